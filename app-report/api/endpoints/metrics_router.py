@@ -0,0 +1,27 @@
+# Prometheus 지표 노출 엔드포인트
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from ...utils.prometheus import CONTENT_TYPE, get_prometheus_metrics
+
+
+class MetricsRouter:
+    """
+    Prometheus 스크레이프 엔드포인트를 처리하는 라우터 클래스
+    요청 지연 / 단계별(MCP 검색, LLM 호출) 처리 시간, 처리 중 요청 수, 프로세스 메모리 제공
+    """
+
+    def __init__(self):
+        # 라우터 생성
+        self.router = APIRouter(tags=["monitoring"])
+        self.router.add_api_route(
+            "/metrics",
+            self.get_metrics,
+            methods=["GET"],
+            summary="Prometheus 지표 조회",
+            description="요청 지연 / 단계별 처리 시간 히스토그램, 처리 중 요청 수, 프로세스 메모리를 Prometheus 텍스트 노출 형식으로 조회합니다.",
+            response_class=Response,
+        )
+
+    def get_metrics(self) -> Response:
+        return Response(content=get_prometheus_metrics(), media_type=CONTENT_TYPE)
@@ -11,8 +11,10 @@ from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import RedirectResponse
 
+from .api.endpoints.metrics_router import MetricsRouter
 from .api.endpoints.tuning_report_router import TuningReportRouter
 from .utils.error_handler import register_exception_handlers
+from .utils.prometheus import RequestMetricsMiddleware
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
@@ -26,8 +28,12 @@ app = FastAPI(
 
 register_exception_handlers(app)  # 반드시 포함
 
+# 라우트별 요청 지연 / 처리 중 요청 수 기록 (/metrics)
+app.add_middleware(RequestMetricsMiddleware)
+
 # 라우터 등록 - API를 기능별로 모듈화
 app.include_router(TuningReportRouter().router)
+app.include_router(MetricsRouter().router)
 
 
 # 루트 경로 핸들러 - 개발 환경에서는 API 문서(Swagger)로 리다이렉트, 프로덕션에서는 접근 제한
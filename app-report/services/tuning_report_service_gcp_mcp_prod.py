@@ -16,6 +16,7 @@ from ..core.prompt_templates.tuning_report_prompt_mcp import build_prompt
 from ..models import qwen_loader_gcp_vllm
 from ..schemas.tuning_schema import TuningReport, TuningReportResponse, UserProfile
 from ..utils.logger import log_performance, logger
+from ..utils.prometheus import stage_timer
 
 # === 재시도 관련 상수 및 예외 정의 ===
 
@@ -191,7 +192,8 @@ async def research_agent(request: TuningReport) -> str:
         server_config = create_server_config()
         client = MultiServerMCPClient(server_config)
         try:
-            tools = await client.get_tools()
+            with stage_timer("mcp_tools"):
+                tools = await client.get_tools()
             logger.debug("MCP 툴 개수: ", len(tools))
         except Exception as e:
             logger.warning(f"[INFO] MCP 도구 로드 실패 또는 초기화 안됨: {e}")
@@ -238,9 +240,10 @@ async def research_agent(request: TuningReport) -> str:
             # 검색 결과
             # search_response = await search_agent.ainvoke({"messages": search_messages})
             # 변경
-            search_response = await safe_invoke_with_timeout(
-                search_agent, {"messages": search_messages}, timeout=120
-            )
+            with stage_timer("mcp_search"):
+                search_response = await safe_invoke_with_timeout(
+                    search_agent, {"messages": search_messages}, timeout=120
+                )
             logger.debug(f"Search response: {search_response}")
             # 검색 결과 추출
             # TODO: 검색 성공/실패 케이스로 나눌 것
@@ -300,7 +303,8 @@ async def generate_with_retry(model, messages):
     for attempt in range(MAX_RETRY):
         try:
             logger.info(f"▶ 모델 응답 요청 (시도 {attempt + 1})")
-            response = await model.ainvoke(messages)
+            with stage_timer("llm_call"):
+                response = await model.ainvoke(messages)
             parsed = safe_json_parse(response.content)
             validate_model_response(parsed)
             return parsed
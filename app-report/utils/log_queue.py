@@ -0,0 +1,148 @@
+# 비동기(큐 기반) 로그 출력 유틸리티
+"""
+요청 처리 경로에서 파일 / 콘솔 쓰기를 하지 않도록 로그 레코드를 큐에 넣고
+별도 스레드(QueueListener)가 실제 핸들러로 출력
+
+- 큐는 LOG_QUEUE_SIZE개로 제한하고, 가득 차면 기다리지 않고 버린 뒤 버린 수를 집계
+  (디스크가 느려도 요청 지연에 영향 없음)
+- LOG_FORMAT=json이면 한 줄 JSON 형식 (time, level, logger, message, pid 및 추가 필드)
+- fork된 워커에는 리스너 스레드가 복사되지 않으므로 자식 프로세스에서 새 큐 / 리스너로 다시 시작
+- 종료 시(atexit) 큐에 남은 레코드를 모두 출력한 뒤 리스너 중지
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List
+
+# 큐 기반 비동기 출력 사용 여부 (false면 핸들러를 로거에 직접 연결)
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+# 출력 대기 레코드 수 상한 (넘으면 버림)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# 로그 형식 (text / json)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# 종료 시 남은 레코드 출력을 기다리는 최대 시간 (초)
+LOG_FLUSH_TIMEOUT = float(os.getenv("LOG_FLUSH_TIMEOUT", "5"))
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    한 줄 JSON 로그 형식
+
+    Args:
+        fields: 레코드에 있으면 함께 기록할 추가 속성 이름 (예: user_id)
+    """
+
+    def __init__(self, fields: List[str] = ()):
+        super().__init__()
+        self.fields = list(fields)
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        for field in self.fields:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class _FlushingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # 큐가 가득 차 있어도 남은 레코드를 출력할 수 있도록 잠시 대기 (기본 구현은 put_nowait)
+        self.queue.put(self._sentinel, timeout=LOG_FLUSH_TIMEOUT)
+
+
+class QueueLogging:
+    """
+    로거 → DroppingQueueHandler → 큐 → QueueListener 스레드 → 실제 핸들러
+
+    Args:
+        target: 레코드를 받을 로거
+        handlers: 리스너 스레드에서 실제로 출력할 핸들러 (파일 / 콘솔)
+        queue_size: 출력 대기 레코드 수 상한
+    """
+
+    def __init__(
+        self,
+        target: logging.Logger,
+        handlers: List[logging.Handler],
+        queue_size: int = LOG_QUEUE_SIZE,
+    ):
+        self.handlers = handlers
+        self.queue_size = queue_size
+        self.handler = DroppingQueueHandler(queue.Queue(queue_size))
+        target.addHandler(self.handler)
+        self._start_listener()
+        atexit.register(self.stop)
+        os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def _start_listener(self) -> None:
+        self.listener = _FlushingQueueListener(
+            self.handler.queue, *self.handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        self._running = True
+
+    def _restart_in_child(self) -> None:
+        # 부모의 큐 잠금 상태 / 리스너 스레드를 물려받지 않도록 새 큐로 시작
+        if not self._running:
+            return
+        self.handler.queue = queue.Queue(self.queue_size)
+        self._start_listener()
+
+    def stop(self) -> None:
+        """남은 레코드를 모두 출력하고 리스너 중지"""
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self.listener.stop()
+        except queue.Full:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "async": True,
+            "format": LOG_FORMAT,
+            "capacity": self.queue_size,
+            "depth": self.handler.queue.qsize(),
+            "enqueued": self.handler.enqueued,
+            "dropped": self.handler.dropped,
+        }
+
+
+def make_formatter(text_format: str, fields: List[str] = ()) -> logging.Formatter:
+    """LOG_FORMAT에 맞는 포매터 (json이면 JsonFormatter, 아니면 text_format 문자열)"""
+    if LOG_FORMAT == "json":
+        return JsonFormatter(fields)
+    return logging.Formatter(text_format)
@@ -9,20 +9,28 @@ from typing import Any, Callable, Dict, Optional
 
 import psutil
 
+from .log_queue import LOG_ASYNC, LOG_FORMAT, QueueLogging, make_formatter
+
 # --------- 로거 설정 ---------
 logger = logging.getLogger("tuning_performance")
-formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+formatter = make_formatter("%(asctime)s [%(levelname)s] %(message)s")
 
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
 
 os.makedirs("logs", exist_ok=True)
 file_handler = logging.FileHandler(
     f"logs/performance_{datetime.now().strftime('%Y%m%d')}.log"
 )
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+
+# 파일 / 콘솔 쓰기는 리스너 스레드에서 (요청 처리 경로는 큐에 넣기만 함, utils/log_queue)
+queue_logging: Optional[QueueLogging] = None
+if LOG_ASYNC:
+    queue_logging = QueueLogging(logger, [console_handler, file_handler])
+else:
+    logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
 
 logger.setLevel(logging.INFO)
 
@@ -288,6 +296,12 @@ def get_performance_summary() -> Dict[str, Any]:
     return summary
 
 
+def get_logging_stats() -> Dict[str, Any]:
+    if queue_logging is None:
+        return {"async": False, "format": LOG_FORMAT}
+    return queue_logging.get_stats()
+
+
 def reset_performance_metrics() -> None:
     for key in performance_metrics:
         performance_metrics[key] = (
@@ -0,0 +1,219 @@
+# Prometheus 지표 수집 / 텍스트 노출 형식 유틸리티 (/metrics)
+"""
+리포트 서비스 요청 지연과 단계별(MCP 검색, LLM 호출) 처리 시간을 고정 버킷 히스토그램에 누적하고
+Prometheus 텍스트 노출 형식(text/plain; version=0.0.4)으로 반환
+
+- 요청 지연: RequestMetricsMiddleware가 라우트 템플릿 단위로 기록, 처리 중 요청 수(포화도)도 함께 유지
+- 단계 시간: with stage_timer("llm_call"): ... 블록 단위로 기록, 예외로 끝나면 단계별 오류 수 증가
+- 로그 큐(utils/log_queue)에서 버린 레코드 수 / 대기 레코드 수도 함께 노출
+- 기록은 버킷 위치 이분 탐색 + 카운터 증가뿐이므로 요청 처리 경로 비용이 작음
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import psutil
+
+from .logger import get_logging_stats
+
+# 히스토그램 le 버킷 경계 (초, LLM 호출이 길어 tuning 서비스보다 넓게 잡음)
+PROMETHEUS_BUCKETS = sorted(
+    float(b)
+    for b in os.getenv(
+        "PROMETHEUS_BUCKETS", "0.05,0.1,0.25,0.5,1,2.5,5,10,20,30,60,120,300"
+    ).split(",")
+)
+# 노출 형식 Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# 라우트에 매칭되지 않은 요청의 route 라벨
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """
+    라벨 조합별 고정 버킷 히스토그램
+
+    Args:
+        name: 지표 이름
+        help_text: 지표 설명
+        label_names: 라벨 이름 목록
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        # 라벨 값 → [버킷별 개수(+Inf 포함), 합계]
+        self._series: Dict[Tuple[Any, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[Any, ...], value: float) -> None:
+        position = bisect_left(PROMETHEUS_BUCKETS, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [
+                    [0] * (len(PROMETHEUS_BUCKETS) + 1),
+                    0.0,
+                ]
+            series[0][position] += 1
+            series[1] += value
+
+    def render(self, lines: List[str]) -> None:
+        with self._lock:
+            series = [
+                (labels, list(c), total) for labels, (c, total) in self._series.items()
+            ]
+        if not series:
+            return
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for labels, counts, total in series:
+            base = dict(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(PROMETHEUS_BUCKETS + ["+Inf"], counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels({**base, 'le': bound})} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(base)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(base)} {cumulative}")
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        for v in labels.values()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+# 모듈 레벨 싱글톤 인스턴스
+http_request_duration = Histogram(
+    "report_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+stage_duration = Histogram(
+    "report_stage_duration_seconds",
+    "Report pipeline stage latency (mcp_tools, mcp_search, llm_call).",
+    ("stage", "outcome"),
+)
+_stage_errors: Dict[str, int] = {}
+_in_flight = 0
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    블록 실행 시간을 단계 히스토그램에 기록 (예외로 끝나면 outcome="error"와 오류 수 증가)
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        stage_duration.observe((stage, outcome), time.perf_counter() - start)
+        if outcome == "error":
+            _stage_errors[stage] = _stage_errors.get(stage, 0) + 1
+
+
+class RequestMetricsMiddleware:
+    """
+    요청 지연 / 처리 중 요청 수 기록 ASGI 미들웨어 (응답 본문 전송 완료까지)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status: Optional[int] = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _in_flight -= 1
+            route = scope.get("route")
+            http_request_duration.observe(
+                (
+                    scope["method"],
+                    getattr(route, "path", UNMATCHED_ROUTE),
+                    status or 500,
+                ),
+                time.perf_counter() - start,
+            )
+
+
+def get_prometheus_metrics() -> str:
+    """
+    요청 / 단계 히스토그램, 처리 중 요청 수, 프로세스 지표를 Prometheus 텍스트 노출 형식으로 반환
+    """
+    lines: List[str] = []
+    http_request_duration.render(lines)
+    stage_duration.render(lines)
+
+    lines.append("# HELP report_stage_errors_total Failed pipeline stages.")
+    lines.append("# TYPE report_stage_errors_total counter")
+    for stage, count in list(_stage_errors.items()):
+        lines.append(
+            f"report_stage_errors_total{_format_labels({'stage': stage})} {count}"
+        )
+
+    lines.append("# HELP report_requests_in_flight Requests currently being handled.")
+    lines.append("# TYPE report_requests_in_flight gauge")
+    lines.append(f"report_requests_in_flight {_in_flight}")
+
+    logging_stats = get_logging_stats()
+    if logging_stats["async"]:
+        lines += [
+            "# HELP report_log_records_dropped_total Log records dropped because the log queue was full.",
+            "# TYPE report_log_records_dropped_total counter",
+            f"report_log_records_dropped_total {logging_stats['dropped']}",
+            "# HELP report_log_queue_depth Log records waiting to be written.",
+            "# TYPE report_log_queue_depth gauge",
+            f"report_log_queue_depth {logging_stats['depth']}",
+        ]
+
+    try:
+        process = psutil.Process(os.getpid())
+        with process.oneshot():
+            memory = process.memory_info()
+            cpu = process.cpu_times()
+            created = process.create_time()
+        lines += [
+            "# HELP process_resident_memory_bytes Resident memory size in bytes.",
+            "# TYPE process_resident_memory_bytes gauge",
+            f"process_resident_memory_bytes {memory.rss}",
+            "# HELP process_virtual_memory_bytes Virtual memory size in bytes.",
+            "# TYPE process_virtual_memory_bytes gauge",
+            f"process_virtual_memory_bytes {memory.vms}",
+            "# HELP process_cpu_seconds_total Total user and system CPU time spent in seconds.",
+            "# TYPE process_cpu_seconds_total counter",
+            f"process_cpu_seconds_total {cpu.user + cpu.system!r}",
+            "# HELP process_start_time_seconds Start time of the process since unix epoch in seconds.",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {created!r}",
+        ]
+    except Exception:
+        pass
+    return "\n".join(lines) + "\n"
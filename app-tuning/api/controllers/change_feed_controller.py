@@ -0,0 +1,42 @@
+"""
+사용자 변경 피드 조회를 담당하는 컨트롤러
+복제 노드가 마지막으로 반영한 순번 이후의 등록/수정/삭제 이벤트를 반환
+"""
+
+import sqlite3
+
+from core.change_feed import change_feed
+from fastapi import HTTPException
+
+
+def get_changes(after: int, limit: int) -> dict:
+    """
+    순번 after 이후의 변경 이벤트를 조회하는 컨트롤러 함수
+
+    Args:
+        after: 마지막으로 반영한 순번 (0이면 처음부터)
+        limit: 최대 이벤트 수
+
+    Returns:
+        응답 코드와 이벤트 목록, head / oldest 순번
+
+    Raises:
+        HTTPException: 피드가 비활성이거나 조회에 실패한 경우
+    """
+    if not change_feed.enabled:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "CHANGE_FEED_DISABLED",
+                "message": "변경 피드가 비활성화되어 있습니다 (CHANGE_FEED_ENABLED)",
+            },
+        )
+    try:
+        page = change_feed.read(after, limit)
+    except sqlite3.Error as e:
+        print(f"Error in change feed controller: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"code": "CHANGE_FEED_SERVER_ERROR", "message": str(e)},
+        )
+    return {"code": "CHANGE_FEED_RETRIEVED", "data": page}
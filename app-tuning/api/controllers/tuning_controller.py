@@ -4,20 +4,27 @@
 """
 
 import logging
+from typing import Optional
 
-from fastapi import HTTPException
+from core.domain_partition import domain_partition
+from fastapi import HTTPException, Request
 from schemas.tuning_schema import TuningMatchingList, TuningResponse
 from services.tuning_service import get_matching_users
+from services.user_service import get_user_domain
+from utils.logger import bind_user_id
 
 logger = logging.getLogger(__name__)
 
 
-async def get_tuning_matches(user_id: int) -> TuningResponse:
+async def get_tuning_matches(
+    user_id: int, request: Optional[Request] = None
+) -> TuningResponse:
     """
     사용자 ID를 기반으로 매칭 추천을 제공하는 컨트롤러 함수
 
     Args:
         userId: 매칭을 요청한 사용자의 ID
+        request: 원본 요청 (다중 노드 파티션에서 다른 노드 소유 도메인이면 redirect / proxy)
 
     Returns:
         Dictionary containing the response code and matching user IDs list
@@ -26,6 +33,10 @@ async def get_tuning_matches(user_id: int) -> TuningResponse:
         HTTPException: 오류 발생 시 적절한 상태 코드와 메시지를 포함한 예외 발생
     """
     user_id = str(user_id)
+    bind_user_id(user_id)
+    routed = await domain_partition.route_user(request, user_id, get_user_domain)
+    if routed is not None:
+        return routed
     try:
         result = await get_matching_users(user_id)
 
@@ -3,16 +3,51 @@
 라우터에서 받은 요청을 처리하고 서비스 레이어와 연결
 """
 
+import asyncio
 import logging
+from typing import Optional
 
+from core.domain_index import domain_indexes
+from core.domain_partition import domain_partition
+from core.recommendation_cache import recommendation_cache
+from core.similarity_write_queue import similarity_coalescer, similarity_write_queue
 from core.vector_database import list_similarities, list_users, reset_collections
-from fastapi import HTTPException
-from schemas.user_schema import BaseResponse, EmbeddingRegister
-from services.user_service import delete_user_metatdata, register_user
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from models.sbert_loader import (
+    MODEL_RETRY_AFTER_SECONDS,
+    get_model_status,
+    is_model_ready,
+)
+from schemas.user_schema import BaseResponse, EmbeddingRegister, EmbeddingUpdate
+from services import registration_job_service
+from services.user_service import (
+    delete_user_metatdata,
+    get_user_domain,
+    register_user,
+    update_user_profile,
+)
+from utils.logger import bind_user_id
 
 logger = logging.getLogger(__name__)
 
 
+def ensure_model_ready() -> None:
+    """
+    임베딩 모델이 백그라운드 로드 중이면 503 + Retry-After로 즉시 응답
+
+    Raises:
+        HTTPException: 모델 준비 전(503)
+    """
+    if is_model_ready():
+        return
+    raise HTTPException(
+        status_code=503,
+        detail={"code": "EMBEDDING_MODEL_NOT_READY", "data": get_model_status()},
+        headers={"Retry-After": str(MODEL_RETRY_AFTER_SECONDS)},
+    )
+
+
 async def db_user_list():
     result = await list_users()
     return {
@@ -38,16 +73,23 @@ async def db_similarity_list():
 
 
 async def db_reset_data():
+    similarity_coalescer.flush()
+    similarity_write_queue.clear()
     reset_collections()  # 동기 함수이므로 await 필요 없음
+    recommendation_cache.clear()
+    domain_indexes.clear()
     return BaseResponse(status="success", code="CHROMADB_RESET_SUCCESS")
 
 
-async def create_user(user_data: EmbeddingRegister) -> BaseResponse:
+async def create_user(
+    user_data: EmbeddingRegister, request: Optional[Request] = None
+) -> BaseResponse:
     """
     새 사용자를 등록하고 임베딩 벡터를 생성하는 컨트롤러 함수
 
     Args:
         user_data: 사용자 등록 데이터 (Pydantic 모델)
+        request: 원본 요청 (다중 노드 파티션에서 다른 노드 소유 도메인이면 redirect / proxy)
 
     Returns:
         Dictionary containing the response code and result
@@ -55,6 +97,11 @@ async def create_user(user_data: EmbeddingRegister) -> BaseResponse:
     Raises:
         HTTPException: 오류 발생 시 적절한 상태 코드와 메시지를 포함한 예외 발생
     """
+    bind_user_id(user_data.userId)
+    routed = await domain_partition.route(request, user_data.emailDomain)
+    if routed is not None:
+        return routed
+    ensure_model_ready()
     try:
         await register_user(user_data)
         return BaseResponse(code="EMBEDDING_REGISTER_SUCCESS", data=None)
@@ -73,7 +120,52 @@ async def create_user(user_data: EmbeddingRegister) -> BaseResponse:
         )
 
 
-async def delete_user_data(user_id: int) -> BaseResponse:
+async def create_user_async(
+    user_data: EmbeddingRegister, request: Optional[Request] = None
+) -> Response:
+    """
+    등록 요청을 검증한 뒤 작업 큐에 넣고 202와 작업 ID를 반환하는 컨트롤러 함수
+
+    Args:
+        user_data: 사용자 등록 데이터 (Pydantic 모델)
+
+    Returns:
+        202 응답 (작업 ID와 상태)
+
+    Raises:
+        HTTPException: 검증 실패, 중복 사용자, 대기열 포화, 모델 준비 전(503) 시 발생
+    """
+    bind_user_id(user_data.userId)
+    routed = await domain_partition.route(request, user_data.emailDomain)
+    if routed is not None:
+        return routed
+    ensure_model_ready()
+    try:
+        job = await registration_job_service.submit_registration(user_data)
+    except HTTPException as http_ex:
+        logger.warning(f"[REGISTER_USER_ASYNC_HTTP_ERROR] {http_ex.detail}")
+        raise
+
+    return JSONResponse(
+        status_code=202,
+        content=BaseResponse(
+            code="EMBEDDING_REGISTER_ACCEPTED",
+            data={"jobId": job["jobId"], "status": job["status"]},
+        ).model_dump(),
+    )
+
+
+async def get_registration_job(job_id: str) -> BaseResponse:
+    """
+    등록 작업 상태와 단계별 소요 시간을 조회하는 컨트롤러 함수
+    """
+    job = await registration_job_service.get_registration_job(job_id)
+    return BaseResponse(code="REGISTRATION_JOB_RETRIEVED", data=job)
+
+
+async def delete_user_data(
+    user_id: int, request: Optional[Request] = None
+) -> BaseResponse:
     """
     사용자 데이터를 삭제하는 컨트롤러 함수
 
@@ -86,8 +178,13 @@ async def delete_user_data(user_id: int) -> BaseResponse:
     Raises:
         HTTPException: 사용자 데이터가 없거나 서버 오류가 발생한 경우
     """
+    bind_user_id(user_id)
+    routed = await domain_partition.route_user(request, user_id, get_user_domain)
+    if routed is not None:
+        return routed
     try:
         delete_user_metatdata(user_id)
+        domain_partition.forget_user(user_id)
         return BaseResponse(code="EMBEDDING_DELETE_SUCCESS", data=None)
     except HTTPException as http_ex:
         logger.warning(f"[EMBEDDING_DELETE_HTTP_ERROR] {http_ex.detail}")
@@ -100,3 +197,35 @@ async def delete_user_data(user_id: int) -> BaseResponse:
                 code="EMBEDDING_DELETE_SERVER_ERROR", data=None
             ).model_dump(),
         )
+
+
+async def update_user_data(
+    user_id: int, update: EmbeddingUpdate, request: Optional[Request] = None
+) -> BaseResponse:
+    """
+    사용자 프로필을 부분 수정하는 컨트롤러 함수
+    (바뀐 필드만 다시 임베딩하고, 벡터나 규칙 입력이 바뀐 경우에만 매칭 스코어 재계산)
+
+    Raises:
+        HTTPException: 없는 사용자(404), 재임베딩이 필요한데 모델 준비 전(503), 처리 실패(500)
+    """
+    bind_user_id(user_id)
+    routed = await domain_partition.route_user(request, user_id, get_user_domain)
+    if routed is not None:
+        return routed
+    try:
+        # 임베딩 / Chroma 호출은 동기 함수이므로 스레드에서 수행 (이벤트 루프 차단 방지)
+        # 모델 준비 확인은 재임베딩이 필요한 수정에만 (규칙 필드만 바뀐 수정은 로드 중에도 처리)
+        result = await asyncio.to_thread(
+            update_user_profile, str(user_id), update, ensure_model_ready
+        )
+    except HTTPException as http_ex:
+        logger.warning(f"[UPDATE_USER_HTTP_ERROR] {http_ex.detail}")
+        raise
+
+    code = (
+        "EMBEDDING_UPDATE_SUCCESS"
+        if result["changedFields"]
+        else "EMBEDDING_UPDATE_NOT_MODIFIED"
+    )
+    return BaseResponse(code=code, data=result)
@@ -0,0 +1,61 @@
+"""
+사용자 변경 피드 API 엔드포인트 정의 및 관리
+다중 노드 환경에서 복제 노드가 상주 인덱스를 증분 갱신할 수 있도록
+순번이 붙은 등록/수정/삭제 이벤트를 제공
+"""
+
+from core.change_feed import CHANGE_FEED_BATCH_SIZE
+from fastapi import APIRouter, Query
+
+from ..controllers import change_feed_controller
+
+
+class ChangeFeedRouter:
+    """
+    사용자 변경 피드 관련 엔드포인트를 처리하는 라우터 클래스
+    """
+
+    def __init__(self):
+        # 라우터 생성
+        self.router = APIRouter(prefix="/api", tags=["change-feed"])
+        # 엔드포인트 등록 (/api/v1/changes)
+        self.router.add_api_route(
+            "/v1/changes",
+            self.get_changes,
+            methods=["GET"],
+            summary="사용자 변경 피드 조회",
+            description="순번(after) 이후의 사용자 등록/수정/삭제 이벤트를 순서대로 조회합니다. 복제 노드의 인덱스 증분 갱신에 사용합니다.",
+        )
+
+    def get_changes(
+        self,
+        after: int = Query(0, description="마지막으로 반영한 순번", ge=0),
+        limit: int = Query(
+            CHANGE_FEED_BATCH_SIZE, description="최대 이벤트 수", ge=0, le=10000
+        ),
+    ) -> dict:
+        """
+        순번 이후 변경 이벤트 조회
+
+        - **after**: 마지막으로 반영한 순번 (이 순번보다 큰 이벤트만 반환)
+        - **limit**: 최대 이벤트 수 (0이면 head / oldest만 조회)
+
+        **응답 예시**:
+        ```json
+        {
+          "code": "CHANGE_FEED_RETRIEVED",
+          "data": {
+            "events": [
+              {"seq": 101, "op": "upsert", "userId": "30", "domain": "kakaotech.com", "createdAt": 1718000000.1},
+              {"seq": 102, "op": "delete", "userId": "5", "domain": "kakaotech.com", "createdAt": 1718000003.4}
+            ],
+            "head": 102,
+            "oldest": 1
+          }
+        }
+        ```
+
+        oldest가 after + 1보다 크면 필요한 이벤트가 보존 기간이 지나 삭제된 것이므로
+        로드된 인덱스를 버리고 head부터 다시 시작해야 합니다.
+        """
+        return change_feed_controller.get_changes(after, limit)
@@ -0,0 +1,59 @@
+"""
+클러스터 파티션 API 엔드포인트 정의 및 관리
+다중 노드 배포에서 도메인이 어느 노드에 배치되는지(consistent hashing) 조회
+"""
+
+from typing import List, Optional
+
+from core.domain_partition import domain_partition
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+
+
+class ClusterRouter:
+    """
+    도메인 파티션 맵 조회 엔드포인트를 처리하는 라우터 클래스
+    """
+
+    def __init__(self):
+        # 라우터 생성
+        self.router = APIRouter(prefix="/api/v1/cluster", tags=["cluster"])
+        # 엔드포인트 등록 (/api/v1/cluster/partitions)
+        self.router.add_api_route(
+            "/partitions",
+            self.get_partitions,
+            methods=["GET"],
+            summary="도메인 파티션 맵 조회",
+            description="클러스터 노드 목록, 이 노드 ID, 라우팅 방식(redirect/proxy)과 요청한 도메인의 소유 노드를 조회합니다.",
+        )
+
+    def get_partitions(
+        self,
+        domains: Optional[List[str]] = Query(
+            None, alias="domain", description="소유 노드를 확인할 도메인 (여러 개 가능)"
+        ),
+    ) -> JSONResponse:
+        """
+        도메인 파티션 맵 반환
+
+        **응답 예시**:
+        ```json
+        {
+          "code": "CLUSTER_PARTITIONS_RETRIEVED",
+          "data": {
+            "enabled": true,
+            "nodeId": "node-a",
+            "mode": "redirect",
+            "vnodes": 128,
+            "nodes": {"node-a": "http://10.0.0.1:8000", "node-b": "http://10.0.0.2:8000"},
+            "owners": {"kakaotech.com": "node-b"}
+          }
+        }
+        ```
+        """
+        return JSONResponse(
+            content={
+                "code": "CLUSTER_PARTITIONS_RETRIEVED",
+                "data": domain_partition.get_map(domains),
+            }
+        )
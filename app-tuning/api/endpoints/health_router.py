@@ -7,6 +7,8 @@ import os
 
 import chromadb
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from models.sbert_loader import MODEL_RETRY_AFTER_SECONDS, get_model_status
 
 
 class HealthRouter:
@@ -37,12 +39,32 @@ class HealthRouter:
     def _configure_routes(self):
         """라우터 경로 설정"""
         self.router.add_api_route("", self.check_health, methods=["GET"])
+        self.router.add_api_route("/ready", self.check_ready, methods=["GET"])
         self.router.add_api_route("/chromadb", self.check_chromadb, methods=["GET"])
 
     async def check_health(self):
         """기본 헬스 체크 엔드포인트"""
         return {"status": "UP", "message": "서비스가 정상적으로 실행 중입니다"}
 
+    async def check_ready(self):
+        """준비 상태 확인 엔드포인트 (임베딩 모델 로드 완료 전에는 503)"""
+        model = get_model_status()
+        if model["status"] == "READY":
+            return {
+                "status": "UP",
+                "message": "요청을 처리할 준비가 되었습니다",
+                "model": model,
+            }
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "DOWN",
+                "message": "임베딩 모델을 로드하는 중입니다",
+                "model": model,
+            },
+            headers={"Retry-After": str(MODEL_RETRY_AFTER_SECONDS)},
+        )
+
     async def check_chromadb(self):
         """ChromaDB 연결 확인 엔드포인트"""
         if self.chroma_client is None:
@@ -0,0 +1,46 @@
+"""
+Prometheus 지표 노출 엔드포인트 정의 및 관리
+요청 지연 / 단계별 처리 시간 히스토그램, 큐 깊이, 캐시 적중률, 프로세스 메모리를
+Prometheus 텍스트 노출 형식으로 제공 (/metrics)
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from utils import logger
+from utils.prometheus import CONTENT_TYPE
+
+
+class MetricsRouter:
+    """
+    Prometheus 스크레이프 엔드포인트를 처리하는 라우터 클래스
+    """
+
+    def __init__(self):
+        # 라우터 생성
+        self.router = APIRouter(tags=["monitoring"])
+        # 엔드포인트 등록 (/metrics)
+        self.router.add_api_route(
+            "/metrics",
+            self.get_metrics,
+            methods=["GET"],
+            summary="Prometheus 지표 조회",
+            description="요청 지연 / 단계별 처리 시간 히스토그램, 큐 깊이, 캐시 적중률, 프로세스 메모리를 Prometheus 텍스트 노출 형식으로 조회합니다.",
+            response_class=Response,
+        )
+
+    def get_metrics(self) -> Response:
+        """
+        Prometheus 텍스트 노출 형식 지표 반환
+
+        **응답 예시**:
+        ```text
+        # TYPE tuning_http_request_duration_seconds histogram
+        tuning_http_request_duration_seconds_bucket{method="GET",route="/api/v1/tuning",status="200",le="0.1"} 42
+        ...
+        tuning_registration_jobs_queued 3
+        process_resident_memory_bytes 1.2e+09
+        ```
+        """
+        return Response(
+            content=logger.get_prometheus_metrics(), media_type=CONTENT_TYPE
+        )
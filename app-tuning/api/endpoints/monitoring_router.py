@@ -3,6 +3,9 @@
 수집된 성능 로그를 기반으로 성능 요약 통계를 제공
 """
 
+from core.change_feed import change_feed, worker_sync_replica
+from core.embedding_migration import embedding_migration
+from core.similarity_write_queue import similarity_write_queue
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from utils import logger
@@ -24,6 +27,30 @@ class PerformanceRouter:
             summary="성능 지표 요약 조회",
             description="API 응답 시간, 메모리 사용량, 오류 횟수 등 애플리케이션 성능 관련 메트릭 요약 정보를 조회합니다.",
         )
+        # 엔드포인트 등록 (/monitoring/similarity-queue)
+        self.router.add_api_route(
+            "/similarity-queue",
+            self.get_similarity_queue,
+            methods=["GET"],
+            summary="유사도 쓰기 지연 큐 상태 조회",
+            description="Chroma 반영을 기다리는 유사도 쓰기 작업 수(큐 깊이), 가장 오래된 작업의 지연 시간, 반영/오류 횟수를 조회합니다.",
+        )
+        # 엔드포인트 등록 (/monitoring/embedding-migration)
+        self.router.add_api_route(
+            "/embedding-migration",
+            self.get_embedding_migration,
+            methods=["GET"],
+            summary="임베딩 재생성 마이그레이션 진행 상태 조회",
+            description="모델 교체 후 이전 버전 임베딩 재생성의 도메인별 진행 상태(대상/완료/실패 수, 전환 여부)를 조회합니다.",
+        )
+        # 엔드포인트 등록 (/monitoring/change-feed)
+        self.router.add_api_route(
+            "/change-feed",
+            self.get_change_feed,
+            methods=["GET"],
+            summary="사용자 변경 피드 / 복제 지연 상태 조회",
+            description="이 노드가 기록한 변경 피드의 마지막 순번과, 복제 노드인 경우 반영한 순번 / 지연 이벤트 수 / 지연 시간 / 재동기화 횟수를 조회합니다.",
+        )
 
     def get_summary(self) -> JSONResponse:
         """
@@ -45,3 +72,78 @@ class PerformanceRouter:
         return JSONResponse(
             content={"code": "PERFORMANCE_SUMMARY_RETRIEVED", "data": summary}
         )
+
+    def get_similarity_queue(self) -> JSONResponse:
+        """
+        유사도 쓰기 지연 큐 상태를 반환
+
+        **응답 예시**:
+        ```json
+        {
+          "code": "SIMILARITY_QUEUE_STATUS_RETRIEVED",
+          "data": {
+            "enabled": true,
+            "depth": 120,
+            "lag_seconds": 0.84,
+            ...
+          }
+        }
+        ```
+        """
+        return JSONResponse(
+            content={
+                "code": "SIMILARITY_QUEUE_STATUS_RETRIEVED",
+                "data": similarity_write_queue.get_stats(),
+            }
+        )
+
+    def get_embedding_migration(self) -> JSONResponse:
+        """
+        임베딩 재생성 마이그레이션 진행 상태를 반환
+
+        **응답 예시**:
+        ```json
+        {
+          "code": "EMBEDDING_MIGRATION_STATUS_RETRIEVED",
+          "data": {
+            "targetVersion": "jhgan-ko-sroberta-multitask",
+            "running": true,
+            "domains": {
+              "kakaotech.com": {"status": "MIGRATING", "total": 1200, "migrated": 512, ...}
+            }
+          }
+        }
+        ```
+        """
+        return JSONResponse(
+            content={
+                "code": "EMBEDDING_MIGRATION_STATUS_RETRIEVED",
+                "data": embedding_migration.get_stats(),
+            }
+        )
+
+    def get_change_feed(self) -> JSONResponse:
+        """
+        변경 피드 및 복제 지연 상태를 반환
+
+        **응답 예시**:
+        ```json
+        {
+          "code": "CHANGE_FEED_STATUS_RETRIEVED",
+          "data": {
+            "feed": {"enabled": false, "appended": 0, ...},
+            "replica": {"source": "http://tuning-primary:8000", "applied_seq": 1520, "lag_events": 3, "lag_seconds": 0.42, ...}
+          }
+        }
+        ```
+        """
+        replica = worker_sync_replica()
+        return JSONResponse(
+            content={
+                "code": "CHANGE_FEED_STATUS_RETRIEVED",
+                "data": {
+                    "feed": change_feed.get_stats(),
+                    "replica": replica.get_stats() if replica is not None else None,
+                },
+            }
+        )
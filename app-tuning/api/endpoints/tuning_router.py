@@ -4,7 +4,7 @@
 /api 요청을 처리하고, 비즈니스 로직 실행을 위해 컨트롤러와 연결
 """
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 from schemas.tuning_schema import TuningResponse
 
 from ..controllers import tuning_controller
@@ -31,6 +31,7 @@ class TuningRouter:
 
     async def get_tuning(
         self,
+        request: Request,
         user_id: int = Query(
             ..., alias="userId", description="매칭할 사용자의 ID", gt=0
         ),
@@ -50,6 +51,9 @@ class TuningRouter:
         }
         ```
 
+        다중 노드 파티션(CLUSTER_NODES)에서 다른 노드가 소유한 도메인의 사용자면
+        307 redirect 또는 소유 노드 응답(proxy)을 반환합니다.
+
         매칭 결과가 없는 경우:
         ```json
         {
@@ -58,4 +62,4 @@ class TuningRouter:
         }
         ```
         """
-        return await tuning_controller.get_tuning_matches(user_id)
+        return await tuning_controller.get_tuning_matches(user_id, request)
@@ -5,8 +5,8 @@
 """
 
 from api.controllers import user_controller
-from fastapi import APIRouter, Body, Path
-from schemas.user_schema import BaseResponse, EmbeddingRegister
+from fastapi import APIRouter, Body, Path, Query, Request
+from schemas.user_schema import BaseResponse, EmbeddingRegister, EmbeddingUpdate
 
 
 class UserRouter:
@@ -44,7 +44,16 @@ class UserRouter:
             methods=["POST"],
             response_model=BaseResponse,
             summary="사용자 등록",
-            description="사용자 등록 후 임베딩 벡터를 생성합니다.",
+            description="사용자 등록 후 임베딩 벡터를 생성합니다. async=true이면 검증 후 202와 작업 ID를 바로 반환합니다.",
+        )
+
+        self.router.add_api_route(
+            "/v1/users/jobs/{job_id}",
+            self.get_registration_job,
+            methods=["GET"],
+            response_model=BaseResponse,
+            summary="비동기 등록 작업 조회",
+            description="비동기 사용자 등록 작업의 상태와 단계별 소요 시간을 조회합니다.",
         )
 
         self.router.add_api_route(
@@ -63,6 +72,14 @@ class UserRouter:
             summary="사용자 삭제",
             description="벡터 데이터베이스에서 사용자 데이터를 삭제합니다.",
         )
+        self.router.add_api_route(
+            "/v2/users/{user_id}",
+            self.update_user_data,
+            methods=["PATCH"],
+            response_model=BaseResponse,
+            summary="사용자 프로필 부분 수정",
+            description="바뀐 필드만 다시 임베딩하고, 벡터나 규칙 입력이 바뀐 경우에만 매칭 스코어를 다시 계산합니다.",
+        )
 
     async def db_user_list(self) -> BaseResponse:
         return await user_controller.db_user_list()
@@ -74,12 +91,18 @@ class UserRouter:
         return await user_controller.db_reset_data()
 
     async def create_user(
-        self, user_data: EmbeddingRegister = Body(..., description="사용자 등록 데이터")
+        self,
+        request: Request,
+        user_data: EmbeddingRegister = Body(..., description="사용자 등록 데이터"),
+        run_async: bool = Query(
+            False, alias="async", description="true이면 작업 큐에 넣고 202 반환"
+        ),
     ) -> BaseResponse:
         """
         신규 사용자를 등록 후 임베딩 벡터 생성
 
         - **user_data**: 사용자 등록 정보 (개인정보, 키워드, 관심사 등)
+        - **async**: true이면 검증 후 바로 202와 작업 ID 반환 (GET /api/v1/users/jobs/{jobId}로 조회)
 
         **응답 예시**:
         ```json
@@ -97,11 +120,47 @@ class UserRouter:
           "data": null
         }
         ```
+
+        **비동기 응답 예시** (202 Accepted):
+        ```json
+        {
+          "code": "EMBEDDING_REGISTER_ACCEPTED",
+          "data": {"jobId": "9f1c...", "status": "QUEUED"}
+        }
+        ```
+        """
+        if run_async:
+            return await user_controller.create_user_async(user_data, request)
+        return await user_controller.create_user(user_data, request)
+
+    async def get_registration_job(
+        self, job_id: str = Path(..., description="등록 작업 ID")
+    ) -> BaseResponse:
+        """
+        비동기 등록 작업 상태 조회
+
+        **응답 예시**:
+        ```json
+        {
+          "code": "REGISTRATION_JOB_RETRIEVED",
+          "data": {
+            "jobId": "9f1c...",
+            "userId": "1",
+            "status": "SUCCEEDED",
+            "queueWaitSeconds": 0.012,
+            "stages": {"embed": 0.21, "store": 0.03, "score": 0.08, "fanout": 0.4},
+            "totalSeconds": 0.74,
+            "error": null
+          }
+        }
+        ```
         """
-        return await user_controller.create_user(user_data)
+        return await user_controller.get_registration_job(job_id)
 
     async def delete_user_data(
-        self, user_id: int = Path(..., description="삭제할 사용자의 ID")
+        self,
+        request: Request,
+        user_id: int = Path(..., description="삭제할 사용자의 ID"),
     ) -> BaseResponse:
         """
         사용자 데이터 삭제
@@ -126,4 +185,43 @@ class UserRouter:
         }
         ```
         """
-        return await user_controller.delete_user_data(user_id)
+        return await user_controller.delete_user_data(user_id, request)
+
+    async def update_user_data(
+        self,
+        request: Request,
+        user_id: int = Path(..., description="수정할 사용자의 ID"),
+        update: EmbeddingUpdate = Body(..., description="변경할 필드만 포함"),
+    ) -> BaseResponse:
+        """
+        사용자 프로필 부분 수정
+
+        - **user_id**: 사용자 아이디
+        - **update**: 변경할 필드 (emailDomain, userId는 변경 불가)
+
+        MBTI 등 규칙 필드만 바뀐 경우 임베딩 추론 없이 매칭 스코어만 다시 계산합니다.
+
+        **응답 예시**:
+        ```json
+        {
+          "code": "EMBEDDING_UPDATE_SUCCESS",
+          "data": {
+            "changedFields": ["MBTI"],
+            "reembeddedFields": [],
+            "reembeddedProfile": false,
+            "similarityUpdated": true,
+            "timings": {"embed": 0.0, "store": 0.02, "score": 0.05, "fanout": 0.3}
+          }
+        }
+        ```
+
+        **오류 응답**:
+        - 404 Not Found: 없는 사용자
+        ```json
+        {
+          "code": "EMBEDDING_UPDATE_NOT_FOUND_USER",
+          "data": null
+        }
+        ```
+        """
+        return await user_controller.update_user_data(user_id, update, request)
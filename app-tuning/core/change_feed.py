@@ -0,0 +1,465 @@
+"""
+사용자 변경 피드 모듈
+GET /api/v1/tuning을 여러 노드로 수평 확장할 때 각 노드의 상주 도메인 인덱스를
+Chroma 전체 스캔 없이 맞추기 위해, user_service의 등록/수정/삭제를 순번(seq)이 붙은
+추가 전용 로그(SQLite, WAL)로 기록하고 복제 노드가 이를 읽어 증분 반영
+
+이벤트 종류:
+- upsert: 사용자 등록 / 프로필 수정 / 재임베딩 (벡터와 메타데이터는 Chroma에서 다시 읽음)
+- delete: 사용자 삭제
+- reload: 도메인 전체 변경 (임베딩 버전 전환 등, 복제 노드는 도메인 인덱스를 다시 로드)
+
+복제 노드 (CHANGE_FEED_SOURCE 설정 시):
+1. 시작 시점의 head부터 읽기 시작 (그 이전 상태는 도메인을 처음 로드할 때 Chroma에서 읽음)
+2. 마지막으로 반영한 seq 이후 이벤트를 배치로 읽어 로드된 도메인 인덱스에만 반영
+3. 보존 기간이 지나 필요한 이벤트가 지워졌거나 피드가 초기화되었으면(catch-up 불가)
+   로드된 인덱스를 모두 내리고 현재 head부터 다시 시작 (이후 요청 시 Chroma에서 다시 로드)
+4. 지연 이벤트 수 / 지연 시간은 성능 요약(change_feed_replica)에서 확인
+
+읽기 방식:
+- local: 같은 피드 파일을 직접 읽음 (공유 볼륨, 같은 서버의 다른 프로세스)
+- http(s)://<원본 노드>: 원본 노드의 GET /api/v1/changes 호출
+
+uvicorn --workers N(UVICORN_WORKERS / WEB_CONCURRENCY > 1)으로 실행하면 워커마다 상주 인덱스를
+따로 가지며 pre-fork 세대 카운터(worker_generations)도 없으므로, 설정과 관계없이 피드 기록을 켜고
+같은 피드 파일을 읽는 local 복제기로 다른 워커의 변경을 반영 (worker_sync_replica, 폴링 주기만큼 지연)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import logger
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# ---------------------- 상수 정의 ----------------------
+CHANGE_FEED_ENABLED = os.getenv("CHANGE_FEED_ENABLED", "false").lower() == "true"
+# 피드 파일 경로
+CHANGE_FEED_PATH = os.getenv(
+    "CHANGE_FEED_PATH", os.path.join(BASE_DIR, "data", "change_feed.db")
+)
+# 보존할 최근 이벤트 수 (이보다 뒤처진 복제 노드는 전체 재동기화)
+CHANGE_FEED_RETENTION = int(os.getenv("CHANGE_FEED_RETENTION", "1000000"))
+# 복제 노드의 피드 원본 ("local" 또는 원본 노드 URL, 빈 값이면 복제 안 함)
+CHANGE_FEED_SOURCE = os.getenv("CHANGE_FEED_SOURCE", "")
+# 한 번에 읽을 최대 이벤트 수
+CHANGE_FEED_BATCH_SIZE = int(os.getenv("CHANGE_FEED_BATCH_SIZE", "500"))
+# 새 이벤트가 없을 때 확인 주기 (초)
+CHANGE_FEED_POLL_INTERVAL = float(os.getenv("CHANGE_FEED_POLL_INTERVAL", "1.0"))
+# HTTP 원본 요청 타임아웃 (초)
+CHANGE_FEED_HTTP_TIMEOUT = float(os.getenv("CHANGE_FEED_HTTP_TIMEOUT", "5"))
+# 같은 서버의 API 워커 수 (uvicorn --workers / pre-fork)
+SERVER_WORKERS = int(
+    os.getenv("UVICORN_WORKERS") or os.getenv("WEB_CONCURRENCY") or "1"
+)
+
+UPSERT = "upsert"
+DELETE = "delete"
+RELOAD = "reload"
+
+# 보존 기간 정리 주기 (추가한 이벤트 수 기준)
+_PRUNE_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    user_id TEXT,
+    domain TEXT,
+    created_at REAL NOT NULL
+)
+"""
+
+
+class ChangeFeed:
+    """
+    SQLite 기반 사용자 변경 피드 (원본 노드에서 기록)
+
+    seq는 AUTOINCREMENT라 삭제 후에도 재사용되지 않고, 쓰기 트랜잭션이 직렬화되므로
+    커밋된 순서대로 증가함 (pre-fork 워커들이 같은 파일에 기록해도 순서 보장)
+    """
+
+    def __init__(
+        self,
+        path: str = CHANGE_FEED_PATH,
+        enabled: bool = CHANGE_FEED_ENABLED,
+        retention: int = CHANGE_FEED_RETENTION,
+    ):
+        self.path = path
+        self.enabled = enabled
+        self.retention = max(1, retention)
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._stats = {"appended": 0, "pruned": 0, "errors": 0, "last_error": None}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def append(self, op: str, user_id: Optional[str], domain: Optional[str]) -> int:
+        """단일 이벤트 기록 (기록한 seq 반환, 비활성이면 0)"""
+        return self.append_many([(op, user_id, domain)])
+
+    def append_many(
+        self, events: List[Tuple[str, Optional[str], Optional[str]]]
+    ) -> int:
+        """
+        (op, user_id, domain) 이벤트를 한 트랜잭션으로 기록
+
+        기록 실패는 사용자 요청을 실패시키지 않고 오류 횟수만 남김
+        (누락된 변경은 복제 노드의 도메인 재로드 / 스냅샷 재시작 시 Chroma에서 반영)
+
+        Returns:
+            마지막으로 기록한 seq (비활성이거나 실패하면 0)
+        """
+        if not self.enabled or not events:
+            return 0
+        now = time.time()
+        rows = [
+            (op, None if user_id is None else str(user_id), domain, now)
+            for op, user_id, domain in events
+        ]
+        try:
+            with self._db_lock:
+                conn = self._connection()
+                with conn:
+                    cursor = conn.executemany(
+                        "INSERT INTO changes (op, user_id, domain, created_at)"
+                        " VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+                    seq = self._head(conn)
+                before = self._stats["appended"]
+                self._stats["appended"] += cursor.rowcount
+                if before // _PRUNE_EVERY != self._stats["appended"] // _PRUNE_EVERY:
+                    self._prune(conn, seq)
+            return seq
+        except sqlite3.Error as e:
+            self._stats["errors"] += 1
+            self._stats["last_error"] = str(e)
+            logger.logger.error(
+                f"CHANGE-FEED: append failed [events={rows}, error={e}]"
+            )
+            return 0
+
+    @staticmethod
+    def _head(conn: sqlite3.Connection) -> int:
+        row = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'changes'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _prune(self, conn: sqlite3.Connection, head: int) -> None:
+        with conn:
+            pruned = conn.execute(
+                "DELETE FROM changes WHERE seq <= ?", (head - self.retention,)
+            ).rowcount
+        self._stats["pruned"] += pruned
+
+    def read(
+        self, after: int = 0, limit: int = CHANGE_FEED_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        after 이후 이벤트를 seq 순서로 조회
+
+        Returns:
+            {"events": [{"seq", "op", "userId", "domain", "createdAt"}, ...],
+             "head": 마지막 seq, "oldest": 보존 중인 가장 오래된 seq (없으면 head + 1)}
+        """
+        with self._db_lock:
+            conn = self._connection()
+            rows = conn.execute(
+                "SELECT seq, op, user_id, domain, created_at FROM changes"
+                " WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after, max(0, limit)),
+            ).fetchall()
+            head = self._head(conn)
+            oldest = conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+        return {
+            "events": [
+                {
+                    "seq": seq,
+                    "op": op,
+                    "userId": user_id,
+                    "domain": domain,
+                    "createdAt": created_at,
+                }
+                for seq, op, user_id, domain, created_at in rows
+            ],
+            "head": head,
+            "oldest": oldest if oldest is not None else head + 1,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {"enabled": self.enabled, **self._stats}
+        if self.enabled:
+            try:
+                with self._db_lock:
+                    stats["head"] = self._head(self._connection())
+            except sqlite3.Error:
+                pass
+        return stats
+
+
+# ---------------------- 복제 노드 ----------------------
+class HttpFeedSource:
+    """
+    원본 노드의 GET /api/v1/changes를 읽는 피드 원본
+    """
+
+    def __init__(self, base_url: str, timeout: float = CHANGE_FEED_HTTP_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def read(
+        self, after: int = 0, limit: int = CHANGE_FEED_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        query = urllib.parse.urlencode({"after": after, "limit": limit})
+        url = f"{self.base_url}/api/v1/changes?{query}"
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))["data"]
+
+
+class ChangeFeedReplica:
+    """
+    변경 피드를 읽어 이 노드의 상주 도메인 인덱스와 추천 캐시에 반영
+
+    Args:
+        source: read(after, limit)를 제공하는 피드 원본 (ChangeFeed 또는 HttpFeedSource)
+        registry: 반영할 도메인 인덱스 레지스트리 (기본: domain_indexes)
+        cache: 무효화할 추천 캐시 (기본: recommendation_cache)
+    """
+
+    def __init__(
+        self,
+        source,
+        registry=None,
+        cache=None,
+        batch_size: int = CHANGE_FEED_BATCH_SIZE,
+        interval: float = CHANGE_FEED_POLL_INTERVAL,
+    ):
+        from core.domain_index import domain_indexes
+        from core.recommendation_cache import recommendation_cache
+
+        self.source = source
+        self.registry = registry if registry is not None else domain_indexes
+        self.cache = cache if cache is not None else recommendation_cache
+        self.batch_size = batch_size
+        self.interval = interval
+
+        # 마지막으로 반영한 seq (None이면 아직 시작 위치를 정하지 않음)
+        self.applied_seq: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "head": None,
+            "applied_events": 0,
+            "upserted_users": 0,
+            "removed_users": 0,
+            "reloaded_domains": 0,
+            "resyncs": 0,
+            "polls": 0,
+            "errors": 0,
+            "last_poll_at": None,
+            "last_applied_at": None,
+            "last_event_at": None,
+            "last_error": None,
+        }
+
+    def _resync(self, head: int) -> None:
+        """catch-up 불가: 로드된 인덱스를 내리고 head부터 다시 시작"""
+        if self.applied_seq is not None:
+            logger.logger.warning(
+                f"CHANGE-FEED: replica resync [applied={self.applied_seq}, head={head}]"
+            )
+            self.registry.clear()
+            self.cache.clear()
+            self._stats["resyncs"] += 1
+        self.applied_seq = head
+
+    def apply(self, events: List[Dict[str, Any]]) -> None:
+        """
+        이벤트 배치 반영 (같은 사용자의 이벤트는 마지막 것만, 로드되지 않은 도메인은 건너뜀)
+        """
+        from core.vector_database import get_user_collection
+
+        latest: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        reloads = set()
+        for event in events:
+            if event["op"] == RELOAD:
+                reloads.add(event["domain"])
+            else:
+                latest.pop(event["userId"], None)
+                latest[event["userId"]] = event
+
+        for domain in reloads:
+            if self.registry.is_loaded(domain):
+                self.registry.unload(domain)
+                self._stats["reloaded_domains"] += 1
+
+        upserts = [
+            user_id
+            for user_id, event in latest.items()
+            if event["op"] == UPSERT and self.registry.is_loaded(event["domain"])
+        ]
+        found = set()
+        if upserts:
+            users = get_user_collection().get(
+                ids=upserts, include=["embeddings", "metadatas"]
+            )
+            for user_id, embedding, meta in zip(
+                users["ids"], users["embeddings"], users["metadatas"]
+            ):
+                self.registry.upsert_user(user_id, embedding, meta)
+                found.add(user_id)
+            self._stats["upserted_users"] += len(found)
+
+        # 삭제 이벤트 + 그 사이 Chroma에서 사라진 upsert 대상
+        for user_id, event in latest.items():
+            if event["op"] == DELETE or (user_id in upserts and user_id not in found):
+                if self.registry.is_loaded(event["domain"]):
+                    self.registry.remove_user(user_id, event["domain"])
+                    self._stats["removed_users"] += 1
+                if event["op"] == DELETE:
+                    self.cache.invalidate_user(user_id)
+
+        for domain in {event["domain"] for event in events if event["domain"]}:
+            self.cache.invalidate_domain(domain)
+
+    def poll_once(self) -> int:
+        """
+        피드에서 한 배치를 읽어 반영
+
+        Returns:
+            반영한 이벤트 수
+        """
+        if self.applied_seq is None:
+            # 처음 시작: 현재 head부터 (이전 상태는 도메인 로드 시 Chroma에서 읽음)
+            self._resync(self.source.read(0, 0)["head"])
+
+        page = self.source.read(self.applied_seq, self.batch_size)
+        self._stats["polls"] += 1
+        self._stats["last_poll_at"] = time.time()
+        self._stats["head"] = page["head"]
+
+        # 필요한 이벤트가 보존 기간이 지나 지워졌거나 피드가 초기화됨
+        if self.applied_seq + 1 < page["oldest"] or page["head"] < self.applied_seq:
+            self._resync(page["head"])
+            return 0
+
+        events = page["events"]
+        if not events:
+            return 0
+        self.apply(events)
+        self.applied_seq = events[-1]["seq"]
+        self._stats["applied_events"] += len(events)
+        self._stats["last_applied_at"] = time.time()
+        self._stats["last_event_at"] = events[-1]["createdAt"]
+        return len(events)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                applied = self.poll_once()
+            except Exception as e:
+                self._stats["errors"] += 1
+                self._stats["last_error"] = str(e)
+                logger.logger.warning(f"CHANGE-FEED: replica poll failed [error={e}]")
+                applied = 0
+            # 배치가 꽉 찼으면 바로 이어서 읽음 (catch-up)
+            if applied < self.batch_size:
+                self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """피드 반영 스레드 시작"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="change-feed-replica", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {"source": getattr(self.source, "base_url", "local"), **self._stats}
+        stats["applied_seq"] = self.applied_seq
+        head = stats["head"]
+        lag_events = (
+            max(0, head - self.applied_seq)
+            if head is not None and self.applied_seq is not None
+            else None
+        )
+        stats["lag_events"] = lag_events
+        # 밀린 이벤트가 있으면 마지막으로 반영한 이벤트 이후 흐른 시간 (없으면 0)
+        if lag_events:
+            since = stats["last_event_at"] or stats["last_poll_at"]
+            stats["lag_seconds"] = round(time.time() - since, 3) if since else None
+        else:
+            stats["lag_seconds"] = 0.0 if lag_events == 0 else None
+        return stats
+
+
+def build_replica(source: str = CHANGE_FEED_SOURCE) -> Optional[ChangeFeedReplica]:
+    """CHANGE_FEED_SOURCE 설정에 따라 복제기 생성 (빈 값이면 None)"""
+    if not source:
+        return None
+    if source == "local":
+        return ChangeFeedReplica(ChangeFeed(enabled=True))
+    return ChangeFeedReplica(HttpFeedSource(source))
+
+
+def worker_sync_replica(workers: int = SERVER_WORKERS) -> Optional[ChangeFeedReplica]:
+    """
+    이 워커에서 실행할 복제기 (워커 시작 시 호출)
+
+    uvicorn --workers N처럼 pre-fork 없이 여러 워커가 뜬 경우에는 워커끼리 상주 인덱스를
+    맞출 방법이 없어 다른 워커로 등록된 사용자가 유사도 계산에서 빠지므로,
+    피드 기록을 켜고 같은 피드 파일을 읽는 local 복제기를 만들어 반환
+    """
+    global change_feed_replica
+    from core.worker_generations import index_generations
+
+    if workers <= 1 or index_generations.enabled or change_feed_replica is not None:
+        return change_feed_replica
+
+    logger.logger.warning(
+        f"CHANGE-FEED: {workers} workers without pre-fork, syncing domain indexes through local feed"
+    )
+    change_feed.enabled = True
+    change_feed_replica = ChangeFeedReplica(ChangeFeed(change_feed.path, enabled=True))
+    logger.register_summary_provider(
+        "change_feed_replica", change_feed_replica.get_stats
+    )
+    return change_feed_replica
+
+
+# 모듈 레벨 싱글톤 인스턴스
+change_feed = ChangeFeed()
+change_feed_replica = build_replica()
+
+logger.register_summary_provider("change_feed", change_feed.get_stats)
+if change_feed_replica is not None:
+    logger.register_summary_provider(
+        "change_feed_replica", change_feed_replica.get_stats
+    )
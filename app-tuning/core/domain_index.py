@@ -0,0 +1,947 @@
+"""
+도메인별 매칭 인덱스 모듈
+사용자 등록마다 user_profiles 전체를 float 리스트로 다시 읽어 결합하던 방식 대신,
+도메인별 매칭 벡터를 압축 코드(MATCHING_VECTOR_CODEC)로 메모리에 상주시키고
+등록/삭제 시 증분으로 갱신
+
+인덱스 구성 (행 단위로 정렬된 열):
+- ids: 사용자 ID
+- codes: 압축된 매칭 벡터 (vector_codec)
+- norms: 원본 매칭 벡터 노름 (float32)
+- signature_ids: 규칙 시그니처 번호 (int32), 번호별 (시그니처, 대표 메타데이터)는 signatures에 보관
+
+병렬 점수 계산(MATCHING_PARALLEL_WORKERS)이 켜져 있으면 codes / norms와 출력 버퍼를
+공유 메모리에 할당하여 워커 프로세스가 그대로 읽음
+
+인덱스는 (도메인, 임베딩 버전)별로 분리되어 모델 교체 중에도 같은 버전의 벡터끼리만 비교
+
+pre-fork 다중 워커 모드에서는 다른 워커가 도메인을 변경하면(worker_generations) 다음 조회 시
+공유 변경 저널에 기록된 사용자만 Chroma에서 읽어 증분 반영 (저널이 밀려났거나 도메인 단위 변경이면 다시 로드)
+
+INDEX_SNAPSHOT_DIR가 설정되면 인덱스를 주기적으로 스냅샷(core/index_snapshot)으로 저장하고,
+도메인을 처음 로드할 때 스냅샷을 메모리 맵으로 연 뒤 그 이후 변경분만 Chroma에서 읽어 반영
+
+DOMAIN_INDEX_MEMORY_BUDGET이 설정되면 힙 상주 바이트가 예산을 넘을 때 오래 쓰이지 않은
+도메인부터 내보냄 (vector_database/residency). 스냅샷을 쓰면 최신 상태를 스냅샷으로 저장하고
+메모리 맵 인덱스로 바꾸어 로드 상태를 유지하고, 스냅샷을 쓰지 않으면 완전히 해제
+(힙 상주 바이트는 열과 ID 목록 / 시그니처 등 파이썬 객체, 메모리 맵 열은 쓰기로 복사된 페이지만 포함.
+이미 메모리 맵인 도메인을 다시 내보내면 완전히 해제)
+"""
+
+import mmap
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from core.embedding_version import EMBEDDING_VERSION, embedding_version_of
+from core.index_snapshot import (
+    INDEX_SNAPSHOT_DIR,
+    INDEX_SNAPSHOT_INTERVAL,
+    INDEX_SNAPSHOT_REPLAY_MARGIN,
+    UPDATED_AT_KEY,
+    latest_snapshot,
+    remove_snapshots,
+    snapshot_versions,
+    write_snapshot,
+)
+from core.matching_score_optimized import matching_vector, rule_signature
+from core.parallel_scoring import parallel_scorer
+from core.projection import get_active_projection
+from core.vector_database import get_user_collection
+from core.vector_database.residency import DOMAIN_INDEX_MEMORY_BUDGET, ResidencyManager
+from core.vector_database.shared_vectors import SharedArray
+from core.vector_database.vector_codec import PQCodec, VectorCodec, get_codec
+from core.worker_generations import index_generations
+from utils import logger
+
+# 상주 벡터 코덱 (float32 | float16 | int8 | pq)
+MATCHING_VECTOR_CODEC = os.getenv("MATCHING_VECTOR_CODEC", "float32")
+# PQ 코덱은 이 인원 이상이 되면 학습 후 전환 (그 전에는 float16으로 보관)
+PQ_MIN_TRAIN_SIZE = int(os.getenv("MATCHING_PQ_MIN_TRAIN_SIZE", "1024"))
+
+# 대표 메타데이터에서 제외할 큰 필드 / 사용자별 값
+_HEAVY_META_KEYS = ("field_embeddings", UPDATED_AT_KEY)
+# 행 번호 int 객체 크기 (사전 값, 작은 정수 캐시는 무시한 근사치)
+_ROW_INT_BYTES = sys.getsizeof(1 << 20)
+
+
+def matching_space() -> Dict[str, Any]:
+    """
+    현재 매칭 벡터 공간 (스냅샷 매니페스트에 기록하고 복원 시 비교)
+    투영 버전이나 출력 차원이 다르면 저장된 코드를 그대로 쓸 수 없음
+    """
+    projection = get_active_projection()
+    if projection is None:
+        return {"projection": None, "projectionDim": None}
+    return {"projection": projection.version, "projectionDim": projection.output_dim}
+
+
+class DomainIndex:
+    """
+    한 도메인의 매칭 벡터 / 규칙 시그니처 상주 인덱스
+    """
+
+    def __init__(
+        self,
+        domain: str,
+        codec_name: str = MATCHING_VECTOR_CODEC,
+        version: str = EMBEDDING_VERSION,
+    ):
+        self.domain = domain
+        self.version = version
+        self.codec_name = codec_name
+        self.codec: Optional[VectorCodec] = None
+
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # ids 문자열 객체 바이트 합계 (memory_bytes에서 매번 순회하지 않도록 증분 유지)
+        self._id_bytes = 0
+        self.codes: Optional[np.ndarray] = None
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.signature_ids = np.zeros(0, dtype=np.int32)
+        self.signatures: List[Tuple[tuple, dict]] = []
+        self._signature_lookup: Dict[tuple, int] = {}
+
+        # 공유 메모리 할당 열 (병렬 계산 사용 시)
+        self._shared: Dict[str, SharedArray] = {}
+        self._out: Optional[np.ndarray] = None
+        self._retired: List[SharedArray] = []
+
+        # 변경 횟수 (스냅샷 저장 여부 판단) / 스냅샷 메모리 맵에서 복원했는지 여부
+        self.revision = 0
+        self.mapped = False
+        # 메모리 맵 열에 쓴 행 (쓰기 시 복사로 해당 페이지가 힙에 사적으로 생김)
+        self._dirty_rows: set = set()
+
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---------------------- 내부 유틸 ----------------------
+    def _staging_codec(self, dim: int) -> VectorCodec:
+        # PQ는 학습 데이터가 쌓일 때까지 float16으로 보관
+        if self.codec_name == "pq":
+            return get_codec("float16", dim)
+        return get_codec(self.codec_name, dim)
+
+    def _signature_id(self, meta: dict) -> int:
+        signature = rule_signature(meta)
+        signature_id = self._signature_lookup.get(signature)
+        if signature_id is None:
+            signature_id = len(self.signatures)
+            representative = {
+                k: v for k, v in meta.items() if k not in _HEAVY_META_KEYS
+            }
+            self.signatures.append((signature, representative))
+            self._signature_lookup[signature] = signature_id
+        return signature_id
+
+    def _allocate(self, column: str, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        # 병렬 계산을 쓰지 않으면 일반 배열, 쓰면 공유 메모리 배열
+        # 이전 블록은 새 배열로 교체한 뒤 _release_retired()에서 해제
+        if not parallel_scorer.enabled or column == "signature_ids":
+            return np.zeros(shape, dtype=dtype)
+
+        shared = SharedArray(shape, dtype)
+        previous = self._shared.get(column)
+        self._shared[column] = shared
+        if previous is not None:
+            self._retired.append(previous)
+        return shared.array
+
+    def _release_retired(self) -> None:
+        retired, self._retired = self._retired, []
+        for block in retired:
+            block.release()
+
+    def _ensure_capacity(self, rows: int) -> None:
+        capacity = len(self.norms)
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, capacity * 2, 64)
+
+        size = len(self.ids)
+        codes = self._allocate(
+            "codes", (new_capacity, self.codec.code_width), self.codec.dtype
+        )
+        norms = self._allocate("norms", (new_capacity,), np.float32)
+        signature_ids = self._allocate("signature_ids", (new_capacity,), np.int32)
+        if self.codes is not None:
+            codes[:size] = self.codes[:size]
+            norms[:size] = self.norms[:size]
+            signature_ids[:size] = self.signature_ids[:size]
+        self.codes, self.norms, self.signature_ids = codes, norms, signature_ids
+        self._out = self._allocate("out", (new_capacity,), np.float32)
+        self.mapped = False
+        self._dirty_rows = set()
+        self._release_retired()
+
+    def _maybe_train_pq(self) -> None:
+        if self.codec_name != "pq" or self.codec.name == "pq":
+            return
+        if len(self.ids) < PQ_MIN_TRAIN_SIZE:
+            return
+
+        size = len(self.ids)
+        vectors = self.codec.decode(self.codes[:size])
+        codec = get_codec("pq", self.codec.dim).fit(vectors)
+
+        codes = self._allocate(
+            "codes", (len(self.norms), codec.code_width), codec.dtype
+        )
+        codes[:size] = codec.encode(vectors)
+        self.codec, self.codes = codec, codes
+        self._release_retired()
+        logger.logger.info(
+            f"DOMAIN-INDEX: trained PQ codec [domain={self.domain}, users={size}, subspaces={codec.subspaces}]"
+        )
+
+    # ---------------------- 갱신 ----------------------
+    def build(self, ids: List[str], embeddings: List[List[float]], metas: List[dict]):
+        """Chroma에서 읽은 도메인 전체 사용자로 인덱스 구성"""
+        with self.lock:
+            for user_id, embedding, meta in zip(ids, embeddings, metas):
+                self.upsert(user_id, embedding, meta)
+
+    def upsert(self, user_id: str, embedding: List[float], meta: dict) -> None:
+        """사용자 매칭 벡터 추가 또는 교체"""
+        vector = matching_vector(embedding, meta)
+
+        with self.lock:
+            if self.codec is None:
+                self.codec = self._staging_codec(len(vector))
+
+            row = self._rows.get(user_id)
+            if row is None:
+                row = len(self.ids)
+                self._ensure_capacity(row + 1)
+                self.ids.append(user_id)
+                self._rows[user_id] = row
+                self._id_bytes += sys.getsizeof(user_id)
+
+            if self.mapped:
+                self._dirty_rows.add(row)
+            self.codes[row] = self.codec.encode(vector[None, :])[0]
+            self.norms[row] = np.linalg.norm(vector)
+            self.signature_ids[row] = self._signature_id(meta)
+            self.revision += 1
+            self._maybe_train_pq()
+
+    def remove(self, user_id: str) -> bool:
+        """사용자 제거 (마지막 행을 빈자리로 옮김)"""
+        with self.lock:
+            row = self._rows.pop(user_id, None)
+            if row is None:
+                return False
+            self._id_bytes -= sys.getsizeof(user_id)
+            last = len(self.ids) - 1
+            if row != last:
+                if self.mapped:
+                    self._dirty_rows.add(row)
+                moved = self.ids[last]
+                self.ids[row] = moved
+                self._rows[moved] = row
+                self.codes[row] = self.codes[last]
+                self.norms[row] = self.norms[last]
+                self.signature_ids[row] = self.signature_ids[last]
+            self.ids.pop()
+            self.revision += 1
+            return True
+
+    # ---------------------- 스냅샷 ----------------------
+    def snapshot_columns(self) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """
+        스냅샷으로 저장할 열과 매니페스트 (복원 후 추가 등록이 바로 들어가도록 여유 행 포함)
+        """
+        with self.lock:
+            size = len(self.ids)
+            rows = size + max(64, size // 8)
+            codes = self.codec.empty(rows)
+            codes[:size] = self.codes[:size]
+            norms = np.zeros(rows, dtype=np.float32)
+            norms[:size] = self.norms[:size]
+            signature_ids = np.zeros(rows, dtype=np.int32)
+            signature_ids[:size] = self.signature_ids[:size]
+            columns = {"codes": codes, "norms": norms, "signature_ids": signature_ids}
+            if self.codec.name == "pq":
+                columns["codebooks"] = self.codec.codebooks
+            manifest = {
+                "ids": list(self.ids),
+                "codec": self.codec.name,
+                "codecName": self.codec_name,
+                "dim": self.codec.dim,
+                "revision": self.revision,
+                "embeddingVersion": self.version,
+                **matching_space(),
+                "signatures": [representative for _, representative in self.signatures],
+            }
+        return columns, manifest
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "DomainIndex":
+        """스냅샷으로 인덱스 복원 (병렬 계산을 쓰지 않으면 열은 메모리 맵 그대로 사용)"""
+        manifest = snapshot["manifest"]
+        index = cls(manifest["domain"], manifest["codecName"], manifest["version"])
+        if "codebooks" in snapshot:
+            codebooks = snapshot["codebooks"]
+            codec = PQCodec(manifest["dim"], subspaces=codebooks.shape[0])
+            codec.codebooks = codebooks
+        else:
+            codec = get_codec(manifest["codec"], manifest["dim"])
+        index.codec = codec
+
+        index.ids = list(manifest["ids"])
+        index._rows = {user_id: row for row, user_id in enumerate(index.ids)}
+        index._id_bytes = sum(sys.getsizeof(user_id) for user_id in index.ids)
+        # 시그니처는 대표 메타데이터에서 다시 계산 (JSON에 튜플 / 집합을 저장하지 않음)
+        for representative in manifest["signatures"]:
+            signature = rule_signature(representative)
+            index._signature_lookup[signature] = len(index.signatures)
+            index.signatures.append((signature, representative))
+
+        codes, norms = snapshot["codes"], snapshot["norms"]
+        signature_ids = snapshot["signature_ids"]
+        if parallel_scorer.enabled:
+            # 점수 계산 워커가 이름으로 붙을 수 있도록 공유 메모리로 복사
+            index.codes = index._allocate("codes", codes.shape, codes.dtype)
+            index.codes[:] = codes
+            index.norms = index._allocate("norms", norms.shape, np.float32)
+            index.norms[:] = norms
+            index.signature_ids = np.array(signature_ids)
+            index._out = index._allocate("out", norms.shape, np.float32)
+        else:
+            index.codes, index.norms, index.signature_ids = codes, norms, signature_ids
+            index.mapped = True
+        index.revision = manifest.get("revision", 0)
+        return index
+
+    # ---------------------- 조회 ----------------------
+    def score(
+        self, query: np.ndarray, exclude_id: str = None
+    ) -> Tuple[List[str], np.ndarray, np.ndarray, List[Tuple[tuple, dict]]]:
+        """
+        질의 벡터와 도메인 전체 사용자 간 코사인 유사도
+
+        Returns:
+            (사용자 ID 목록, 코사인 유사도, 시그니처 번호 열, 시그니처 목록)
+        """
+        with self.lock:
+            size = len(self.ids)
+            ids = list(self.ids)
+            if size == 0:
+                return [], np.zeros(0), np.zeros(0, dtype=np.int32), []
+
+            query = np.asarray(query, dtype=np.float32)
+            if "codes" in self._shared and parallel_scorer.should_use(size):
+                cosine = parallel_scorer.cosine(
+                    self.codec,
+                    self._shared["codes"].spec,
+                    self._shared["norms"].spec,
+                    self._shared["out"].spec,
+                    self._out,
+                    query,
+                    size,
+                )
+            else:
+                dots = self.codec.dot(query, self.codes[:size])
+                norms = self.norms[:size] * np.float32(np.linalg.norm(query))
+                norms[norms == 0] = 1.0
+                cosine = (dots / norms).astype(np.float64)
+            signature_ids = self.signature_ids[:size].copy()
+            signatures = list(self.signatures)
+
+        if exclude_id is not None and exclude_id in ids:
+            keep = np.ones(size, dtype=bool)
+            keep[ids.index(exclude_id)] = False
+            ids = [uid for uid, k in zip(ids, keep) if k]
+            cosine, signature_ids = cosine[keep], signature_ids[keep]
+
+        return ids, cosine, signature_ids, signatures
+
+    def close(self) -> None:
+        """공유 메모리 블록 해제"""
+        with self.lock:
+            shared, self._shared = self._shared, {}
+            self.ids, self._rows = [], {}
+            self._id_bytes = 0
+            self._dirty_rows = set()
+            self.codes, self._out = None, None
+            self.norms = np.zeros(0, dtype=np.float32)
+            self.signature_ids = np.zeros(0, dtype=np.int32)
+            self._retired.extend(shared.values())
+            self._release_retired()
+
+    @property
+    def dirty(self) -> bool:
+        """메모리 맵 열에 쓰기가 있어 힙에 사적 페이지가 생겼는지 여부"""
+        return bool(self._dirty_rows)
+
+    def _column_bytes(self) -> int:
+        size = len(self.ids)
+        return int(
+            self.codec.bytes_per_vector() * size
+            + (self.norms.itemsize + self.signature_ids.itemsize) * size
+        )
+
+    def _dirty_bytes(self) -> int:
+        # 메모리 맵 열에서 쓰기 시 복사된 페이지 (열마다 쓴 행이 걸친 페이지 수)
+        total = 0
+        for column in (self.codes, self.norms, self.signature_ids):
+            stride = column.strides[0]
+            pages = {row * stride // mmap.PAGESIZE for row in self._dirty_rows}
+            total += len(pages) * mmap.PAGESIZE
+        return total
+
+    def _python_bytes(self) -> int:
+        # ids 목록 / 행 사전 / 시그니처 (대표 메타데이터 포함) 파이썬 객체 (근사치)
+        signatures = sum(
+            sys.getsizeof(signature) + sys.getsizeof(representative)
+            for signature, representative in self.signatures
+        )
+        return (
+            sys.getsizeof(self.ids)
+            + self._id_bytes
+            + sys.getsizeof(self._rows)
+            + _ROW_INT_BYTES * len(self._rows)
+            + sys.getsizeof(self.signatures)
+            + sys.getsizeof(self._signature_lookup)
+            + signatures
+        )
+
+    def memory_bytes(self) -> int:
+        """열(메모리 맵 포함) + 파이썬 객체 바이트"""
+        with self.lock:
+            if self.codes is None:
+                return 0
+            return self._column_bytes() + self._python_bytes()
+
+    def heap_bytes(self) -> int:
+        """
+        프로세스 힙에 상주하는 바이트 (상주 메모리 예산 기준)
+        메모리 맵 인덱스는 열 대신 쓰기로 복사된 페이지만 포함
+        """
+        with self.lock:
+            if self.codes is None:
+                return 0
+            columns = self._dirty_bytes() if self.mapped else self._column_bytes()
+            return columns + self._python_bytes()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            size = len(self.ids)
+            codec = self.codec.name if self.codec else self.codec_name
+            dim = self.codec.dim if self.codec else None
+            signatures = len(self.signatures)
+        memory = self.memory_bytes()
+        heap = self.heap_bytes()
+        return {
+            "users": size,
+            "version": self.version,
+            "codec": codec,
+            "dim": dim,
+            "signatures": signatures,
+            "memory_bytes": memory,
+            "heap_bytes": heap,
+            "bytes_per_user": round(memory / size, 1) if size else 0,
+            "mapped": self.mapped,
+        }
+
+
+class DomainIndexRegistry:
+    """
+    (도메인, 임베딩 버전) → DomainIndex 관리
+    (도메인이 처음 요청될 때 Chroma에서 도메인 사용자를 읽어 버전별로 구성)
+    """
+
+    def __init__(
+        self,
+        codec_name: str = MATCHING_VECTOR_CODEC,
+        snapshot_dir: str = INDEX_SNAPSHOT_DIR,
+        memory_budget: int = DOMAIN_INDEX_MEMORY_BUDGET,
+    ):
+        get_codec(codec_name, 1)  # 잘못된 코덱 이름은 시작 시점에 실패
+        self.codec_name = codec_name
+        self.snapshot_dir = snapshot_dir
+        self.residency = ResidencyManager(memory_budget)
+        self._indexes: Dict[Tuple[str, str], DomainIndex] = {}
+        self._loaded: set = set()
+        # 도메인별로 마지막으로 반영한 워커 간 세대 (pre-fork 다중 워커 모드)
+        self._seen: Dict[str, int] = {}
+        # 도메인별로 마지막으로 반영한 변경 저널 순번
+        self._applied: Dict[str, int] = {}
+        self._sync_stats = {"synced_users": 0, "reloads": 0}
+        self._lock = threading.Lock()
+
+        # 스냅샷 저장 상태: (도메인, 버전) → 마지막으로 저장한 revision
+        self._saved_revisions: Dict[Tuple[str, str], int] = {}
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_stop = threading.Event()
+        self._snapshot_stats = {
+            "saved": 0,
+            "restored": 0,
+            "replayed_users": 0,
+            "removed_users": 0,
+            "incompatible": 0,
+            "errors": 0,
+            "last_saved_at": None,
+        }
+
+    def _load(self, domain: str) -> None:
+        if self.snapshot_dir:
+            try:
+                if self._load_snapshot(domain):
+                    self._loaded.add(domain)
+                    return
+            except Exception as e:
+                # 스냅샷 복원 실패 시 전체 로드로 대체
+                self._snapshot_stats["errors"] += 1
+                logger.logger.warning(
+                    f"DOMAIN-INDEX: snapshot restore failed, full load [domain={domain}, error={e}]"
+                )
+                for key in [key for key in self._indexes if key[0] == domain]:
+                    del self._indexes[key]
+
+        users = get_user_collection().get(
+            where={"emailDomain": domain}, include=["embeddings", "metadatas"]
+        )
+        groups: Dict[str, List[int]] = {}
+        for i, meta in enumerate(users["metadatas"]):
+            groups.setdefault(embedding_version_of(meta), []).append(i)
+
+        for version, rows in groups.items():
+            index = DomainIndex(domain, self.codec_name, version)
+            index.build(
+                [users["ids"][i] for i in rows],
+                [users["embeddings"][i] for i in rows],
+                [users["metadatas"][i] for i in rows],
+            )
+            self._indexes[(domain, version)] = index
+            logger.logger.info(f"DOMAIN-INDEX: loaded {domain} {index.get_stats()}")
+        self._loaded.add(domain)
+
+    # ---------------------- 스냅샷 ----------------------
+    def _load_snapshot(self, domain: str) -> bool:
+        """
+        도메인의 최신 스냅샷을 열고 그 이후 변경분만 Chroma에서 읽어 반영
+
+        Returns:
+            스냅샷으로 복원했으면 True (스냅샷이 없으면 False)
+        """
+        restored: Dict[str, Tuple[DomainIndex, float]] = {}
+        for version in snapshot_versions(self.snapshot_dir, domain):
+            snapshot = latest_snapshot(self.snapshot_dir, domain, version)
+            if snapshot is None:
+                continue
+            if not self._snapshot_compatible(snapshot["manifest"], version):
+                # 코덱 / 투영 / 임베딩 버전이 바뀐 스냅샷은 쓰지 않고 Chroma에서 다시 구성
+                self._snapshot_stats["incompatible"] += 1
+                continue
+            index = DomainIndex.from_snapshot(snapshot)
+            restored[version] = (index, snapshot["manifest"]["takenAt"])
+        if not restored:
+            return False
+
+        for version, (index, _) in restored.items():
+            self._indexes[(domain, version)] = index
+            self._saved_revisions[(domain, version)] = index.revision
+
+        collection = get_user_collection()
+        # 삭제된 사용자: 현재 ID 목록(메타데이터 / 벡터 없이)과 비교
+        current = set(collection.get(where={"emailDomain": domain}, include=[])["ids"])
+        known = set()
+        removed = 0
+        for index, _ in restored.values():
+            for user_id in [uid for uid in index.ids if uid not in current]:
+                removed += index.remove(user_id)
+            known.update(index.ids)
+
+        # 스냅샷 이후 갱신된 사용자 + 갱신 시각이 없는 새 사용자
+        since = min(taken_at for _, taken_at in restored.values())
+        changed = collection.get(
+            where={
+                "$and": [
+                    {"emailDomain": domain},
+                    {UPDATED_AT_KEY: {"$gt": since - INDEX_SNAPSHOT_REPLAY_MARGIN}},
+                ]
+            },
+            include=["embeddings", "metadatas"],
+        )
+        missing = sorted(current - known - set(changed["ids"]))
+        batches = [changed]
+        if missing:
+            batches.append(
+                collection.get(ids=missing, include=["embeddings", "metadatas"])
+            )
+
+        replayed = 0
+        for batch in batches:
+            for user_id, embedding, meta in zip(
+                batch["ids"], batch["embeddings"], batch["metadatas"]
+            ):
+                version = embedding_version_of(meta)
+                index = self._indexes.get((domain, version))
+                if index is None:
+                    index = DomainIndex(domain, self.codec_name, version)
+                    self._indexes[(domain, version)] = index
+                index.upsert(user_id, embedding, meta)
+                for (d, other), stale in self._indexes.items():
+                    if d == domain and other != version:
+                        stale.remove(user_id)
+                replayed += 1
+
+        self._snapshot_stats["restored"] += 1
+        self._snapshot_stats["replayed_users"] += replayed
+        self._snapshot_stats["removed_users"] += removed
+        logger.logger.info(
+            f"DOMAIN-INDEX: restored {domain} from snapshot [versions={sorted(restored)}, replayed={replayed}, removed={removed}]"
+        )
+        return True
+
+    def save_snapshots(self) -> int:
+        """
+        바뀐 인덱스만 스냅샷으로 저장
+
+        Returns:
+            저장한 인덱스 수
+        """
+        if not self.snapshot_dir:
+            return 0
+        with self._lock:
+            items = list(self._indexes.items())
+        saved = 0
+        for (domain, version), index in items:
+            if index.codec is None or len(index) == 0:
+                continue
+            if self._saved_revisions.get((domain, version)) == index.revision:
+                continue
+            try:
+                columns, manifest = index.snapshot_columns()
+                write_snapshot(self.snapshot_dir, domain, version, columns, manifest)
+            except Exception as e:
+                self._snapshot_stats["errors"] += 1
+                logger.logger.error(
+                    f"DOMAIN-INDEX: snapshot save failed [domain={domain}, error={e}]"
+                )
+                continue
+            self._saved_revisions[(domain, version)] = manifest["revision"]
+            saved += 1
+        self._snapshot_stats["saved"] += saved
+        self._snapshot_stats["last_saved_at"] = time.time()
+        return saved
+
+    def _run_snapshots(self, interval: float) -> None:
+        while not self._snapshot_stop.wait(interval):
+            self.save_snapshots()
+
+    def start_snapshots(self, interval: float = INDEX_SNAPSHOT_INTERVAL) -> None:
+        """주기적 스냅샷 저장 스레드 시작 (interval이 0이면 종료 시에만 저장)"""
+        if not self.snapshot_dir or interval <= 0 or self._snapshot_thread is not None:
+            return
+        self._snapshot_stop.clear()
+        self._snapshot_thread = threading.Thread(
+            target=self._run_snapshots,
+            args=(interval,),
+            name="domain-index-snapshot",
+            daemon=True,
+        )
+        self._snapshot_thread.start()
+
+    def stop_snapshots(self, save: bool = True) -> None:
+        """스냅샷 스레드 종료 (save=True면 마지막으로 한 번 저장)"""
+        self._snapshot_stop.set()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join(timeout=30)
+            self._snapshot_thread = None
+        if save:
+            self.save_snapshots()
+
+    def get(self, domain: str, version: str = EMBEDDING_VERSION) -> DomainIndex:
+        """도메인의 해당 버전 인덱스 (도메인을 처음 요청하면 로드)"""
+        with self._lock:
+            return self._get(domain, version)
+
+    def _get(self, domain: str, version: str) -> DomainIndex:
+        """get 본체 (잠금 안에서 호출)"""
+        if domain in self._loaded and self._seen.get(
+            domain, 0
+        ) != index_generations.current(domain):
+            # 다른 워커가 도메인을 변경함 → 바뀐 사용자만 반영 (불가능하면 다시 로드)
+            if not self._sync(domain):
+                self._unload(domain)
+                self._sync_stats["reloads"] += 1
+        loaded = domain not in self._loaded
+        if loaded:
+            self._seen[domain], self._applied[domain] = index_generations.position(
+                domain
+            )
+            self._load(domain)
+        self.residency.touch(domain, loaded)
+        index = self._indexes.get((domain, version))
+        if index is None:
+            index = DomainIndex(domain, self.codec_name, version)
+            self._indexes[(domain, version)] = index
+        if loaded:
+            self._enforce_budget(protect=domain)
+        return index
+
+    def _sync(self, domain: str) -> bool:
+        """
+        다른 워커의 변경 저널을 도메인 인덱스에 증분 반영 (잠금 안에서 호출)
+
+        Returns:
+            반영했으면 True, 저널로 따라잡을 수 없으면 False (전체 다시 로드 필요)
+        """
+        changes = index_generations.changes_since(domain, self._applied.get(domain, 0))
+        if changes is None:
+            return False
+        user_ids, head, generation = changes
+        user_ids = list(dict.fromkeys(user_ids))
+        if user_ids:
+            self._apply_changes(domain, user_ids)
+        self._applied[domain] = head
+        self._seen[domain] = generation
+        self._sync_stats["synced_users"] += len(user_ids)
+        return True
+
+    def _apply_changes(self, domain: str, user_ids: List[str]) -> None:
+        """
+        변경된 사용자의 현재 상태를 Chroma에서 읽어 반영
+        (도메인에 없는 사용자는 제거, 슬롯 충돌로 섞인 다른 도메인 사용자는 제거만 시도되어 무시됨)
+        """
+        users = get_user_collection().get(
+            ids=user_ids, include=["embeddings", "metadatas"]
+        )
+        current = set()
+        for user_id, embedding, meta in zip(
+            users["ids"], users["embeddings"], users["metadatas"]
+        ):
+            if meta.get("emailDomain") != domain:
+                continue
+            version = embedding_version_of(meta)
+            index = self._indexes.get((domain, version))
+            if index is None:
+                index = DomainIndex(domain, self.codec_name, version)
+                self._indexes[(domain, version)] = index
+            index.upsert(user_id, embedding, meta)
+            current.add((user_id, version))
+        for (d, version), index in self._indexes.items():
+            if d != domain:
+                continue
+            for user_id in user_ids:
+                if (user_id, version) not in current:
+                    index.remove(user_id)
+
+    def _unload(self, domain: str) -> None:
+        for key in [key for key in self._indexes if key[0] == domain]:
+            self._indexes.pop(key).close()
+        self._loaded.discard(domain)
+        self.residency.forget(domain)
+
+    # ---------------------- 상주 메모리 예산 ----------------------
+    def _enforce_budget(self, protect: str = None) -> None:
+        """힙 상주 바이트가 예산을 넘으면 오래 쓰이지 않은 도메인부터 내보냄 (잠금 안에서 호출)"""
+        if not self.residency.budget_bytes:
+            return
+        sizes: Dict[str, int] = {}
+        for (domain, _), index in self._indexes.items():
+            sizes[domain] = sizes.get(domain, 0) + index.heap_bytes()
+        for domain in self.residency.select_victims(sizes, protect):
+            self._evict(domain, sizes.get(domain, 0))
+
+    def _evict(self, domain: str, size: int) -> None:
+        mapped = False
+        # 병렬 점수 계산은 열을 공유 메모리로 복사하므로 메모리 맵으로 바꿔도 줄지 않음
+        # 이미 깨끗한 메모리 맵 인덱스뿐이면 남은 파이썬 객체까지 줄이도록 완전히 해제
+        remappable = any(
+            not index.mapped or index.dirty
+            for key, index in self._indexes.items()
+            if key[0] == domain
+        )
+        if self.snapshot_dir and not parallel_scorer.enabled and remappable:
+            try:
+                mapped = self._map_snapshots(domain)
+            except Exception as e:
+                self._snapshot_stats["errors"] += 1
+                logger.logger.warning(
+                    f"DOMAIN-INDEX: snapshot eviction failed, unloading [domain={domain}, error={e}]"
+                )
+        if not mapped:
+            for key in [key for key in self._indexes if key[0] == domain]:
+                index = self._indexes.pop(key)
+                # 공유 메모리가 없으면 닫지 않고 참조만 끊음 (점수 계산 중인 요청이 끝까지 사용)
+                if index._shared:
+                    index.close()
+            self._loaded.discard(domain)
+        # 메모리 맵으로 바꾸어도 ID 목록 / 시그니처 등 파이썬 객체는 힙에 남음
+        resident = 0
+        if mapped:
+            resident = sum(
+                index.heap_bytes()
+                for key, index in self._indexes.items()
+                if key[0] == domain
+            )
+        self.residency.evicted(domain, max(0, size - resident), mapped, resident)
+        logger.logger.info(
+            f"DOMAIN-INDEX: evicted {domain} [bytes={size}, resident={resident}, mapped={mapped}]"
+        )
+
+    def _map_snapshots(self, domain: str) -> bool:
+        """
+        도메인 인덱스를 최신 스냅샷의 메모리 맵 인덱스로 교체 (스냅샷이 뒤처져 있으면 먼저 저장)
+
+        Returns:
+            모든 버전을 교체했으면 True
+        """
+        for key in [key for key in self._indexes if key[0] == domain]:
+            index = self._indexes[key]
+            if index.mapped and not index.dirty:
+                continue
+            if index.codec is None or len(index) == 0:
+                self._indexes.pop(key)
+                continue
+
+            snapshot = latest_snapshot(self.snapshot_dir, *key)
+            if not self._snapshot_matches(snapshot, index):
+                columns, manifest = index.snapshot_columns()
+                write_snapshot(self.snapshot_dir, key[0], key[1], columns, manifest)
+                self._saved_revisions[key] = manifest["revision"]
+                self._snapshot_stats["saved"] += 1
+                snapshot = latest_snapshot(self.snapshot_dir, *key)
+                if not self._snapshot_matches(snapshot, index):
+                    return False
+            self._indexes[key] = DomainIndex.from_snapshot(snapshot)
+        return True
+
+    def _snapshot_compatible(self, manifest: Dict[str, Any], version: str) -> bool:
+        """스냅샷이 현재 코덱 / 매칭 벡터 공간 / 임베딩 버전으로 만들어졌는지 여부"""
+        space = matching_space()
+        return (
+            manifest["codecName"] == self.codec_name
+            and manifest.get("embeddingVersion", manifest.get("version")) == version
+            and all(manifest.get(key) == value for key, value in space.items())
+        )
+
+    def _snapshot_matches(self, snapshot: Optional[Dict[str, Any]], index) -> bool:
+        if snapshot is None:
+            return False
+        manifest = snapshot["manifest"]
+        return (
+            self._snapshot_compatible(manifest, index.version)
+            and manifest.get("revision") == index.revision
+            and len(manifest["ids"]) == len(index)
+        )
+
+    def is_loaded(self, domain: str) -> bool:
+        """도메인 인덱스가 로드되어 있는지 여부 (변경 피드 반영 대상 판단)"""
+        with self._lock:
+            return domain in self._loaded
+
+    def unload(self, domain: str) -> None:
+        """도메인 인덱스 해제 (다음 요청 시 다시 로드)"""
+        with self._lock:
+            self._unload(domain)
+
+    def _mark_changed(self, domain: str, user_ids: Optional[List[str]] = None) -> None:
+        """
+        다른 워커에 도메인 변경 알림 (user_ids가 없으면 도메인 전체 변경)
+        (이미 최신이었다면 자신은 저널 위치만 맞추고 다시 반영하지 않음)
+        """
+        before, after, head = index_generations.record(domain, user_ids)
+        if not index_generations.enabled:
+            return
+        with self._lock:
+            if self._seen.get(domain) == before:
+                self._seen[domain] = after
+                self._applied[domain] = head
+
+    def versions(self, domain: str) -> List[str]:
+        """로드된 도메인 인덱스의 임베딩 버전 목록"""
+        with self._lock:
+            return [v for (d, v), index in self._indexes.items() if d == domain]
+
+    def upsert_user(self, user_id: str, embedding: List[float], meta: dict):
+        """
+        사용자 등록/수정 반영 후 해당 (도메인, 버전) 인덱스 반환
+        (재임베딩으로 버전이 바뀐 사용자는 이전 버전 인덱스에서 제거)
+        """
+        domain = meta.get("emailDomain")
+        version = embedding_version_of(meta)
+        # 조회와 반영 사이에 내보내기가 인덱스를 메모리 맵 복사본으로 바꾸면 갱신이 사라지므로 잠금 안에서 반영
+        with self._lock:
+            index = self._get(domain, version)
+            index.upsert(user_id, embedding, meta)
+            for (d, other), stale in self._indexes.items():
+                if d == domain and other != version:
+                    stale.remove(user_id)
+        self._mark_changed(domain, [user_id])
+        return index
+
+    def remove_user(self, user_id: str, domain: str = None) -> None:
+        """사용자 삭제 반영 (도메인을 모르면 로드된 모든 인덱스에서 제거)"""
+        with self._lock:
+            targets = [
+                (d, index)
+                for (d, _), index in self._indexes.items()
+                if domain is None or d == domain
+            ]
+            for _, index in targets:
+                index.remove(user_id)
+        changed = {domain} if domain is not None else {d for d, _ in targets}
+        for d in changed:
+            self._mark_changed(d, [user_id])
+
+    def drop_version(self, domain: str, version: str) -> None:
+        """전환이 끝난 도메인의 이전 버전 인덱스 해제"""
+        with self._lock:
+            index = self._indexes.pop((domain, version), None)
+            self._saved_revisions.pop((domain, version), None)
+        if self.snapshot_dir:
+            remove_snapshots(self.snapshot_dir, domain, version)
+        if index is not None:
+            index.close()
+            self._mark_changed(domain)
+
+    def clear(self) -> None:
+        with self._lock:
+            indexes, self._indexes = self._indexes, {}
+            self._loaded = set()
+            self._seen = {}
+            self._applied = {}
+            self._saved_revisions = {}
+            self.residency.clear()
+        for index in indexes.values():
+            index.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            indexes = dict(self._indexes)
+        # 현재 버전은 도메인 이름, 이전 버전은 "도메인@버전"으로 표시
+        domains = {
+            (domain if version == EMBEDDING_VERSION else f"{domain}@{version}"): (
+                index.get_stats()
+            )
+            for (domain, version), index in indexes.items()
+        }
+        users = sum(d["users"] for d in domains.values())
+        memory = sum(d["memory_bytes"] for d in domains.values())
+        return {
+            "codec": self.codec_name,
+            "users": users,
+            "memory_bytes": memory,
+            "heap_bytes": sum(d["heap_bytes"] for d in domains.values()),
+            "bytes_per_user": round(memory / users, 1) if users else 0,
+            "snapshots": dict(self._snapshot_stats),
+            "residency": self.residency.get_stats(),
+            "worker_sync": dict(self._sync_stats),
+            "domains": domains,
+        }
+
+
+# 모듈 레벨 싱글톤 인스턴스
+domain_indexes = DomainIndexRegistry()
+
+logger.register_summary_provider("domain_index", domain_indexes.get_stats)
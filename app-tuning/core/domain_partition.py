@@ -0,0 +1,305 @@
+"""
+도메인 파티션(consistent hashing) 모듈
+매칭 점수 계산은 emailDomain 단위로만 이루어지므로, 여러 노드로 수평 확장할 때 도메인을
+해시 링으로 노드에 나누어 각 노드가 자기 도메인의 상주 인덱스만 로드하게 함
+(클러스터 전체 메모리 ≈ 데이터 크기, 노드 수 × 데이터 크기가 아님)
+
+- 각 노드는 CLUSTER_VNODES개의 가상 노드로 링에 배치되어 노드 추가/제거 시 약 1/N 도메인만 이동
+- 다른 노드 소유 도메인 요청은 CLUSTER_ROUTING에 따라
+  redirect: 307 + 소유 노드 URL (메서드와 본문 유지)
+  proxy: 이 노드가 소유 노드로 요청을 전달하고 응답을 그대로 반환
+- 전달된 요청(FORWARDED_HEADER)은 링 설정이 노드마다 달라도 다시 전달하지 않고 로컬 처리
+- 파티션 맵은 GET /api/v1/cluster/partitions에서 조회
+
+설정 예:
+    CLUSTER_NODES="node-a=http://10.0.0.1:8000,node-b=http://10.0.0.2:8000"
+    CLUSTER_NODE_ID="node-a"
+"""
+
+import asyncio
+import bisect
+import hashlib
+import os
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import RedirectResponse, Response
+from utils import logger
+
+# ---------------------- 상수 정의 ----------------------
+# 클러스터 노드 목록 ("노드ID=기본 URL" 쉼표 구분, 비어 있거나 1개면 파티션 미사용)
+CLUSTER_NODES = os.getenv("CLUSTER_NODES", "")
+# 이 노드의 ID (CLUSTER_NODES의 키 중 하나)
+CLUSTER_NODE_ID = os.getenv("CLUSTER_NODE_ID", "")
+# 노드당 가상 노드 수
+CLUSTER_VNODES = int(os.getenv("CLUSTER_VNODES", "128"))
+# 다른 노드 소유 도메인 요청 처리 방식 (redirect / proxy)
+CLUSTER_ROUTING = os.getenv("CLUSTER_ROUTING", "redirect").lower()
+# proxy 요청 타임아웃 (초)
+CLUSTER_PROXY_TIMEOUT = float(os.getenv("CLUSTER_PROXY_TIMEOUT", "30"))
+# 사용자 ID → 도메인 조회 결과 캐시 크기 (도메인은 수정 불가라 만료 없음)
+CLUSTER_USER_DOMAIN_CACHE = int(os.getenv("CLUSTER_USER_DOMAIN_CACHE", "100000"))
+
+# 다른 노드가 전달한 요청 표시 (값: 전달한 노드 ID)
+FORWARDED_HEADER = "X-Tuning-Forwarded-By"
+# 응답을 처리한 노드 표시
+OWNER_HEADER = "X-Tuning-Node"
+
+# proxy 시 전달할 요청 / 응답 헤더
+_FORWARD_REQUEST_HEADERS = ("content-type", "accept", "authorization")
+_FORWARD_RESPONSE_HEADERS = ("content-type", "retry-after", "location")
+
+
+def parse_nodes(spec: str) -> Dict[str, str]:
+    """
+    "노드ID=URL,..." 설정 파싱
+
+    Returns:
+        {노드 ID: 끝의 /를 제거한 기본 URL}
+    """
+    nodes = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        node_id, sep, url = item.partition("=")
+        if not sep or not node_id.strip() or not url.strip():
+            raise ValueError(f"CLUSTER_NODES 형식 오류: {item!r} (노드ID=URL)")
+        nodes[node_id.strip()] = url.strip().rstrip("/")
+    return nodes
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    가상 노드 기반 consistent hash 링
+    """
+
+    def __init__(self, node_ids: List[str], vnodes: int = CLUSTER_VNODES):
+        self.vnodes = max(1, vnodes)
+        points = sorted(
+            (_hash(f"{node_id}#{i}"), node_id)
+            for node_id in node_ids
+            for i in range(self.vnodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [node_id for _, node_id in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        """키를 시계 방향으로 처음 만나는 가상 노드의 노드 ID"""
+        if not self._hashes:
+            return None
+        i = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[i]
+
+
+class DomainPartition:
+    """
+    도메인 → 소유 노드 매핑과 요청 라우팅
+
+    Args:
+        nodes: {노드 ID: 기본 URL}
+        node_id: 이 노드 ID
+        mode: redirect / proxy
+    """
+
+    def __init__(
+        self,
+        nodes: Dict[str, str],
+        node_id: str = CLUSTER_NODE_ID,
+        vnodes: int = CLUSTER_VNODES,
+        mode: str = CLUSTER_ROUTING,
+        proxy_timeout: float = CLUSTER_PROXY_TIMEOUT,
+        user_domain_cache: int = CLUSTER_USER_DOMAIN_CACHE,
+    ):
+        if mode not in ("redirect", "proxy"):
+            raise ValueError(f"CLUSTER_ROUTING은 redirect / proxy 중 하나: {mode!r}")
+        if len(nodes) > 1 and node_id not in nodes:
+            raise ValueError(f"CLUSTER_NODE_ID {node_id!r}가 CLUSTER_NODES에 없음")
+        self.nodes = dict(nodes)
+        self.node_id = node_id
+        self.mode = mode
+        self.proxy_timeout = proxy_timeout
+        self.ring = HashRing(sorted(self.nodes), vnodes)
+
+        self._user_domains: "OrderedDict[str, str]" = OrderedDict()
+        self._user_domain_cache = user_domain_cache
+        self._stats = {
+            "local": 0,
+            "redirected": 0,
+            "proxied": 0,
+            "proxy_errors": 0,
+            "misrouted": 0,  # 전달받았지만 이 노드 소유가 아닌 요청 (노드 간 링 설정 불일치)
+            "user_domain_hits": 0,
+            "user_domain_lookups": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.nodes) > 1
+
+    def owner(self, domain: str) -> str:
+        """도메인 소유 노드 ID (파티션 미사용이면 이 노드)"""
+        if not self.enabled:
+            return self.node_id
+        return self.ring.owner(str(domain))
+
+    def owns(self, domain: Optional[str]) -> bool:
+        """이 노드가 도메인을 소유하는지 여부 (도메인을 모르면 로컬 처리)"""
+        return domain is None or not self.enabled or self.owner(domain) == self.node_id
+
+    # ---------------------- 사용자 → 도메인 ----------------------
+    def user_domain(
+        self, user_id: str, lookup: Callable[[str], Optional[str]]
+    ) -> Optional[str]:
+        """
+        사용자 도메인 조회 (파티션 미사용이면 조회하지 않고 None)
+
+        Args:
+            lookup: 캐시에 없을 때 호출할 조회 함수 (user_service.get_user_domain)
+        """
+        if not self.enabled:
+            return None
+        user_id = str(user_id)
+        domain = self._user_domains.get(user_id)
+        if domain is not None:
+            self._user_domains.move_to_end(user_id)
+            self._stats["user_domain_hits"] += 1
+            return domain
+        self._stats["user_domain_lookups"] += 1
+        domain = lookup(user_id)
+        if domain is not None:
+            self.remember_user(user_id, domain)
+        return domain
+
+    def remember_user(self, user_id: str, domain: str) -> None:
+        if not self.enabled or self._user_domain_cache <= 0:
+            return
+        self._user_domains[str(user_id)] = domain
+        self._user_domains.move_to_end(str(user_id))
+        while len(self._user_domains) > self._user_domain_cache:
+            self._user_domains.popitem(last=False)
+
+    def forget_user(self, user_id: str) -> None:
+        self._user_domains.pop(str(user_id), None)
+
+    # ---------------------- 라우팅 ----------------------
+    async def route_user(
+        self,
+        request: Optional[Request],
+        user_id: str,
+        lookup: Callable[[str], Optional[str]],
+    ) -> Optional[Response]:
+        """사용자 ID로 도메인을 찾아 route (파티션 미사용이면 조회 없이 None)"""
+        if not self.enabled or request is None:
+            return None
+        return await self.route(request, self.user_domain(user_id, lookup))
+
+    async def route(
+        self, request: Optional[Request], domain: Optional[str]
+    ) -> Optional[Response]:
+        """
+        다른 노드 소유 도메인이면 redirect / proxy 응답 반환 (이 노드가 처리할 요청이면 None)
+        """
+        if not self.enabled or request is None:
+            return None
+        if self.owns(domain):
+            self._stats["local"] += 1
+            return None
+        if request.headers.get(FORWARDED_HEADER):
+            # 전달받은 요청은 다시 전달하지 않음 (링 설정 불일치 시 순환 방지)
+            self._stats["misrouted"] += 1
+            logger.logger.warning(
+                f"CLUSTER: forwarded request for {domain} is not owned by {self.node_id}"
+            )
+            return None
+
+        owner = self.owner(domain)
+        url = self.nodes[owner] + request.url.path
+        if request.url.query:
+            url = f"{url}?{request.url.query}"
+
+        if self.mode == "redirect":
+            self._stats["redirected"] += 1
+            return RedirectResponse(url, status_code=307, headers={OWNER_HEADER: owner})
+        body = await request.body()
+        return await asyncio.to_thread(self._proxy, request, url, body, owner)
+
+    def _proxy(self, request: Request, url: str, body: bytes, owner: str) -> Response:
+        headers = {
+            name: request.headers[name]
+            for name in _FORWARD_REQUEST_HEADERS
+            if name in request.headers
+        }
+        headers[FORWARDED_HEADER] = self.node_id
+        forwarded = urllib.request.Request(
+            url, data=body or None, headers=headers, method=request.method
+        )
+        try:
+            with urllib.request.urlopen(
+                forwarded, timeout=self.proxy_timeout
+            ) as response:
+                status, content, reply_headers = (
+                    response.status,
+                    response.read(),
+                    response.headers,
+                )
+        except urllib.error.HTTPError as e:
+            # 소유 노드의 오류 응답(404, 409 등)은 그대로 전달
+            status, content, reply_headers = e.code, e.read(), e.headers
+        except (urllib.error.URLError, OSError) as e:
+            self._stats["proxy_errors"] += 1
+            raise HTTPException(
+                status_code=502,
+                detail={
+                    "code": "CLUSTER_PROXY_FAILED",
+                    "message": f"{owner} 노드로 요청 전달 실패: {e}",
+                },
+            )
+        self._stats["proxied"] += 1
+        headers = {
+            name: reply_headers[name]
+            for name in _FORWARD_RESPONSE_HEADERS
+            if reply_headers.get(name) is not None
+        }
+        headers[OWNER_HEADER] = owner
+        return Response(content=content, status_code=status, headers=headers)
+
+    # ---------------------- 조회 ----------------------
+    def get_map(self, domains: List[str] = None) -> Dict[str, Any]:
+        """
+        파티션 맵
+
+        Args:
+            domains: 소유 노드를 함께 반환할 도메인 목록
+        """
+        partition_map = {
+            "enabled": self.enabled,
+            "nodeId": self.node_id,
+            "mode": self.mode,
+            "vnodes": self.ring.vnodes,
+            "nodes": self.nodes,
+        }
+        if domains:
+            partition_map["owners"] = {domain: self.owner(domain) for domain in domains}
+        return partition_map
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "nodeId": self.node_id,
+            "user_domain_cache": len(self._user_domains),
+            **self._stats,
+        }
+
+
+# 모듈 레벨 싱글톤 인스턴스
+domain_partition = DomainPartition(parse_nodes(CLUSTER_NODES))
+
+if domain_partition.enabled:
+    logger.register_summary_provider("domain_partition", domain_partition.get_stats)
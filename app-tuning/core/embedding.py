@@ -117,3 +117,42 @@ def embed_fields_optimized(user: dict, fields: list) -> dict:
     else:
         # 모든 필드가 비어 있는 경우
         return {field: [0.0] * dim for field in fields}
+
+
+@logger.log_performance(operation_name="embed_profiles_batch", include_memory=True)
+def embed_profiles_batch(metas: List[dict], fields: List[str]) -> tuple:
+    """
+    여러 사용자의 통합 텍스트 임베딩과 필드별 임베딩을 한 번에 생성 (재임베딩 마이그레이션용)
+
+    Args:
+        metas: 저장된 사용자 메타데이터 목록 (한글화 + 문자열 형식)
+        fields: 통합 텍스트 / 필드 임베딩 대상 필드 리스트
+
+    Returns:
+        (통합 임베딩 목록, {필드명: 임베딩 벡터} 목록)
+    """
+    model = get_model()
+    dim = model.get_sentence_embedding_dimension()
+
+    texts = [convert_user_to_text(meta, fields) for meta in metas]
+    embeddings = model.encode(texts, show_progress_bar=False)
+
+    # 모든 사용자의 비어 있지 않은 필드 값을 한 번에 인코딩
+    field_texts, field_mapping = [], []
+    for i, meta in enumerate(metas):
+        for field in fields:
+            value = meta.get(field)
+            if not value:
+                continue
+            field_texts.append(
+                ", ".join(value) if isinstance(value, list) else str(value)
+            )
+            field_mapping.append((i, field))
+
+    field_embeddings = [{field: [0.0] * dim for field in fields} for _ in metas]
+    if field_texts:
+        encoded = model.encode(field_texts, show_progress_bar=False)
+        for (i, field), vector in zip(field_mapping, encoded):
+            field_embeddings[i][field] = vector.tolist()
+
+    return [vector.tolist() for vector in embeddings], field_embeddings
@@ -0,0 +1,407 @@
+"""
+임베딩 재생성 마이그레이션 모듈
+SBERT 모델 교체(EMBEDDING_MODEL_NAME / EMBEDDING_VERSION 변경) 후 이전 버전으로 저장된
+사용자 임베딩을 Chroma를 비우지 않고 백그라운드에서 현재 버전으로 다시 생성
+
+진행 방식 (도메인 단위):
+1. MIGRATING: 이전 버전 사용자를 배치로 읽어 통합/필드 임베딩을 한 번에 재생성하고
+   user_profiles와 도메인 인덱스에 반영 (버전 태그 갱신)
+   - 매칭은 같은 버전 인덱스끼리만 비교하므로 진행 중에도 버전이 섞이지 않음
+2. CUTOVER: 도메인의 모든 사용자가 현재 버전이 되면 도메인 전체 유사도 문서를
+   현재 버전 벡터로 다시 계산하여 교체하고 이전 버전 인덱스 해제
+3. DONE
+
+- 진행 상태는 EMBEDDING_MIGRATION_STATE_PATH(JSON)에 배치마다 저장되어 재시작 후 이어서 진행
+  (남은 대상은 매번 메타데이터의 버전 태그로 다시 찾으므로 중간에 끊겨도 안전)
+- EMBEDDING_MIGRATION_CPU_BUDGET: 처리 시간 비율 상한 (0.25면 처리 1초당 3초 휴식)
+- EMBEDDING_MIGRATION_SLICE_MS: 쉬지 않고 연속으로 처리하는 최대 시간
+  (재임베딩은 묶음 크기를 측정 시간에 맞춰 줄여 한 번의 인코딩이 이 시간 안에 끝나게 하고,
+  구간마다 budget 비율에 맞춰 휴식)
+  → 온라인 인코딩이 마이그레이션 때문에 기다리는 시간은 최대 한 구간
+  (구간 안에서는 모델이 모든 연산 스레드를 사용함, torch 스레드 수는 프로세스 전역 설정이라
+  마이그레이션만 따로 제한하지 않음. 순간 CPU 사용률이 아니라 평균 비율과 연속 점유 시간을 제한)
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from core.change_feed import RELOAD, UPSERT, change_feed
+from core.domain_index import domain_indexes
+from core.domain_partition import domain_partition
+from core.embedding_version import (
+    EMBEDDING_VERSION,
+    EMBEDDING_VERSION_KEY,
+    embedding_version_of,
+)
+from core.index_snapshot import mark_updated
+from core.matching_score_optimized import (
+    blend_scores,
+    compute_matching_components_indexed,
+)
+from core.profile_update import PROFILE_TEXT_FIELDS
+from core.recommendation_cache import recommendation_cache
+from core.similarity_write_queue import build_similarity_metadata
+from core.vector_database import (
+    get_similarity_collection,
+    get_user_collection,
+    similarity_locks,
+)
+from core.weight_profiles import get_weight_profile
+from utils import logger
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# ---------------------- 상수 정의 ----------------------
+# 서버 시작 시 마이그레이션 자동 실행 여부
+EMBEDDING_MIGRATION_AUTO = (
+    os.getenv("EMBEDDING_MIGRATION_AUTO", "false").lower() == "true"
+)
+# 한 번에 재임베딩할 사용자 수
+EMBEDDING_MIGRATION_BATCH_SIZE = int(os.getenv("EMBEDDING_MIGRATION_BATCH_SIZE", "256"))
+# 처리 시간 비율 상한 (0 < budget <= 1)
+EMBEDDING_MIGRATION_CPU_BUDGET = float(
+    os.getenv("EMBEDDING_MIGRATION_CPU_BUDGET", "0.25")
+)
+# 연속 처리 구간 상한 (밀리초)
+EMBEDDING_MIGRATION_SLICE_MS = float(os.getenv("EMBEDDING_MIGRATION_SLICE_MS", "100"))
+# 재임베딩 첫 인코딩 묶음 크기 (이후 SLICE_MS에 맞춰 조정)
+EMBEDDING_MIGRATION_ENCODE_CHUNK = int(
+    os.getenv("EMBEDDING_MIGRATION_ENCODE_CHUNK", "8")
+)
+# 진행 상태 파일 경로
+EMBEDDING_MIGRATION_STATE_PATH = os.getenv(
+    "EMBEDDING_MIGRATION_STATE_PATH",
+    os.path.join(BASE_DIR, "data", "embedding_migration.json"),
+)
+# Chroma 메타데이터 페이지 크기 (대상 탐색용)
+_SCAN_PAGE_SIZE = 1000
+
+PENDING, MIGRATING, CUTOVER, DONE = "PENDING", "MIGRATING", "CUTOVER", "DONE"
+
+
+def _default_encoder(metas: List[dict], fields: List[str]) -> tuple:
+    # 모델은 실제로 재임베딩할 때만 로드
+    from core.embedding import embed_profiles_batch
+
+    return embed_profiles_batch(metas, fields)
+
+
+class EmbeddingMigration:
+    """
+    도메인 단위 임베딩 재생성 작업
+    """
+
+    def __init__(
+        self,
+        target_version: str = EMBEDDING_VERSION,
+        batch_size: int = EMBEDDING_MIGRATION_BATCH_SIZE,
+        cpu_budget: float = EMBEDDING_MIGRATION_CPU_BUDGET,
+        slice_ms: float = EMBEDDING_MIGRATION_SLICE_MS,
+        encode_chunk: int = EMBEDDING_MIGRATION_ENCODE_CHUNK,
+        state_path: str = EMBEDDING_MIGRATION_STATE_PATH,
+        encoder: Callable[[List[dict], List[str]], tuple] = _default_encoder,
+    ):
+        self.target_version = target_version
+        self.batch_size = batch_size
+        self.cpu_budget = min(1.0, max(0.01, cpu_budget))
+        self.slice_seconds = max(0.0, slice_ms) / 1000
+        self.encode_chunk = max(1, encode_chunk)
+        self.state_path = state_path
+        self.encoder = encoder
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._state_lock = threading.Lock()
+        self.state = self._load_state()
+
+    # ---------------------- 진행 상태 ----------------------
+    def _load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("targetVersion") == self.target_version:
+                return state
+        return {"targetVersion": self.target_version, "domains": {}}
+
+    def _save_state(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with self._state_lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_path)
+
+    def _domain_state(self, domain: str) -> Dict[str, Any]:
+        with self._state_lock:
+            return self.state["domains"].setdefault(
+                domain,
+                {
+                    "status": PENDING,
+                    "total": 0,
+                    "migrated": 0,
+                    "failed": 0,
+                    "startedAt": None,
+                    "cutoverAt": None,
+                },
+            )
+
+    # ---------------------- 대상 탐색 ----------------------
+    def _scan(self, where: dict = None):
+        collection = get_user_collection()
+        offset = 0
+        while True:
+            page = collection.get(
+                where=where,
+                include=["metadatas"],
+                limit=_SCAN_PAGE_SIZE,
+                offset=offset,
+            )
+            if not page["ids"]:
+                return
+            yield from zip(page["ids"], page["metadatas"])
+            offset += len(page["ids"])
+
+    def discover_domains(self) -> List[str]:
+        # 다중 노드 파티션에서는 이 노드가 소유한 도메인만 (다른 도메인은 소유 노드가 진행)
+        domains = {meta.get("emailDomain") for _, meta in self._scan()}
+        return sorted(
+            domain for domain in domains if domain and domain_partition.owns(domain)
+        )
+
+    def _stale_ids(self, domain: str) -> List[str]:
+        return [
+            user_id
+            for user_id, meta in self._scan({"emailDomain": domain})
+            if embedding_version_of(meta) != self.target_version
+        ]
+
+    # ---------------------- 재임베딩 ----------------------
+    def _throttle(self, elapsed: float) -> None:
+        # 처리 시간이 전체의 cpu_budget 비율을 넘지 않도록 휴식
+        pause = elapsed * (1 - self.cpu_budget) / self.cpu_budget
+        if pause > 0:
+            self._stop.wait(pause)
+
+    def _encode(self, metas: List[dict]) -> tuple:
+        """
+        한 구간(slice_seconds) 안에 끝나는 크기의 묶음으로 나누어 인코딩하고 묶음마다 휴식
+        (묶음 크기는 직전 묶음의 사용자당 처리 시간으로 조정)
+        """
+        embeddings, field_embeddings = [], []
+        chunk, position = self.encode_chunk, 0
+        while position < len(metas):
+            started = time.perf_counter()
+            part = metas[position : position + chunk]
+            part_embeddings, part_fields = self.encoder(part, PROFILE_TEXT_FIELDS)
+            embeddings.extend(part_embeddings)
+            field_embeddings.extend(part_fields)
+            position += len(part)
+
+            elapsed = time.perf_counter() - started
+            per_user = elapsed / len(part)
+            chunk = max(
+                1,
+                min(self.batch_size, int(self.slice_seconds / max(per_user, 1e-6))),
+            )
+            self._throttle(elapsed)
+        return embeddings, field_embeddings
+
+    def migrate_batch(self, user_ids: List[str]) -> int:
+        """
+        사용자 배치를 현재 버전으로 재임베딩하여 user_profiles와 도메인 인덱스에 반영
+
+        Returns:
+            재임베딩한 사용자 수
+        """
+        users = get_user_collection().get(ids=user_ids, include=["metadatas"])
+        targets = [
+            (user_id, meta)
+            for user_id, meta in zip(users["ids"], users["metadatas"])
+            if embedding_version_of(meta) != self.target_version
+        ]
+        if not targets:
+            return 0
+
+        metas = [dict(meta) for _, meta in targets]
+        embeddings, field_embeddings = self._encode(metas)
+        for meta, fields in zip(metas, field_embeddings):
+            meta["field_embeddings"] = json.dumps(fields)
+            meta[EMBEDDING_VERSION_KEY] = self.target_version
+            mark_updated(meta)
+
+        ids = [user_id for user_id, _ in targets]
+        get_user_collection().update(ids=ids, embeddings=embeddings, metadatas=metas)
+        change_feed.append_many(
+            [
+                (UPSERT, user_id, meta.get("emailDomain"))
+                for user_id, meta in zip(ids, metas)
+            ]
+        )
+        for user_id, embedding, meta in zip(ids, embeddings, metas):
+            domain_indexes.upsert_user(user_id, embedding, meta)
+        return len(ids)
+
+    def cutover(self, domain: str) -> int:
+        """
+        도메인 전체 유사도 문서를 현재 버전 벡터로 다시 계산하여 교체
+
+        Returns:
+            교체한 유사도 문서 수
+        """
+        index = domain_indexes.get(domain, self.target_version)
+        user_ids = list(index.ids)
+        profile = get_weight_profile(domain)
+        written = 0
+
+        for start in range(0, len(user_ids), self.batch_size):
+            if self._stop.is_set():
+                return written
+            batch_ids = user_ids[start : start + self.batch_size]
+            users = get_user_collection().get(
+                ids=batch_ids, include=["embeddings", "metadatas"]
+            )
+
+            ids, embeddings, metadatas = [], [], []
+            started = time.perf_counter()
+            for user_id, embedding, meta in zip(
+                users["ids"], users["embeddings"], users["metadatas"]
+            ):
+                # 연속 처리가 한 구간을 넘으면 휴식 (배치가 끝날 때까지 몰아서 계산하지 않음)
+                elapsed = time.perf_counter() - started
+                if elapsed >= self.slice_seconds:
+                    self._throttle(elapsed)
+                    started = time.perf_counter()
+                other_ids, component_matrix = compute_matching_components_indexed(
+                    user_id=user_id,
+                    user_embedding=embedding,
+                    user_meta=meta,
+                    index=index,
+                )
+                scores = blend_scores(component_matrix, **profile)
+                ids.append(user_id)
+                embeddings.append(embedding)
+                metadatas.append(
+                    build_similarity_metadata(
+                        user_id,
+                        dict(zip(other_ids, scores.tolist())),
+                        dict(zip(other_ids, component_matrix.tolist())),
+                        domain,
+                    )
+                )
+
+            if ids:
+                with similarity_locks.hold(ids):
+                    get_similarity_collection().upsert(
+                        ids=ids, embeddings=embeddings, metadatas=metadatas
+                    )
+                written += len(ids)
+            self._throttle(time.perf_counter() - started)
+
+        for version in domain_indexes.versions(domain):
+            if version != self.target_version:
+                domain_indexes.drop_version(domain, version)
+        # 복제 노드도 이전 버전 인덱스를 내리고 새 유사도 문서 기준으로 다시 로드
+        change_feed.append(RELOAD, None, domain)
+        recommendation_cache.invalidate_domain(domain)
+        return written
+
+    def run_domain(self, domain: str) -> str:
+        """한 도메인 마이그레이션 (중단 시 현재 상태 반환, 다시 실행하면 이어서 진행)"""
+        state = self._domain_state(domain)
+        if state["status"] == DONE:
+            return DONE
+
+        stale_ids = self._stale_ids(domain)
+        if state["status"] == PENDING:
+            if not stale_ids:
+                # 처음부터 모두 현재 버전이면 유사도도 현재 버전으로 계산되어 있음
+                state["status"] = DONE
+                self._save_state()
+                return DONE
+            state.update(status=MIGRATING, total=len(stale_ids), startedAt=time.time())
+            self._save_state()
+
+        for start in range(0, len(stale_ids), self.batch_size):
+            if self._stop.is_set():
+                return state["status"]
+            batch = stale_ids[start : start + self.batch_size]
+            try:
+                state["migrated"] += self.migrate_batch(batch)
+            except Exception as e:
+                state["failed"] += len(batch)
+                logger.logger.error(
+                    f"EMBEDDING-MIGRATION-ERROR: {domain} batch@{start} [{e}]"
+                )
+            self._save_state()
+
+        # 실패한 사용자가 남아 있으면 전환하지 않고 다음 실행에서 재시도
+        if self._stop.is_set() or self._stale_ids(domain):
+            return state["status"]
+
+        state["status"] = CUTOVER
+        self._save_state()
+        self.cutover(domain)
+        if self._stop.is_set():
+            return state["status"]
+
+        state.update(status=DONE, cutoverAt=time.time())
+        self._save_state()
+        logger.logger.info(
+            f"EMBEDDING-MIGRATION: {domain} cut over to {self.target_version}"
+        )
+        return DONE
+
+    def run(self, domains: List[str] = None) -> Dict[str, str]:
+        """대상 도메인(기본: 전체) 순서대로 마이그레이션"""
+        results = {}
+        for domain in domains or self.discover_domains():
+            if self._stop.is_set():
+                break
+            results[domain] = self.run_domain(domain)
+        return results
+
+    # ---------------------- 백그라운드 실행 ----------------------
+    def _run_background(self) -> None:
+        logger.logger.info(
+            f"EMBEDDING-MIGRATION: started [target={self.target_version}, budget={self.cpu_budget}]"
+        )
+        try:
+            self.run()
+        except Exception as e:
+            logger.logger.error(f"EMBEDDING-MIGRATION-ERROR: {e}")
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run_background, name="embedding-migration", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """진행 중인 배치가 끝나면 중단 (진행 상태는 저장되어 다음 시작 시 이어서 진행)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._state_lock:
+            domains = {d: dict(s) for d, s in self.state["domains"].items()}
+        return {
+            "targetVersion": self.target_version,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "cpuBudget": self.cpu_budget,
+            "sliceMs": round(self.slice_seconds * 1000, 1),
+            "domains": domains,
+        }
+
+
+# 모듈 레벨 싱글톤 인스턴스
+embedding_migration = EmbeddingMigration()
+
+logger.register_summary_provider("embedding_migration", embedding_migration.get_stats)
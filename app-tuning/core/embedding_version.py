@@ -0,0 +1,31 @@
+"""
+임베딩 버전 모듈
+저장된 임베딩이 어떤 모델로 만들어졌는지 user_profiles 메타데이터(embedding_version)에 기록하여
+모델 교체 후에도 같은 버전의 벡터끼리만 비교하도록 함
+
+- EMBEDDING_MODEL_NAME: 현재 로드하는 SBERT 모델
+- EMBEDDING_VERSION: 새로 만드는 임베딩에 붙이는 버전 (기본값은 모델 이름 기반)
+- EMBEDDING_LEGACY_VERSION: 버전 태그가 없는 기존 데이터의 버전
+"""
+
+import os
+
+# 현재 임베딩 모델
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "jhgan/ko-sbert-nli")
+# 새로 생성하는 임베딩 버전
+EMBEDDING_VERSION = os.getenv(
+    "EMBEDDING_VERSION", EMBEDDING_MODEL_NAME.replace("/", "-")
+)
+# 버전 태그 도입 전에 저장된 임베딩의 버전
+EMBEDDING_LEGACY_VERSION = os.getenv("EMBEDDING_LEGACY_VERSION", "jhgan-ko-sbert-nli")
+
+EMBEDDING_VERSION_KEY = "embedding_version"
+
+
+def embedding_version_of(meta: dict) -> str:
+    """사용자 메타데이터의 임베딩 버전 (태그가 없으면 레거시 버전)"""
+    return (meta or {}).get(EMBEDDING_VERSION_KEY) or EMBEDDING_LEGACY_VERSION
+
+
+def is_current_version(meta: dict) -> bool:
+    return embedding_version_of(meta) == EMBEDDING_VERSION
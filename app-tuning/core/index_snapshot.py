@@ -0,0 +1,157 @@
+"""
+도메인 인덱스 스냅샷 모듈
+재시작 후 도메인 사용자 전체를 Chroma에서 다시 읽지 않도록 (도메인, 버전)별 인덱스 열을
+버전이 붙은 .npy 파일로 저장하고, 시작 시 메모리 맵(copy-on-write)으로 열어 사용
+
+디렉토리 구조: INDEX_SNAPSHOT_DIR/<도메인>/<임베딩 버전>/<스냅샷 ID>/
+- codes.npy / norms.npy / signature_ids.npy: 행 단위 인덱스 열 (추가 여유 행 포함)
+- codebooks.npy: PQ 코덱 중심점 (PQ인 경우)
+- manifest.json: 사용자 ID, 코덱, 매칭 벡터 공간(투영 버전 / 차원), 시그니처 대표 메타데이터, 생성 시각
+
+스냅샷 이후의 변경은 사용자 메타데이터의 UPDATED_AT_KEY(갱신 시각)와 ID 목록 비교로 찾아 반영
+(도메인 인덱스 쪽 처리는 core/domain_index 참고)
+"""
+
+import json
+import os
+import shutil
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# ---------------------- 상수 정의 ----------------------
+# 스냅샷 저장 경로 (기본값은 빈 값 = 스냅샷 미사용, 디스크 쓰기는 설정한 경우에만)
+INDEX_SNAPSHOT_DIR = os.getenv("INDEX_SNAPSHOT_DIR", "")
+# 주기적 스냅샷 간격 (초, 0이면 종료 시에만 저장)
+INDEX_SNAPSHOT_INTERVAL = float(os.getenv("INDEX_SNAPSHOT_INTERVAL", "900"))
+# (도메인, 버전)별로 보관할 스냅샷 수
+INDEX_SNAPSHOT_KEEP = int(os.getenv("INDEX_SNAPSHOT_KEEP", "2"))
+# 스냅샷 시각 이전 몇 초까지의 변경을 다시 반영할지 (서버 간 시계 오차 보정)
+INDEX_SNAPSHOT_REPLAY_MARGIN = float(os.getenv("INDEX_SNAPSHOT_REPLAY_MARGIN", "60"))
+
+# 사용자 메타데이터의 마지막 갱신 시각 (epoch 초)
+UPDATED_AT_KEY = "updatedAt"
+
+SNAPSHOT_FORMAT = 1
+_COLUMNS = ("codes", "norms", "signature_ids")
+
+
+def mark_updated(meta: dict) -> dict:
+    """저장 직전 메타데이터에 갱신 시각 기록 (스냅샷 이후 변경 탐지용)"""
+    meta[UPDATED_AT_KEY] = time.time()
+    return meta
+
+
+def _domain_dir(directory: str, domain: str, version: str) -> str:
+    # 도메인 / 버전 문자열을 파일 이름으로 안전하게 인코딩
+    return os.path.join(
+        directory,
+        urllib.parse.quote(str(domain), safe=""),
+        urllib.parse.quote(str(version), safe=""),
+    )
+
+
+def write_snapshot(
+    directory: str,
+    domain: str,
+    version: str,
+    columns: Dict[str, np.ndarray],
+    manifest: Dict[str, Any],
+    keep: int = INDEX_SNAPSHOT_KEEP,
+) -> str:
+    """
+    스냅샷 저장 (임시 디렉토리에 쓴 뒤 이름 변경으로 원자적 게시)
+
+    Args:
+        columns: codes / norms / signature_ids (+ codebooks) 배열
+        manifest: ids, codec, signatures 등 JSON 직렬화 가능한 정보
+
+    Returns:
+        저장된 스냅샷 경로
+    """
+    parent = _domain_dir(directory, domain, version)
+    os.makedirs(parent, exist_ok=True)
+    taken_at = time.time()
+    snapshot_id = f"{int(taken_at * 1000):015d}"
+    tmp = os.path.join(parent, f".{snapshot_id}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    for name, array in columns.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+    manifest = {
+        **manifest,
+        "format": SNAPSHOT_FORMAT,
+        "domain": domain,
+        "version": version,
+        "takenAt": taken_at,
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    path = os.path.join(parent, snapshot_id)
+    os.rename(tmp, path)
+    for old in list_snapshots(directory, domain, version)[: -max(1, keep)]:
+        shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+def list_snapshots(directory: str, domain: str, version: str) -> List[str]:
+    """(도메인, 버전)의 스냅샷 경로 (오래된 순)"""
+    parent = _domain_dir(directory, domain, version)
+    if not os.path.isdir(parent):
+        return []
+    return [
+        os.path.join(parent, name)
+        for name in sorted(os.listdir(parent))
+        if not name.startswith(".")
+    ]
+
+
+def remove_snapshots(directory: str, domain: str, version: str) -> None:
+    """(도메인, 버전)의 스냅샷 전체 삭제 (이전 임베딩 버전 정리)"""
+    shutil.rmtree(_domain_dir(directory, domain, version), ignore_errors=True)
+
+
+def snapshot_versions(directory: str, domain: str) -> List[str]:
+    """스냅샷이 있는 도메인의 임베딩 버전 목록"""
+    parent = os.path.join(directory, urllib.parse.quote(str(domain), safe=""))
+    if not os.path.isdir(parent):
+        return []
+    return [urllib.parse.unquote(name) for name in sorted(os.listdir(parent))]
+
+
+def read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """
+    스냅샷 열기 (배열은 copy-on-write 메모리 맵, 읽기 실패 시 None)
+
+    Returns:
+        {"manifest": dict, "codes": ..., "norms": ..., "signature_ids": ..., "codebooks": ...}
+    """
+    try:
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            return None
+        snapshot = {"manifest": manifest}
+        for name in _COLUMNS:
+            snapshot[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="c")
+        codebooks = os.path.join(path, "codebooks.npy")
+        if os.path.exists(codebooks):
+            snapshot["codebooks"] = np.load(codebooks)
+        return snapshot
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def latest_snapshot(
+    directory: str, domain: str, version: str
+) -> Optional[Dict[str, Any]]:
+    """읽을 수 있는 가장 최근 스냅샷 (손상된 스냅샷은 건너뜀)"""
+    for path in reversed(list_snapshots(directory, domain, version)):
+        snapshot = read_snapshot(path)
+        if snapshot is not None:
+            return snapshot
+    return None
@@ -0,0 +1,131 @@
+"""
+추론 서버 클라이언트 모듈
+INFERENCE_SERVER_ADDRESS가 설정된 API 워커는 모델을 직접 로드하지 않고
+이 클라이언트로 추론 서버(core/inference_server)에 인코딩을 요청
+
+- SentenceTransformer와 같은 encode / get_sentence_embedding_dimension 인터페이스 제공
+- 결과는 클라이언트가 만든 공유 메모리 버퍼로 받아 피클링된 리스트 전송을 피함
+- 연결은 스레드마다 하나씩 유지 (요청-응답 순서 보장)
+- 응답을 기다리는 동안 호출 스레드가 멈추므로 요청 핸들러에서는 encode_async
+  (또는 asyncio.to_thread)로 호출 (이벤트 루프 스레드에서 호출되면 경고 / loop_thread_calls 집계)
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from multiprocessing.connection import Client
+from typing import Any, Dict, List, Union
+
+import numpy as np
+from core.inference_server import INFERENCE_SERVER_AUTHKEY
+from core.vector_database.shared_vectors import SharedArray
+
+
+class InferenceServerError(RuntimeError):
+    """추론 서버 인코딩 실패"""
+
+
+class RemoteEncoder:
+    """
+    추론 서버에 인코딩을 요청하는 SentenceTransformer 호환 객체
+    """
+
+    def __init__(self, address: str, authkey: bytes = INFERENCE_SERVER_AUTHKEY):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+        self._dim = None
+        self._ids = itertools.count()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "texts": 0,
+            "errors": 0,
+            "seconds": 0.0,
+            "loop_thread_calls": 0,
+        }
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def _call(self, message: tuple):
+        conn = self._connection()
+        try:
+            conn.send(message)
+            return conn.recv()
+        except (EOFError, OSError):
+            # 서버 재시작 등으로 끊긴 연결은 다음 요청에서 다시 연결
+            self._local.conn = None
+            raise
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dim is None:
+            self._dim = self._call(("dim",))[1]
+        return self._dim
+
+    def encode(self, sentences: Union[str, List[str]], **kwargs: Any) -> np.ndarray:
+        """
+        텍스트(또는 목록)를 임베딩으로 변환 (show_progress_bar 등 추가 인자는 무시)
+
+        Returns:
+            단일 텍스트면 1차원, 목록이면 (텍스트 수, 차원) float32 배열
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        dim = self.get_sentence_embedding_dimension()
+        if not texts:
+            return np.zeros((0, dim), dtype=np.float32)
+
+        self._check_loop_thread()
+        started = time.perf_counter()
+        request_id = next(self._ids)
+        buffer = SharedArray((len(texts), dim), np.float32)
+        try:
+            reply = self._call(("encode", request_id, texts, buffer.spec))
+            if reply[0] != "ok" or reply[1] != request_id:
+                with self._stats_lock:
+                    self._stats["errors"] += 1
+                raise InferenceServerError(f"추론 서버 인코딩 실패: {reply[2:]}")
+            result = buffer.array.copy()
+        finally:
+            buffer.release()
+
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["texts"] += len(texts)
+            self._stats["seconds"] += time.perf_counter() - started
+        return result[0] if single else result
+
+    async def encode_async(
+        self, sentences: Union[str, List[str]], **kwargs: Any
+    ) -> np.ndarray:
+        """encode()를 스레드에서 실행 (원격 인코딩 / 배치 대기 중에도 이벤트 루프가 다른 요청 처리)"""
+        return await asyncio.to_thread(self.encode, sentences, **kwargs)
+
+    def _check_loop_thread(self) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        with self._stats_lock:
+            self._stats["loop_thread_calls"] += 1
+            first = self._stats["loop_thread_calls"] == 1
+        if first:
+            logging.warning(
+                "[INFERENCE_CLIENT] 이벤트 루프 스레드에서 encode 호출 (응답까지 루프가 멈춤, encode_async 사용)"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["address"] = self.address
+        if stats["requests"]:
+            stats["avg_ms"] = round(stats["seconds"] / stats["requests"] * 1000, 2)
+        stats["seconds"] = round(stats["seconds"], 3)
+        return stats
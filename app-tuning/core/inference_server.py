@@ -0,0 +1,218 @@
+"""
+추론 서버 모듈
+SentenceTransformer 모델을 별도 프로세스가 소유하고, API 워커들은 로컬 IPC(Unix 소켓)로
+텍스트 배치를 보내 임베딩을 받도록 하여 인코딩 부하가 API 이벤트 루프/GIL과 경쟁하지 않게 함
+
+프로토콜 (multiprocessing.connection, authkey 인증):
+- ("dim",) → ("dim", 임베딩 차원)
+- ("encode", 요청 ID, 텍스트 목록, 출력 공유 메모리 spec)
+  → 서버가 클라이언트가 만든 공유 메모리 버퍼에 float32 결과를 직접 기록 후 ("ok", 요청 ID)
+  → 실패 시 ("error", 요청 ID, 메시지)
+
+여러 연결에서 들어온 요청은 INFERENCE_MAX_BATCH개 텍스트 또는 INFERENCE_BATCH_WAIT_MS까지
+모아 한 번의 encode로 처리 (여러 API 워커가 모델 하나를 공유)
+
+실행: python scripts/run_inference_server.py
+"""
+
+import os
+import queue
+import socket
+import threading
+import time
+from multiprocessing import AuthenticationError, shared_memory
+from multiprocessing.connection import Listener
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# ---------------------- 상수 정의 ----------------------
+# 추론 서버 소켓 경로 (API 워커에 설정하면 원격 추론 사용)
+INFERENCE_SERVER_ADDRESS = os.getenv("INFERENCE_SERVER_ADDRESS", "")
+# 연결 인증 키
+INFERENCE_SERVER_AUTHKEY = os.getenv(
+    "INFERENCE_SERVER_AUTHKEY", "tuning-inference"
+).encode("utf-8")
+# 한 번에 인코딩할 최대 텍스트 수
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "128"))
+# 배치를 모으는 최대 대기 시간 (밀리초)
+INFERENCE_BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "5"))
+
+DEFAULT_SOCKET_PATH = os.path.join(BASE_DIR, "data", "inference.sock")
+
+
+def write_shared(spec: tuple, values: np.ndarray) -> None:
+    """클라이언트가 만든 공유 메모리 버퍼에 결과 기록 (연결은 바로 닫음)"""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        target = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        target[:] = values
+        del target
+    finally:
+        shm.close()
+
+
+class InferenceServer:
+    """
+    모델을 소유하고 여러 연결의 인코딩 요청을 배치로 처리하는 서버
+
+    Args:
+        address: Unix 소켓 경로
+        model_loader: 모델 로드 함수 (서버 시작 시 한 번 호출)
+        max_batch: 한 번에 인코딩할 최대 텍스트 수
+        batch_wait: 배치를 모으는 최대 대기 시간 (초)
+    """
+
+    def __init__(
+        self,
+        address: str,
+        model_loader: Callable[[], Any],
+        max_batch: int = INFERENCE_MAX_BATCH,
+        batch_wait: float = INFERENCE_BATCH_WAIT_MS / 1000,
+        authkey: bytes = INFERENCE_SERVER_AUTHKEY,
+    ):
+        self.address = address
+        self.model_loader = model_loader
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.authkey = authkey
+
+        self.model = None
+        self.dim = None
+        self._requests: "queue.Queue" = queue.Queue()
+        self._listener = None
+        self._stopping = threading.Event()
+        self._ready = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {"connections": 0, "requests": 0, "texts": 0, "batches": 0}
+
+    # ---------------------- 연결 처리 ----------------------
+    def _reader(self, conn) -> None:
+        send_lock = threading.Lock()
+        try:
+            while not self._stopping.is_set():
+                message = conn.recv()
+                if message[0] == "dim":
+                    with send_lock:
+                        conn.send(("dim", self.dim))
+                elif message[0] == "encode":
+                    _, request_id, texts, spec = message
+                    self._requests.put((conn, send_lock, request_id, texts, spec))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    # ---------------------- 배치 인코딩 ----------------------
+    def _collect(self) -> List[tuple]:
+        batch = [self._requests.get()]
+        if batch[0] is None:
+            return batch
+        texts = len(batch[0][3])
+        deadline = time.monotonic() + self.batch_wait
+        while texts < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            if request is None:
+                break
+            texts += len(request[3])
+        return batch
+
+    def _process(self, batch: List[tuple]) -> None:
+        texts = [text for request in batch for text in request[3]]
+        try:
+            vectors = np.asarray(
+                self.model.encode(texts, show_progress_bar=False), dtype=np.float32
+            )
+        except Exception as e:
+            for conn, send_lock, request_id, _, _ in batch:
+                try:
+                    with send_lock:
+                        conn.send(("error", request_id, str(e)))
+                except OSError:
+                    pass
+            return
+
+        start = 0
+        for conn, send_lock, request_id, request_texts, spec in batch:
+            stop = start + len(request_texts)
+            try:
+                write_shared(spec, vectors[start:stop])
+                reply = ("ok", request_id)
+            except Exception as e:
+                reply = ("error", request_id, str(e))
+            start = stop
+            try:
+                with send_lock:
+                    conn.send(reply)
+            except OSError:
+                pass  # 응답 전에 끊긴 연결
+
+        with self._stats_lock:
+            self._stats["requests"] += len(batch)
+            self._stats["texts"] += len(texts)
+            self._stats["batches"] += 1
+
+    def _batcher(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._collect()
+            if batch[0] is None:
+                return
+            self._process([request for request in batch if request is not None])
+
+    # ---------------------- 실행 ----------------------
+    def serve_forever(self) -> None:
+        self.model = self.model_loader()
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+        os.makedirs(os.path.dirname(self.address) or ".", exist_ok=True)
+        if os.path.exists(self.address):
+            os.unlink(self.address)  # 이전 실행이 남긴 소켓 파일
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        threading.Thread(
+            target=self._batcher, name="inference-batcher", daemon=True
+        ).start()
+        self._ready.set()
+
+        while not self._stopping.is_set():
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                if self._stopping.is_set():
+                    break
+                continue  # 인증 실패 등 개별 연결 오류
+            with self._stats_lock:
+                self._stats["connections"] += 1
+            threading.Thread(target=self._reader, args=(conn,), daemon=True).start()
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        self._requests.put(None)
+        if self._listener is None:
+            return
+        # accept()는 소켓을 닫아도 깨어나지 않으므로 빈 연결로 깨운 뒤 닫음
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as wake:
+                wake.connect(self.address)
+        except OSError:
+            pass
+        self._listener.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        if stats["batches"]:
+            stats["texts_per_batch"] = round(stats["texts"] / stats["batches"], 2)
+        return stats
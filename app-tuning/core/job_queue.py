@@ -0,0 +1,389 @@
+"""
+비동기 작업 큐 모듈
+요청을 검증한 뒤 작업 큐에 넣고 즉시 작업 ID를 반환하며,
+실제 처리는 제한된 수의 작업 워커가 스레드에서 실행하여 이벤트 루프를 막지 않음
+
+주요 기능:
+1. 작업 워커 수로 파이프라인 동시 실행 수 제한
+2. 대기 작업 수 상한 초과 시 503으로 거절
+3. 같은 키(예: userId)의 작업이 진행 중이면 409로 거절
+4. 작업 상태(QUEUED / RUNNING / SUCCEEDED / FAILED)와 단계별 소요 시간 조회
+5. 완료된 작업 정보는 ttl초 동안 보관
+6. 저장소(JobStore)가 있으면 작업 상태를 같은 서버의 워커들이 공유하는 SQLite 파일에도 기록하여,
+   접수한 워커와 다른 워커로 조회 / 재등록 요청이 와도 상태 조회와 중복 거절이 동작
+   (작업 실행 자체는 접수한 워커에서만 수행)
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from utils import logger
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "QUEUED", "RUNNING", "SUCCEEDED", "FAILED"
+# 저장소에는 상태가 앞으로만 진행되도록 기록 (접수 / 시작 기록 순서가 뒤바뀌어도 안전)
+_STATUS_RANK = {QUEUED: 0, RUNNING: 1, SUCCEEDED: 2, FAILED: 2}
+# 보관 기간 정리 주기 (기록 횟수 기준)
+_PRUNE_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    body TEXT NOT NULL
+)
+"""
+
+
+class JobStore:
+    """
+    워커 프로세스 간 작업 상태 공유 저장소 (SQLite, WAL)
+
+    Args:
+        path: 저장소 파일 경로
+        ttl: 완료된 작업 / 끝나지 않은 작업(워커 비정상 종료 등) 보관 시간 (초)
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._saved = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs(key)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def save(self, job: Dict[str, Any]) -> None:
+        """작업 상태 기록 (저장된 상태보다 뒤의 상태일 때만 덮어씀)"""
+        row = (
+            job["jobId"],
+            job["key"],
+            _STATUS_RANK[job["status"]],
+            job["createdAt"],
+            job["finishedAt"],
+            json.dumps(job, ensure_ascii=False),
+        )
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO jobs (job_id, key, rank, created_at, finished_at, body)"
+                    " VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(job_id) DO UPDATE SET rank = excluded.rank,"
+                    " finished_at = excluded.finished_at, body = excluded.body"
+                    " WHERE excluded.rank >= jobs.rank",
+                    row,
+                )
+            self._saved += 1
+            if self._saved % _PRUNE_EVERY == 0:
+                self._prune(conn)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        expired = time.time() - self.ttl
+        with conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE COALESCE(finished_at, created_at) < ?",
+                (expired,),
+            )
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태 (없거나 보관 시간이 지났으면 None)"""
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT body, finished_at, created_at FROM jobs WHERE job_id = ?",
+                    (job_id,),
+                )
+                .fetchone()
+            )
+        if row is None or (row[1] or row[2]) < time.time() - self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def is_active(self, key: str) -> bool:
+        """같은 키의 끝나지 않은 작업이 있는지 (보관 시간이 지난 미완료 작업은 제외)"""
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT 1 FROM jobs WHERE key = ? AND finished_at IS NULL"
+                    " AND created_at >= ? LIMIT 1",
+                    (key, time.time() - self.ttl),
+                )
+                .fetchone()
+            )
+        return row is not None
+
+
+class JobManager:
+    """
+    작업 큐와 작업 워커 관리 (워커는 처음 작업이 들어올 때 이벤트 루프에서 시작)
+
+    Args:
+        name: 로그/통계용 이름
+        process: process(payload, stages) 형태의 동기 처리 함수 (stages에 단계별 소요 시간 기록)
+        key_of: 중복 작업 판정 키 추출 함수
+        workers: 동시 처리 작업 수
+        queue_size: 대기 작업 수 상한
+        ttl: 완료된 작업 정보 보관 시간 (초)
+        codes: 오류 응답 코드 (duplicate, queue_full, failed, not_found)
+        store: 워커 간 작업 상태 공유 저장소 (None이면 프로세스 메모리만 사용)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process: Callable[[Any, dict], Any],
+        key_of: Callable[[Any], str],
+        workers: int,
+        queue_size: int,
+        ttl: float,
+        codes: Dict[str, str],
+        store: Optional[JobStore] = None,
+    ):
+        self.name = name
+        self.process = process
+        self.key_of = key_of
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.ttl = ttl
+        self.codes = codes
+        self.store = store
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 처리 중인 키 → jobId
+        self._active_keys: Dict[str, str] = {}
+        # 진행 중인 저장소 기록 태스크 (종료 시 마무리)
+        self._pending_saves: set = set()
+        self._stats = {"submitted": 0, "succeeded": 0, "failed": 0, "rejected": 0}
+
+    # ---------------------- 작업 등록 ----------------------
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(
+                asyncio.create_task(
+                    self._worker(), name=f"{self.name}-worker-{len(self._tasks)}"
+                )
+            )
+
+    def check_duplicate(self, payload: Any) -> None:
+        """
+        같은 키의 작업이 진행 중이면 409
+        (저장소를 쓰면 다른 워커의 작업도 확인하므로 이벤트 루프 밖에서 호출)
+        """
+        key = self.key_of(payload)
+        if key in self._active_keys or (
+            self.store is not None and self.store.is_active(key)
+        ):
+            raise HTTPException(
+                status_code=409,
+                detail={"code": self.codes["duplicate"], "data": None},
+            )
+
+    def submit(self, payload: Any) -> Dict[str, Any]:
+        """
+        작업 큐에 추가 (요청 검증과 저장소 중복 확인은 호출 측에서 먼저 수행)
+
+        Raises:
+            HTTPException: 같은 키 작업 진행 중(409), 큐 포화(503)
+        """
+        if self.key_of(payload) in self._active_keys:
+            raise HTTPException(
+                status_code=409,
+                detail={"code": self.codes["duplicate"], "data": None},
+            )
+        self._prune()
+        self._ensure_workers()
+
+        key = self.key_of(payload)
+        job_id = uuid.uuid4().hex
+        job = {
+            "jobId": job_id,
+            "key": key,
+            "status": QUEUED,
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None,
+            "queueWaitSeconds": None,
+            "stages": {},
+            "error": None,
+        }
+
+        try:
+            self._queue.put_nowait((job_id, payload))
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            raise HTTPException(
+                status_code=503,
+                detail={
+                    "code": self.codes["queue_full"],
+                    "message": "대기 작업이 많습니다. 잠시 후 다시 시도해주세요.",
+                },
+            )
+
+        self._jobs[job_id] = job
+        self._active_keys[key] = job_id
+        self._stats["submitted"] += 1
+        self._persist(job)
+        return self.describe(job)
+
+    def _persist(self, job: Dict[str, Any]) -> None:
+        # 저장소 기록은 이벤트 루프 밖에서 (상태 순위로 기록 순서가 뒤바뀌어도 안전)
+        if self.store is None:
+            return
+        task = asyncio.create_task(
+            asyncio.to_thread(self._save, self.describe(job)),
+            name=f"{self.name}-persist",
+        )
+        self._pending_saves.add(task)
+        task.add_done_callback(self._pending_saves.discard)
+
+    def _save(self, job: Dict[str, Any]) -> None:
+        try:
+            self.store.save(job)
+        except sqlite3.Error as e:
+            # 기록 실패는 작업을 실패시키지 않음 (다른 워커에서 조회만 안 됨)
+            logger.logger.error(
+                f"JOB-STORE-ERROR: {self.name} {job['jobId']} [error={e}]"
+            )
+
+    # ---------------------- 작업 처리 ----------------------
+    async def _worker(self) -> None:
+        while True:
+            job_id, payload = await self._queue.get()
+            try:
+                await self._run(job_id, payload)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, payload: Any) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        # 작업 키(예: userId)를 작업 로그의 유저 ID로 사용 (워커 태스크는 작업마다 재사용되므로 복원)
+        token = logger.bind_user_id(job["key"])
+        job["status"] = RUNNING
+        job["startedAt"] = time.time()
+        job["queueWaitSeconds"] = round(job["startedAt"] - job["createdAt"], 3)
+        self._persist(job)
+
+        try:
+            await asyncio.to_thread(self.process, payload, job["stages"])
+            job["status"] = SUCCEEDED
+            self._stats["succeeded"] += 1
+        except Exception as e:
+            job["status"] = FAILED
+            detail = e.detail if isinstance(e, HTTPException) else None
+            job["error"] = (
+                detail
+                if isinstance(detail, dict)
+                else {"code": self.codes["failed"], "message": str(e)}
+            )
+            self._stats["failed"] += 1
+            logger.logger.error(
+                f"JOB-ERROR: {self.name} {job_id} [key={job['key']}, error={e}]"
+            )
+        finally:
+            job["finishedAt"] = time.time()
+            self._active_keys.pop(job["key"], None)
+            self._persist(job)
+            logger.reset_user_id(token)
+
+    # ---------------------- 조회 ----------------------
+    @staticmethod
+    def describe(job: Dict[str, Any]) -> Dict[str, Any]:
+        """응답용 작업 정보 (완료 시 전체 소요 시간 포함)"""
+        result = dict(job)
+        result["stages"] = dict(job["stages"])
+        if job["finishedAt"] is not None:
+            result["totalSeconds"] = round(job["finishedAt"] - job["createdAt"], 3)
+        return result
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        """
+        작업 상태 조회 (이 워커의 작업만)
+
+        Raises:
+            HTTPException: 없는 작업 ID(404)
+        """
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=404,
+                detail={"code": self.codes["not_found"], "data": None},
+            )
+        return self.describe(job)
+
+    async def lookup(self, job_id: str) -> Dict[str, Any]:
+        """
+        작업 상태 조회 (이 워커에 없으면 다른 워커가 기록한 저장소에서 조회)
+
+        Raises:
+            HTTPException: 없는 작업 ID(404)
+        """
+        if job_id in self._jobs or self.store is None:
+            return self.get(job_id)
+        job = await asyncio.to_thread(self.store.load, job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=404,
+                detail={"code": self.codes["not_found"], "data": None},
+            )
+        return job
+
+    def _prune(self) -> None:
+        # 보관 시간이 지난 완료 작업 제거
+        now = time.time()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job["finishedAt"] is not None and now - job["finishedAt"] >= self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def shutdown(self) -> None:
+        """작업 워커 종료 (대기 중인 작업은 처리되지 않음)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.gather(*self._pending_saves, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["workers"] = self.workers
+        stats["queued"] = self._queue.qsize() if self._queue is not None else 0
+        stats["running"] = sum(
+            1 for job in self._jobs.values() if job["status"] == RUNNING
+        )
+        return stats
@@ -12,9 +12,11 @@
 """
 
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
+from core.projection import get_active_projection
+from core.rule_score_memo import rule_score_memo
 from sklearn.metrics.pairwise import cosine_similarity
 from utils import logger
 
@@ -24,6 +26,17 @@ EMBEDDING_DIM = 768  # SBERT 모델의 임베딩 차원
 EMBEDDING_WEIGHT = 0.7  # 임베딩 기반 유사도 가중치
 RULE_WEIGHT = 0.3  # 규칙 기반 유사도 가중치
 
+# 규칙 기반 유사도 세부 가중치 (기본 필드, MBTI, 연령대, 선호-성격)
+RULE_COMPONENT_WEIGHTS = {
+    "base": 0.3,
+    "mbti": 0.2,
+    "age": 0.2,
+    "preference": 0.3,
+}
+
+# 쌍별로 저장되는 점수 구성요소 (코사인 유사도 + 규칙 세부 점수)
+SCORE_COMPONENTS = ["cosine", "base", "mbti", "age", "preference"]
+
 # MBTI 관련 상수
 MBTI_WEIGHTS = [0.5, 1.0, 1.0, 0.5]  # E/I, N/S, F/T, J/P 각 차원별 가중치
 
@@ -37,6 +50,17 @@ EMBEDDING_FIELDS = [
     "hobbies",
 ]
 
+# 규칙 기반 점수 입력 필드 (rule_signature 구성 필드)
+RULE_FIELDS = [
+    "religion",
+    "smoking",
+    "drinking",
+    "MBTI",
+    "ageGroup",
+    "personality",
+    "preferredPeople",
+]
+
 # MBTI 유형 간 호환성 맵핑
 # 각 MBTI 유형에 대해 잘 맞는 상호보완적 유형 목록 정의
 MBTI_COMPATIBILITY = {
@@ -69,13 +93,16 @@ AGE_GROUPS = {
 }
 
 
-def average_field_embedding(field_embeddings: dict, fields: list) -> list:
+def average_field_embedding(
+    field_embeddings: dict, fields: list, dim: int = EMBEDDING_DIM
+) -> list:
     """
     개별 필드 임베딩들을 평균하여 하나의 통합 벡터로 만드는 함수
 
     Args:
         field_embeddings: 필드별 임베딩 벡터 딕셔너리
         fields: 평균 계산에 사용할 필드 이름 목록
+        dim: 벡터가 없을 때 반환할 영벡터 차원 (모델 교체 시 프로필 임베딩 차원)
 
     Returns:
         평균 임베딩 벡터 (리스트)
@@ -86,7 +113,7 @@ def average_field_embedding(field_embeddings: dict, fields: list) -> list:
 
     # 벡터가 없을 경우 기본 영벡터 반환
     if not vectors:
-        return [0.0] * EMBEDDING_DIM
+        return [0.0] * dim
 
     # 평균 계산 후 리스트로 변환하여 반환
     return np.mean(np.array(vectors), axis=0).tolist()
@@ -193,17 +220,16 @@ def match_tags(list1: List[str], list2: List[str]) -> float:
     return round(len(overlap) / len(union), 6)
 
 
-def rule_based_similarity(user1: dict, user2: dict) -> float:
+def rule_similarity_components(user1: dict, user2: dict) -> List[float]:
     """
-    사용자 프로필 데이터를 기반으로 규칙 기반 유사도 점수 계산
-    여러 속성(종교, 흡연, 음주, MBTI, 연령대, 성격 등)의 일치도를 종합
+    규칙 기반 유사도의 세부 점수 계산
 
     Args:
         user1: 첫 번째 사용자 프로필 데이터
         user2: 두 번째 사용자 프로필 데이터
 
     Returns:
-        0.0~1.0 사이의 규칙 기반 유사도 점수
+        [기본 필드, MBTI, 연령대, 선호-성격] 점수 목록 (RULE_COMPONENT_WEIGHTS 순서)
     """
     # 기본 필드 일치도 (종교, 흡연, 음주 등) - 단순 일치 여부 확인
     base_fields = ["religion", "smoking", "drinking"]
@@ -227,22 +253,102 @@ def rule_based_similarity(user1: dict, user2: dict) -> float:
         user2.get("preferredPeople", []), user1.get("personality", [])
     )
 
+    return [base_score, mbti_score, age_score, (pref_score + rev_pref_score) / 2]
+
+
+def rule_signature(user: dict) -> tuple:
+    """
+    규칙 기반 점수를 결정하는 범주형 시그니처 생성
+    시그니처가 같은 두 사용자는 누구와 비교해도 같은 규칙 점수를 가짐
+
+    Args:
+        user: 사용자 프로필 데이터
+
+    Returns:
+        (종교, 흡연, 음주, MBTI, 연령대, 성격 태그 집합, 선호 태그 집합)
+    """
+
+    # match_tags는 set(값)으로 비교하므로 집합으로 정규화 (빈 값은 빈 집합)
+    def tag_key(field: str) -> frozenset:
+        value = user.get(field, [])
+        return frozenset(value) if value else frozenset()
+
+    return (
+        user.get("religion"),
+        user.get("smoking"),
+        user.get("drinking"),
+        user.get("MBTI"),
+        user.get("ageGroup"),
+        tag_key("personality"),
+        tag_key("preferredPeople"),
+    )
+
+
+def rule_based_similarity(user1: dict, user2: dict) -> float:
+    """
+    사용자 프로필 데이터를 기반으로 규칙 기반 유사도 점수 계산
+    여러 속성(종교, 흡연, 음주, MBTI, 연령대, 성격 등)의 일치도를 종합
+
+    Args:
+        user1: 첫 번째 사용자 프로필 데이터
+        user2: 두 번째 사용자 프로필 데이터
+
+    Returns:
+        0.0~1.0 사이의 규칙 기반 유사도 점수
+    """
+    base_score, mbti_score, age_score, pref_score = rule_similarity_components(
+        user1, user2
+    )
+
     # 가중치를 적용한 최종 점수 계산
     # - 기본 필드(종교,흡연,음주): 30%
     # - MBTI 호환성: 20%
     # - 연령대 일치도: 20%
     # - 선호-성격 매칭(양방향 평균): 30%
     final_score = (
-        base_score * 0.3
-        + mbti_score * 0.2
-        + age_score * 0.2
-        + (pref_score + rev_pref_score) / 2 * 0.3
+        base_score * RULE_COMPONENT_WEIGHTS["base"]
+        + mbti_score * RULE_COMPONENT_WEIGHTS["mbti"]
+        + age_score * RULE_COMPONENT_WEIGHTS["age"]
+        + pref_score * RULE_COMPONENT_WEIGHTS["preference"]
     )
 
     # 소수점 6자리로 반올림하여 반환
     return round(final_score, 6)
 
 
+def blend_scores(
+    components: np.ndarray,
+    embedding_weight: float = EMBEDDING_WEIGHT,
+    rule_weight: float = RULE_WEIGHT,
+    rule_component_weights: Optional[Dict[str, float]] = None,
+) -> np.ndarray:
+    """
+    저장된 점수 구성요소에 가중치를 적용하여 최종 점수 계산 (벡터화)
+    가중치 변경 시 임베딩/규칙 재계산 없이 점수를 다시 만들 때 사용
+
+    Args:
+        components: (N, len(SCORE_COMPONENTS)) 구성요소 행렬
+        embedding_weight: 코사인 유사도 가중치
+        rule_weight: 규칙 기반 유사도 가중치
+        rule_component_weights: 규칙 세부 가중치 (기본값: RULE_COMPONENT_WEIGHTS)
+
+    Returns:
+        (N,) 최종 점수 배열 (소수점 6자리 반올림)
+    """
+    rule_component_weights = rule_component_weights or RULE_COMPONENT_WEIGHTS
+    components = np.asarray(components, dtype=np.float64).reshape(
+        -1, len(SCORE_COMPONENTS)
+    )
+
+    # rule_based_similarity와 같은 순서로 누적 (부동소수점 결과 일치)
+    rule_sims = np.zeros(len(components))
+    for col, name in enumerate(SCORE_COMPONENTS[1:], start=1):
+        rule_sims = rule_sims + components[:, col] * rule_component_weights[name]
+    rule_sims = np.round(rule_sims, 6)
+
+    return np.round(embedding_weight * components[:, 0] + rule_weight * rule_sims, 6)
+
+
 @logger.log_performance(operation_name="compute_matching_score", include_memory=True)
 def compute_matching_score(
     user_id: str, user_embedding: List[float], user_meta: dict, all_users: dict
@@ -350,7 +456,9 @@ def combine_embeddings(
 
     # 필드 임베딩 추출 및 평균 계산
     avg_field_embed = np.array(
-        average_field_embedding(field_embeddings, EMBEDDING_FIELDS)
+        average_field_embedding(
+            field_embeddings, EMBEDDING_FIELDS, dim=len(profile_embed)
+        )
     )
 
     # 정규화된 벡터의 가중 평균
@@ -361,29 +469,72 @@ def combine_embeddings(
     return 0.6 * norm_profile + 0.4 * norm_fields
 
 
+def matching_vector(embedding: List[float], meta: dict) -> np.ndarray:
+    """
+    코사인 유사도 계산에 사용하는 사용자 매칭 벡터
+    (결합 임베딩, 투영이 설정되어 있으면 축소된 차원)
+
+    Args:
+        embedding: 프로필 임베딩 벡터
+        meta: 사용자 메타데이터 (field_embeddings 포함)
+
+    Returns:
+        float32 매칭 벡터
+    """
+    fields = json.loads(meta.get("field_embeddings", "{}"))
+    vector = combine_embeddings(embedding, fields)
+
+    projection = get_active_projection()
+    if projection is not None:
+        return projection.transform(vector)
+    return vector.astype(np.float32)
+
+
+def fill_rule_components(
+    components: np.ndarray,
+    user_meta: dict,
+    signature_groups: Dict[tuple, Tuple[List[int], dict]],
+) -> None:
+    """
+    시그니처 묶음별로 규칙 세부 점수를 한 번씩 계산하여 components[:, 1:]에 채움
+
+    Args:
+        components: (N, len(SCORE_COMPONENTS)) 구성요소 행렬
+        user_meta: 기준 사용자 메타데이터
+        signature_groups: 상대 시그니처 → (행 번호 목록, 대표 메타데이터)
+    """
+    query_signature = rule_signature(user_meta)
+    for signature, (members, representative) in signature_groups.items():
+        components[members, 1:] = rule_score_memo.get_or_compute(
+            query_signature,
+            signature,
+            lambda: rule_similarity_components(user_meta, representative),
+            members=len(members),
+        )
+
+
 @logger.log_performance(
-    operation_name="compute_matching_score_optimized", include_memory=True
+    operation_name="compute_matching_components", include_memory=True
 )
-def compute_matching_score_optimized(
+def compute_matching_components(
     user_id: str,
     user_embedding: List[float],
     user_meta: dict,
     all_users: dict,
-    embedding_method: str = "weighted_average",
-) -> Dict[str, float]:
+) -> Tuple[List[str], np.ndarray]:
     """
-    최적화된 매칭 점수 계산 함수
-    벡터화 및 배치 처리를 통해 성능 개선
+    같은 도메인 사용자들과의 점수 구성요소 계산
+    (코사인 유사도 + 규칙 세부 점수, SCORE_COMPONENTS 순서)
+    상주 인덱스를 쓰지 않는 전체 차원 기준 경로 (투영 설정과 무관하게 768차원 코사인)
 
     Args:
         user_id: 기준 사용자 ID
         user_embedding: 기준 사용자의 임베딩 벡터
         user_meta: 기준 사용자의 메타데이터
         all_users: 전체 사용자 데이터 (IDs, 임베딩, 메타데이터)
-        embedding_method: 임베딩 결합 방식
 
     Returns:
-        사용자 ID를 키로, 매칭 점수를 값으로 하는 딕셔너리
+        (상대 사용자 ID 목록, (N, len(SCORE_COMPONENTS)) 구성요소 행렬)
     """
     # 전체 사용자 데이터 추출
     all_ids = all_users["ids"]
@@ -400,7 +551,7 @@ def compute_matching_score_optimized(
 
     # 같은 도메인 사용자가 없으면 빈 결과 반환
     if not domain_indices:
-        return {}
+        return [], np.empty((0, len(SCORE_COMPONENTS)))
 
     # 2. 개선된 임베딩 결합 적용
     my_fields = json.loads(user_meta.get("field_embeddings", "{}"))
@@ -420,19 +571,101 @@ def compute_matching_score_optimized(
         other_metas_filtered.append(other_meta)
 
     # 4. 벡터화된 유사도 계산 (배치 처리)
+    # 투영은 상주 인덱스 경로에만 적용 (호출마다 전체 행렬을 다시 투영하면 오히려 느려짐)
     other_embeddings_matrix = np.vstack(other_embeddings)
+
     cosine_sims = cosine_similarity([combined_user_embedding], other_embeddings_matrix)[
         0
     ]
 
-    # 5. 규칙 기반 유사도 및 최종 점수 계산
-    similarities = {}
-    for idx, other_id in enumerate(other_ids):
-        # 각 사용자에 대한 규칙 기반 유사도 계산
-        rule_sim = rule_based_similarity(user_meta, other_metas_filtered[idx])
+    # 5. 규칙 기반 세부 점수 계산
+    # 시그니처가 같은 사용자끼리 묶어 (기준, 상대) 시그니처 쌍마다 한 번만 계산
+    components = np.empty((len(other_ids), len(SCORE_COMPONENTS)))
+    components[:, 0] = cosine_sims
 
-        # 임베딩 기반 유사도와 규칙 기반 유사도를 결합하여 최종 점수 계산
-        final_score = EMBEDDING_WEIGHT * cosine_sims[idx] + RULE_WEIGHT * rule_sim
-        similarities[other_id] = round(final_score, 6)
+    signature_groups: Dict[tuple, Tuple[List[int], dict]] = {}
+    for idx, other_meta in enumerate(other_metas_filtered):
+        signature = rule_signature(other_meta)
+        if signature not in signature_groups:
+            signature_groups[signature] = ([], other_meta)
+        signature_groups[signature][0].append(idx)
+    fill_rule_components(components, user_meta, signature_groups)
 
-    return similarities
+    return other_ids, components
+
+
+@logger.log_performance(
+    operation_name="compute_matching_components_indexed", include_memory=True
+)
+def compute_matching_components_indexed(
+    user_id: str,
+    user_embedding: List[float],
+    user_meta: dict,
+    index,
+) -> Tuple[List[str], np.ndarray]:
+    """
+    메모리에 상주하는 도메인 인덱스(core.domain_index.DomainIndex)로 점수 구성요소 계산
+    상대 벡터는 인덱스의 압축 코드와 직접 내적하고, 규칙 점수는 시그니처 열로 묶어 계산
+
+    Args:
+        user_id: 기준 사용자 ID
+        user_embedding: 기준 사용자의 임베딩 벡터
+        user_meta: 기준 사용자의 메타데이터
+        index: 기준 사용자 도메인의 DomainIndex
+
+    Returns:
+        (상대 사용자 ID 목록, (N, len(SCORE_COMPONENTS)) 구성요소 행렬)
+    """
+    query = matching_vector(user_embedding, user_meta)
+    other_ids, cosine_sims, signature_ids, signatures = index.score(query, user_id)
+
+    components = np.empty((len(other_ids), len(SCORE_COMPONENTS)))
+    if not other_ids:
+        return other_ids, components
+    components[:, 0] = cosine_sims
+
+    # 시그니처 번호별 행 묶음 (정렬 후 경계에서 분할)
+    unique_ids, inverse = np.unique(signature_ids, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.cumsum(np.bincount(inverse))[:-1]
+
+    signature_groups: Dict[tuple, Tuple[List[int], dict]] = {}
+    for signature_id, members in zip(unique_ids, np.split(order, bounds)):
+        signature, representative = signatures[signature_id]
+        signature_groups[signature] = (members, representative)
+    fill_rule_components(components, user_meta, signature_groups)
+
+    return other_ids, components
+
+
+@logger.log_performance(
+    operation_name="compute_matching_score_optimized", include_memory=True
+)
+def compute_matching_score_optimized(
+    user_id: str,
+    user_embedding: List[float],
+    user_meta: dict,
+    all_users: dict,
+    embedding_method: str = "weighted_average",
+) -> Dict[str, float]:
+    """
+    최적화된 매칭 점수 계산 함수
+    벡터화 및 배치 처리를 통해 성능 개선
+
+    Args:
+        user_id: 기준 사용자 ID
+        user_embedding: 기준 사용자의 임베딩 벡터
+        user_meta: 기준 사용자의 메타데이터
+        all_users: 전체 사용자 데이터 (IDs, 임베딩, 메타데이터)
+        embedding_method: 임베딩 결합 방식
+
+    Returns:
+        사용자 ID를 키로, 매칭 점수를 값으로 하는 딕셔너리
+    """
+    other_ids, components = compute_matching_components(
+        user_id, user_embedding, user_meta, all_users
+    )
+
+    # 임베딩 기반 유사도와 규칙 기반 유사도를 결합하여 최종 점수 계산
+    scores = blend_scores(components)
+    return dict(zip(other_ids, scores.tolist()))
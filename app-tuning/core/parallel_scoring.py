@@ -0,0 +1,137 @@
+"""
+대규모 도메인 병렬 점수 계산 모듈
+후보 행렬을 행 구간으로 나누어 프로세스 풀에서 코사인 유사도를 계산
+워커는 공유 메모리(core.vector_database.shared_vectors)의 인덱스 열에 이름으로 붙어
+결과를 공유 출력 버퍼에 직접 기록하므로 벡터/결과 피클링이 없음
+
+도메인 인원이 MATCHING_PARALLEL_MIN_USERS 미만이면 프로세스 간 조율 비용이 더 크므로
+기존처럼 요청 프로세스 안에서 계산
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Any, Dict, Optional
+
+import numpy as np
+from core.vector_database.shared_vectors import ArraySpec, score_partition
+from utils import logger
+
+# 점수 계산 워커 프로세스 수 (0이면 병렬 계산 미사용)
+MATCHING_PARALLEL_WORKERS = int(os.getenv("MATCHING_PARALLEL_WORKERS", "0"))
+# 병렬 계산을 적용할 최소 도메인 인원
+MATCHING_PARALLEL_MIN_USERS = int(os.getenv("MATCHING_PARALLEL_MIN_USERS", "50000"))
+# 워커 1개가 처리할 최소 행 수
+MATCHING_PARALLEL_MIN_ROWS = int(os.getenv("MATCHING_PARALLEL_MIN_ROWS", "10000"))
+
+
+class ParallelScorer:
+    """
+    공유 메모리 기반 병렬 코사인 계산기 (프로세스 풀은 처음 사용할 때 생성)
+    """
+
+    def __init__(
+        self,
+        workers: int = MATCHING_PARALLEL_WORKERS,
+        min_users: int = MATCHING_PARALLEL_MIN_USERS,
+        min_rows: int = MATCHING_PARALLEL_MIN_ROWS,
+    ):
+        self.workers = workers
+        self.min_users = min_users
+        self.min_rows = max(1, min_rows)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {"parallel_calls": 0, "inprocess_calls": 0, "partitions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def should_use(self, rows: int) -> bool:
+        """rows명 도메인에 병렬 계산을 적용할지 여부 (통계 집계 포함)"""
+        use = self.enabled and rows >= self.min_users
+        with self._lock:
+            self._stats["parallel_calls" if use else "inprocess_calls"] += 1
+        return use
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # uvicorn 스레드 상태를 복제하지 않도록 spawn 사용
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.logger.info(f"PARALLEL-SCORING: started {self.workers} workers")
+            return self._pool
+
+    def cosine(
+        self,
+        codec,
+        codes_spec: ArraySpec,
+        norms_spec: ArraySpec,
+        out_spec: ArraySpec,
+        out: np.ndarray,
+        query: np.ndarray,
+        rows: int,
+    ) -> np.ndarray:
+        """
+        [0, rows) 행의 코사인 유사도를 워커에 나누어 계산
+
+        Args:
+            codec: 인덱스 코덱 (PQ는 코드북 포함)
+            codes_spec / norms_spec / out_spec: 공유 배열 정보
+            out: 부모 프로세스의 출력 버퍼 배열 (out_spec과 같은 메모리)
+            query: float32 질의 벡터
+            rows: 계산할 행 수
+
+        Returns:
+            (rows,) 코사인 유사도 (출력 버퍼 복사본)
+        """
+        partitions = max(1, min(self.workers, math.ceil(rows / self.min_rows)))
+        bounds = np.linspace(0, rows, partitions + 1).astype(int)
+
+        pool = self._get_pool()
+        futures = [
+            pool.submit(
+                score_partition,
+                codec,
+                codes_spec,
+                norms_spec,
+                out_spec,
+                query,
+                int(start),
+                int(stop),
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start
+        ]
+        done, _ = wait(futures)
+        for future in done:
+            future.result()  # 워커 예외 전파
+
+        with self._lock:
+            self._stats["partitions"] += len(futures)
+        return np.array(out[:rows], dtype=np.float64)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pool_started"] = self._pool is not None
+        stats["workers"] = self.workers
+        stats["min_users"] = self.min_users
+        return stats
+
+
+# 모듈 레벨 싱글톤 인스턴스
+parallel_scorer = ParallelScorer()
+
+logger.register_summary_provider("parallel_scoring", parallel_scorer.get_stats)
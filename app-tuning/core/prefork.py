@@ -0,0 +1,295 @@
+"""
+pre-fork 다중 워커 실행 모듈
+uvicorn --workers는 워커를 spawn으로 새로 시작하므로 워커마다 SBERT 모델과 torch 런타임을
+따로 로드함. 이 모듈은 마스터 프로세스에서 모델 / 매칭 테이블 / 상주 도메인 인덱스를 먼저
+로드하고 gc.freeze()로 GC 대상에서 제외한 뒤 fork하여, 워커들이 읽기 전용 페이지를
+copy-on-write로 공유하게 함
+
+- 리스닝 소켓은 마스터가 열고 모든 워커가 같은 소켓에서 accept
+- 워커 RSS 증가량(fork 직후 대비)과 공유/전용 메모리는 워커별 성능 요약(worker_memory)과
+  마스터 로그(PREFORK_MEMORY_LOG_INTERVAL초마다)로 보고
+- 워커 간 상주 인덱스 / 추천 캐시 정합성은 worker_generations 카운터로 유지
+- 유사도 쓰기 지연 큐 반영과 자동 임베딩 마이그레이션은 0번 워커만 실행 (is_primary_worker)
+
+실행: python scripts/serve_prefork.py (워커 수는 UVICORN_WORKERS / WEB_CONCURRENCY)
+"""
+
+import gc
+import os
+import signal
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from utils import logger
+
+# ---------------------- 상수 정의 ----------------------
+# 워커 수
+PREFORK_WORKERS = int(
+    os.getenv("UVICORN_WORKERS") or os.getenv("WEB_CONCURRENCY") or "1"
+)
+# fork 전에 인덱스를 로드할 도메인 (쉼표 구분, "*"이면 등록된 모든 도메인)
+PREFORK_PRELOAD_DOMAINS = os.getenv("PREFORK_PRELOAD_DOMAINS", "*")
+# 마스터가 워커 메모리를 로그로 남기는 주기 (초, 0이면 미사용)
+PREFORK_MEMORY_LOG_INTERVAL = float(os.getenv("PREFORK_MEMORY_LOG_INTERVAL", "300"))
+
+# fork된 워커 번호 (마스터 / 단일 프로세스 실행에서는 설정되지 않음)
+WORKER_INDEX_ENV = "TUNING_WORKER_INDEX"
+
+_SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared",
+    "Shared_Dirty": "shared",
+    "Private_Clean": "private",
+    "Private_Dirty": "private",
+}
+
+
+def is_primary_worker() -> bool:
+    """단일 프로세스 실행이거나 pre-fork의 0번 워커인지 여부"""
+    return os.getenv(WORKER_INDEX_ENV, "0") == "0"
+
+
+def read_process_memory(pid: Union[int, str] = "self") -> Dict[str, float]:
+    """
+    /proc/<pid>/smaps_rollup 기준 메모리 사용량 (MB)
+
+    Returns:
+        rss / pss / shared / private (smaps_rollup이 없으면 rss만)
+    """
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                name = _SMAPS_FIELDS.get(key)
+                if name is not None:
+                    memory[name] = memory.get(name, 0) + int(rest.split()[0])
+    except (OSError, ValueError):
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        memory["rss"] = int(line.split()[1])
+        except OSError:
+            return {}
+    return {name: round(kb / 1024, 2) for name, kb in memory.items()}
+
+
+class WorkerMemory:
+    """
+    fork 직후 메모리를 기준으로 워커의 RSS 증가량 추적
+    """
+
+    def __init__(self):
+        self.worker_index: Optional[int] = None
+        self.baseline: Dict[str, float] = {}
+
+    def mark_fork(self, worker_index: int) -> None:
+        self.worker_index = worker_index
+        self.baseline = read_process_memory()
+
+    def get_stats(self) -> Dict[str, Any]:
+        current = read_process_memory()
+        stats = {"worker": self.worker_index, "pid": os.getpid(), **current}
+        if "rss" in self.baseline and "rss" in current:
+            stats["rss_at_fork"] = self.baseline["rss"]
+            stats["rss_growth"] = round(current["rss"] - self.baseline["rss"], 2)
+        return stats
+
+
+# 모듈 레벨 싱글톤 인스턴스
+worker_memory = WorkerMemory()
+
+
+# ---------------------- fork 전 공유 상태 로드 ----------------------
+def _preload_domains(spec: str) -> List[str]:
+    from core.domain_partition import domain_partition
+    from core.vector_database import get_user_collection
+
+    if spec.strip() != "*":
+        domains = {d.strip() for d in spec.split(",") if d.strip()}
+    else:
+        metas = get_user_collection().get(include=["metadatas"])["metadatas"]
+        domains = {m.get("emailDomain") for m in metas if m.get("emailDomain")}
+    # 다중 노드 파티션에서는 이 노드가 소유한 도메인만
+    return sorted(domain for domain in domains if domain_partition.owns(domain))
+
+
+def preload_shared_state(domains: str = PREFORK_PRELOAD_DOMAINS) -> Dict[str, Any]:
+    """
+    fork 전에 마스터에서 공유할 상태를 로드하고 gc.freeze()
+
+    Returns:
+        로드 항목별 소요 시간과 메모리
+    """
+    from core.domain_index import domain_indexes
+    from core.inference_server import INFERENCE_SERVER_ADDRESS
+    from core.parallel_scoring import parallel_scorer
+    from core.projection import get_active_projection
+    from core.vector_database import reset_connections
+    from core.worker_generations import share_across_workers
+    from models.sbert_loader import preload_model
+
+    report: Dict[str, Any] = {}
+
+    # 원격 추론 모드에서는 공유할 모델이 없음 (클라이언트 연결은 워커마다 생성)
+    if not INFERENCE_SERVER_ADDRESS:
+        started = time.perf_counter()
+        preload_model()
+        report["model_seconds"] = round(time.perf_counter() - started, 3)
+
+    get_active_projection()
+
+    # 병렬 점수 계산을 쓰면 인덱스 열이 이름 있는 공유 메모리라 fork 후에도 실제로 공유되어
+    # 워커별 증분 갱신이 서로를 덮어쓰므로, 이 경우 인덱스는 워커마다 따로 로드
+    if domains and not parallel_scorer.enabled:
+        started = time.perf_counter()
+        try:
+            loaded = _preload_domains(domains)
+            for domain in loaded:
+                domain_indexes.get(domain)
+            report["domains"] = len(loaded)
+        except Exception as e:
+            # Chroma 장애 시에도 서버는 시작하고 인덱스는 워커가 처음 요청할 때 로드
+            logger.logger.warning(f"PREFORK: domain index preload failed [error={e}]")
+        report["index_seconds"] = round(time.perf_counter() - started, 3)
+    elif domains:
+        logger.logger.warning(
+            "PREFORK: MATCHING_PARALLEL_WORKERS is set, domain indexes load per worker"
+        )
+
+    # 워커가 마스터의 HTTP 연결을 공유하지 않도록 초기화
+    reset_connections()
+    share_across_workers()
+
+    gc.collect()
+    gc.freeze()
+    report["frozen_objects"] = gc.get_freeze_count()
+    report["memory"] = read_process_memory()
+    return report
+
+
+# ---------------------- 마스터 / 워커 ----------------------
+class PreforkServer:
+    """
+    공유 상태를 로드한 마스터에서 uvicorn 워커를 fork하고 감시
+
+    Args:
+        app: uvicorn 앱 경로 (예: "main:app")
+        host / port: 리스닝 주소
+        workers: 워커 수
+    """
+
+    def __init__(
+        self,
+        app: str = "main:app",
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = PREFORK_WORKERS,
+    ):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self._children: Dict[int, int] = {}  # pid → 워커 번호
+        self._baselines: Dict[int, float] = {}  # pid → fork 직후 RSS
+        self._stopping = False
+
+    def _spawn(self, config, sock, worker_index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker(config, sock, worker_index)
+            except BaseException as e:
+                logger.logger.exception(f"PREFORK: worker {worker_index} failed: {e}")
+                code = 1
+            finally:
+                # os._exit는 atexit를 건너뛰므로 큐에 남은 로그를 직접 출력
+                logger.stop_logging()
+                os._exit(code)
+        self._children[pid] = worker_index
+        self._baselines[pid] = read_process_memory(pid).get("rss", 0.0)
+
+    def _run_worker(self, config, sock, worker_index: int) -> None:
+        import uvicorn
+        from models.sbert_loader import get_model, is_model_ready
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        os.environ[WORKER_INDEX_ENV] = str(worker_index)
+
+        worker_memory.mark_fork(worker_index)
+        logger.register_summary_provider("worker_memory", worker_memory.get_stats)
+
+        # torch 스레드를 워커 수로 나누고 워커별로 예열
+        if is_model_ready():
+            import torch
+
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // 2 // self.workers))
+            get_model().encode("모델 예열용 텍스트")
+
+        uvicorn.Server(config).run(sockets=[sock])
+
+    def _log_memory(self) -> None:
+        for pid, worker_index in sorted(self._children.items(), key=lambda x: x[1]):
+            memory = read_process_memory(pid)
+            if not memory:
+                continue
+            growth = round(memory.get("rss", 0.0) - self._baselines.get(pid, 0.0), 2)
+            logger.logger.info(
+                f"PREFORK-MEMORY: worker={worker_index} pid={pid} {memory} rss_growth={growth}"
+            )
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        import uvicorn
+
+        config = uvicorn.Config(self.app, host=self.host, port=self.port)
+        config.load()  # 앱 모듈 import도 fork 전에 완료
+        sock = config.bind_socket()
+
+        report = preload_shared_state()
+        logger.logger.info(f"PREFORK: preloaded {report}")
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        for worker_index in range(self.workers):
+            self._spawn(config, sock, worker_index)
+        logger.logger.info(
+            f"PREFORK: started {self.workers} workers {sorted(self._children)}"
+        )
+
+        next_log = time.monotonic() + PREFORK_MEMORY_LOG_INTERVAL
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if PREFORK_MEMORY_LOG_INTERVAL > 0 and time.monotonic() >= next_log:
+                    self._log_memory()
+                    next_log = time.monotonic() + PREFORK_MEMORY_LOG_INTERVAL
+                time.sleep(0.5)
+                continue
+
+            worker_index = self._children.pop(pid, None)
+            self._baselines.pop(pid, None)
+            if worker_index is None or self._stopping:
+                continue
+            # 비정상 종료한 워커는 같은 번호로 다시 fork (공유 상태는 마스터에 그대로 있음)
+            logger.logger.warning(
+                f"PREFORK: worker {worker_index} (pid={pid}) exited [status={status}], restarting"
+            )
+            self._spawn(config, sock, worker_index)
+
+        sock.close()
+        logger.logger.info("PREFORK: all workers stopped")
@@ -0,0 +1,93 @@
+"""
+사용자 프로필 부분 수정 모듈
+수정 요청을 저장된 메타데이터와 비교하여 실제로 바뀐 필드만 찾고,
+어떤 임베딩을 다시 만들어야 하는지 / 매칭 스코어를 다시 계산해야 하는지 결정
+
+- 프로필 텍스트 필드(PROFILE_TEXT_FIELDS)가 바뀌면 통합 텍스트 임베딩 재생성
+- field_embeddings에 저장된 필드가 바뀌면 해당 필드 임베딩만 재생성
+- 규칙 점수 입력(RULE_FIELDS)만 바뀌면 추론 없이 매칭 스코어만 재계산
+- 저장된 임베딩이 이전 모델 버전이면 재임베딩 시 모든 필드를 현재 모델로 다시 생성
+"""
+
+import json
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+from core.embedding_version import is_current_version
+from core.enum_process import convert_to_korean
+from core.matching_score_optimized import RULE_FIELDS
+
+# 통합 텍스트 임베딩(및 필드별 임베딩)에 사용하는 필드 목록
+PROFILE_TEXT_FIELDS = [
+    "emailDomain",
+    "gender",
+    "religion",
+    "smoking",
+    "drinking",
+    "currentInterests",
+    "favoriteFoods",
+    "likedSports",
+    "pets",
+    "selfDevelopment",
+    "hobbies",
+]
+
+
+# 메타데이터 저장 시 문자열로 반환하기 위함
+def safe_join(value):
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    return ", ".join(str(v) for v in value) if isinstance(value, list) else str(value)
+
+
+class ProfileUpdatePlan(NamedTuple):
+    """수정 요청 반영 계획"""
+
+    metadata: dict  # 수정 값이 반영된 메타데이터 (field_embeddings는 기존 값)
+    changed_fields: List[str]
+    reembed_fields: List[str]  # 다시 임베딩할 필드
+    reembed_profile: bool  # 통합 텍스트 임베딩 재생성 여부
+    rules_changed: bool
+
+    @property
+    def update_similarity(self) -> bool:
+        return self.reembed_profile or bool(self.reembed_fields) or self.rules_changed
+
+
+def plan_profile_update(
+    stored_meta: dict, changes: Dict[str, object]
+) -> ProfileUpdatePlan:
+    """
+    수정 요청과 저장된 메타데이터를 비교하여 반영 계획 생성
+
+    Args:
+        stored_meta: user_profiles에 저장된 메타데이터 (한글화 + 문자열 형식)
+        changes: 요청에 포함된 필드 값 (Enum 원문)
+
+    Returns:
+        ProfileUpdatePlan
+    """
+    converted = convert_to_korean(changes)
+    metadata = dict(stored_meta)
+    changed_fields = []
+    for field, value in converted.items():
+        value = safe_join(value)
+        if stored_meta.get(field) != value:
+            metadata[field] = value
+            changed_fields.append(field)
+
+    stored_fields = json.loads(stored_meta.get("field_embeddings", "{}"))
+    reembed_fields = [field for field in changed_fields if field in stored_fields]
+    reembed_profile = any(field in PROFILE_TEXT_FIELDS for field in changed_fields)
+
+    # 이전 버전 벡터와 섞이지 않도록 전체 재생성
+    if (reembed_fields or reembed_profile) and not is_current_version(stored_meta):
+        reembed_fields, reembed_profile = list(stored_fields), True
+
+    return ProfileUpdatePlan(
+        metadata=metadata,
+        changed_fields=changed_fields,
+        reembed_fields=reembed_fields,
+        reembed_profile=reembed_profile,
+        rules_changed=any(field in RULE_FIELDS for field in changed_fields),
+    )
@@ -0,0 +1,250 @@
+"""
+매칭 벡터 차원 축소(PCA 투영) 모듈
+combine_embeddings로 만든 768차원 결합 벡터를 128~256차원으로 투영하여
+매칭 경로의 행렬 메모리와 코사인 계산 비용을 줄임
+
+- 투영 행렬은 현재 사용자 벡터로 학습하고 버전 이름과 함께 .npz 파일로 저장
+- 코사인(내적) 보존을 위해 평균을 빼지 않는 PCA(절단 SVD)로 학습
+- MATCHING_PROJECTION_VERSION 환경변수로 사용할 버전 지정 ("latest" 가능, 비우면 미사용)
+- 투영은 상주 인덱스(core.domain_index)에 벡터를 넣을 때 한 번만 적용되며,
+  인덱스를 쓰지 않는 compute_matching_components는 전체 차원 그대로 계산
+"""
+
+import glob
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy.stats import kendalltau, spearmanr
+from sklearn.decomposition import TruncatedSVD
+from utils import logger
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# 투영 행렬 저장 경로
+PROJECTION_DIR = os.getenv(
+    "MATCHING_PROJECTION_DIR", os.path.join(BASE_DIR, "model-cache", "projections")
+)
+# 매칭에 사용할 투영 버전 (빈 문자열이면 전체 차원 사용)
+PROJECTION_VERSION = os.getenv("MATCHING_PROJECTION_VERSION", "")
+
+
+class Projection:
+    """
+    버전이 부여된 선형 투영 (입력 차원 → n_components)
+    """
+
+    def __init__(
+        self,
+        version: str,
+        components: np.ndarray,
+        explained_variance_ratio: np.ndarray,
+        n_samples: int,
+    ):
+        self.version = version
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.explained_variance_ratio = np.asarray(explained_variance_ratio)
+        self.n_samples = n_samples
+
+    @property
+    def input_dim(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def output_dim(self) -> int:
+        return self.components.shape[0]
+
+    def transform(self, vectors) -> np.ndarray:
+        """(N, input_dim) 또는 (input_dim,) 벡터를 투영"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors @ self.components.T
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "version": self.version,
+            "input_dim": self.input_dim,
+            "output_dim": self.output_dim,
+            "n_samples": self.n_samples,
+            "explained_variance": round(float(self.explained_variance_ratio.sum()), 4),
+        }
+
+
+def fit_projection(vectors, n_components: int = 128, version: str = None) -> Projection:
+    """
+    결합 벡터 행렬로 투영 학습
+
+    Args:
+        vectors: (N, D) 결합 벡터 행렬
+        n_components: 투영 차원 (128~256 권장)
+        version: 버전 이름 (기본값: pca-{차원}-{시각})
+
+    Returns:
+        학습된 Projection
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.shape[0] <= n_components:
+        raise ValueError(
+            f"학습 샘플 수({vectors.shape[0]})가 투영 차원({n_components})보다 많아야 합니다."
+        )
+
+    svd = TruncatedSVD(
+        n_components=n_components, algorithm="randomized", random_state=0
+    )
+    svd.fit(vectors)
+
+    version = (
+        version or f"pca-{n_components}-{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+    )
+    return Projection(
+        version, svd.components_, svd.explained_variance_ratio_, len(vectors)
+    )
+
+
+def save_projection(projection: Projection, directory: str = PROJECTION_DIR) -> str:
+    """투영을 {directory}/{version}.npz로 저장하고 경로 반환"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{projection.version}.npz")
+    np.savez(
+        path,
+        version=projection.version,
+        components=projection.components,
+        explained_variance_ratio=projection.explained_variance_ratio,
+        n_samples=projection.n_samples,
+    )
+    return path
+
+
+def load_projection(version: str, directory: str = PROJECTION_DIR) -> Projection:
+    """
+    저장된 투영 로드
+
+    Args:
+        version: 버전 이름 또는 "latest" (가장 최근 파일)
+    """
+    if version == "latest":
+        paths = sorted(
+            glob.glob(os.path.join(directory, "*.npz")), key=os.path.getmtime
+        )
+        if not paths:
+            raise FileNotFoundError(f"저장된 투영이 없습니다: {directory}")
+        path = paths[-1]
+    else:
+        path = os.path.join(directory, f"{version}.npz")
+
+    with np.load(path) as data:
+        return Projection(
+            str(data["version"]),
+            data["components"],
+            data["explained_variance_ratio"],
+            int(data["n_samples"]),
+        )
+
+
+_active_projection = None
+_active_loaded = False
+_active_lock = threading.Lock()
+
+
+def get_active_projection() -> Optional[Projection]:
+    """MATCHING_PROJECTION_VERSION에 해당하는 투영 (미설정 또는 로드 실패 시 None)"""
+    global _active_projection, _active_loaded
+
+    if _active_loaded:
+        return _active_projection
+
+    with _active_lock:
+        if not _active_loaded:
+            if PROJECTION_VERSION:
+                try:
+                    _active_projection = load_projection(PROJECTION_VERSION)
+                    logger.logger.info(
+                        f"PROJECTION: loaded {_active_projection.describe()}"
+                    )
+                except Exception as e:
+                    logger.logger.error(
+                        f"PROJECTION: failed to load '{PROJECTION_VERSION}', using full dimension [error={e}]"
+                    )
+            _active_loaded = True
+    return _active_projection
+
+
+def _cosine_scores(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    norms[norms == 0] = 1.0
+    return (matrix @ query) / norms
+
+
+def evaluate_projection(
+    vectors,
+    projection: Projection,
+    groups: Iterable[List[int]],
+    top_k: int = 100,
+    max_queries_per_group: int = 50,
+) -> Dict[str, object]:
+    """
+    전체 차원 대비 투영 차원의 상위 K개 목록 일치도 평가
+
+    Args:
+        vectors: (N, D) 결합 벡터 행렬
+        projection: 평가할 투영
+        groups: 비교 대상 집합(도메인)별 행 인덱스 목록
+        top_k: 비교할 상위 목록 길이
+        max_queries_per_group: 그룹당 평가할 기준 사용자 수
+
+    Returns:
+        recall@K, 상위 K개 순위 상관(Spearman/Kendall), 메모리/계산 시간 비교
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    projected = projection.transform(vectors)
+
+    recalls, spearmans, kendalls = [], [], []
+    full_time, projected_time = 0.0, 0.0
+
+    for members in groups:
+        members = np.asarray(members)
+        if len(members) < 3:
+            continue
+        for query in members[:max_queries_per_group]:
+            candidates = members[members != query]
+            k = min(top_k, len(candidates))
+
+            start = time.perf_counter()
+            full_scores = _cosine_scores(vectors[query], vectors[candidates])
+            full_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            proj_scores = _cosine_scores(projected[query], projected[candidates])
+            projected_time += time.perf_counter() - start
+
+            full_top = np.argsort(-full_scores, kind="stable")[:k]
+            proj_top = np.argsort(-proj_scores, kind="stable")[:k]
+            recalls.append(len(np.intersect1d(full_top, proj_top)) / k)
+
+            # 전체 차원 상위 K개에 대해 두 점수의 순위 상관
+            if k >= 2:
+                spearmans.append(
+                    spearmanr(full_scores[full_top], proj_scores[full_top])[0]
+                )
+                kendalls.append(
+                    kendalltau(full_scores[full_top], proj_scores[full_top])[0]
+                )
+
+    def mean(values):
+        values = [v for v in values if not np.isnan(v)]
+        return round(float(np.mean(values)), 4) if values else None
+
+    return {
+        "projection": projection.describe(),
+        "queries": len(recalls),
+        "top_k": top_k,
+        "recall_at_k": mean(recalls),
+        "spearman_top_k": mean(spearmans),
+        "kendall_top_k": mean(kendalls),
+        "matrix_bytes_full": int(vectors.nbytes),
+        "matrix_bytes_projected": int(projected.nbytes),
+        "scoring_seconds_full": round(full_time, 4),
+        "scoring_seconds_projected": round(projected_time, 4),
+    }
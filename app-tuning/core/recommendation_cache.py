@@ -0,0 +1,285 @@
+"""
+추천 결과 캐시 모듈
+get_matching_users 결과(추천 userId 리스트)를 userId 단위로 프로세스 내에 보관
+
+주요 기능:
+1. 엔트리 수 / 추정 메모리 기준 LRU 제한
+2. 도메인(emailDomain) 단위 이벤트 기반 무효화 (등록/삭제 경로에서 호출)
+3. stale-while-revalidate: 무효화된 엔트리는 갱신이 끝날 때까지 잠시 대기 후 기존 값 반환
+4. single-flight: 동일 사용자에 대한 동시 요청은 한 번만 계산
+5. pre-fork 다중 워커 모드에서는 다른 워커의 도메인 무효화도 반영 (worker_generations)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.worker_generations import recommendation_generations
+from utils import logger
+
+# ---------------------- 상수 정의 ----------------------
+RECOMMENDATION_CACHE_ENABLED = (
+    os.getenv("RECOMMENDATION_CACHE_ENABLED", "true").lower() == "true"
+)
+# 최대 엔트리 수
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(
+    os.getenv("RECOMMENDATION_CACHE_MAX_ENTRIES", "10000")
+)
+# 최대 추정 메모리 (바이트)
+RECOMMENDATION_CACHE_MAX_BYTES = int(
+    os.getenv("RECOMMENDATION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+# 무효화 이벤트 누락에 대비한 안전망 TTL (초)
+RECOMMENDATION_CACHE_TTL = float(os.getenv("RECOMMENDATION_CACHE_TTL", "600"))
+# stale 엔트리를 반환하기 전 갱신 완료를 기다리는 시간 (초)
+RECOMMENDATION_CACHE_STALE_WAIT = float(
+    os.getenv("RECOMMENDATION_CACHE_STALE_WAIT", "0.5")
+)
+
+# 엔트리 1개당 고정 오버헤드 추정치 (키, 엔트리 객체, 인덱스 등)
+_ENTRY_OVERHEAD_BYTES = 256
+# 리스트에 담긴 int 객체 1개의 추정 크기
+_INT_OBJECT_BYTES = 28
+
+Loader = Callable[[], Awaitable[Tuple[List[int], Optional[str]]]]
+
+
+class _CacheEntry:
+    __slots__ = ("value", "domain", "nbytes", "created_at", "stale", "generation")
+
+    def __init__(self, value: List[int], domain: Optional[str], stale: bool):
+        self.value = value
+        self.domain = domain
+        self.nbytes = _estimate_bytes(value)
+        self.created_at = time.monotonic()
+        self.stale = stale
+        self.generation = recommendation_generations.current(domain)
+
+
+def _estimate_bytes(value: List[int]) -> int:
+    """추천 리스트의 메모리 사용량 추정"""
+    return _ENTRY_OVERHEAD_BYTES + sys.getsizeof(value) + _INT_OBJECT_BYTES * len(value)
+
+
+def _consume_task_exception(task: asyncio.Task) -> None:
+    """아무도 기다리지 않는 백그라운드 갱신 태스크의 예외 경고 방지"""
+    if not task.cancelled():
+        task.exception()
+
+
+class RecommendationCache:
+    """
+    userId → 추천 결과 캐시
+    데이터 구조 변경은 스레드 락으로 보호하고, 계산(single-flight)은 asyncio 태스크로 공유
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RECOMMENDATION_CACHE_MAX_ENTRIES,
+        max_bytes: int = RECOMMENDATION_CACHE_MAX_BYTES,
+        ttl: float = RECOMMENDATION_CACHE_TTL,
+        stale_wait: float = RECOMMENDATION_CACHE_STALE_WAIT,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_wait = stale_wait
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._domain_members: Dict[Optional[str], set] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # 무효화 순번: 계산 도중 무효화된 결과를 fresh로 저장하지 않기 위해 사용
+        self._sequence = 0
+        self._domain_sequence: Dict[Optional[str], int] = {}
+        self._user_sequence: Dict[str, int] = {}
+
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    # ---------------------- 조회 ----------------------
+    async def get_or_load(self, user_id: str, loader: Loader) -> List[int]:
+        """
+        캐시된 추천 결과를 반환하고, 없거나 오래된 경우 loader로 계산
+
+        Args:
+            user_id: 추천을 요청한 사용자 ID
+            loader: (추천 ID 리스트, 사용자 도메인)을 반환하는 코루틴 함수
+
+        Returns:
+            추천 사용자 ID 리스트
+        """
+        user_id = str(user_id)
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                if not self._is_stale(entry):
+                    self._stats["hits"] += 1
+                    return list(entry.value)
+
+        if entry is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            # 미스: 계산 결과(또는 예외)를 그대로 전달
+            return list(await asyncio.shield(self._start_load(user_id, loader)))
+
+        # stale: 갱신을 시작하고 잠시 기다린 뒤, 늦어지면 기존 값 반환
+        task = self._start_load(user_id, loader)
+        try:
+            value = await asyncio.wait_for(asyncio.shield(task), self.stale_wait)
+            with self._lock:
+                self._stats["refreshes"] += 1
+            return list(value)
+        except asyncio.TimeoutError:
+            pass
+        except Exception as e:
+            logger.logger.warning(
+                f"CACHE: recommendation refresh failed, serving stale [userId={user_id}, error={e}]"
+            )
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+
+        with self._lock:
+            self._stats["stale_hits"] += 1
+        return list(entry.value)
+
+    def _is_stale(self, entry: _CacheEntry) -> bool:
+        return (
+            entry.stale
+            or (time.monotonic() - entry.created_at) > self.ttl
+            or recommendation_generations.current(entry.domain) != entry.generation
+        )
+
+    def _start_load(self, user_id: str, loader: Loader) -> asyncio.Task:
+        """동일 사용자에 대한 계산이 진행 중이면 해당 태스크를 공유"""
+        task = self._inflight.get(user_id)
+        if task is not None:
+            with self._lock:
+                self._stats["coalesced"] += 1
+            return task
+
+        task = asyncio.get_running_loop().create_task(self._load(user_id, loader))
+        task.add_done_callback(_consume_task_exception)
+        self._inflight[user_id] = task
+        return task
+
+    async def _load(self, user_id: str, loader: Loader) -> List[int]:
+        with self._lock:
+            started_sequence = self._sequence
+        try:
+            value, domain = await loader()
+            with self._lock:
+                # 계산 도중 해당 도메인/사용자가 무효화된 경우 stale로 저장
+                invalidated = (
+                    self._domain_sequence.get(domain, 0) > started_sequence
+                    or self._user_sequence.get(user_id, 0) > started_sequence
+                )
+                self._store(user_id, _CacheEntry(value, domain, stale=invalidated))
+            return value
+        finally:
+            self._inflight.pop(user_id, None)
+
+    # ---------------------- 저장 / 제거 ----------------------
+    def _store(self, user_id: str, entry: _CacheEntry) -> None:
+        self._remove(user_id)
+        if entry.nbytes > self.max_bytes:
+            return
+
+        self._entries[user_id] = entry
+        self._domain_members.setdefault(entry.domain, set()).add(user_id)
+        self._bytes += entry.nbytes
+
+        # LRU 순서로 엔트리 수 / 메모리 한도 초과분 제거
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest_id = next(iter(self._entries))
+            self._remove(oldest_id)
+            self._stats["evictions"] += 1
+
+    def _remove(self, user_id: str) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        self._bytes -= entry.nbytes
+        members = self._domain_members.get(entry.domain)
+        if members is not None:
+            members.discard(user_id)
+            if not members:
+                del self._domain_members[entry.domain]
+
+    # ---------------------- 무효화 ----------------------
+    def invalidate_domain(self, domain: Optional[str]) -> int:
+        """
+        도메인 내 사용자 등록/삭제 시 해당 도메인 엔트리를 stale로 표시
+        (도메인을 알 수 없는 엔트리도 함께 표시)
+
+        Returns:
+            stale로 표시된 엔트리 수
+        """
+        recommendation_generations.bump(domain)
+        with self._lock:
+            self._sequence += 1
+            self._domain_sequence[domain] = self._sequence
+            self._domain_sequence[None] = self._sequence
+            self._stats["invalidations"] += 1
+
+            marked = 0
+            for key in {domain, None}:
+                for user_id in self._domain_members.get(key, ()):
+                    self._entries[user_id].stale = True
+                    marked += 1
+            return marked
+
+    def invalidate_user(self, user_id: str) -> None:
+        """삭제된 사용자의 엔트리 제거"""
+        user_id = str(user_id)
+        with self._lock:
+            self._sequence += 1
+            self._user_sequence[user_id] = self._sequence
+            self._remove(user_id)
+
+    def clear(self) -> None:
+        """전체 엔트리 제거 (컬렉션 초기화 등)"""
+        with self._lock:
+            self._sequence += 1
+            for key in list(self._domain_sequence) + [None]:
+                self._domain_sequence[key] = self._sequence
+            self._entries.clear()
+            self._domain_members.clear()
+            self._bytes = 0
+
+    # ---------------------- 통계 ----------------------
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["inflight"] = len(self._inflight)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = (
+            round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0
+        )
+        return stats
+
+
+# 모듈 레벨 싱글톤 인스턴스
+recommendation_cache = RecommendationCache()
+
+logger.register_summary_provider("recommendation_cache", recommendation_cache.get_stats)
@@ -0,0 +1,91 @@
+"""
+규칙 기반 점수 메모이제이션 모듈
+규칙 점수는 소수의 범주형 시그니처(종교, 흡연, 음주, MBTI, 연령대, 성격/선호 태그)에만
+의존하므로 (기준 시그니처, 상대 시그니처) 쌍 단위로 계산 결과를 재사용
+
+요청 간에 유지되는 크기 제한 LRU 캐시로 동작하며, 적중률은 성능 요약에 포함
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from utils import logger
+
+# 최대 메모 엔트리 수 (엔트리당 시그니처 2개 + 점수 4개)
+RULE_MEMO_MAX_ENTRIES = int(os.getenv("RULE_MEMO_MAX_ENTRIES", "200000"))
+
+
+class RuleScoreMemo:
+    """
+    (기준 시그니처, 상대 시그니처) → 규칙 세부 점수 LRU 캐시
+    """
+
+    def __init__(self, max_entries: int = RULE_MEMO_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, Hashable], List[float]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "broadcast_rows": 0}
+
+    def get_or_compute(
+        self,
+        query_signature: Hashable,
+        candidate_signature: Hashable,
+        compute: Callable[[], List[float]],
+        members: int = 1,
+    ) -> List[float]:
+        """
+        메모된 규칙 점수를 반환하고, 없으면 compute()로 계산 후 저장
+
+        Args:
+            query_signature: 기준 사용자 시그니처
+            candidate_signature: 상대 사용자 시그니처
+            compute: 규칙 세부 점수 계산 함수
+            members: 이 결과를 공유하는 상대 사용자 수 (통계용)
+        """
+        key = (query_signature, candidate_signature)
+
+        with self._lock:
+            self._stats["broadcast_rows"] += members
+            scores = self._entries.get(key)
+            if scores is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return scores
+            self._stats["misses"] += 1
+
+        scores = compute()
+
+        with self._lock:
+            self._entries[key] = scores
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return scores
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0
+        # 실제 규칙 계산 1회당 점수를 공유받은 사용자 수
+        stats["rows_per_computation"] = (
+            round(stats["broadcast_rows"] / stats["misses"], 2)
+            if stats["misses"]
+            else 0
+        )
+        return stats
+
+
+# 모듈 레벨 싱글톤 인스턴스
+rule_score_memo = RuleScoreMemo()
+
+logger.register_summary_provider("rule_score_memo", rule_score_memo.get_stats)
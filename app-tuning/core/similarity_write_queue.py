@@ -0,0 +1,587 @@
+"""
+유사도 쓰기 지연(write-behind) 큐 모듈
+사용자 등록 시 자기 유사도 문서 교체와 상대 문서 역방향 갱신을 바로 Chroma에 쓰지 않고
+로컬 SQLite 저널에 기록한 뒤, 백그라운드 스레드가 묶어서 반영
+
+주요 기능:
+1. 저널(SQLite, WAL)에 기록된 작업은 재시작 후에도 다시 반영 (replay)
+2. 한 배치 안에서 같은 문서에 대한 작업을 순서대로 합쳐 문서당 읽기 1회 / 쓰기 1회로 반영
+3. 작업은 "문서 교체" / "항목 설정"으로만 표현되어 여러 번 반영해도 결과가 같음 (idempotent)
+4. 큐 깊이와 지연 시간은 모니터링 라우터(/monitoring/similarity-queue)에서 확인
+5. 배치 반영(읽기~Chroma 쓰기~저널 삭제)과 삭제 사용자 정리는 저널 옆 잠금 파일(flock)로
+   프로세스 간에도 직렬화 (다른 워커가 처리한 삭제 뒤에 이미 읽어 둔 역방향 쓰기가 다시 반영되지 않도록)
+
+작업 종류:
+- replace: doc_id 문서의 유사도 맵/구성요소 전체 교체 (등록 사용자 자신의 문서)
+  (merge 플래그가 있으면 저장된 문서에서 새 맵에 없는 역방향 항목은 유지 → 반영 스레드에서 병합)
+- set: doc_id 문서에서 subject 항목의 점수/구성요소 설정 (역방향 갱신)
+
+쓰기 지연을 쓰지 않을 때도 CHROMA_WRITE_COALESCE_MS > 0이면 같은 작업 형식으로
+similarity_coalescer가 짧은 구간의 동시 등록 쓰기를 문서별로 합쳐 한 번에 반영
+(등록 요청은 자신의 작업이 반영될 때까지 기다림)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경: 프로세스 내 잠금만 사용
+    fcntl = None
+
+from core.matching_score_optimized import SCORE_COMPONENTS
+from core.recommendation_cache import recommendation_cache
+from core.vector_database import (
+    decode_components,
+    decode_similarities,
+    encode_similarities,
+    get_similarity_collection,
+    get_user_collection,
+    similarity_locks,
+)
+from core.vector_database.write_coalescer import WriteCoalescer
+from core.weight_profiles import (
+    get_weight_profile,
+    needs_reblend,
+    profile_signature,
+    reblend_map,
+)
+from utils import logger
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# ---------------------- 상수 정의 ----------------------
+SIMILARITY_WRITE_BEHIND = (
+    os.getenv("SIMILARITY_WRITE_BEHIND", "false").lower() == "true"
+)
+# 저널 파일 경로
+SIMILARITY_JOURNAL_PATH = os.getenv(
+    "SIMILARITY_JOURNAL_PATH", os.path.join(BASE_DIR, "data", "similarity_journal.db")
+)
+# 한 번에 반영할 최대 작업 수
+SIMILARITY_QUEUE_BATCH_SIZE = int(os.getenv("SIMILARITY_QUEUE_BATCH_SIZE", "500"))
+# 큐가 비어 있을 때 확인 주기 (초)
+SIMILARITY_QUEUE_INTERVAL = float(os.getenv("SIMILARITY_QUEUE_INTERVAL", "0.5"))
+# 종료 시 남은 작업 반영 최대 대기 시간 (초)
+SIMILARITY_QUEUE_DRAIN_TIMEOUT = float(
+    os.getenv("SIMILARITY_QUEUE_DRAIN_TIMEOUT", "10")
+)
+# 동기 경로 쓰기 병합 구간 (밀리초, 0이면 비활성)
+CHROMA_WRITE_COALESCE_MS = float(os.getenv("CHROMA_WRITE_COALESCE_MS", "0"))
+# 병합 버퍼 대기 문서 수 상한 (도달 시 즉시 반영)
+CHROMA_WRITE_COALESCE_MAX_DOCS = int(
+    os.getenv("CHROMA_WRITE_COALESCE_MAX_DOCS", "2000")
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS similarity_writes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    doc_id TEXT NOT NULL,
+    subject TEXT,
+    op TEXT NOT NULL,
+    domain TEXT,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL
+)
+"""
+
+
+def build_similarity_metadata(
+    user_id: str, similarities: dict, components: dict, domain: Optional[str]
+) -> dict:
+    """유사도 문서 메타데이터 구성 (user_service.upsert_similarity와 같은 형식)"""
+    metadata = {
+        "userId": user_id,
+        "sim_weight_profile": profile_signature(get_weight_profile(domain)),
+        **encode_similarities(similarities, components, SCORE_COMPONENTS),
+    }
+    if domain is not None:
+        metadata["emailDomain"] = domain
+    return metadata
+
+
+def apply_operations(
+    similarities: dict, components: dict, operations: List[tuple]
+) -> None:
+    """
+    (op, subject, payload) 작업을 순서대로 유사도 맵/구성요소에 적용 (제자리 수정)
+    """
+    for op, subject, payload in operations:
+        if op == "replace":
+            if payload.get("merge"):
+                # 다른 등록이 이 문서에 남긴 역방향 항목은 유지 (enrich_with_reverse_similarities 대체)
+                kept = {
+                    k: v
+                    for k, v in similarities.items()
+                    if k not in payload["similarities"]
+                }
+                kept_components = {k: components[k] for k in kept if k in components}
+            else:
+                kept, kept_components = {}, {}
+            similarities.clear()
+            similarities.update(payload["similarities"])
+            similarities.update(kept)
+            components.clear()
+            components.update(payload.get("components") or {})
+            components.update(kept_components)
+        elif op == "set":
+            similarities[subject] = payload["score"]
+            if payload.get("components") is not None:
+                components[subject] = payload["components"]
+
+
+def merge_operations(pending: List[tuple], incoming: List[tuple]) -> List[tuple]:
+    """
+    같은 문서의 작업 목록을 "교체 최대 1개 + 항목별 마지막 설정"으로 압축
+
+    교체 이전의 설정 중 교체 맵에 없는 항목은 유지하여,
+    다른 요청이 먼저 남긴 역방향 갱신이 뒤늦은 교체로 지워지지 않게 함
+    """
+    replace = None
+    sets: "OrderedDict[str, tuple]" = OrderedDict()
+    for operation in list(pending) + list(incoming):
+        op, subject, payload = operation
+        if op == "replace":
+            replace = operation
+            for other_id in payload["similarities"]:
+                sets.pop(other_id, None)
+        else:
+            sets.pop(subject, None)
+            sets[subject] = operation
+    return ([replace] if replace else []) + list(sets.values())
+
+
+def similarity_operations(
+    user_id: str, similarities: dict, reverse_scores: dict, components: dict
+) -> "OrderedDict[str, List[tuple]]":
+    """
+    등록 사용자 자기 문서 교체 + 상대 문서 역방향 설정 작업 구성
+    (교체는 merge로 기록하여 이전 배치에서 반영된 다른 등록의 역방향 항목을 유지)
+    """
+    operations: "OrderedDict[str, List[tuple]]" = OrderedDict()
+    operations[user_id] = [
+        (
+            "replace",
+            None,
+            {"similarities": similarities, "components": components, "merge": True},
+        )
+    ]
+    for other_id, score in reverse_scores.items():
+        operations.setdefault(str(other_id), []).append(
+            ("set", user_id, {"score": score, "components": components.get(other_id)})
+        )
+    return operations
+
+
+def write_similarity_documents(
+    operations: "OrderedDict[str, List[tuple]]",
+    domains: Dict[str, Optional[str]],
+) -> None:
+    """
+    문서별 작업을 적용하여 문서당 읽기 1회 / 일괄 쓰기 1회로 Chroma에 반영
+    (읽기~쓰기 구간은 대상 문서 잠금 안에서 수행)
+    """
+    with similarity_locks.hold(operations):
+        _write_documents_locked(operations, domains)
+
+
+def _write_documents_locked(
+    operations: "OrderedDict[str, List[tuple]]",
+    domains: Dict[str, Optional[str]],
+) -> None:
+    doc_ids = list(operations)
+    collection = get_similarity_collection()
+
+    existing = collection.get(ids=doc_ids, include=["metadatas", "embeddings"])
+    current = {
+        doc_id: (meta, embedding)
+        for doc_id, meta, embedding in zip(
+            existing["ids"], existing["metadatas"], existing["embeddings"]
+        )
+    }
+
+    # 새 문서이거나 자기 문서 교체는 user_profiles의 최신 임베딩 사용
+    profile_ids = [
+        doc_id
+        for doc_id in doc_ids
+        if doc_id not in current
+        or any(op == "replace" for op, _, _ in operations[doc_id])
+    ]
+    profile_embeddings = {}
+    if profile_ids:
+        profiles = get_user_collection().get(ids=profile_ids, include=["embeddings"])
+        profile_embeddings = dict(zip(profiles["ids"], profiles["embeddings"]))
+
+    ids, embeddings, metadatas = [], [], []
+    for doc_id in doc_ids:
+        meta, embedding = current.get(doc_id, (None, None))
+        embedding = profile_embeddings.get(doc_id, embedding)
+        if embedding is None:
+            # 이미 삭제된 사용자 문서는 건너뜀
+            continue
+
+        similarities = decode_similarities(meta) if meta else {}
+        components = decode_components(meta) if meta else {}
+        apply_operations(similarities, components, operations[doc_id])
+
+        domain = domains[doc_id]
+        profile = get_weight_profile(domain)
+        if meta and needs_reblend(meta, profile):
+            similarities = reblend_map(similarities, components, profile)
+
+        ids.append(doc_id)
+        embeddings.append(embedding)
+        metadatas.append(
+            build_similarity_metadata(doc_id, similarities, components, domain)
+        )
+
+    if ids:
+        collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas)
+
+
+class SimilarityWriteQueue:
+    """
+    SQLite 저널 기반 유사도 쓰기 지연 큐
+    """
+
+    def __init__(
+        self,
+        path: str = SIMILARITY_JOURNAL_PATH,
+        enabled: bool = SIMILARITY_WRITE_BEHIND,
+        batch_size: int = SIMILARITY_QUEUE_BATCH_SIZE,
+        interval: float = SIMILARITY_QUEUE_INTERVAL,
+    ):
+        self.path = path
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.interval = interval
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        # 반영 중인 배치와 사용자 삭제 정리가 겹치지 않도록 보호 (프로세스 간은 _guard의 flock)
+        self._flush_lock = threading.Lock()
+        self._lock_file = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._stats = {
+            "enqueued": 0,
+            "applied_operations": 0,
+            "written_documents": 0,
+            "batches": 0,
+            "errors": 0,
+            "purged": 0,
+            "last_flush_at": None,
+            "last_error": None,
+        }
+
+    # ---------------------- 저널 ----------------------
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_similarity_writes_doc ON similarity_writes(doc_id)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def enqueue(
+        self,
+        user_id: str,
+        similarities: dict,
+        reverse_scores: dict,
+        components: dict,
+        domain: Optional[str],
+    ) -> int:
+        """
+        등록 사용자의 유사도 쓰기를 한 트랜잭션으로 기록
+        (저장된 자기 문서의 역방향 항목 병합은 요청 경로가 아니라 반영 스레드에서 수행)
+
+        Args:
+            user_id: 등록 사용자 ID
+            similarities: 자기 문서에 저장할 유사도 맵
+            reverse_scores: 상대 문서에 설정할 {상대 ID: 점수}
+            components: {상대 ID: 점수 구성요소}
+            domain: 사용자 도메인
+
+        Returns:
+            기록된 작업 수
+        """
+        now = time.time()
+        rows = [
+            (
+                user_id,
+                None,
+                "replace",
+                domain,
+                json.dumps(
+                    {
+                        "similarities": similarities,
+                        "components": components,
+                        "merge": True,
+                    }
+                ),
+                now,
+            )
+        ]
+        rows.extend(
+            (
+                str(other_id),
+                user_id,
+                "set",
+                domain,
+                json.dumps({"score": score, "components": components.get(other_id)}),
+                now,
+            )
+            for other_id, score in reverse_scores.items()
+        )
+
+        with self._db_lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO similarity_writes (doc_id, subject, op, domain, payload, enqueued_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            self._stats["enqueued"] += len(rows)
+        self._wakeup.set()
+        return len(rows)
+
+    @contextmanager
+    def _guard(self) -> Iterator[None]:
+        """반영 배치 / 삭제 정리 / 초기화 직렬화 (같은 저널을 쓰는 다른 워커 프로세스 포함)"""
+        with self._flush_lock:
+            if fcntl is None:
+                yield
+                return
+            if self._lock_file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._lock_file = open(f"{self.path}.lock", "a+")
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_batch(self) -> List[tuple]:
+        with self._db_lock:
+            return (
+                self._connection()
+                .execute(
+                    "SELECT seq, doc_id, subject, op, domain, payload FROM similarity_writes"
+                    " ORDER BY seq LIMIT ?",
+                    (self.batch_size,),
+                )
+                .fetchall()
+            )
+
+    def _delete_through(self, seq: int) -> None:
+        with self._db_lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM similarity_writes WHERE seq <= ?", (seq,))
+
+    def purge_user(self, user_id: str) -> int:
+        """
+        삭제된 사용자 관련 대기 작업 정리
+        - 해당 사용자 문서 작업과 다른 문서에 해당 사용자 항목을 설정하는 작업 제거
+        - 다른 사용자 문서 교체 작업의 맵에서 해당 사용자 항목 제거
+        """
+        if not self.enabled:
+            return 0
+        user_id = str(user_id)
+        with self._guard(), self._db_lock:
+            conn = self._connection()
+            with conn:
+                removed = conn.execute(
+                    "DELETE FROM similarity_writes WHERE doc_id = ? OR subject = ?",
+                    (user_id, user_id),
+                ).rowcount
+
+                replaces = conn.execute(
+                    "SELECT seq, payload FROM similarity_writes WHERE op = 'replace'"
+                ).fetchall()
+                for seq, payload in replaces:
+                    payload = json.loads(payload)
+                    if user_id not in payload["similarities"]:
+                        continue
+                    payload["similarities"].pop(user_id)
+                    (payload.get("components") or {}).pop(user_id, None)
+                    conn.execute(
+                        "UPDATE similarity_writes SET payload = ? WHERE seq = ?",
+                        (json.dumps(payload), seq),
+                    )
+            self._stats["purged"] += removed
+        return removed
+
+    def clear(self) -> None:
+        """저널 전체 삭제 (컬렉션 초기화 등)"""
+        if not self.enabled:
+            return
+        with self._guard(), self._db_lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM similarity_writes")
+
+    # ---------------------- 반영 ----------------------
+    def flush_once(self) -> int:
+        """
+        저널 앞부분의 한 배치를 문서 단위로 합쳐 Chroma에 반영
+
+        Returns:
+            반영한 작업 수 (비어 있으면 0)
+        """
+        with self._guard():
+            rows = self._read_batch()
+            if not rows:
+                return 0
+
+            operations: "OrderedDict[str, List[tuple]]" = OrderedDict()
+            domains: Dict[str, Optional[str]] = {}
+            for _, doc_id, subject, op, domain, payload in rows:
+                operations.setdefault(doc_id, []).append(
+                    (op, subject, json.loads(payload))
+                )
+                domains[doc_id] = domain
+
+            write_similarity_documents(operations, domains)
+            self._delete_through(rows[-1][0])
+
+            with self._db_lock:
+                self._stats["applied_operations"] += len(rows)
+                self._stats["written_documents"] += len(operations)
+                self._stats["batches"] += 1
+                self._stats["last_flush_at"] = time.time()
+
+        # 반영된 도메인의 추천 결과 캐시 무효화
+        for domain in set(domains.values()):
+            recommendation_cache.invalidate_domain(domain)
+        return len(rows)
+
+    def drain(self, timeout: float = SIMILARITY_QUEUE_DRAIN_TIMEOUT) -> bool:
+        """큐가 빌 때까지 반영 (timeout 초과 시 False)"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.flush_once() == 0:
+                return True
+        return False
+
+    def _run(self) -> None:
+        logger.logger.info(f"SIMILARITY-QUEUE: started [journal={self.path}]")
+        backoff = self.interval
+        while not self._stopping.is_set():
+            try:
+                applied = self.flush_once()
+                backoff = self.interval
+            except Exception as e:
+                applied = 0
+                with self._db_lock:
+                    self._stats["errors"] += 1
+                    self._stats["last_error"] = str(e)
+                logger.logger.error(f"SIMILARITY-QUEUE-ERROR: {e}")
+                # Chroma 장애 시 재시도 간격을 늘림 (최대 30초)
+                backoff = min(backoff * 2, 30.0)
+                self._stopping.wait(backoff)
+                continue
+
+            if applied == 0:
+                self._wakeup.wait(self.interval)
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        """백그라운드 반영 스레드 시작 (재시작 시 남아 있던 작업부터 반영)"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="similarity-write-queue", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, drain: bool = True) -> None:
+        """반영 스레드 종료 (drain=True면 남은 작업을 먼저 반영)"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout=SIMILARITY_QUEUE_DRAIN_TIMEOUT)
+        self._thread = None
+        if drain:
+            try:
+                if not self.drain():
+                    logger.logger.warning(
+                        "SIMILARITY-QUEUE: drain timed out, remaining writes replay on restart"
+                    )
+            except Exception as e:
+                logger.logger.error(f"SIMILARITY-QUEUE-DRAIN-ERROR: {e}")
+
+    # ---------------------- 통계 ----------------------
+    def get_stats(self) -> Dict[str, Any]:
+        """큐 깊이(대기 작업 수), 대기 문서 수, 가장 오래된 작업의 지연 시간(초)"""
+        with self._db_lock:
+            stats = dict(self._stats)
+            if self.enabled or self._conn is not None:
+                depth, documents, oldest = (
+                    self._connection()
+                    .execute(
+                        "SELECT COUNT(*), COUNT(DISTINCT doc_id), MIN(enqueued_at)"
+                        " FROM similarity_writes"
+                    )
+                    .fetchone()
+                )
+            else:
+                depth, documents, oldest = 0, 0, None
+
+        stats["enabled"] = self.enabled
+        stats["running"] = bool(self._thread and self._thread.is_alive())
+        stats["depth"] = depth
+        stats["pending_documents"] = documents
+        stats["lag_seconds"] = round(time.time() - oldest, 3) if oldest else 0
+        if stats["written_documents"]:
+            stats["operations_per_document"] = round(
+                stats["applied_operations"] / stats["written_documents"], 2
+            )
+        return stats
+
+
+# 모듈 레벨 싱글톤 인스턴스
+similarity_write_queue = SimilarityWriteQueue()
+
+logger.register_summary_provider(
+    "similarity_write_queue", similarity_write_queue.get_stats
+)
+
+
+def _write_coalesced(
+    operations: "OrderedDict[str, List[tuple]]", domains: Dict[str, Optional[str]]
+) -> None:
+    write_similarity_documents(operations, domains)
+    for domain in set(domains.values()):
+        recommendation_cache.invalidate_domain(domain)
+
+
+similarity_coalescer = WriteCoalescer(
+    writer=_write_coalesced,
+    window=CHROMA_WRITE_COALESCE_MS / 1000,
+    max_documents=CHROMA_WRITE_COALESCE_MAX_DOCS,
+    merge=merge_operations,
+    name="similarity-write-coalescer",
+)
+
+logger.register_summary_provider(
+    "similarity_write_coalescer", similarity_coalescer.get_stats
+)
+logger.register_summary_provider("similarity_locks", similarity_locks.get_stats)
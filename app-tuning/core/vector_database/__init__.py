@@ -1,8 +1,18 @@
-from .client import get_chroma_client
+from .client import ChromaUnavailableError, get_chroma_client
 from .collections import (
     get_similarity_collection,
     get_user_collection,
     reset_collections,
+    reset_connections,
+)
+from .document_locks import StripedLock, similarity_locks
+from .similarity_codec import (
+    convert_metadata,
+    decode_components,
+    decode_similarities,
+    encode_similarities,
+    same_score,
+    top_similarities,
 )
 from .similarity_repository import (
     clean_up_similarity,
@@ -10,12 +20,23 @@ from .similarity_repository import (
     list_similarities,
 )
 from .user_repository import delete_user, get_user_data, get_users_data, list_users
+from .write_coalescer import WriteCoalescer
 
 __all__ = [
+    "ChromaUnavailableError",
     "get_chroma_client",
+    "StripedLock",
+    "similarity_locks",
     "get_similarity_collection",
     "get_user_collection",
     "reset_collections",
+    "reset_connections",
+    "convert_metadata",
+    "decode_components",
+    "decode_similarities",
+    "encode_similarities",
+    "same_score",
+    "top_similarities",
     "clean_up_similarity",
     "get_user_similarities",
     "list_similarities",
@@ -23,4 +44,5 @@ __all__ = [
     "get_user_data",
     "get_users_data",
     "list_users",
+    "WriteCoalescer",
 ]
@@ -1,55 +1,243 @@
+"""
+Chroma 클라이언트 관리 모듈
+저장소 연산마다 list_collections() / count()로 상태를 확인하던 방식 대신,
+클라이언트 하나를 keep-alive HTTP 세션으로 재사용하고 상태 확인은 TTL 동안 캐시
+
+- 상태 확인(heartbeat)은 마지막 확인(또는 성공한 연산) 후 CHROMA_LIVENESS_TTL초가 지났을 때만 수행
+- 재연결은 실제 연산이 연결 오류로 실패했을 때만 (컬렉션 래퍼가 report_failure 호출)
+- 연속 실패가 CHROMA_BREAKER_THRESHOLD회에 도달하면 회로 차단(open):
+  지수 백오프(CHROMA_BREAKER_BASE_DELAY × 2^n, 최대 CHROMA_BREAKER_MAX_DELAY) 동안
+  연결을 시도하지 않고 바로 ChromaUnavailableError를 발생시키며, 이후 한 번 다시 시도(half-open)
+- 상태 확인 / 재연결 / 차단 횟수는 성능 요약(chroma_client)에서 확인
+"""
+
 import logging
 import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils import logger
 
 import chromadb
 
-chroma_client = None
+# ---------------------- 상수 정의 ----------------------
+# 상태 확인 결과 유지 시간 (초)
+CHROMA_LIVENESS_TTL = float(os.getenv("CHROMA_LIVENESS_TTL", "30"))
+# 회로 차단까지의 연속 실패 횟수
+CHROMA_BREAKER_THRESHOLD = int(os.getenv("CHROMA_BREAKER_THRESHOLD", "3"))
+# 회로 차단 첫 대기 시간 / 최대 대기 시간 (초)
+CHROMA_BREAKER_BASE_DELAY = float(os.getenv("CHROMA_BREAKER_BASE_DELAY", "1"))
+CHROMA_BREAKER_MAX_DELAY = float(os.getenv("CHROMA_BREAKER_MAX_DELAY", "60"))
+# HTTP 연결 풀 크기 (동시 요청 스레드 수 이상이면 연결이 재사용됨)
+CHROMA_HTTP_POOL_SIZE = int(os.getenv("CHROMA_HTTP_POOL_SIZE", "32"))
 
 
-def is_client_alive(client):
-    try:
-        client.list_collections()  # 헬스체크
-        return True
-    except Exception as e:
-        logging.warning(f"[Chroma] 클라이언트 응답 없음: {e}")
-        print(f"ChromaDB 클라이언트 헬스체크 실패: {e}")
-        return False
+class ChromaUnavailableError(RuntimeError):
+    """Chroma에 연결할 수 없거나 회로 차단 중"""
 
 
-def get_chroma_client():
-    global chroma_client
+def create_client():
+    """설정(CHROMA_MODE)에 따라 Chroma 클라이언트 생성 (상태 확인은 하지 않음)"""
+    mode = os.getenv("CHROMA_MODE", "server")
 
-    if chroma_client is not None and is_client_alive(chroma_client):
-        return chroma_client
-    else:
-        print("ChromaDB 클라이언트 재연결 시도")
-        chroma_client = None  # 죽은 연결 무효화
+    if mode == "local":
+        # 로컬 PersistentClient 사용
+        base_dir = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        chroma_path = os.path.join(base_dir, "chroma_db")
+        return chromadb.PersistentClient(path=chroma_path)
 
-    try:
-        mode = os.getenv("CHROMA_MODE", "server")
+    # 서버 모드 (기본)
+    host = os.getenv("CHROMA_HOST", "localhost")
+    port = int(os.getenv("CHROMA_PORT", "8001"))
+
+    host = host.replace("http://", "").replace("https://", "")
+
+    client = chromadb.HttpClient(host=host, port=port)
+    _configure_session(client)
+    return client
+
+
+def _configure_session(client) -> None:
+    # 기본 requests 풀(10개)보다 많은 스레드가 동시에 요청하면 연결을 매번 새로 맺으므로 풀 확장
+    session = getattr(client, "_session", None)
+    if session is None:
+        return
+    from requests.adapters import HTTPAdapter
+
+    adapter = HTTPAdapter(
+        pool_connections=CHROMA_HTTP_POOL_SIZE,
+        pool_maxsize=CHROMA_HTTP_POOL_SIZE,
+        max_retries=0,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+class ChromaClientManager:
+    """
+    Chroma 클라이언트 재사용 / 상태 확인 캐시 / 회로 차단
+
+    Args:
+        factory: 클라이언트 생성 함수
+        liveness_ttl: 상태 확인 결과 유지 시간 (초)
+        threshold: 회로 차단까지의 연속 실패 횟수
+        base_delay / max_delay: 회로 차단 대기 시간 (지수 백오프)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any] = create_client,
+        liveness_ttl: float = CHROMA_LIVENESS_TTL,
+        threshold: int = CHROMA_BREAKER_THRESHOLD,
+        base_delay: float = CHROMA_BREAKER_BASE_DELAY,
+        max_delay: float = CHROMA_BREAKER_MAX_DELAY,
+    ):
+        self.factory = factory
+        self.liveness_ttl = liveness_ttl
+        self.threshold = max(1, threshold)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._client = None
+        # 클라이언트가 바뀔 때마다 증가 (컬렉션 캐시 무효화 기준)
+        self.generation = 0
+        self._checked_at = 0.0
+        self._failures = 0
+        self._open_until = 0.0
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "probes": 0,
+            "probe_failures": 0,
+            "connects": 0,
+            "operation_failures": 0,
+            "breaker_opens": 0,
+            "rejected": 0,
+        }
 
-        if mode == "local":
-            # 로컬 PersistentClient 사용
-            base_dir = os.path.dirname(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # ---------------------- 상태 ----------------------
+    def _probe(self, client) -> bool:
+        self._stats["probes"] += 1
+        try:
+            client.heartbeat()
+            return True
+        except Exception as e:
+            self._stats["probe_failures"] += 1
+            self._last_error = str(e)
+            logging.warning(f"[Chroma] 클라이언트 응답 없음: {e}")
+            return False
+
+    def _record_failure(self, now: float) -> None:
+        self._failures += 1
+        if self._failures >= self.threshold:
+            delay = min(
+                self.base_delay * 2 ** (self._failures - self.threshold),
+                self.max_delay,
+            )
+            self._open_until = now + delay
+            self._stats["breaker_opens"] += 1
+            logging.error(
+                f"[Chroma] 회로 차단 {delay:.1f}초 (연속 실패 {self._failures}회): {self._last_error}"
             )
-            chroma_path = os.path.join(base_dir, "chroma_db")
-            chroma_client = chromadb.PersistentClient(path=chroma_path)
-        else:
-            # 서버 모드 (기본)
-            host = os.getenv("CHROMA_HOST", "localhost")
-            port = int(os.getenv("CHROMA_PORT", "8001"))
 
-            host = host.replace("http://", "").replace("https://", "")
+    @property
+    def state(self) -> str:
+        if self._open_until > time.monotonic():
+            return "OPEN"
+        if self._failures >= self.threshold:
+            return "HALF_OPEN"
+        return "CLOSED"
+
+    # ---------------------- 클라이언트 ----------------------
+    def get_client(self):
+        """
+        살아 있는 클라이언트 반환 (TTL 안에서는 상태 확인 없이 캐시 사용)
+
+        Raises:
+            ChromaUnavailableError: 회로 차단 중이거나 연결 / 상태 확인 실패
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._open_until > now:
+                self._stats["rejected"] += 1
+                raise ChromaUnavailableError(
+                    f"ChromaDB 회로 차단 중 ({self._open_until - now:.1f}초 후 재시도): {self._last_error}"
+                )
+            if self._client is not None and now - self._checked_at < self.liveness_ttl:
+                return self._client
+
+            client = self._client
+            if client is not None and self._probe(client):
+                self._checked_at, self._failures = now, 0
+                return client
+
+            # 처음 연결이거나 상태 확인 실패 → 새 클라이언트로 한 번 시도
+            self._client = None
+            try:
+                client = self.factory()
+                self._stats["connects"] += 1
+            except Exception as e:
+                self._last_error = str(e)
+                client = None
+            if client is None or not self._probe(client):
+                self._record_failure(now)
+                raise ChromaUnavailableError(
+                    f"ChromaDB 클라이언트가 응답하지 않습니다: {self._last_error}"
+                )
+            self._client = client
+            self.generation += 1
+            self._checked_at, self._failures = now, 0
+            return client
+
+    def mark_success(self) -> None:
+        """실제 연산 성공 (상태 확인을 한 TTL 동안 생략)"""
+        self._checked_at = time.monotonic()
+        self._failures = 0
+
+    def report_failure(self, error: Exception) -> None:
+        """실제 연산이 연결 오류로 실패: 클라이언트를 버리고 다음 호출에서 재연결"""
+        with self._lock:
+            self._stats["operation_failures"] += 1
+            self._last_error = str(error)
+            self._client = None
+            self._record_failure(time.monotonic())
+        logging.warning(f"[Chroma] 연산 실패, 재연결 예정: {error}")
 
-            chroma_client = chromadb.HttpClient(host=host, port=port)
+    def reset(self) -> None:
+        """캐시된 클라이언트 제거 (pre-fork 전 등, 실패로 기록하지 않음)"""
+        with self._lock:
+            self._client = None
+            self.generation += 1
 
-        if not is_client_alive(chroma_client):
-            logging.error("ChromaDB 클라이언트가 연결되었지만 응답이 없습니다.")
-            raise RuntimeError("ChromaDB 클라이언트가 연결되었지만 응답이 없습니다.")
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "connected": self._client is not None,
+            "consecutive_failures": self._failures,
+            "liveness_ttl": self.liveness_ttl,
+            **self._stats,
+            "last_error": self._last_error,
+        }
 
-        return chroma_client
-    except Exception as e:
-        logging.exception(f"[Chroma] 클라이언트 초기화 실패: {e}")
-        chroma_client = None
+
+# 모듈 레벨 싱글톤 인스턴스
+chroma_clients = ChromaClientManager()
+
+logger.register_summary_provider("chroma_client", chroma_clients.get_stats)
+
+
+def reset_chroma_client():
+    """캐시된 클라이언트 제거 (다음 get_chroma_client() 호출 시 새로 연결)"""
+    chroma_clients.reset()
+
+
+def get_chroma_client():
+    """살아 있는 Chroma 클라이언트 (연결할 수 없거나 회로 차단 중이면 None)"""
+    try:
+        return chroma_clients.get_client()
+    except ChromaUnavailableError as e:
+        logging.error(f"[Chroma] 클라이언트 사용 불가: {e}")
         return None
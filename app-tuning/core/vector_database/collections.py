@@ -1,6 +1,15 @@
 import logging
+import time
 
-from .client import get_chroma_client
+import requests
+from utils import logger
+
+from .client import (
+    ChromaUnavailableError,
+    chroma_clients,
+    get_chroma_client,
+    reset_chroma_client,
+)
 
 _user_collection = None
 _similarity_collection = None
@@ -8,42 +17,106 @@ _similarity_collection = None
 USER_COLLECTION_NAME = "user_profiles"
 SIMILARITY_COLLECTION_NAME = "user_similarities"
 
+# 연결 문제로 보는 예외 (이 경우에만 클라이언트를 버리고 재연결)
+_TRANSPORT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ConnectionError,
+    TimeoutError,
+)
+# 재시도해도 안전한 읽기 연산 (쓰기는 중복 반영될 수 있으므로 재시도하지 않음)
+_READ_METHODS = {"get", "query", "count", "peek"}
 
-def _is_alive(collection) -> bool:
-    try:
-        collection.count()  # 헬스 체크
-        return True
-    except Exception as e:
-        logging.debug(f"[Chroma] 컬렉션 응답 없음: {e}")
-        return False
 
+class ManagedCollection:
+    """
+    Chroma 컬렉션 래퍼
+    매 접근마다 count()로 상태를 확인하지 않고, 실제 연산이 연결 오류로 실패했을 때만
+    클라이언트 관리자에 알려 재연결 (읽기 연산은 새 연결로 한 번 재시도)
+    성공한 연산 시간은 컬렉션_작업별 db_operations 히스토그램에 기록
+    """
 
-_collection_cache = {}
+    def __init__(self, cache_key: str, name: str, collection):
+        self._cache_key = cache_key
+        self._name = name
+        self._collection = collection
+
+    def __getattr__(self, attr):
+        value = getattr(self._collection, attr)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = getattr(self._collection, attr)(*args, **kwargs)
+            except _TRANSPORT_ERRORS as e:
+                chroma_clients.report_failure(e)
+                _collection_cache.pop(self._cache_key, None)
+                if attr not in _READ_METHODS:
+                    raise
+                # 새 클라이언트로 한 번 재시도 (회로 차단 중이면 ChromaUnavailableError)
+                self._collection = _connect(self._cache_key, self._name)._collection
+                result = getattr(self._collection, attr)(*args, **kwargs)
+            chroma_clients.mark_success()
+            logger.record_db_operation(
+                f"{self._name}_{attr}", time.perf_counter() - start
+            )
+            return result
 
+        return call
+
+
+# cache_key → (클라이언트 세대, ManagedCollection)
+_collection_cache = {}
 
-def _get_or_create_collection(cache_key, collection_name):
-    collection = _collection_cache.get(cache_key)
-
-    if collection:
-        if _is_alive(collection):
-            return collection
-        else:
-            logging.warning(
-                f"[Chroma] 컬렉션 '{collection_name}' 연결이 끊어졌습니다. 재연결 시도 중..."
-            )
-            _collection_cache[cache_key] = None  # 무효화
 
-    client = get_chroma_client()
-    if client is None:
-        raise RuntimeError("ChromaDB 클라이언트를 사용할 수 없습니다.")
+def _connect(cache_key, collection_name) -> ManagedCollection:
+    try:
+        client = chroma_clients.get_client()
+    except ChromaUnavailableError as e:
+        raise RuntimeError(f"ChromaDB 클라이언트를 사용할 수 없습니다: {e}") from e
 
     try:
         collection = client.get_or_create_collection(collection_name)
-        _collection_cache[cache_key] = collection
-        return collection
+    except _TRANSPORT_ERRORS as e:
+        chroma_clients.report_failure(e)
+        raise RuntimeError(f"{collection_name} 컬렉션 초기화 실패: {e}") from e
     except Exception as e:
         raise RuntimeError(f"{collection_name} 컬렉션 초기화 실패: {e}") from e
 
+    managed = ManagedCollection(cache_key, collection_name, collection)
+    _collection_cache[cache_key] = (chroma_clients.generation, managed)
+    return managed
+
+
+def _get_or_create_collection(cache_key, collection_name):
+    cached = _collection_cache.get(cache_key)
+    if cached is None:
+        return _connect(cache_key, collection_name)
+
+    generation, collection = cached
+    # TTL 안에서는 상태 확인 없이 반환, 지나면 heartbeat 한 번 (실패 시 새 클라이언트)
+    try:
+        chroma_clients.get_client()
+    except ChromaUnavailableError as e:
+        raise RuntimeError(f"ChromaDB 클라이언트를 사용할 수 없습니다: {e}") from e
+    if generation != chroma_clients.generation:
+        logging.warning(
+            f"[Chroma] 컬렉션 '{collection_name}' 클라이언트가 바뀌어 다시 가져옵니다."
+        )
+        return _connect(cache_key, collection_name)
+    return collection
+
+
+def reset_connections():
+    """
+    클라이언트 / 컬렉션 캐시 초기화
+    (pre-fork 워커가 마스터의 HTTP 연결 풀을 함께 쓰지 않도록 fork 전에 호출)
+    """
+    _collection_cache.clear()
+    reset_chroma_client()
+
 
 def get_user_collection():
     return _get_or_create_collection("user", USER_COLLECTION_NAME)
@@ -68,7 +141,8 @@ def reset_collections():
         client.delete_collection(USER_COLLECTION_NAME)
         client.delete_collection(SIMILARITY_COLLECTION_NAME)
 
-        # 전역 캐시 초기화
+        # 전역 캐시 초기화 (삭제된 컬렉션을 가리키는 래퍼 제거)
+        _collection_cache.clear()
         global _user_collection, _similarity_collection
         _user_collection = client.get_or_create_collection(USER_COLLECTION_NAME)
         _similarity_collection = client.get_or_create_collection(
@@ -0,0 +1,122 @@
+"""
+유사도 문서 잠금(lock striping) 모듈
+다른 사용자 유사도 문서를 읽고-수정하고-쓰는 구간을 문서 ID별 스트라이프 잠금으로 보호하여
+동시 등록 시 역방향 갱신이 유실되지 않게 함
+
+- 문서 ID를 crc32로 SIMILARITY_LOCK_STRIPES개 스트라이프 중 하나에 대응 (프로세스 간 동일)
+- 여러 문서를 함께 잠글 때는 스트라이프 번호 순으로 획득하여 교착 방지
+- SIMILARITY_LOCK_DIR가 지정되면 스트라이프마다 파일 잠금(fcntl.flock)을 함께 잡아
+  같은 호스트의 여러 uvicorn 워커 프로세스 사이에서도 직렬화
+  (미지정 시 UVICORN_WORKERS / WEB_CONCURRENCY가 2 이상이면 data/similarity_locks 사용)
+"""
+
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경: 프로세스 내 잠금만 사용
+    fcntl = None
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# 스트라이프 수
+SIMILARITY_LOCK_STRIPES = int(os.getenv("SIMILARITY_LOCK_STRIPES", "256"))
+
+
+def _default_lock_dir() -> str:
+    workers = os.getenv("UVICORN_WORKERS") or os.getenv("WEB_CONCURRENCY") or "1"
+    if int(workers) > 1:
+        return os.path.join(BASE_DIR, "data", "similarity_locks")
+    return ""
+
+
+# 프로세스 간 파일 잠금 디렉터리 (빈 값이면 프로세스 내 잠금만 사용)
+SIMILARITY_LOCK_DIR = os.getenv("SIMILARITY_LOCK_DIR", _default_lock_dir())
+
+
+class StripedLock:
+    """
+    문서 ID 스트라이프 잠금
+    """
+
+    def __init__(self, stripes: int = SIMILARITY_LOCK_STRIPES, lock_dir: str = ""):
+        self.stripes = max(1, stripes)
+        self.lock_dir = lock_dir if fcntl is not None else ""
+        self._locks = [threading.Lock() for _ in range(self.stripes)]
+        self._files: Dict[int, Any] = {}
+        self._files_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"acquisitions": 0, "contended": 0, "wait_seconds": 0.0}
+
+    def stripe_of(self, doc_id: str) -> int:
+        return zlib.crc32(str(doc_id).encode("utf-8")) % self.stripes
+
+    def _file(self, stripe: int):
+        with self._files_lock:
+            handle = self._files.get(stripe)
+            if handle is None:
+                os.makedirs(self.lock_dir, exist_ok=True)
+                handle = open(
+                    os.path.join(self.lock_dir, f"stripe-{stripe}.lock"), "a+"
+                )
+                self._files[stripe] = handle
+            return handle
+
+    def _acquire(self, stripe: int) -> Optional[float]:
+        lock = self._locks[stripe]
+        waited = None
+        if not lock.acquire(blocking=False):
+            started = time.perf_counter()
+            lock.acquire()
+            waited = time.perf_counter() - started
+        if self.lock_dir:
+            try:
+                fcntl.flock(self._file(stripe).fileno(), fcntl.LOCK_EX)
+            except Exception:
+                lock.release()
+                raise
+        return waited
+
+    def _release(self, stripe: int) -> None:
+        if self.lock_dir:
+            fcntl.flock(self._file(stripe).fileno(), fcntl.LOCK_UN)
+        self._locks[stripe].release()
+
+    @contextmanager
+    def hold(self, doc_ids: Iterable[str]) -> Iterator[None]:
+        """문서 ID들이 속한 스트라이프를 번호 순으로 잠금"""
+        stripes: List[int] = sorted({self.stripe_of(doc_id) for doc_id in doc_ids})
+        acquired: List[int] = []
+        contended, wait_seconds = 0, 0.0
+        try:
+            for stripe in stripes:
+                waited = self._acquire(stripe)
+                acquired.append(stripe)
+                if waited is not None:
+                    contended += 1
+                    wait_seconds += waited
+            with self._stats_lock:
+                self._stats["acquisitions"] += len(stripes)
+                self._stats["contended"] += contended
+                self._stats["wait_seconds"] += wait_seconds
+            yield
+        finally:
+            for stripe in reversed(acquired):
+                self._release(stripe)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 4)
+        stats["stripes"] = self.stripes
+        stats["cross_process"] = bool(self.lock_dir)
+        return stats
+
+
+# 모듈 레벨 싱글톤 인스턴스
+similarity_locks = StripedLock(lock_dir=SIMILARITY_LOCK_DIR)
@@ -0,0 +1,122 @@
+"""
+도메인 상주 메모리 관리(residency) 모듈
+조직 대부분은 작고 드물게 쓰이며 소수의 큰 조직만 자주 쓰이므로, 모든 도메인의 매칭 벡터와
+규칙 열을 계속 메모리에 두지 않고 바이트 예산(DOMAIN_INDEX_MEMORY_BUDGET) 안에서
+최근에 쓰인 도메인만 힙에 유지 (LRU)
+
+- 도메인은 처음 요청될 때 로드되고, 요청될 때마다 최근 사용 순서가 갱신됨
+- 예산을 넘으면 가장 오래 쓰이지 않은 도메인부터 내보냄 (방금 요청된 도메인은 제외)
+- 어떻게 내보낼지(스냅샷 메모리 맵으로 전환 / 완전 해제)는 사용하는 쪽(core/domain_index)이 결정
+- 로드 / 적중 / 내보내기 횟수는 성능 요약(domain_index.residency)에서 확인
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+# 힙에 상주시킬 도메인 인덱스 총 바이트 예산 (0이면 제한 없음)
+DOMAIN_INDEX_MEMORY_BUDGET = int(os.getenv("DOMAIN_INDEX_MEMORY_BUDGET", "0"))
+
+
+class ResidencyManager:
+    """
+    도메인별 최근 사용 순서와 상주 메모리 추적
+
+    Args:
+        budget_bytes: 힙 상주 바이트 예산 (0이면 내보내지 않음)
+    """
+
+    def __init__(self, budget_bytes: int = DOMAIN_INDEX_MEMORY_BUDGET):
+        self.budget_bytes = max(0, budget_bytes)
+        # 도메인 → 마지막으로 측정한 힙 상주 바이트 (앞쪽일수록 오래 쓰이지 않음)
+        self._domains: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "loads": 0,
+            "hits": 0,
+            "evictions": 0,
+            "mapped_evictions": 0,
+            "evicted_bytes": 0,
+        }
+
+    def touch(self, domain: str, loaded: bool) -> None:
+        """
+        도메인 사용 기록
+
+        Args:
+            loaded: 이번 요청에서 새로 로드했으면 True (아니면 적중)
+        """
+        with self._lock:
+            self._stats["loads" if loaded else "hits"] += 1
+            self._domains[domain] = self._domains.get(domain, 0)
+            self._domains.move_to_end(domain)
+
+    def forget(self, domain: str) -> None:
+        """해제된 도메인 제거 (다음 요청은 새로 로드)"""
+        with self._lock:
+            self._domains.pop(domain, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._domains.clear()
+
+    def select_victims(self, sizes: Dict[str, int], protect: str = None) -> List[str]:
+        """
+        예산을 넘는 만큼 내보낼 도메인을 오래 쓰이지 않은 순서로 선택
+
+        Args:
+            sizes: 도메인 → 현재 힙 상주 바이트 (메모리 맵 열은 쓰기로 복사된 페이지만 포함)
+            protect: 내보내지 않을 도메인 (방금 요청된 도메인)
+
+        Returns:
+            내보낼 도메인 목록 (예산이 없거나 넘지 않으면 빈 목록)
+        """
+        with self._lock:
+            for domain in self._domains:
+                self._domains[domain] = sizes.get(domain, 0)
+            if not self.budget_bytes:
+                return []
+            total = sum(self._domains.values())
+            victims = []
+            for domain, size in self._domains.items():
+                if total <= self.budget_bytes:
+                    break
+                if domain == protect or size == 0:
+                    continue
+                victims.append(domain)
+                total -= size
+            return victims
+
+    def evicted(self, domain: str, size: int, mapped: bool, resident: int = 0) -> None:
+        """
+        내보내기 기록
+
+        Args:
+            size: 내보낸 힙 상주 바이트
+            mapped: 스냅샷 메모리 맵으로 전환했으면 True (완전 해제면 False)
+            resident: 메모리 맵으로 전환한 뒤에도 힙에 남은 바이트 (ID 목록 등)
+        """
+        with self._lock:
+            self._stats["evictions"] += 1
+            self._stats["evicted_bytes"] += size
+            if mapped:
+                self._stats["mapped_evictions"] += 1
+                self._domains[domain] = resident
+            else:
+                self._domains.pop(domain, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self._stats["loads"] + self._stats["hits"]
+            return {
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": sum(self._domains.values()),
+                "domains": len(self._domains),
+                **self._stats,
+                "hit_ratio": (
+                    round(self._stats["hits"] / requests, 4) if requests else None
+                ),
+                # 최근에 쓰인 도메인 (가장 최근이 앞)
+                "recent": list(reversed(self._domains))[:20],
+            }
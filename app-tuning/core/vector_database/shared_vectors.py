@@ -0,0 +1,97 @@
+"""
+공유 메모리 매칭 벡터 모듈
+도메인 인덱스 열(코드, 노름, 출력 버퍼)을 multiprocessing.shared_memory에 두어
+점수 계산 워커 프로세스가 피클링 없이 이름으로 붙어 읽고 쓸 수 있게 함
+
+워커 프로세스에서 실행되는 함수(score_partition)는 numpy와 코덱만 사용
+"""
+
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+
+# 워커가 유지하는 공유 메모리 연결 수 (인덱스 재할당 시 이전 블록은 닫힘)
+_WORKER_ATTACH_LIMIT = 16
+
+# (이름, shape, dtype 문자열)
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+class SharedArray:
+    """
+    공유 메모리 블록 위의 numpy 배열 (생성한 프로세스가 해제 책임)
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype):
+        dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        self.array.fill(0)
+
+    @property
+    def spec(self) -> ArraySpec:
+        return (self._shm.name, self.array.shape, self.array.dtype.str)
+
+    def release(self) -> None:
+        # 배열 참조를 먼저 끊어야 버퍼를 닫을 수 있음
+        self.array = None
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            self._shm.close()
+        except BufferError:
+            # 아직 참조 중인 배열이 있으면 마지막 참조가 사라질 때 해제됨
+            pass
+
+
+# 워커 프로세스 측 연결 캐시: 이름 → SharedMemory
+_attached: "OrderedDict[str, shared_memory.SharedMemory]" = OrderedDict()
+
+
+def attach(spec: ArraySpec) -> np.ndarray:
+    """워커 프로세스에서 공유 배열에 연결 (연결은 캐시되어 재사용)"""
+    name, shape, dtype = spec
+    shm = _attached.get(name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+        while len(_attached) > _WORKER_ATTACH_LIMIT:
+            _, old = _attached.popitem(last=False)
+            try:
+                old.close()
+            except BufferError:
+                pass
+    else:
+        _attached.move_to_end(name)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def score_partition(
+    codec,
+    codes_spec: ArraySpec,
+    norms_spec: ArraySpec,
+    out_spec: ArraySpec,
+    query: np.ndarray,
+    start: int,
+    stop: int,
+) -> int:
+    """
+    [start, stop) 행의 코사인 유사도를 계산하여 공유 출력 버퍼에 기록
+
+    Returns:
+        처리한 행 수
+    """
+    codes = attach(codes_spec)
+    norms = attach(norms_spec)
+    out = attach(out_spec)
+
+    dots = codec.dot(query, codes[start:stop])
+    denominators = norms[start:stop] * np.float32(np.linalg.norm(query))
+    denominators[denominators == 0] = 1.0
+    out[start:stop] = dots / denominators
+    return stop - start
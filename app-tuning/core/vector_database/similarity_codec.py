@@ -0,0 +1,256 @@
+"""
+유사도 목록 압축 포맷 모듈
+similarity_collection 메타데이터의 유사도 목록을 점수 내림차순으로 미리 정렬된
+병렬 배열(uint32 userId + uint16 양자화 점수)로 저장하고 읽는 기능 제공
+
+저장 필드:
+- sim_format: 포맷 버전 ("packed-v1")
+- sim_count: 저장된 유사도 개수
+- sim_ids: uint32 little-endian userId 배열 (base64)
+- sim_scores: uint16 little-endian 양자화 점수 배열 (base64)
+- sim_component_names: 점수 구성요소 이름 목록 (쉼표 구분, 없으면 빈 문자열)
+- sim_components: uint16 양자화 구성요소 행렬 (sim_count × 구성요소 수, 행 우선, base64)
+
+기존 JSON 맵("similarities")도 그대로 읽을 수 있으며,
+상위 K개 조회는 base64 앞부분만 디코딩하는 슬라이스로 처리 (전체 파싱/정렬 없음)
+"""
+
+import base64
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SIMILARITY_FORMAT = "packed-v1"
+LEGACY_SIMILARITY_KEY = "similarities"
+
+# 점수 양자화 범위 (최종 점수 = 0.7 * 코사인[-1, 1] + 0.3 * 규칙[0, 1])
+SCORE_MIN = -1.0
+SCORE_MAX = 1.0
+_QUANT_LEVELS = np.iinfo(np.uint16).max
+
+_ID_DTYPE = np.dtype("<u4")
+_SCORE_DTYPE = np.dtype("<u2")
+
+# 구성요소 값이 없는 쌍(변환 전 데이터 등)을 표시하는 예약 코드
+_COMPONENT_MISSING = np.iinfo(np.uint16).max
+_COMPONENT_LEVELS = _COMPONENT_MISSING - 1
+
+
+def quantize_scores(scores) -> np.ndarray:
+    """float 점수를 uint16 코드로 양자화"""
+    scores = np.clip(np.asarray(scores, dtype=np.float64), SCORE_MIN, SCORE_MAX)
+    codes = np.rint((scores - SCORE_MIN) / (SCORE_MAX - SCORE_MIN) * _QUANT_LEVELS)
+    return codes.astype(_SCORE_DTYPE)
+
+
+def dequantize_scores(codes) -> np.ndarray:
+    """uint16 코드를 float 점수로 복원"""
+    codes = np.asarray(codes, dtype=np.float64)
+    return codes / _QUANT_LEVELS * (SCORE_MAX - SCORE_MIN) + SCORE_MIN
+
+
+def quantize_components(values) -> np.ndarray:
+    """구성요소 점수를 uint16 코드로 양자화 (NaN은 예약 코드로 저장)"""
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    clipped = np.clip(np.nan_to_num(values), SCORE_MIN, SCORE_MAX)
+    codes = np.rint((clipped - SCORE_MIN) / (SCORE_MAX - SCORE_MIN) * _COMPONENT_LEVELS)
+    codes[missing] = _COMPONENT_MISSING
+    return codes.astype(_SCORE_DTYPE)
+
+
+def dequantize_components(codes) -> np.ndarray:
+    """uint16 코드를 구성요소 점수로 복원 (예약 코드는 NaN)"""
+    codes = np.asarray(codes)
+    values = codes.astype(np.float64) / _COMPONENT_LEVELS * (SCORE_MAX - SCORE_MIN)
+    values += SCORE_MIN
+    values[codes == _COMPONENT_MISSING] = np.nan
+    return values
+
+
+def same_score(a: float, b: float) -> bool:
+    """두 점수가 같은 양자화 코드로 저장되는지 여부"""
+    return bool(quantize_scores([a])[0] == quantize_scores([b])[0])
+
+
+def is_packed(metadata: dict) -> bool:
+    return bool(metadata) and metadata.get("sim_format") == SIMILARITY_FORMAT
+
+
+def encode_similarities(
+    similarities: Dict[str, float],
+    components: Optional[Dict[str, Sequence[float]]] = None,
+    component_names: Optional[Sequence[str]] = None,
+) -> dict:
+    """
+    유사도 맵을 점수 내림차순으로 정렬된 압축 메타데이터 필드로 변환
+
+    Args:
+        similarities: {userId: 점수} 맵
+        components: {userId: 구성요소 점수 목록} 맵 (선택, 일부 누락 허용)
+        component_names: 구성요소 이름 목록 (components 사용 시 필수)
+
+    Returns:
+        similarity_collection 메타데이터에 병합할 필드 딕셔너리
+        (기존 JSON 필드는 빈 문자열로 덮어써 공간 회수)
+    """
+    keys = [str(k) for k in similarities.keys()]
+    ids = np.fromiter((int(k) for k in keys), dtype=_ID_DTYPE, count=len(keys))
+    codes = quantize_scores(list(similarities.values()))
+
+    # 점수 내림차순, 동점이면 userId 오름차순
+    order = np.lexsort((ids, -codes.astype(np.int64)))
+    ids, codes = ids[order], codes[order]
+
+    fields = {
+        LEGACY_SIMILARITY_KEY: "",
+        "sim_format": SIMILARITY_FORMAT,
+        "sim_count": int(len(ids)),
+        "sim_ids": base64.b64encode(ids.tobytes()).decode("ascii"),
+        "sim_scores": base64.b64encode(codes.tobytes()).decode("ascii"),
+        # upsert는 메타데이터를 병합하므로 구성요소가 없을 때도 명시적으로 비움
+        "sim_component_names": "",
+        "sim_components": "",
+    }
+
+    if components and component_names:
+        matrix = np.full((len(keys), len(component_names)), np.nan)
+        for row, key in enumerate(keys):
+            values = components.get(key)
+            if values is not None:
+                matrix[row] = values
+        matrix = quantize_components(matrix[order])
+        fields["sim_component_names"] = ",".join(component_names)
+        fields["sim_components"] = base64.b64encode(matrix.tobytes()).decode("ascii")
+
+    return fields
+
+
+def _decode_prefix(encoded: str, dtype: np.dtype, count: int) -> np.ndarray:
+    """base64 문자열에서 앞쪽 count개 원소에 해당하는 부분만 디코딩"""
+    needed_bytes = count * dtype.itemsize
+    needed_chars = min(len(encoded), -(-needed_bytes // 3) * 4)
+    raw = base64.b64decode(encoded[:needed_chars])
+    return np.frombuffer(raw[:needed_bytes], dtype=dtype)
+
+
+def decode_packed_arrays(
+    metadata: dict, top_k: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    압축 포맷에서 (userId 배열, 양자화 점수 배열) 반환
+
+    Args:
+        metadata: similarity_collection 메타데이터
+        top_k: 앞에서부터 읽을 개수 (None이면 전체)
+    """
+    count = int(metadata.get("sim_count", 0))
+    if top_k is not None:
+        count = min(count, max(int(top_k), 0))
+    if count == 0:
+        return np.empty(0, dtype=_ID_DTYPE), np.empty(0, dtype=_SCORE_DTYPE)
+
+    ids = _decode_prefix(metadata["sim_ids"], _ID_DTYPE, count)
+    codes = _decode_prefix(metadata["sim_scores"], _SCORE_DTYPE, count)
+    return ids, codes
+
+
+def component_names_of(metadata: dict) -> List[str]:
+    """저장된 구성요소 이름 목록 (없으면 빈 리스트)"""
+    if not is_packed(metadata) or not metadata.get("sim_components"):
+        return []
+    return [name for name in metadata.get("sim_component_names", "").split(",") if name]
+
+
+def decode_component_matrix(
+    metadata: dict, top_k: Optional[int] = None
+) -> Tuple[List[str], np.ndarray]:
+    """
+    압축 포맷에서 (구성요소 이름 목록, 구성요소 행렬) 반환
+    행 순서는 decode_packed_arrays의 userId 순서와 동일, 누락 값은 NaN
+
+    Args:
+        metadata: similarity_collection 메타데이터
+        top_k: 앞에서부터 읽을 개수 (None이면 전체)
+    """
+    names = component_names_of(metadata)
+    count = int(metadata.get("sim_count", 0)) if names else 0
+    if top_k is not None:
+        count = min(count, max(int(top_k), 0))
+    if count == 0:
+        return names, np.empty((0, len(names)))
+
+    codes = _decode_prefix(metadata["sim_components"], _SCORE_DTYPE, count * len(names))
+    return names, dequantize_components(codes.reshape(count, len(names)))
+
+
+def decode_components(metadata: dict) -> Dict[str, List[float]]:
+    """
+    메타데이터에서 {userId: 구성요소 점수 목록} 맵 복원
+    (구성요소가 저장되지 않았거나 누락된 쌍은 제외)
+    """
+    if not metadata or not component_names_of(metadata):
+        return {}
+
+    ids, _ = decode_packed_arrays(metadata)
+    _, matrix = decode_component_matrix(metadata)
+    matrix = np.round(matrix, 6)
+    return {
+        str(uid): row
+        for uid, row in zip(ids.tolist(), matrix.tolist())
+        if not any(np.isnan(row))
+    }
+
+
+def _decode_legacy(metadata: dict) -> Dict[str, float]:
+    similarity_map = json.loads(metadata.get(LEGACY_SIMILARITY_KEY) or "{}")
+    return {str(k): float(v) for k, v in similarity_map.items()}
+
+
+def decode_similarities(metadata: dict) -> Dict[str, float]:
+    """
+    메타데이터에서 전체 유사도 맵 복원 (압축 / 기존 JSON 포맷 모두 지원)
+
+    Raises:
+        ValueError, json.JSONDecodeError: 데이터가 손상된 경우
+    """
+    if not metadata:
+        return {}
+    if not is_packed(metadata):
+        return _decode_legacy(metadata)
+
+    ids, codes = decode_packed_arrays(metadata)
+    scores = np.round(dequantize_scores(codes), 6)
+    return {str(uid): float(score) for uid, score in zip(ids.tolist(), scores.tolist())}
+
+
+def top_similarities(metadata: dict, top_k: int) -> List[Tuple[str, float]]:
+    """
+    점수 상위 top_k개의 (userId, 점수) 목록 반환
+    압축 포맷은 정렬된 상태로 저장되어 있으므로 앞부분 슬라이스만 디코딩
+    """
+    if not metadata:
+        return []
+    if not is_packed(metadata):
+        # 기존 JSON 포맷: 전체 파싱 후 정렬
+        similarities = _decode_legacy(metadata)
+        return sorted(similarities.items(), key=lambda x: x[1], reverse=True)[:top_k]
+
+    ids, codes = decode_packed_arrays(metadata, top_k)
+    scores = np.round(dequantize_scores(codes), 6)
+    return [
+        (str(uid), float(score)) for uid, score in zip(ids.tolist(), scores.tolist())
+    ]
+
+
+def convert_metadata(metadata: dict) -> dict:
+    """
+    기존 JSON 맵 메타데이터를 압축 포맷으로 변환한 메타데이터 반환
+    (이미 압축 포맷이면 그대로 반환)
+    """
+    if is_packed(metadata):
+        return metadata
+    converted = dict(metadata)
+    converted.update(encode_similarities(_decode_legacy(metadata)))
+    return converted
@@ -3,6 +3,13 @@ import json
 from fastapi import HTTPException
 
 from .collections import get_similarity_collection
+from .document_locks import similarity_locks
+from .similarity_codec import (
+    component_names_of,
+    decode_components,
+    decode_similarities,
+    encode_similarities,
+)
 
 
 def clean_up_similarity(user_id: int) -> int:
@@ -29,28 +36,40 @@ def clean_up_similarity(user_id: int) -> int:
             return 0
 
         for doc_id, metadata in zip(ids, metadatas):
-            similarities_json = metadata.get("similarities")
-            if not similarities_json:
-                continue
-
             try:
-                similarities = json.loads(similarities_json)
-            except json.JSONDecodeError:
-                print(f"⚠️ ID '{doc_id}' - similarities JSON 파싱 실패")
+                similarities = decode_similarities(metadata)
+            except (ValueError, TypeError, json.JSONDecodeError):
+                print(f"⚠️ ID '{doc_id}' - similarities 파싱 실패")
                 continue
 
             if user_id_str not in similarities:
                 continue
 
-            # user_id 제거 후 업데이트
-            similarities.pop(user_id_str)
-            metadata["similarities"] = json.dumps(similarities)
-
-            try:
-                collection.update(ids=[doc_id], metadatas=[metadata])
-                updates_made += 1
-            except Exception as update_err:
-                print(f"❌ ID '{doc_id}' 업데이트 실패: {update_err}")
+            # 동시 역방향 갱신과 겹치지 않도록 문서를 잠그고 최신 내용을 다시 읽어 수정
+            with similarity_locks.hold([doc_id]):
+                latest = collection.get(ids=[doc_id], include=["metadatas"])
+                if not latest.get("metadatas"):
+                    continue
+                metadata = latest["metadatas"][0]
+                similarities = decode_similarities(metadata)
+                if user_id_str not in similarities:
+                    continue
+
+                # user_id 제거 후 업데이트 (저장된 점수 구성요소는 유지)
+                similarities.pop(user_id_str)
+                components = decode_components(metadata)
+                components.pop(user_id_str, None)
+                metadata.update(
+                    encode_similarities(
+                        similarities, components, component_names_of(metadata)
+                    )
+                )
+
+                try:
+                    collection.update(ids=[doc_id], metadatas=[metadata])
+                    updates_made += 1
+                except Exception as update_err:
+                    print(f"❌ ID '{doc_id}' 업데이트 실패: {update_err}")
 
         print(f"✅ 총 {updates_made}개의 유사도 정보에서 user_id '{user_id}' 제거 완료")
         return updates_made
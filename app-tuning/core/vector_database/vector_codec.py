@@ -0,0 +1,278 @@
+"""
+매칭 벡터 압축 저장 코덱 모듈
+메모리에 상주하는 매칭 벡터를 압축된 코드로 보관하고,
+질의 벡터는 float32 그대로 두고 코드와 직접 내적을 계산 (비대칭 거리 계산, ADC)
+
+지원 코덱 (MATCHING_VECTOR_CODEC):
+- float32: 압축 없음 (기준 경로)
+- float16: 2배 축소
+- int8: 벡터별 스케일을 둔 8bit 양자화, 4배 축소
+- pq: 곱 양자화(Product Quantization), 부분공간당 1byte, 768차원 기준 16배 축소
+
+코사인 계산용 원본 벡터 노름은 모든 코덱에서 float32로 별도 보관
+"""
+
+import os
+from typing import Dict, Optional, Type
+
+import numpy as np
+
+# PQ 부분공간 수 (벡터당 코드 바이트 수)
+PQ_SUBSPACES = int(os.getenv("MATCHING_PQ_SUBSPACES", "192"))
+# PQ 코드북 학습에 사용할 최대 벡터 수
+PQ_TRAIN_SAMPLES = int(os.getenv("MATCHING_PQ_TRAIN_SAMPLES", "4096"))
+# ADC 계산 시 한 번에 처리할 행 수 (임시 행렬 메모리 제한)
+ADC_CHUNK_ROWS = 16384
+
+
+class VectorCodec:
+    """
+    벡터 코덱 기본 클래스 (float32, 압축 없음)
+    """
+
+    name = "float32"
+    dtype = np.float32
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    @property
+    def trained(self) -> bool:
+        return True
+
+    def fit(self, vectors: np.ndarray) -> "VectorCodec":
+        return self
+
+    def empty(self, rows: int) -> np.ndarray:
+        """rows개 벡터를 담을 코드 배열"""
+        return np.zeros((rows, self.code_width), dtype=self.dtype)
+
+    @property
+    def code_width(self) -> int:
+        return self.dim
+
+    def bytes_per_vector(self) -> int:
+        return self.code_width * np.dtype(self.dtype).itemsize
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=self.dtype)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return np.asarray(codes, dtype=np.float32)
+
+    def dot(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """float32 질의 벡터와 코드 간 내적"""
+        return codes.astype(np.float32, copy=False) @ query.astype(np.float32)
+
+
+class Float16Codec(VectorCodec):
+    name = "float16"
+    dtype = np.float16
+
+    def dot(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        # 청크 단위로 float32 변환하여 임시 메모리 제한
+        query = query.astype(np.float32)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), ADC_CHUNK_ROWS):
+            chunk = codes[start : start + ADC_CHUNK_ROWS]
+            out[start : start + len(chunk)] = chunk.astype(np.float32) @ query
+        return out
+
+
+class Int8Codec(VectorCodec):
+    """
+    벡터별 스케일(max|x| / 127)을 둔 대칭 8bit 양자화
+    코드 마지막 4byte에 float32 스케일을 함께 저장
+    """
+
+    name = "int8"
+    dtype = np.int8
+
+    @property
+    def code_width(self) -> int:
+        return self.dim + 4
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+
+        codes = self.empty(len(vectors))
+        codes[:, : self.dim] = np.round(vectors / scales[:, None]).astype(np.int8)
+        codes[:, self.dim :] = scales.astype(np.float32).view(np.int8).reshape(-1, 4)
+        return codes
+
+    def _scales(self, codes: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(codes[:, self.dim :]).view(np.float32).ravel()
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        codes = np.atleast_2d(codes)
+        return codes[:, : self.dim].astype(np.float32) * self._scales(codes)[:, None]
+
+    def dot(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        query = query.astype(np.float32)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), ADC_CHUNK_ROWS):
+            chunk = codes[start : start + ADC_CHUNK_ROWS]
+            out[start : start + len(chunk)] = (
+                chunk[:, : self.dim].astype(np.float32) @ query
+            ) * self._scales(chunk)
+        return out
+
+
+class PQCodec(VectorCodec):
+    """
+    곱 양자화 코덱
+    벡터를 subspaces개 부분공간으로 나누고 부분공간마다 256개 중심점 중 하나의 번호(1byte)로 저장
+    내적은 질의 벡터와 중심점 간 내적 테이블을 만든 뒤 코드로 조회하여 합산 (ADC)
+    """
+
+    name = "pq"
+    dtype = np.uint8
+
+    def __init__(self, dim: int, subspaces: int = PQ_SUBSPACES):
+        super().__init__(dim)
+        # 차원을 나누어떨어지게 하는 가장 큰 부분공간 수 선택
+        subspaces = max(1, min(subspaces, dim))
+        while dim % subspaces:
+            subspaces -= 1
+        self.subspaces = subspaces
+        self.sub_dim = dim // subspaces
+        self.codebooks: Optional[np.ndarray] = None  # (subspaces, 256, sub_dim)
+
+    @property
+    def trained(self) -> bool:
+        return self.codebooks is not None
+
+    @property
+    def code_width(self) -> int:
+        return self.subspaces
+
+    def fit(self, vectors: np.ndarray) -> "PQCodec":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rng = np.random.default_rng(0)
+        if len(vectors) > PQ_TRAIN_SAMPLES:
+            vectors = vectors[rng.choice(len(vectors), PQ_TRAIN_SAMPLES, replace=False)]
+
+        codebooks = np.zeros((self.subspaces, 256, self.sub_dim), dtype=np.float32)
+        for s in range(self.subspaces):
+            sub = vectors[:, s * self.sub_dim : (s + 1) * self.sub_dim]
+            codebooks[s] = _kmeans(sub, 256, rng)
+        self.codebooks = codebooks
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        if not self.trained:
+            raise RuntimeError("PQ 코덱이 학습되지 않았습니다.")
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        codes = self.empty(len(vectors))
+        for s in range(self.subspaces):
+            sub = vectors[:, s * self.sub_dim : (s + 1) * self.sub_dim]
+            codes[:, s] = _nearest(sub, self.codebooks[s])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        codes = np.atleast_2d(codes)
+        parts = [self.codebooks[s][codes[:, s]] for s in range(self.subspaces)]
+        return np.hstack(parts)
+
+    def dot(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        query = query.astype(np.float32).reshape(self.subspaces, self.sub_dim)
+        # (subspaces, 256) 질의-중심점 내적 테이블
+        table = np.einsum("skd,sd->sk", self.codebooks, query)
+        rows = np.arange(self.subspaces)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), ADC_CHUNK_ROWS):
+            chunk = codes[start : start + ADC_CHUNK_ROWS]
+            out[start : start + len(chunk)] = table[rows, chunk].sum(axis=1)
+        return out
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # |x - c|^2 = |x|^2 - 2x·c + |c|^2 (|x|^2는 argmin에 무관)
+    distances = (centroids**2).sum(axis=1)[None, :] - 2 * vectors @ centroids.T
+    return distances.argmin(axis=1)
+
+
+def _kmeans(
+    vectors: np.ndarray, clusters: int, rng: np.random.Generator, iterations: int = 20
+) -> np.ndarray:
+    """
+    부분공간 코드북 학습용 Lloyd k-means
+    샘플이 clusters개보다 적으면 남는 중심점은 첫 중심점으로 채움 (선택되지 않음)
+    """
+    count = min(clusters, len(vectors))
+    centroids = np.empty((clusters, vectors.shape[1]), dtype=np.float32)
+    centroids[:count] = vectors[rng.choice(len(vectors), count, replace=False)]
+
+    for _ in range(iterations):
+        labels = _nearest(vectors, centroids[:count])
+        sums = np.stack(
+            [
+                np.bincount(labels, weights=vectors[:, d], minlength=count)
+                for d in range(vectors.shape[1])
+            ],
+            axis=1,
+        )
+        sizes = np.bincount(labels, minlength=count)
+        filled = sizes > 0
+        # 비어 있는 중심점은 이전 위치 유지
+        centroids[:count][filled] = sums[filled] / sizes[filled, None]
+
+    centroids[count:] = centroids[0]
+    return centroids
+
+
+CODECS: Dict[str, Type[VectorCodec]] = {
+    codec.name: codec for codec in (VectorCodec, Float16Codec, Int8Codec, PQCodec)
+}
+
+
+def get_codec(name: str, dim: int) -> VectorCodec:
+    """이름으로 코덱 생성 (알 수 없는 이름이면 ValueError)"""
+    if name not in CODECS:
+        raise ValueError(f"지원하지 않는 벡터 코덱입니다: {name} ({', '.join(CODECS)})")
+    return CODECS[name](dim)
+
+
+def evaluate_codec(
+    vectors: np.ndarray, codec: VectorCodec, queries: int = 200, top_k: int = 100
+) -> Dict[str, object]:
+    """
+    float32 기준 경로 대비 코덱의 코사인 오차와 상위 K개 재현율 측정
+
+    Args:
+        vectors: (N, D) 매칭 벡터 (한 도메인)
+        codec: 평가할 코덱 (PQ는 학습된 상태)
+        queries: 평가할 기준 사용자 수
+        top_k: 비교할 상위 목록 길이
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    codes = codec.encode(vectors)
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1.0
+
+    errors, recalls = [], []
+    for row in range(min(queries, len(vectors))):
+        query = vectors[row]
+        exact = (vectors @ query) / (norms * norms[row])
+        approx = codec.dot(query, codes) / (norms * norms[row])
+        exact[row] = approx[row] = -np.inf  # 자기 자신 제외
+
+        k = min(top_k, len(vectors) - 1)
+        exact_top = np.argpartition(-exact, k - 1)[:k] if k else []
+        approx_top = np.argpartition(-approx, k - 1)[:k] if k else []
+        if k:
+            recalls.append(len(np.intersect1d(exact_top, approx_top)) / k)
+
+        mask = np.isfinite(exact)
+        errors.append(np.abs(exact[mask] - approx[mask]).max() if mask.any() else 0)
+
+    return {
+        "codec": codec.name,
+        "bytes_per_vector": codec.bytes_per_vector(),
+        "compression": round(vectors.shape[1] * 4 / codec.bytes_per_vector(), 2),
+        "max_abs_error": round(float(np.max(errors)), 6) if errors else 0,
+        "mean_max_abs_error": round(float(np.mean(errors)), 6) if errors else 0,
+        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else None,
+    }
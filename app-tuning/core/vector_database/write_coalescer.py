@@ -0,0 +1,200 @@
+"""
+Chroma 쓰기 병합(coalescing) 모듈
+짧은 시간 안에 여러 요청이 같은 문서를 갱신하면 문서 ID별로 작업을 모아 두었다가
+한 번의 일괄 쓰기로 반영하여 쓰기 증폭을 줄임
+
+- 첫 작업이 들어온 뒤 window초가 지나거나 대기 문서 수가 max_documents에 도달하면 반영
+- 종료 시 flush()/shutdown()으로 남은 작업 강제 반영
+- 호출자는 submit()이 돌려준 Future로 자신의 작업이 반영될 때까지 기다릴 수 있음
+
+실제 쓰기는 생성 시 전달하는 writer(operations, domains)가 수행
+(operations: 문서 ID → 순서가 유지된 작업 목록)
+merge(pending, incoming)를 전달하면 같은 문서에 쌓인 작업을 들어올 때마다 하나로 압축
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+Writer = Callable[["OrderedDict[str, List[Any]]", Dict[str, Optional[str]]], None]
+Merger = Callable[[List[Any], List[Any]], List[Any]]
+
+
+class WriteCoalescer:
+    """
+    문서 ID 단위 쓰기 병합 버퍼
+
+    Args:
+        writer: 문서별 작업을 한 번에 반영하는 함수
+        window: 첫 작업 이후 다른 작업을 모으는 시간 (초, 0이면 비활성)
+        max_documents: 대기 문서 수 상한 (도달 시 즉시 반영)
+        merge: 같은 문서의 대기 작업과 새 작업을 합치는 함수 (없으면 이어 붙임)
+        name: 스레드/통계용 이름
+    """
+
+    def __init__(
+        self,
+        writer: Writer,
+        window: float,
+        max_documents: int,
+        merge: Optional[Merger] = None,
+        name: str = "write-coalescer",
+    ):
+        self.writer = writer
+        self.merge = merge
+        self.window = window
+        self.max_documents = max_documents
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._domains: Dict[str, Optional[str]] = {}
+        self._futures: List[Future] = []
+        self._first_at: Optional[float] = None
+        # 반영은 한 번에 하나씩 (순서 보장)
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._stats = {
+            "submitted_operations": 0,
+            "submissions": 0,
+            "flushes": 0,
+            "written_documents": 0,
+            "forced_flushes": 0,
+            "errors": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        # 종료 후에는 호출 측이 직접 쓰기 경로를 사용
+        return self.window > 0 and not self._stopping
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def submit(
+        self,
+        operations: Dict[str, List[Any]],
+        domains: Dict[str, Optional[str]],
+    ) -> Future:
+        """
+        문서별 작업을 버퍼에 추가
+
+        Returns:
+            해당 작업이 포함된 반영이 끝나면 완료되는 Future
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._stopping:
+                raise RuntimeError(f"{self.name}가 종료되었습니다.")
+            for doc_id, ops in operations.items():
+                ops = list(ops)
+                self._stats["submitted_operations"] += len(ops)
+                pending = self._pending.get(doc_id)
+                if pending is None:
+                    self._pending[doc_id] = ops
+                elif self.merge is not None:
+                    self._pending[doc_id] = self.merge(pending, ops)
+                else:
+                    pending.extend(ops)
+            self._domains.update(domains)
+            self._futures.append(future)
+            self._stats["submissions"] += 1
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+            full = len(self._pending) >= self.max_documents
+            self._ensure_thread()
+
+        if full:
+            with self._lock:
+                self._stats["forced_flushes"] += 1
+            self.flush()
+        else:
+            self._wakeup.set()
+        return future
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+            domains, self._domains = self._domains, {}
+            futures, self._futures = self._futures, []
+            self._first_at = None
+        return pending, domains, futures
+
+    def flush(self) -> int:
+        """버퍼의 작업을 즉시 반영
+
+        Returns:
+            반영한 문서 수
+        """
+        with self._flush_lock:
+            pending, domains, futures = self._take()
+            if not pending:
+                for future in futures:
+                    future.set_result(0)
+                return 0
+            try:
+                self.writer(pending, domains)
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                for future in futures:
+                    future.set_exception(e)
+                return 0
+
+            with self._lock:
+                self._stats["flushes"] += 1
+                self._stats["written_documents"] += len(pending)
+            for future in futures:
+                future.set_result(len(pending))
+            return len(pending)
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                if self._stopping and not self._pending:
+                    return
+                first_at = self._first_at
+            if first_at is None:
+                continue
+
+            # 첫 작업 기준 window가 지날 때까지 다른 요청의 작업을 더 모음
+            remaining = self.window - (time.monotonic() - first_at)
+            if remaining > 0:
+                time.sleep(remaining)
+            try:
+                self.flush()
+            except Exception:
+                pass  # 오류는 Future로 호출자에게 전달됨
+
+    def shutdown(self) -> None:
+        """남은 작업을 반영하고 반영 스레드 종료"""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self.flush()
+        self._wakeup.set()
+        if thread is not None:
+            thread.join(timeout=5)
+        self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending_documents"] = len(self._pending)
+        stats["window_ms"] = round(self.window * 1000, 1)
+        if stats["written_documents"]:
+            stats["operations_per_document"] = round(
+                stats["submitted_operations"] / stats["written_documents"], 2
+            )
+        return stats
@@ -0,0 +1,128 @@
+"""
+조직(emailDomain)별 매칭 가중치 프로필 모듈
+저장된 점수 구성요소(코사인 + 규칙 세부 점수)에 가중치를 적용해
+임베딩/규칙 재계산 없이 최종 점수를 다시 만드는 기능 제공
+
+MATCHING_WEIGHT_PROFILES 환경변수(JSON)로 도메인별 가중치 지정 가능
+예: {"kakaotech.com": {"embedding": 0.6, "rule": 0.4, "rule_components": {"mbti": 0.4}}}
+(지정하지 않은 값은 기본 가중치 사용)
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from core.matching_score_optimized import (
+    EMBEDDING_WEIGHT,
+    RULE_COMPONENT_WEIGHTS,
+    RULE_WEIGHT,
+    SCORE_COMPONENTS,
+    blend_scores,
+)
+from core.vector_database.similarity_codec import (
+    decode_component_matrix,
+    decode_packed_arrays,
+    dequantize_scores,
+    is_packed,
+)
+from utils import logger
+
+
+def _build_profile(raw: dict) -> dict:
+    """환경변수 JSON 항목을 blend_scores 인자 형태로 변환"""
+    rule_components = dict(RULE_COMPONENT_WEIGHTS)
+    for name, weight in (raw.get("rule_components") or {}).items():
+        if name not in rule_components:
+            raise ValueError(f"알 수 없는 규칙 구성요소: {name}")
+        rule_components[name] = float(weight)
+
+    return {
+        "embedding_weight": float(raw.get("embedding", EMBEDDING_WEIGHT)),
+        "rule_weight": float(raw.get("rule", RULE_WEIGHT)),
+        "rule_component_weights": rule_components,
+    }
+
+
+def profile_signature(profile: dict) -> str:
+    """가중치 프로필 식별자 (저장된 점수가 어떤 가중치로 계산되었는지 기록용)"""
+    encoded = json.dumps(profile, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def _load_profiles() -> Dict[str, dict]:
+    raw = os.getenv("MATCHING_WEIGHT_PROFILES", "")
+    if not raw:
+        return {}
+    try:
+        return {
+            domain: _build_profile(value) for domain, value in json.loads(raw).items()
+        }
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.logger.error(
+            f"WEIGHT-PROFILE: invalid MATCHING_WEIGHT_PROFILES [error={e}]"
+        )
+        return {}
+
+
+DEFAULT_PROFILE = _build_profile({})
+WEIGHT_PROFILES = _load_profiles()
+
+
+def get_weight_profile(domain: Optional[str]) -> dict:
+    """도메인에 적용할 가중치 프로필 반환 (없으면 기본 프로필)"""
+    return WEIGHT_PROFILES.get(domain, DEFAULT_PROFILE)
+
+
+def reblend_map(
+    similarities: Dict[str, float],
+    components: Dict[str, List[float]],
+    profile: dict,
+) -> Dict[str, float]:
+    """
+    구성요소가 있는 쌍의 점수를 주어진 프로필로 다시 계산한 유사도 맵 반환
+    (구성요소가 없는 쌍은 기존 점수 유지)
+    """
+    keys = [key for key in similarities if key in components]
+    if not keys:
+        return dict(similarities)
+
+    scores = blend_scores(np.array([components[key] for key in keys]), **profile)
+    reblended = dict(similarities)
+    reblended.update(zip(keys, scores.tolist()))
+    return reblended
+
+
+def reblend_top_similarities(
+    metadata: dict, profile: dict, top_k: int
+) -> List[Tuple[str, float]]:
+    """
+    저장된 구성요소에 프로필을 적용하여 점수 상위 top_k개 (userId, 점수) 반환
+    (읽기 시점 재가중치 - 저장 당시 가중치와 현재 프로필이 다를 때 사용)
+    """
+    ids, codes = decode_packed_arrays(metadata)
+    names, matrix = decode_component_matrix(metadata)
+    if names != SCORE_COMPONENTS:
+        raise ValueError(f"지원하지 않는 구성요소 목록: {names}")
+
+    scores = np.round(dequantize_scores(codes), 6)
+    has_components = ~np.isnan(matrix).any(axis=1)
+    if has_components.any():
+        scores[has_components] = blend_scores(matrix[has_components], **profile)
+
+    # 상위 top_k개만 부분 정렬
+    if top_k < len(scores):
+        candidates = np.argpartition(-scores, top_k)[:top_k]
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.lexsort((ids[candidates], -scores[candidates]))]
+    return [(str(ids[i]), float(scores[i])) for i in order.tolist()]
+
+
+def needs_reblend(metadata: dict, profile: dict) -> bool:
+    """저장된 점수가 현재 프로필과 다른 가중치로 계산되었는지 여부"""
+    if not is_packed(metadata) or not metadata.get("sim_components"):
+        return False
+    stored = metadata.get("sim_weight_profile") or profile_signature(DEFAULT_PROFILE)
+    return stored != profile_signature(profile)
@@ -0,0 +1,170 @@
+"""
+워커 간 도메인 변경 세대 카운터 모듈
+pre-fork 다중 워커 모드(core/prefork)에서 한 워커의 등록/수정/삭제를 다른 워커가 알 수 있도록
+fork 전에 만든 공유 카운터 배열을 도메인별로 증가시킴
+
+- 도메인은 crc32 해시로 슬롯에 매핑 (충돌 시 불필요한 갱신만 늘어남)
+- share()를 호출하지 않은 단일 프로세스 모드에서는 모든 동작이 no-op
+- journal_size가 있으면 변경된 사용자 ID를 공유 링 버퍼(저널)에 함께 기록하여,
+  다른 워커가 도메인 전체를 다시 읽지 않고 바뀐 사용자만 반영할 수 있게 함
+  (저널이 한 바퀴 넘게 밀렸거나 도메인 단위 변경이면 전체 다시 로드)
+"""
+
+import multiprocessing
+import os
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# 공유 카운터 슬롯 수
+GENERATION_SLOTS = 4096
+# 상주 인덱스 변경 저널 크기 (최근 변경 사용자 수, 0이면 저널 없이 세대만 공유)
+WORKER_CHANGE_JOURNAL_SIZE = int(os.getenv("WORKER_CHANGE_JOURNAL_SIZE", "65536"))
+# 저널 항목의 사용자 ID 최대 바이트 (더 긴 ID는 도메인 전체 다시 로드로 기록)
+JOURNAL_ID_BYTES = 64
+
+
+class DomainGenerations:
+    """
+    도메인별 변경 세대 (프로세스 간 공유)
+    """
+
+    def __init__(self, slots: int = GENERATION_SLOTS, journal_size: int = 0):
+        self.slots = slots
+        self.journal_size = journal_size
+        self._counters = None
+        # 저널: 전체 순번(head)과 항목별 (순번, 슬롯, 사용자 ID), 카운터 잠금으로 보호
+        self._head = None
+        self._journal_seq = None
+        self._journal_slot = None
+        self._journal_ids = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._counters is not None
+
+    def share(self) -> None:
+        """fork 전에 호출: 이후 fork된 워커들이 같은 카운터를 공유"""
+        if self._counters is None:
+            context = multiprocessing.get_context("fork")
+            self._counters = context.Array("q", self.slots)
+            if self.journal_size:
+                self._head = context.RawValue("q", 0)
+                self._journal_seq = context.RawArray("q", self.journal_size)
+                self._journal_slot = context.RawArray("i", self.journal_size)
+                self._journal_ids = context.RawArray(
+                    "c", self.journal_size * JOURNAL_ID_BYTES
+                )
+
+    def _slot(self, domain: Optional[str]) -> int:
+        return zlib.crc32(str(domain).encode("utf-8")) % self.slots
+
+    def current(self, domain: Optional[str]) -> int:
+        if self._counters is None:
+            return 0
+        return self._counters[self._slot(domain)]
+
+    def bump(self, domain: Optional[str]) -> Tuple[int, int]:
+        """
+        도메인 세대 증가
+
+        Returns:
+            (증가 전 세대, 증가 후 세대)
+        """
+        before, after, _ = self.record(domain)
+        return before, after
+
+    def record(
+        self, domain: Optional[str], user_ids: Optional[List[str]] = None
+    ) -> Tuple[int, int, int]:
+        """
+        도메인 세대 증가 + 변경 사용자 저널 기록 (같은 잠금 안에서 원자적으로)
+
+        Args:
+            domain: 변경된 도메인
+            user_ids: 변경된 사용자 ID (None이면 도메인 전체 변경으로 기록)
+
+        Returns:
+            (증가 전 세대, 증가 후 세대, 기록 후 저널 순번)
+        """
+        if self._counters is None:
+            return 0, 0, 0
+        slot = self._slot(domain)
+        with self._counters.get_lock():
+            before = self._counters[slot]
+            self._counters[slot] = before + 1
+            head = self._append(slot, user_ids)
+        return before, before + 1, head
+
+    def _append(self, slot: int, user_ids: Optional[List[str]]) -> int:
+        """저널에 항목 추가 (잠금 안에서 호출, 빈 ID는 도메인 전체 변경 표시)"""
+        if self._head is None:
+            return 0
+        encoded = [b""]
+        if user_ids is not None:
+            encoded = [str(user_id).encode("utf-8") for user_id in user_ids]
+            if any(len(raw) > JOURNAL_ID_BYTES for raw in encoded):
+                encoded = [b""]
+        head = self._head.value
+        for raw in encoded:
+            head += 1
+            i = head % self.journal_size
+            self._journal_seq[i] = head
+            self._journal_slot[i] = slot
+            offset = i * JOURNAL_ID_BYTES
+            self._journal_ids[offset : offset + JOURNAL_ID_BYTES] = raw.ljust(
+                JOURNAL_ID_BYTES, b"\0"
+            )
+        self._head.value = head
+        return head
+
+    def position(self, domain: Optional[str]) -> Tuple[int, int]:
+        """
+        도메인 세대와 저널 순번을 함께 읽음 (도메인을 새로 로드할 때의 기준점)
+
+        Returns:
+            (현재 세대, 현재 저널 순번)
+        """
+        if self._counters is None:
+            return 0, 0
+        with self._counters.get_lock():
+            head = self._head.value if self._head is not None else 0
+            return self._counters[self._slot(domain)], head
+
+    def changes_since(
+        self, domain: Optional[str], after: int
+    ) -> Optional[Tuple[List[str], int, int]]:
+        """
+        after 순번 이후 도메인에서 변경된 사용자 ID
+
+        Returns:
+            (사용자 ID 목록, 현재 저널 순번, 현재 세대),
+            저널이 없거나 밀려났거나 도메인 전체 변경이 있으면 None (전체 다시 로드 필요)
+        """
+        if self._counters is None or self._head is None:
+            return None
+        slot = self._slot(domain)
+        with self._counters.get_lock():
+            head = self._head.value
+            if head - after > self.journal_size:
+                return None
+            seqs = np.frombuffer(self._journal_seq, dtype=np.int64)
+            slots = np.frombuffer(self._journal_slot, dtype=np.int32)
+            rows = np.nonzero((seqs > after) & (slots == slot))[0]
+            ids = np.frombuffer(self._journal_ids, dtype=f"S{JOURNAL_ID_BYTES}")[rows]
+            generation = self._counters[slot]
+        if any(len(raw) == 0 for raw in ids):
+            return None
+        return [raw.decode("utf-8") for raw in ids], head, generation
+
+
+# 상주 도메인 인덱스 / 추천 캐시용 세대 (서로 다른 시점에 증가하므로 분리)
+index_generations = DomainGenerations(journal_size=WORKER_CHANGE_JOURNAL_SIZE)
+recommendation_generations = DomainGenerations()
+
+
+def share_across_workers() -> None:
+    """pre-fork 마스터에서 fork 직전에 호출"""
+    index_generations.share()
+    recommendation_generations.share()
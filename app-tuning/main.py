@@ -7,14 +7,27 @@
 
 import os
 
+from api.endpoints.change_feed_router import ChangeFeedRouter
+from api.endpoints.cluster_router import ClusterRouter
 from api.endpoints.health_router import HealthRouter
+from api.endpoints.metrics_router import MetricsRouter
 from api.endpoints.monitoring_router import PerformanceRouter
 from api.endpoints.tuning_router import TuningRouter
 from api.endpoints.user_router import UserRouter
+from core.change_feed import worker_sync_replica
+from core.domain_index import domain_indexes
+from core.embedding_migration import EMBEDDING_MIGRATION_AUTO, embedding_migration
+from core.parallel_scoring import parallel_scorer
+from core.prefork import is_primary_worker
+from core.similarity_write_queue import similarity_coalescer, similarity_write_queue
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import RedirectResponse
+from models.sbert_loader import start_model_loading
+from services.registration_job_service import registration_jobs
+from utils import logger
 from utils.error_handler import register_exception_handlers
+from utils.prometheus import RequestMetricsMiddleware
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
@@ -28,11 +41,57 @@ app = FastAPI(
 
 register_exception_handlers(app)  # 반드시 포함
 
+# 라우트별 요청 지연 기록 (/metrics의 tuning_http_request_duration_seconds)
+app.add_middleware(RequestMetricsMiddleware, record=logger.log_http_request)
+
 # 라우터 등록 - API를 기능별로 모듈화
 app.include_router(HealthRouter().router)
 app.include_router(UserRouter().router)
 app.include_router(TuningRouter().router)
 app.include_router(PerformanceRouter().router)
+app.include_router(ChangeFeedRouter().router)
+app.include_router(ClusterRouter().router)
+app.include_router(MetricsRouter().router)
+
+
+# 시작 시 임베딩 모델을 백그라운드에서 로드 (완료 전 /api/v1/health/ready와 임베딩 API는 503)
+# 도메인 인덱스 주기적 스냅샷, 유사도 쓰기 지연 큐 반영 스레드 시작 (이전 실행에서 남은 작업부터 반영)
+# EMBEDDING_MIGRATION_AUTO=true면 이전 버전 임베딩 재생성도 이어서 진행
+# CHANGE_FEED_SOURCE가 설정된 복제 노드는 변경 피드 반영 스레드 시작 (워커마다 인덱스를 가지므로 모든 워커)
+# (pre-fork 없이 uvicorn --workers N으로 실행하면 같은 서버의 피드 파일로 워커끼리 인덱스를 맞춤)
+# (pre-fork 다중 워커 모드에서는 스냅샷, 쓰기 큐 반영, 마이그레이션을 0번 워커만 실행)
+@app.on_event("startup")
+def startup_matching_resources():
+    start_model_loading()
+    replica = worker_sync_replica()
+    if replica is not None:
+        replica.start()
+    if not is_primary_worker():
+        return
+    domain_indexes.start_snapshots()
+    similarity_write_queue.start()
+    if EMBEDDING_MIGRATION_AUTO:
+        embedding_migration.start()
+
+
+# 종료 시 비동기 등록 작업 워커 종료
+@app.on_event("shutdown")
+async def shutdown_registration_jobs():
+    await registration_jobs.shutdown()
+
+
+# 종료 시 변경 피드 반영 중지, 남은 유사도 쓰기 반영, 점수 계산 워커 종료, 인덱스 스냅샷 저장 및 공유 메모리 해제
+@app.on_event("shutdown")
+def shutdown_matching_resources():
+    replica = worker_sync_replica()
+    if replica is not None:
+        replica.stop()
+    embedding_migration.stop()
+    similarity_coalescer.shutdown()
+    similarity_write_queue.stop(drain=True)
+    parallel_scorer.shutdown()
+    domain_indexes.stop_snapshots(save=is_primary_worker())
+    domain_indexes.clear()
 
 
 # 루트 경로 핸들러 - 개발 환경에서는 API 문서(Swagger)로 리다이렉트, 프로덕션에서는 접근 제한
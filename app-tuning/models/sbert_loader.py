@@ -5,10 +5,13 @@ SBERT 모델 로더 모듈
 """
 
 import os
+import threading
+import time
 from pathlib import Path
 
-import torch
-from sentence_transformers import SentenceTransformer
+from core.embedding_version import EMBEDDING_MODEL_NAME
+from core.inference_server import INFERENCE_SERVER_ADDRESS
+from utils import logger
 
 # import threading
 
@@ -74,8 +77,13 @@ from sentence_transformers import SentenceTransformer
 # ----- 2차 수정 코드 ----- #
 
 
-# 모듈 임포트 시점에 바로 모델 초기화
-def _load_model():
+# 모델 로드 + 예열 (추론 서버 프로세스도 이 함수로 로드)
+# pre-fork 마스터는 warmup=False로 로드 (fork 전에 torch 스레드 풀을 만들지 않도록)
+def load_model(warmup: bool = True):
+    # 원격 추론 모드의 API 워커는 torch를 import하지 않도록 로드 시점에 import
+    import torch
+    from sentence_transformers import SentenceTransformer
+
     # CPU 스레드 수 최적화 - 시스템의 모든 코어 활용
     torch.set_num_threads(max(1, os.cpu_count() // 2))  # 최소 1개는 사용하도록 보장
 
@@ -86,7 +94,8 @@ def _load_model():
 
     # 환경변수에서 모델 경로 가져오기
 
-    MODEL_NAME = "jhgan/ko-sbert-nli"
+    # 모델 교체 시 EMBEDDING_MODEL_NAME 변경 (기존 임베딩은 마이그레이션으로 재생성)
+    MODEL_NAME = EMBEDDING_MODEL_NAME
     MODEL_DIR_NAME = MODEL_NAME.replace("/", "-")
 
     # app-tuning 디렉토리 기준으로 고정
@@ -115,23 +124,157 @@ def _load_model():
         loaded_model = loaded_model.half().to("cuda")
 
     # 모델 예열 (첫 추론 시간 단축)
-    _ = loaded_model.encode("모델 예열용 텍스트")
+    if warmup:
+        _ = loaded_model.encode("모델 예열용 텍스트")
 
     return loaded_model
 
 
-# 모듈 레벨에서 모델 초기화
-model = _load_model()
+# 모듈 임포트 시점에는 모델을 로드하지 않음 (main import / 테스트 / 스크립트가 torch 로드를 기다리지 않도록)
+# API 서버는 시작 시 start_model_loading()으로 백그라운드 로드, 그 외에는 첫 get_model() 호출 시 로드
+model = None
+# 모델 로드 중 503 응답에 안내할 재시도 대기 시간 (초)
+MODEL_RETRY_AFTER_SECONDS = int(os.getenv("MODEL_RETRY_AFTER_SECONDS", "5"))
+# 로드 실패 시 재시도 대기 시간 (초, 실패할 때마다 두 배, 최대 MODEL_LOAD_RETRY_MAX_DELAY)
+# (원격 추론 모드에서 추론 서버보다 API가 먼저 뜬 경우 등)
+MODEL_LOAD_RETRY_BASE_DELAY = float(os.getenv("MODEL_LOAD_RETRY_BASE_DELAY", "2"))
+MODEL_LOAD_RETRY_MAX_DELAY = float(os.getenv("MODEL_LOAD_RETRY_MAX_DELAY", "60"))
+_model_lock = threading.Lock()
+_model_ready = threading.Event()
+# 로드 스레드의 첫 시도가 끝나면 설정 (get_model()은 재시도까지 기다리지 않음)
+_attempt_done = threading.Event()
+_model_thread = None
+_model_error = None
+_load_attempts = 0
+_next_retry_at = None
+_load_started_at = None
+_load_seconds = None
+
+
+def _create_model():
+    # INFERENCE_SERVER_ADDRESS가 설정되면 모델은 추론 서버 프로세스가 소유하고 여기서는 클라이언트만 생성
+    if INFERENCE_SERVER_ADDRESS:
+        from core.inference_client import RemoteEncoder
+
+        remote = RemoteEncoder(INFERENCE_SERVER_ADDRESS)
+        remote.get_sentence_embedding_dimension()  # 서버 연결 확인
+        logger.register_summary_provider("inference_client", remote.get_stats)
+        return remote
+    return load_model()
+
+
+def _load_in_background():
+    global model, _model_error, _load_attempts, _next_retry_at, _load_seconds
+    delay = MODEL_LOAD_RETRY_BASE_DELAY
+    # 성공할 때까지 지수 백오프로 재시도 (다른 로드 스레드로 교체되면 중단)
+    while _model_thread is threading.current_thread():
+        try:
+            loaded = _create_model()
+        except Exception as e:
+            with _model_lock:
+                _model_error = str(e)
+                _load_attempts += 1
+                _next_retry_at = time.monotonic() + delay
+            _attempt_done.set()
+            logger.logger.error(
+                f"[MODEL_LOAD_FAILED] {e} (attempt {_load_attempts}, retry in {delay:.0f}s)"
+            )
+            time.sleep(delay)
+            delay = min(delay * 2, MODEL_LOAD_RETRY_MAX_DELAY)
+            continue
+        with _model_lock:
+            model = loaded
+            _model_error = None
+            _next_retry_at = None
+            _load_seconds = round(time.monotonic() - _load_started_at, 3)
+        _model_ready.set()
+        _attempt_done.set()
+        return
+
+
+def start_model_loading() -> None:
+    """
+    백그라운드 스레드에서 모델 로드 시작 (이미 로드 중이거나 완료된 경우 무시)
+    실패하면 로드 스레드가 백오프하며 계속 재시도
+    """
+    global _model_thread, _model_error, _load_attempts, _load_started_at
+    with _model_lock:
+        if _model_ready.is_set() or (
+            _model_thread is not None and _model_thread.is_alive()
+        ):
+            return
+        _model_error = None
+        _load_attempts = 0
+        _attempt_done.clear()
+        _load_started_at = time.monotonic()
+        _model_thread = threading.Thread(
+            target=_load_in_background, name="sbert-model-loader", daemon=True
+        )
+        _model_thread.start()
+
+
+def preload_model() -> None:
+    """
+    pre-fork 마스터에서 fork 전에 예열 없이 동기 로드 (워커는 fork 후 get_model()로 바로 사용)
+    """
+    global model, _load_seconds
+    with _model_lock:
+        if _model_ready.is_set():
+            return
+        started = time.monotonic()
+        model = load_model(warmup=False)
+        _load_seconds = round(time.monotonic() - started, 3)
+    _model_ready.set()
+
+
+def is_model_ready() -> bool:
+    return _model_ready.is_set()
+
+
+def get_model_status() -> dict:
+    """준비 상태 확인(readiness)용 모델 로드 상태"""
+    with _model_lock:
+        if _model_ready.is_set():
+            status = "READY"
+        elif _model_error is not None:
+            status = "FAILED"
+        elif _model_thread is not None:
+            status = "LOADING"
+        else:
+            status = "NOT_STARTED"
+        result = {"status": status, "model": EMBEDDING_MODEL_NAME}
+        if INFERENCE_SERVER_ADDRESS:
+            result["inferenceServer"] = INFERENCE_SERVER_ADDRESS
+        if _load_seconds is not None:
+            result["loadSeconds"] = _load_seconds
+        elif status == "LOADING":
+            result["elapsedSeconds"] = round(time.monotonic() - _load_started_at, 3)
+        if _model_error is not None:
+            result["error"] = _model_error
+            result["attempts"] = _load_attempts
+            if _next_retry_at is not None:
+                result["retryInSeconds"] = round(
+                    max(0.0, _next_retry_at - time.monotonic()), 1
+                )
+    return result
 
 
 # 모델 인스턴스에 접근하기 위한 간단한 함수
 def get_model():
     """
-    초기화된 SBERT 모델 인스턴스 반환
+    초기화된 SBERT 모델 인스턴스 반환 (로드 전이면 로드가 끝날 때까지 대기)
 
     Returns:
-        SentenceTransformer: 초기화된 한국어 SBERT 모델 인스턴스
+        SentenceTransformer (원격 추론 모드에서는 같은 인터페이스의 RemoteEncoder)
+
+    Raises:
+        RuntimeError: 모델 로드 실패
     """
+    if not _model_ready.is_set():
+        start_model_loading()
+        _attempt_done.wait()
+        if not _model_ready.is_set():
+            raise RuntimeError(f"SBERT 모델 로드 실패: {_model_error}")
     return model
 
 
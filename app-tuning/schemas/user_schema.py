@@ -82,6 +82,53 @@ class EmbeddingRegister(BaseModel):
     )
 
 
+class EmbeddingUpdate(BaseModel):
+    """
+    사용자 프로필 부분 수정 요청 모델 (포함된 필드만 변경, 도메인은 변경 불가)
+    """
+
+    gender: Optional[str] = Field(None, description="성별 (MALE/FEMALE)")
+    ageGroup: Optional[str] = Field(None, description="연령대")
+    MBTI: Optional[str] = Field(None, description="MBTI", min_length=4)
+    religion: Optional[str] = Field(None, description="종교")
+    smoking: Optional[str] = Field(None, description="흡연 정도")
+    drinking: Optional[str] = Field(None, description="음주 정도")
+
+    personality: Optional[List[str]] = Field(None, description="본인의 성향")
+    preferredPeople: Optional[List[str]] = Field(None, description="선호하는 상대 성향")
+    currentInterests: Optional[List[str]] = Field(None, description="요즘 관심사")
+    favoriteFoods: Optional[List[str]] = Field(None, description="좋아하는 음식")
+    likedSports: Optional[List[str]] = Field(None, description="좋아하는 운동")
+    pets: Optional[List[str]] = Field(None, description="반려동물")
+    selfDevelopment: Optional[List[str]] = Field(None, description="자기계발")
+    hobbies: Optional[List[str]] = Field(None, description="취미")
+
+    @model_validator(mode="after")
+    def check_present_fields(self) -> "EmbeddingUpdate":
+        changes = self.model_dump(exclude_unset=True)
+        if not changes:
+            raise ValueError("at least one field must be provided")
+
+        for field, value in changes.items():
+            if isinstance(value, list):
+                if len(value) == 0:
+                    raise ValueError(f"'{field}' must be a non-empty list")
+            elif value is None or not str(value).strip():
+                raise ValueError(f"'{field}' must be a non-empty string")
+
+        return self
+
+    model_config = ConfigDict(
+        extra="forbid",
+        json_schema_extra={
+            "example": {
+                "MBTI": "INFJ",
+                "currentInterests": ["BAKING", "DRAWING"],
+            }
+        },
+    )
+
+
 class BaseResponse(BaseModel):
     """
     API 응답의 기본 구조
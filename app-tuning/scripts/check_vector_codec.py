@@ -0,0 +1,57 @@
+"""
+도메인별 매칭 벡터에 대해 압축 코덱(float16, int8, pq)의 정확도를 float32 경로와 비교
+코사인 최대 오차, 상위 K개 재현율, 벡터당 바이트(압축률)를 출력
+
+사용법: python scripts/check_vector_codec.py [emailDomain] [top_k]
+"""
+
+import json
+import os
+import sys
+
+# 프로젝트 루트 경로 추가 (core import 가능하게 함)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from core.matching_score_optimized import matching_vector  # noqa: E402
+from core.vector_database import get_user_collection  # noqa: E402
+from core.vector_database.vector_codec import evaluate_codec, get_codec  # noqa: E402
+
+CODECS = ["float16", "int8", "pq"]
+
+
+def check_vector_codecs(domain: str = None, top_k: int = 100):
+    where = {"emailDomain": domain} if domain else None
+    users = get_user_collection().get(where=where, include=["embeddings", "metadatas"])
+
+    groups = {}
+    for embedding, meta in zip(users["embeddings"], users["metadatas"]):
+        groups.setdefault(meta.get("emailDomain"), []).append(
+            matching_vector(embedding, meta)
+        )
+
+    for group_domain, vectors in groups.items():
+        vectors = np.vstack(vectors)
+        print(
+            f"[INFO] {group_domain}: 사용자 {len(vectors)}명, 차원 {vectors.shape[1]}"
+        )
+        if len(vectors) < 2:
+            print("[INFO] 비교 대상이 부족하여 건너뜀")
+            continue
+
+        for name in CODECS:
+            codec = get_codec(name, vectors.shape[1]).fit(vectors)
+            report = evaluate_codec(vectors, codec, top_k=top_k)
+            print(json.dumps(report, ensure_ascii=False))
+
+    print("✅ 코덱 정확도 확인 완료")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print("❗ 사용법: python check_vector_codec.py [emailDomain] [top_k]")
+        sys.exit(1)
+
+    target_domain = sys.argv[1] if len(sys.argv) >= 2 else None
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 100
+    check_vector_codecs(target_domain, k)
@@ -0,0 +1,56 @@
+"""
+similarity_collection의 기존 JSON 유사도 맵을 압축 포맷(packed-v1)으로 제자리 변환
+이미 변환된 문서는 건너뛰므로 여러 번 실행해도 안전함
+
+사용법: python scripts/convert_similarity_format.py [batch_size]
+"""
+
+import os
+import sys
+
+# 프로젝트 루트 경로 추가 (core import 가능하게 함)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.vector_database import (  # noqa: E402
+    convert_metadata,
+    get_similarity_collection,
+)
+from core.vector_database.similarity_codec import is_packed  # noqa: E402
+
+
+def convert_similarities(batch_size: int = 200):
+    collection = get_similarity_collection()
+    total = collection.count()
+    converted, skipped, failed = 0, 0, 0
+
+    for offset in range(0, total, batch_size):
+        batch = collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+        ids, metadatas = [], []
+
+        for doc_id, metadata in zip(batch["ids"], batch["metadatas"]):
+            if not metadata or is_packed(metadata):
+                skipped += 1
+                continue
+            try:
+                metadatas.append(convert_metadata(metadata))
+                ids.append(doc_id)
+            except Exception as e:
+                print(f"❌ ID '{doc_id}' 변환 실패: {e}")
+                failed += 1
+
+        if ids:
+            # 임베딩은 그대로 두고 메타데이터만 갱신
+            collection.update(ids=ids, metadatas=metadatas)
+            converted += len(ids)
+
+        print(f"[INFO] {min(offset + batch_size, total)}/{total} 처리")
+
+    print(f"✅ 변환 완료: converted={converted}, skipped={skipped}, failed={failed}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print("❗ 사용법: python convert_similarity_format.py [batch_size]")
+        sys.exit(1)
+
+    convert_similarities(int(sys.argv[1]) if len(sys.argv) == 2 else 200)
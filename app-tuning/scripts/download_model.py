@@ -3,7 +3,8 @@ from pathlib import Path
 
 from sentence_transformers import SentenceTransformer
 
-MODEL_NAME = "jhgan/ko-sbert-nli"
+# 로더와 같은 모델 (EMBEDDING_MODEL_NAME)
+MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "jhgan/ko-sbert-nli")
 MODEL_DIR_NAME = MODEL_NAME.replace("/", "-")
 
 # app-tuning 디렉토리 기준으로 고정
@@ -0,0 +1,67 @@
+"""
+현재 사용자 결합 벡터로 매칭용 PCA 투영을 학습/저장하고
+전체 차원 대비 상위 K개 목록의 순위 상관, 메모리, 계산 시간을 보고
+
+저장된 투영은 MATCHING_PROJECTION_VERSION 환경변수에 버전(또는 "latest")을 지정해야 매칭에 적용됨
+
+사용법: python scripts/fit_projection.py [n_components] [top_k] [--dry-run]
+"""
+
+import json
+import os
+import sys
+
+# 프로젝트 루트 경로 추가 (core import 가능하게 함)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from core.matching_score_optimized import combine_embeddings  # noqa: E402
+from core.projection import (  # noqa: E402
+    evaluate_projection,
+    fit_projection,
+    save_projection,
+)
+from core.vector_database import get_user_collection  # noqa: E402
+
+
+def load_combined_vectors():
+    """user_profiles의 전체 사용자 결합 벡터와 도메인별 행 인덱스 반환"""
+    users = get_user_collection().get(include=["embeddings", "metadatas"])
+    vectors, groups = [], {}
+
+    for row, (embedding, metadata) in enumerate(
+        zip(users["embeddings"], users["metadatas"])
+    ):
+        fields = json.loads(metadata.get("field_embeddings", "{}"))
+        vectors.append(combine_embeddings(embedding, fields))
+        groups.setdefault(metadata.get("emailDomain"), []).append(row)
+
+    return np.vstack(vectors), list(groups.values())
+
+
+def main(n_components: int = 128, top_k: int = 100, dry_run: bool = False):
+    vectors, groups = load_combined_vectors()
+    print(f"[INFO] 사용자 {len(vectors)}명, 도메인 {len(groups)}개 로드")
+
+    projection = fit_projection(vectors, n_components)
+    report = evaluate_projection(vectors, projection, groups, top_k)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if dry_run:
+        print("[INFO] dry-run: 투영을 저장하지 않음")
+        return
+
+    path = save_projection(projection)
+    print(f"✅ 투영 저장 완료: {path}")
+    print(f"[INFO] 적용: MATCHING_PROJECTION_VERSION={projection.version}")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    if len(args) > 2:
+        print("❗ 사용법: python fit_projection.py [n_components] [top_k] [--dry-run]")
+        sys.exit(1)
+
+    components = int(args[0]) if len(args) >= 1 else 128
+    k = int(args[1]) if len(args) == 2 else 100
+    main(components, k, "--dry-run" in sys.argv)
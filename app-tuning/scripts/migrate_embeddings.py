@@ -0,0 +1,50 @@
+"""
+SBERT 모델 교체 후 이전 버전으로 저장된 사용자 임베딩을 현재 버전(EMBEDDING_VERSION)으로
+다시 생성하고, 도메인의 모든 사용자가 전환되면 유사도 문서를 다시 계산
+진행 상태는 EMBEDDING_MIGRATION_STATE_PATH에 저장되어 중단 후 다시 실행하면 이어서 진행
+
+서버 프로세스의 도메인 인덱스에는 반영되지 않으므로, 서버 실행 중에는
+EMBEDDING_MIGRATION_AUTO=true로 서버 안에서 실행하거나 완료 후 서버를 재시작
+
+사용법: python scripts/migrate_embeddings.py [emailDomain] [cpu_budget]
+"""
+
+import os
+import sys
+
+# 프로젝트 루트 경로 추가 (core import 가능하게 함)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.embedding_migration import (  # noqa: E402
+    EMBEDDING_MIGRATION_CPU_BUDGET,
+    EmbeddingMigration,
+)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print("❗ 사용법: python migrate_embeddings.py [emailDomain] [cpu_budget]")
+        sys.exit(1)
+
+    target_domain = sys.argv[1] if len(sys.argv) >= 2 else None
+    budget = (
+        float(sys.argv[2]) if len(sys.argv) == 3 else EMBEDDING_MIGRATION_CPU_BUDGET
+    )
+
+    migration = EmbeddingMigration(cpu_budget=budget)
+    print(
+        f"[INFO] 대상 버전: {migration.target_version} (cpu_budget={migration.cpu_budget})"
+    )
+
+    try:
+        results = migration.run([target_domain] if target_domain else None)
+    except KeyboardInterrupt:
+        print("❗ 중단되었습니다. 다시 실행하면 이어서 진행합니다.")
+        sys.exit(1)
+
+    for domain, status in results.items():
+        state = migration.get_stats()["domains"].get(domain, {})
+        print(
+            f"[INFO] {domain}: {status} "
+            f"(migrated={state.get('migrated', 0)}/{state.get('total', 0)}, failed={state.get('failed', 0)})"
+        )
+    print("✅ 마이그레이션 실행 완료")
@@ -0,0 +1,81 @@
+"""
+저장된 점수 구성요소에 현재 가중치 프로필(MATCHING_WEIGHT_PROFILES)을 적용하여
+similarity_collection의 최종 점수를 재계산 (임베딩/규칙 재계산 없음)
+현재 프로필로 이미 계산된 문서는 건너뛰므로 여러 번 실행해도 안전함
+
+사용법: python scripts/reblend_similarities.py [emailDomain] [batch_size]
+"""
+
+import os
+import sys
+
+# 프로젝트 루트 경로 추가 (core import 가능하게 함)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.matching_score_optimized import SCORE_COMPONENTS  # noqa: E402
+from core.vector_database import (  # noqa: E402
+    decode_components,
+    decode_similarities,
+    encode_similarities,
+    get_similarity_collection,
+)
+from core.weight_profiles import (  # noqa: E402
+    get_weight_profile,
+    needs_reblend,
+    profile_signature,
+    reblend_map,
+)
+
+
+def reblend_similarities(domain: str = None, batch_size: int = 200):
+    collection = get_similarity_collection()
+    where = {"emailDomain": domain} if domain else None
+    total = collection.count()
+    reblended, skipped, failed = 0, 0, 0
+
+    for offset in range(0, total, batch_size):
+        batch = collection.get(
+            where=where, include=["metadatas"], limit=batch_size, offset=offset
+        )
+        if not batch["ids"]:
+            break
+        ids, metadatas = [], []
+
+        for doc_id, metadata in zip(batch["ids"], batch["metadatas"]):
+            profile = get_weight_profile(metadata.get("emailDomain"))
+            if not needs_reblend(metadata, profile):
+                skipped += 1
+                continue
+            try:
+                components = decode_components(metadata)
+                similarities = reblend_map(
+                    decode_similarities(metadata), components, profile
+                )
+                updated = dict(metadata)
+                updated.update(
+                    encode_similarities(similarities, components, SCORE_COMPONENTS)
+                )
+                updated["sim_weight_profile"] = profile_signature(profile)
+                ids.append(doc_id)
+                metadatas.append(updated)
+            except Exception as e:
+                print(f"❌ ID '{doc_id}' 재계산 실패: {e}")
+                failed += 1
+
+        if ids:
+            collection.update(ids=ids, metadatas=metadatas)
+            reblended += len(ids)
+
+        print(f"[INFO] offset {offset} 처리 (reblended={reblended})")
+
+    print(f"✅ 재계산 완료: reblended={reblended}, skipped={skipped}, failed={failed}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print("❗ 사용법: python reblend_similarities.py [emailDomain] [batch_size]")
+        sys.exit(1)
+
+    target_domain = sys.argv[1] if len(sys.argv) >= 2 else None
+    size = int(sys.argv[2]) if len(sys.argv) == 3 else 200
+    reblend_similarities(target_domain, size)
@@ -0,0 +1,44 @@
+"""
+SBERT 모델을 소유하는 추론 서버 실행
+API 워커에 INFERENCE_SERVER_ADDRESS를 같은 소켓 경로로 설정하면 모델을 직접 로드하지 않고
+이 서버에 인코딩을 요청 (여러 워커의 요청이 배치로 묶여 처리됨)
+
+사용법: python scripts/run_inference_server.py [socket_path]
+"""
+
+import os
+import sys
+
+# 프로젝트 루트 경로 추가 (core import 가능하게 함)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.inference_server import (  # noqa: E402
+    DEFAULT_SOCKET_PATH,
+    INFERENCE_BATCH_WAIT_MS,
+    INFERENCE_MAX_BATCH,
+    InferenceServer,
+)
+from models.sbert_loader import load_model  # noqa: E402
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print("❗ 사용법: python run_inference_server.py [socket_path]")
+        sys.exit(1)
+
+    address = (
+        sys.argv[1]
+        if len(sys.argv) == 2
+        else os.getenv("INFERENCE_SOCKET_PATH", DEFAULT_SOCKET_PATH)
+    )
+
+    # 서버 프로세스는 INFERENCE_SERVER_ADDRESS와 무관하게 모델을 직접 로드
+    server = InferenceServer(address, load_model)
+    print(
+        f"[INFO] 추론 서버 시작: {address} "
+        f"(max_batch={INFERENCE_MAX_BATCH}, wait={INFERENCE_BATCH_WAIT_MS}ms)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"✅ 추론 서버 종료: {server.get_stats()}")
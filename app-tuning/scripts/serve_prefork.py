@@ -0,0 +1,29 @@
+"""
+pre-fork 다중 워커로 API 서버 실행
+마스터가 SBERT 모델과 상주 도메인 인덱스를 먼저 로드하고 gc.freeze() 후 워커를 fork하여
+워커 수만큼 모델 메모리가 늘어나지 않도록 함 (uvicorn --workers 대신 사용)
+
+사용법: UVICORN_WORKERS=4 python scripts/serve_prefork.py [port]
+"""
+
+import os
+import sys
+
+# 프로젝트 루트 경로 추가 (core import 가능하게 함)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.prefork import PREFORK_WORKERS, PreforkServer  # noqa: E402
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print("❗ 사용법: python serve_prefork.py [port]")
+        sys.exit(1)
+
+    # 앱 모듈(main:app)과 data/ 경로를 프로젝트 루트 기준으로 찾도록 이동
+    os.chdir(ROOT_DIR)
+    port = int(sys.argv[1]) if len(sys.argv) == 2 else int(os.getenv("PORT", "8000"))
+
+    print(f"[INFO] pre-fork 서버 시작: 0.0.0.0:{port} (workers={PREFORK_WORKERS})")
+    PreforkServer("main:app", host="0.0.0.0", port=port).run()
+    print("✅ pre-fork 서버 종료")
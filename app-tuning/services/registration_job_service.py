@@ -0,0 +1,82 @@
+"""
+비동기 사용자 등록 작업 서비스
+등록 요청을 검증한 뒤 작업 큐에 넣고 즉시 작업 ID를 반환하며,
+임베딩 생성 → 저장 → 매칭 스코어 계산 → 반영은 제한된 수의 작업 워커가 처리
+
+- 작업 워커 수(REGISTRATION_JOB_WORKERS)로 등록 파이프라인 동시 실행 수 제한
+- 대기 작업 수 상한(REGISTRATION_JOB_QUEUE_SIZE) 초과 시 503으로 거절
+- 완료된 작업 정보는 REGISTRATION_JOB_TTL초 동안 보관
+- 작업 상태는 REGISTRATION_JOB_STORE_PATH(SQLite)에도 기록하여 여러 워커 중 어느 워커로 조회가 와도 응답
+  (미지정 시 UVICORN_WORKERS / WEB_CONCURRENCY가 2 이상이면 data/registration_jobs.db 사용)
+- 요청 검증(Chroma 조회)과 저장소 조회는 이벤트 루프 밖(asyncio.to_thread)에서 수행
+"""
+
+import asyncio
+import os
+
+from core.job_queue import JobManager, JobStore
+from schemas.user_schema import EmbeddingRegister
+from services.user_service import process_registration, validate_registration
+from utils import logger
+
+# 동시에 등록 파이프라인을 실행하는 작업 워커 수
+REGISTRATION_JOB_WORKERS = int(os.getenv("REGISTRATION_JOB_WORKERS", "2"))
+# 대기 작업 수 상한
+REGISTRATION_JOB_QUEUE_SIZE = int(os.getenv("REGISTRATION_JOB_QUEUE_SIZE", "1000"))
+# 완료된 작업 정보 보관 시간 (초)
+REGISTRATION_JOB_TTL = float(os.getenv("REGISTRATION_JOB_TTL", "3600"))
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _default_store_path() -> str:
+    workers = os.getenv("UVICORN_WORKERS") or os.getenv("WEB_CONCURRENCY") or "1"
+    if int(workers) > 1:
+        return os.path.join(BASE_DIR, "data", "registration_jobs.db")
+    return ""
+
+
+# 워커 간 작업 상태 공유 저장소 경로 (빈 값이면 프로세스 메모리만 사용)
+REGISTRATION_JOB_STORE_PATH = os.getenv(
+    "REGISTRATION_JOB_STORE_PATH", _default_store_path()
+)
+
+registration_jobs = JobManager(
+    name="registration",
+    process=process_registration,
+    key_of=lambda user: str(user.userId),
+    workers=REGISTRATION_JOB_WORKERS,
+    queue_size=REGISTRATION_JOB_QUEUE_SIZE,
+    ttl=REGISTRATION_JOB_TTL,
+    codes={
+        "duplicate": "EMBEDDING_CONFLICT_DUPLICATE_ID",
+        "queue_full": "EMBEDDING_REGISTER_QUEUE_FULL",
+        "failed": "EMBEDDING_REGISTER_SERVER_ERROR",
+        "not_found": "REGISTRATION_JOB_NOT_FOUND",
+    },
+    store=(
+        JobStore(REGISTRATION_JOB_STORE_PATH, REGISTRATION_JOB_TTL)
+        if REGISTRATION_JOB_STORE_PATH
+        else None
+    ),
+)
+
+logger.register_summary_provider("registration_jobs", registration_jobs.get_stats)
+
+
+def _to_response(job: dict) -> dict:
+    job = dict(job)
+    job["userId"] = job.pop("key")
+    return job
+
+
+async def submit_registration(user: EmbeddingRegister) -> dict:
+    """등록 요청 검증 후 작업 큐에 추가 (같은 사용자 작업이 진행 중이면 409)"""
+    await asyncio.to_thread(registration_jobs.check_duplicate, user)
+    await asyncio.to_thread(validate_registration, user)
+    return _to_response(registration_jobs.submit(user))
+
+
+async def get_registration_job(job_id: str) -> dict:
+    """등록 작업 상태와 단계별 소요 시간 조회"""
+    return _to_response(await registration_jobs.lookup(job_id))
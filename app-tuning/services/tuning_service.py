@@ -1,13 +1,25 @@
 import json
-
-from core.vector_database import get_user_similarities, get_users_data
+from typing import Optional
+
+from core.recommendation_cache import RECOMMENDATION_CACHE_ENABLED, recommendation_cache
+from core.vector_database import get_user_similarities, get_users_data, top_similarities
+from core.weight_profiles import (
+    get_weight_profile,
+    needs_reblend,
+    reblend_top_similarities,
+)
 from fastapi import HTTPException
 from schemas.tuning_schema import TuningResponse
 from utils import logger
 
+# 추천 결과로 반환할 최대 사용자 수
+TUNING_TOP_K = 100
+
 
-# 유사도 데이터를 가져오고 파싱하는 함수
-async def fetch_user_similarities(user_id: str) -> dict[str, float]:
+# 유사도 데이터를 가져와 점수 상위 top_k개만 파싱하는 함수
+async def fetch_user_similarities(
+    user_id: str, top_k: int = TUNING_TOP_K
+) -> list[tuple[str, float]]:
     user_similarities = await get_user_similarities(user_id)
 
     # 유사도 데이터가 없으면 404 에러 반환
@@ -16,14 +28,17 @@ async def fetch_user_similarities(user_id: str) -> dict[str, float]:
             status_code=404, detail={"code": "TUNING_NOT_FOUND_USER", "data": None}
         )
     try:
-        # similarities 필드에서 JSON 문자열을 딕셔너리로 파싱
-        similarity_map = json.loads(
-            user_similarities["metadatas"][0].get("similarities", "{}")
-        )
+        metadata = user_similarities["metadatas"][0]
+
+        # 저장 당시와 조직 가중치 프로필이 달라진 경우 구성요소로 읽기 시점 재계산
+        profile = get_weight_profile(metadata.get("emailDomain"))
+        if needs_reblend(metadata, profile):
+            return reblend_top_similarities(metadata, profile, top_k)
 
-        # 문자열 userId → float 유사도 점수 형태로 변환
-        return {str(k): float(v) for k, v in similarity_map.items()}
-    except (ValueError, TypeError, json.JSONDecodeError) as e:
+        # 압축 포맷은 미리 정렬되어 있어 앞부분 슬라이스만 디코딩
+        # (기존 JSON 맵은 전체 파싱 후 정렬)
+        return top_similarities(metadata, top_k)
+    except (ValueError, TypeError, KeyError, json.JSONDecodeError) as e:
         raise HTTPException(
             status_code=500,
             detail={"code": "INVALID_SIMILARITY_DATA", "message": str(e)},
@@ -57,29 +72,45 @@ async def fetch_users_metadata(user_ids: list[str]) -> dict[str, dict]:
 
 # 유사도 정보와 메타데이터를 기반으로 추천 ID만 추출하는 함수
 def format_recommendations(
-    similarities: dict[str, float], metadata: dict[str, dict], top_k: int = 100
+    similarities: list[tuple[str, float]],
+    metadata: dict[str, dict],
+    top_k: int = TUNING_TOP_K,
 ) -> list[int]:
 
-    # 유사도 점수를 기준으로 내림차순 정렬 후 상위 N개만 추출
-    sorted_users = sorted(similarities.items(), key=lambda x: x[1], reverse=True)[
-        :top_k
-    ]
+    # 유사도 목록은 점수 내림차순으로 정렬된 상태 → 상위 N개만 추출
+    top_users = similarities[:top_k]
 
     # metadata가 존재하는 유저만 ID로 반환
-    return [int(uid) for uid, _ in sorted_users if uid in metadata]
+    return [int(uid) for uid, _ in top_users if uid in metadata]
 
 
-# 전체 추천 결과를 반환하는 메인 함수
-@logger.log_performance(operation_name="get_matching_users", include_memory=True)
-async def get_matching_users(user_id: str) -> TuningResponse:
+# 추천 결과와 요청 사용자의 도메인을 함께 계산하는 함수 (캐시 무효화 단위로 사용)
+async def compute_matching_users(user_id: str) -> tuple[list[int], Optional[str]]:
     # 유사도 정보 가져오기
     similarities = await fetch_user_similarities(str(user_id))
 
-    # 유사도에 포함된 유저 ID만 추출
-    user_ids = list(similarities.keys())
+    # 유사도에 포함된 유저 ID + 요청 사용자 본인 ID (도메인 확인용)
+    user_ids = [uid for uid, _ in similarities]
+    user_ids.append(str(user_id))
 
     # 해당 유저들의 메타데이터 조회
     metadata = await fetch_users_metadata(user_ids)
+    domain = metadata.get(str(user_id), {}).get("emailDomain")
 
     # 최종적으로 추천할 유저 ID 리스트 반환
-    return format_recommendations(similarities, metadata)
+    return format_recommendations(similarities, metadata), domain
+
+
+# 전체 추천 결과를 반환하는 메인 함수
+@logger.log_performance(operation_name="get_matching_users", include_memory=True)
+async def get_matching_users(user_id: str) -> TuningResponse:
+    user_id = str(user_id)
+
+    if not RECOMMENDATION_CACHE_ENABLED:
+        recommendations, _ = await compute_matching_users(user_id)
+        return recommendations
+
+    # 캐시 조회 (미스/만료 시 동일 사용자 요청을 하나로 합쳐 계산)
+    return await recommendation_cache.get_or_load(
+        user_id, lambda: compute_matching_users(user_id)
+    )
@@ -1,34 +1,48 @@
+import asyncio
 import json
-
-import numpy as np
+import time
+from typing import Callable, Optional
 
 # from app.core.embedding import convert_user_to_text, embed_fields
+from core.change_feed import DELETE, UPSERT, change_feed
+from core.domain_index import domain_indexes
 from core.embedding import convert_user_to_text, embed_fields_optimized
+from core.embedding_version import EMBEDDING_VERSION, EMBEDDING_VERSION_KEY
 from core.enum_process import convert_to_korean
+from core.index_snapshot import mark_updated
 
 # from app.core.matching_score import compute_matching_score
-from core.matching_score_optimized import compute_matching_score_optimized
+from core.matching_score_optimized import (
+    blend_scores,
+    compute_matching_components_indexed,
+)
+from core.profile_update import PROFILE_TEXT_FIELDS, plan_profile_update, safe_join
+from core.recommendation_cache import recommendation_cache
+from core.similarity_write_queue import (
+    build_similarity_metadata,
+    similarity_coalescer,
+    similarity_operations,
+    similarity_write_queue,
+)
 from core.vector_database import (
     clean_up_similarity,
+    decode_components,
+    decode_similarities,
     delete_user,
     get_similarity_collection,
     get_user_collection,
+    same_score,
+    similarity_locks,
 )
+from core.weight_profiles import get_weight_profile, needs_reblend, reblend_map
 from fastapi import HTTPException
 
 # from app.models.sbert_loader import model
 from models.sbert_loader import get_model
-from schemas.user_schema import EmbeddingRegister
+from schemas.user_schema import EmbeddingRegister, EmbeddingUpdate
 from utils import logger
 
 
-# 메타데이터 저장 시 문자열로 반환하기 위함
-def safe_join(value):
-    if isinstance(value, np.ndarray):
-        value = value.tolist()
-    return ", ".join(str(v) for v in value) if isinstance(value, list) else str(value)
-
-
 @logger.log_performance(operation_name="prepare_embedding_data", include_memory=True)
 def prepare_embedding_data(
     user_dict: dict, target_fields: list[str]
@@ -56,6 +70,8 @@ def prepare_embedding_data(
 
         metadata = {k: safe_join(v) for k, v in user_dict.items()}
         metadata["field_embeddings"] = json.dumps(field_embeddings)
+        metadata[EMBEDDING_VERSION_KEY] = EMBEDDING_VERSION
+        mark_updated(metadata)
 
         return embedding, metadata
 
@@ -66,51 +82,114 @@ def prepare_embedding_data(
         )
 
 
-# 매칭 스코어 정보 DB 저장
-def upsert_similarity(user_id: str, embedding: list, similarities: dict):
+# 매칭 스코어 정보 DB 저장 (점수 내림차순 압축 포맷 + 쌍별 점수 구성요소)
+def upsert_similarity(
+    user_id: str,
+    embedding: list,
+    similarities: dict,
+    components: dict = None,
+    domain: str = None,
+):
+    metadata = build_similarity_metadata(user_id, similarities, components, domain)
+
     get_similarity_collection().upsert(
-        ids=[user_id],
-        embeddings=[embedding],
-        metadatas=[{"userId": user_id, "similarities": json.dumps(similarities)}],
+        ids=[user_id], embeddings=[embedding], metadatas=[metadata]
     )
 
 
+# 자기 유사도 문서 최종 저장 (문서 잠금 후 저장된 항목과 병합)
+def upsert_own_similarity(
+    user_id: str,
+    embedding: list,
+    similarities: dict,
+    components: dict,
+    domain: str = None,
+) -> dict:
+    """
+    첫 저장 이후 동시에 등록된 다른 사용자가 이 문서에 설정한 역방향 항목은
+    similarities에 없으므로 덮어쓰지 않고 병합하여 저장
+
+    Returns:
+        실제 저장된 유사도 맵
+    """
+    merged = dict(similarities)
+    with similarity_locks.hold([user_id]):
+        stored = get_similarity_collection().get(ids=[user_id], include=["metadatas"])
+        if stored and stored.get("metadatas"):
+            stored_meta = stored["metadatas"][0]
+            stored_components = decode_components(stored_meta)
+            for other_id, score in decode_similarities(stored_meta).items():
+                if other_id in merged:
+                    continue
+                merged[other_id] = score
+                if other_id in stored_components:
+                    components[other_id] = stored_components[other_id]
+
+        upsert_similarity(user_id, embedding, merged, components, domain)
+    return merged
+
+
 # 매칭 스코어 정보 역방향 DB 저장
 @logger.log_performance(
     operation_name="update_reverse_similarities", include_memory=True
 )
-def update_reverse_similarities(user_id: str, similarities: dict):
+def update_reverse_similarities(
+    user_id: str, similarities: dict, components: dict = None, domain: str = None
+):
+    components = components or {}
+    profile = get_weight_profile(domain)
+
     for other_id, score in similarities.items():
         try:
             other_id = str(other_id)
-            # 1. similarity_collection에서 상대방 데이터 조회
-            other_sim = get_similarity_collection().get(
-                ids=[other_id], include=["metadatas", "embeddings"]
-            )
-
-            if not other_sim or not other_sim.get("metadatas"):
-                # 2. 없으면 user_profiles에서 embedding만 가져옴
-                other_user = get_user_collection().get(
-                    ids=[other_id], include=["embeddings"]
+            # 상대 문서 읽기-수정-쓰기 구간은 문서 잠금 안에서 수행 (동시 등록 시 유실 방지)
+            with similarity_locks.hold([other_id]):
+                # 1. similarity_collection에서 상대방 데이터 조회
+                other_sim = get_similarity_collection().get(
+                    ids=[other_id], include=["metadatas", "embeddings"]
                 )
-                other_embedding = other_user["embeddings"][0]
-                reverse_map = {user_id: score}
-            else:
-                other_meta = other_sim["metadatas"][0]
-                other_embedding = other_sim["embeddings"][0]
-                try:
-                    reverse_map = json.loads(other_meta.get("similarities", "{}"))
-                except json.JSONDecodeError:
-                    reverse_map = {}
-
-                # 3. 값이 바뀐 경우에만 업데이트
-                if reverse_map.get(user_id) == score:
-                    continue
 
-                reverse_map[user_id] = score
-
-            # 4. 실제 벡터 등록/업데이트
-            upsert_similarity(other_id, other_embedding, reverse_map)
+                if not other_sim or not other_sim.get("metadatas"):
+                    # 2. 없으면 user_profiles에서 embedding만 가져옴
+                    other_user = get_user_collection().get(
+                        ids=[other_id], include=["embeddings"]
+                    )
+                    other_embedding = other_user["embeddings"][0]
+                    reverse_map = {user_id: score}
+                    reverse_components = {}
+                else:
+                    other_meta = other_sim["metadatas"][0]
+                    other_embedding = other_sim["embeddings"][0]
+                    try:
+                        reverse_map = decode_similarities(other_meta)
+                        reverse_components = decode_components(other_meta)
+                    except (ValueError, TypeError, json.JSONDecodeError):
+                        reverse_map, reverse_components = {}, {}
+
+                    # 3. 값이 바뀐 경우에만 업데이트
+                    if (
+                        user_id in reverse_map
+                        and same_score(reverse_map[user_id], score)
+                        and not needs_reblend(other_meta, profile)
+                    ):
+                        continue
+
+                    reverse_map[user_id] = score
+
+                    # 다른 가중치로 저장된 문서는 구성요소 기준으로 함께 재계산
+                    if needs_reblend(other_meta, profile):
+                        reverse_map = reblend_map(
+                            reverse_map, reverse_components, profile
+                        )
+
+                # 구성요소는 대칭이므로 같은 값을 역방향에도 저장
+                if other_id in components:
+                    reverse_components[user_id] = components[other_id]
+
+                # 4. 실제 벡터 등록/업데이트
+                upsert_similarity(
+                    other_id, other_embedding, reverse_map, reverse_components, domain
+                )
 
         except Exception as e:
             print(f"[REVERSE_SIMILARITY_UPDATE_ERROR]: {other_id} / {e}")
@@ -122,7 +201,7 @@ def update_reverse_similarities(user_id: str, similarities: dict):
     operation_name="enrich_with_reverse_similarities", include_memory=True
 )
 def enrich_with_reverse_similarities(
-    user_id: str, similarities: dict, all_users: dict
+    user_id: str, similarities: dict, all_users: dict, components: dict = None
 ) -> dict:
     updated_map = dict(similarities)
 
@@ -135,11 +214,17 @@ def enrich_with_reverse_similarities(
             continue
 
         other_meta = other_sim["metadatas"][0]
-        other_map = json.loads(other_meta.get("similarities", "{}"))
+        other_map = decode_similarities(other_meta)
 
         if user_id in other_map and other_id not in updated_map:
             updated_map[other_id] = other_map[user_id]
 
+            # 상대 문서에 저장된 구성요소도 함께 병합
+            if components is not None:
+                other_components = decode_components(other_meta)
+                if user_id in other_components:
+                    components[other_id] = other_components[user_id]
+
     return updated_map
 
 
@@ -147,16 +232,19 @@ def enrich_with_reverse_similarities(
 @logger.log_performance(
     operation_name="update_similarity_for_users", include_memory=True
 )
-def update_similarity_for_users(user_id: str) -> dict:
+def update_similarity_for_users(user_id: str, timings: dict = None) -> dict:
+    """
+    Args:
+        user_id: 등록/수정된 사용자 ID
+        timings: 전달되면 단계별 소요 시간(score, fanout)을 기록
+    """
+    started = time.perf_counter()
     try:
-        all_users = get_user_collection().get(include=["embeddings", "metadatas"])
-        ids, embeddings, metadatas = (
-            all_users["ids"],
-            all_users["embeddings"],
-            all_users["metadatas"],
+        user = get_user_collection().get(
+            ids=[user_id], include=["embeddings", "metadatas"]
         )
 
-        if user_id not in ids:
+        if not user or user_id not in user.get("ids", []):
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -164,34 +252,72 @@ def update_similarity_for_users(user_id: str) -> dict:
                     "message": f"User ID {user_id} not found",
                 },
             )
-        idx = ids.index(user_id)
-        user_embedding, user_meta = embeddings[idx], metadatas[idx]
-
-        # similarities = compute_matching_score(
-        #     user_id=user_id,
-        #     user_embedding=user_embedding,
-        #     user_meta=user_meta,
-        #     all_users=all_users,
-        # )
+        user_embedding, user_meta = user["embeddings"][0], user["metadatas"][0]
 
-        similarities = compute_matching_score_optimized(
+        # 도메인 상주 인덱스에 반영 후 같은 도메인 사용자와 점수 구성요소 계산
+        index = domain_indexes.upsert_user(user_id, user_embedding, user_meta)
+        other_ids, component_matrix = compute_matching_components_indexed(
             user_id=user_id,
             user_embedding=user_embedding,
             user_meta=user_meta,
-            all_users=all_users,
+            index=index,
         )
 
+        # 조직별 가중치 프로필로 최종 점수 계산 (구성요소는 별도 저장)
+        domain = user_meta.get("emailDomain")
+        scores = blend_scores(component_matrix, **get_weight_profile(domain))
+        similarities = dict(zip(other_ids, scores.tolist()))
+        components = dict(zip(other_ids, component_matrix.tolist()))
+
+        if timings is not None:
+            timings["score"] = round(time.perf_counter() - started, 3)
+            started = time.perf_counter()
+
+        # 쓰기 지연 모드: 자기 문서 교체와 역방향 갱신을 저널에 기록하고 바로 반환
+        # (Chroma 조회 없음, 저장된 역방향 항목 병합은 반영 스레드에서 수행)
+        if similarity_write_queue.enabled:
+            similarity_write_queue.enqueue(
+                user_id, similarities, similarities, components, domain
+            )
+            if timings is not None:
+                timings["fanout"] = round(time.perf_counter() - started, 3)
+            return {
+                "userId": user_id,
+                "updated_similarities": len(similarities),
+                "queued": True,
+            }
+
+        # 쓰기 병합 모드: 같은 구간의 다른 등록 쓰기와 문서별로 합쳐 반영될 때까지 대기
+        # (저장된 역방향 항목 병합은 문서 잠금 안의 교체(merge)에서 수행)
+        if similarity_coalescer.enabled:
+            operations = similarity_operations(
+                user_id, similarities, similarities, components
+            )
+            similarity_coalescer.submit(
+                operations, {doc_id: domain for doc_id in operations}
+            ).result()
+            if timings is not None:
+                timings["fanout"] = round(time.perf_counter() - started, 3)
+            return {"userId": user_id, "updated_similarities": len(similarities)}
+
         # 현재 유저 유사도 저장
-        upsert_similarity(user_id, user_embedding, similarities)
+        upsert_similarity(user_id, user_embedding, similarities, components, domain)
 
         # 역방향 저장
-        update_reverse_similarities(user_id, similarities)
+        update_reverse_similarities(user_id, similarities, components, domain)
 
         # 반대방향에도 user_id가 존재하는 경우 통합
-        updated_map = enrich_with_reverse_similarities(user_id, similarities, all_users)
+        updated_map = enrich_with_reverse_similarities(
+            user_id, similarities, {"ids": other_ids}, components
+        )
+
+        # 최종 반영 (처리 중 다른 등록이 남긴 역방향 항목은 유지)
+        updated_map = upsert_own_similarity(
+            user_id, user_embedding, updated_map, components, domain
+        )
 
-        # 최종 반영
-        upsert_similarity(user_id, user_embedding, updated_map)
+        if timings is not None:
+            timings["fanout"] = round(time.perf_counter() - started, 3)
 
         return {"userId": user_id, "updated_similarities": len(updated_map)}
 
@@ -266,11 +392,8 @@ def check_duplicate_user(user_id: str) -> None:
         )
 
 
-# 신규 유저 등록과 매칭 스코어 계산 처리 통합 로직
-@logger.log_performance(operation_name="register_user", include_memory=True)
-async def register_user(user: EmbeddingRegister) -> None:
-    # start_time = time.time()
-
+# 등록 요청 검증 (필드 검증 + 아이디 중복 검사)
+def validate_registration(user: EmbeddingRegister) -> str:
     try:
         user_id = str(user.userId)
         validate_user_fields(user)
@@ -287,29 +410,33 @@ async def register_user(user: EmbeddingRegister) -> None:
         )
 
     check_duplicate_user(user_id)
+    return user_id
+
+
+# 검증이 끝난 사용자의 임베딩 생성 → 저장 → 매칭 스코어 계산/반영
+def process_registration(user: EmbeddingRegister, timings: dict = None) -> None:
+    """
+    Args:
+        user: 검증된 등록 요청
+        timings: 전달되면 단계별 소요 시간(embed, store, score, fanout)을 기록
+    """
+    user_id = str(user.userId)
 
     try:
         user_dict = user.model_dump()
 
-        target_fields = [
-            "emailDomain",
-            "gender",
-            "religion",
-            "smoking",
-            "drinking",
-            "currentInterests",
-            "favoriteFoods",
-            "likedSports",
-            "pets",
-            "selfDevelopment",
-            "hobbies",
-        ]
-
-        embedding, metadata = prepare_embedding_data(user_dict, target_fields)
+        started = time.perf_counter()
+        embedding, metadata = prepare_embedding_data(user_dict, PROFILE_TEXT_FIELDS)
+        if timings is not None:
+            timings["embed"] = round(time.perf_counter() - started, 3)
+            started = time.perf_counter()
 
         get_user_collection().add(
             ids=[user_id], embeddings=[embedding], metadatas=[metadata]
         )
+        change_feed.append(UPSERT, user_id, user.emailDomain)
+        if timings is not None:
+            timings["store"] = round(time.perf_counter() - started, 3)
 
     except Exception as e:
         print(f"[ REGISTER ERROR] 사용자 등록 실패: {e}")
@@ -319,7 +446,7 @@ async def register_user(user: EmbeddingRegister) -> None:
         )
 
     try:
-        update_similarity_for_users(user_id)
+        update_similarity_for_users(user_id, timings=timings)
     except Exception as e:
         print(f"[ SIMILARITY ERROR] 유사도 처리 실패: {e}")
         raise HTTPException(
@@ -329,22 +456,143 @@ async def register_user(user: EmbeddingRegister) -> None:
                 "message": str(e),
             },
         )
+    finally:
+        # 같은 도메인 사용자들의 추천 결과 캐시 무효화 (일부만 반영된 경우 포함)
+        recommendation_cache.invalidate_domain(user.emailDomain)
 
-    # elapsed = round(time.time() - start_time, 3)
 
-    # return {
-    # "status": "registered",
-    # "userId": user_id,
-    # "matchedUserCount": similarity_result.get("updated_similarities", 0),
-    # "time_taken_seconds": elapsed}
+# 신규 유저 등록과 매칭 스코어 계산 처리 통합 로직
+@logger.log_performance(operation_name="register_user", include_memory=True)
+async def register_user(user: EmbeddingRegister) -> None:
+    # 검증 / 임베딩 / Chroma 쓰기(쓰기 병합 대기 포함)는 동기 호출이므로 스레드에서 수행
+    # (이벤트 루프를 막지 않아 대기 중에도 다른 요청이 들어와 같은 구간에 병합됨)
+    await asyncio.to_thread(validate_registration, user)
+    await asyncio.to_thread(process_registration, user)
+
+
+# 프로필 부분 수정: 바뀐 필드만 다시 임베딩하고 필요할 때만 매칭 스코어 재계산
+@logger.log_performance(operation_name="update_user_profile", include_memory=True)
+def update_user_profile(
+    user_id: str,
+    update: EmbeddingUpdate,
+    ensure_model_ready: Optional[Callable[[], None]] = None,
+) -> dict:
+    """
+    Args:
+        user_id: 수정할 사용자 ID
+        update: 변경할 필드만 포함된 요청
+        ensure_model_ready: 재임베딩이 필요한 경우에만 호출할 모델 준비 확인 (준비 전이면 예외)
+
+    Returns:
+        변경 필드, 재임베딩 필드, 매칭 스코어 재계산 여부, 단계별 소요 시간
+    """
+    user_id = str(user_id)
+    stored = get_user_collection().get(
+        ids=[user_id], include=["embeddings", "metadatas"]
+    )
+    if not stored or user_id not in stored.get("ids", []):
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "EMBEDDING_UPDATE_NOT_FOUND_USER", "data": None},
+        )
+
+    plan = plan_profile_update(
+        stored["metadatas"][0], update.model_dump(exclude_unset=True)
+    )
+    result = {
+        "changedFields": plan.changed_fields,
+        "reembeddedFields": plan.reembed_fields,
+        "reembeddedProfile": plan.reembed_profile,
+        "similarityUpdated": False,
+        "timings": {},
+    }
+    if not plan.changed_fields:
+        return result
+
+    # 규칙 필드만 바뀐 수정은 모델 없이 처리하므로 로드 중이어도 진행
+    if ensure_model_ready is not None and (plan.reembed_fields or plan.reembed_profile):
+        ensure_model_ready()
+
+    timings = result["timings"]
+    metadata = plan.metadata
+    embedding = stored["embeddings"][0]
+    domain = metadata.get("emailDomain")
+
+    try:
+        started = time.perf_counter()
+        # 규칙 필드만 바뀐 경우 모델 추론 생략
+        if plan.reembed_fields:
+            field_embeddings = json.loads(metadata.get("field_embeddings", "{}"))
+            field_embeddings.update(
+                embed_fields_optimized(metadata, plan.reembed_fields)
+            )
+            metadata["field_embeddings"] = json.dumps(field_embeddings)
+        if plan.reembed_profile:
+            user_text = convert_user_to_text(metadata, PROFILE_TEXT_FIELDS)
+            embedding = get_model().encode(user_text).tolist()
+            metadata[EMBEDDING_VERSION_KEY] = EMBEDDING_VERSION
+        timings["embed"] = round(time.perf_counter() - started, 3)
+
+        started = time.perf_counter()
+        mark_updated(metadata)
+        get_user_collection().update(
+            ids=[user_id], embeddings=[embedding], metadatas=[metadata]
+        )
+        change_feed.append(UPSERT, user_id, domain)
+        timings["store"] = round(time.perf_counter() - started, 3)
+
+    except Exception as e:
+        print(f"[ UPDATE ERROR] 사용자 수정 실패: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={"code": "EMBEDDING_UPDATE_SERVER_ERROR", "message": str(e)},
+        )
+
+    if not plan.update_similarity:
+        return result
+
+    try:
+        update_similarity_for_users(user_id, timings=timings)
+        result["similarityUpdated"] = True
+    except Exception as e:
+        print(f"[ SIMILARITY ERROR] 유사도 처리 실패: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "code": "EMBEDDING_UPDATE_SIMILARITY_UPDATE_FAILED",
+                "message": str(e),
+            },
+        )
+    finally:
+        recommendation_cache.invalidate_domain(domain)
+
+    return result
+
+
+# 사용자 메타데이터에서 도메인 조회 (없으면 None)
+def get_user_domain(user_id: str):
+    try:
+        result = get_user_collection().get(ids=[str(user_id)], include=["metadatas"])
+        metadatas = result.get("metadatas") or []
+        if metadatas and metadatas[0]:
+            return metadatas[0].get("emailDomain")
+    except Exception as e:
+        print(f"[USER_DOMAIN_LOOKUP_ERROR]: {user_id} / {e}")
+    return None
 
 
 # 전체 유저와의 매칭 스코어 계산 및 저장
 @logger.log_performance(operation_name="delete_user", include_memory=True)
 def delete_user_metatdata(user_id: int):
+    domain = get_user_domain(user_id)
     try:
+        # 저널에 남은 해당 사용자 관련 쓰기를 먼저 제거 (정리 후 다시 기록되지 않도록)
+        similarity_write_queue.purge_user(user_id)
+        similarity_coalescer.flush()
         clean_up_similarity(user_id)
         delete_user(user_id)
+        change_feed.append(DELETE, user_id, domain)
+        domain_indexes.remove_user(str(user_id), domain)
         return {"code": "EMBEDDING_DELETE_SUCCESS", "data": None}
     except HTTPException as http_ex:
         raise http_ex
@@ -356,3 +604,8 @@ def delete_user_metatdata(user_id: int):
                 "message": str(e),
             },
         )
+    finally:
+        # 삭제 사용자 캐시 제거 및 같은 도메인 추천 결과 무효화
+        recommendation_cache.invalidate_user(user_id)
+        if domain is not None:
+            recommendation_cache.invalidate_domain(domain)
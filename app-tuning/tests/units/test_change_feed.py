@@ -0,0 +1,241 @@
+"""
+사용자 변경 피드 테스트 모듈
+이 모듈은 변경 피드 기록과 복제 노드 반영을 단위 테스트합니다.
+주요 테스트 대상:
+- 순번이 붙은 이벤트 기록 / 조회와 보존 개수 정리
+- 복제 노드가 로드된 도메인 인덱스에만 증분 반영
+- 보존 기간이 지나 catch-up이 불가능할 때 재동기화
+- 복제 지연 지표
+- pre-fork 없이 여러 워커로 실행할 때 같은 피드 파일로 워커끼리 동기화
+"""
+
+import numpy as np
+import pytest
+from core import change_feed as change_feed_module
+from core import domain_index as domain_index_module
+from core import worker_generations
+from core.change_feed import DELETE, UPSERT, ChangeFeed, ChangeFeedReplica
+from core.domain_index import DomainIndexRegistry
+from core.worker_generations import DomainGenerations
+
+DOMAIN = "kakaotech.com"
+OTHER_DOMAIN = "example.com"
+DIM = 16
+
+
+class FakeCollection:
+    """get만 지원하는 메모리 컬렉션"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def get(self, ids=None, where=None, include=None):
+        found = [
+            doc_id
+            for doc_id in (ids if ids is not None else list(self.docs))
+            if doc_id in self.docs
+            and all(self.docs[doc_id][0].get(k) == v for k, v in (where or {}).items())
+        ]
+        return {
+            "ids": found,
+            "metadatas": [dict(self.docs[d][0]) for d in found],
+            "embeddings": [self.docs[d][1] for d in found],
+        }
+
+
+class FakeCache:
+    """무효화 호출만 기록하는 추천 캐시"""
+
+    def __init__(self):
+        self.domains = []
+        self.users = []
+        self.cleared = 0
+
+    def invalidate_domain(self, domain):
+        self.domains.append(domain)
+
+    def invalidate_user(self, user_id):
+        self.users.append(user_id)
+
+    def clear(self):
+        self.cleared += 1
+
+
+def make_user(user_id: int, domain: str = DOMAIN):
+    meta = {
+        "userId": str(user_id),
+        "emailDomain": domain,
+        "MBTI": "INTJ",
+        "field_embeddings": "{}",
+    }
+    embedding = np.random.default_rng(user_id).normal(size=DIM).tolist()
+    return str(user_id), (meta, embedding)
+
+
+@pytest.fixture
+def users(monkeypatch):
+    collection = FakeCollection(dict(make_user(i) for i in range(1, 5)))
+    monkeypatch.setattr(domain_index_module, "get_user_collection", lambda: collection)
+    monkeypatch.setattr("core.vector_database.get_user_collection", lambda: collection)
+    return collection
+
+
+@pytest.fixture
+def feed(tmp_path):
+    return ChangeFeed(path=str(tmp_path / "changes.db"), enabled=True)
+
+
+class TestChangeFeed:
+    """
+    사용자 변경 피드 테스트 클래스
+    """
+
+    def test_append_and_read_in_order(self, feed):
+        """
+        이벤트가 순번 순서로 기록되고 after 이후만 조회되는지 확인
+        """
+        assert feed.append(UPSERT, 1, DOMAIN) == 1
+        assert feed.append_many([(UPSERT, "2", DOMAIN), (DELETE, "1", DOMAIN)]) == 3
+
+        page = feed.read(after=1, limit=10)
+        assert [(e["seq"], e["op"], e["userId"]) for e in page["events"]] == [
+            (2, UPSERT, "2"),
+            (3, DELETE, "1"),
+        ]
+        assert page["head"] == 3
+        assert page["oldest"] == 1
+        assert feed.read(after=0, limit=0)["events"] == []
+
+    def test_disabled_feed_records_nothing(self, tmp_path):
+        """
+        비활성 피드는 파일을 만들지 않고 기록하지 않는지 확인
+        """
+        disabled = ChangeFeed(path=str(tmp_path / "changes.db"), enabled=False)
+        assert disabled.append(UPSERT, "1", DOMAIN) == 0
+        assert not (tmp_path / "changes.db").exists()
+
+    def test_prune_keeps_recent_events(self, feed, monkeypatch):
+        """
+        보존 개수를 넘은 오래된 이벤트가 정리되고 순번은 재사용되지 않는지 확인
+        """
+        monkeypatch.setattr(change_feed_module, "_PRUNE_EVERY", 5)
+        feed.retention = 3
+        for user_id in range(10):
+            feed.append(UPSERT, user_id, DOMAIN)
+
+        page = feed.read(after=0, limit=100)
+        assert page["head"] == 10
+        assert page["oldest"] > 1
+        assert [e["seq"] for e in page["events"]] == list(range(page["oldest"], 11))
+
+
+class TestChangeFeedReplica:
+    """
+    복제 노드 반영 테스트 클래스
+    """
+
+    def test_applies_changes_to_loaded_domains(self, feed, users):
+        """
+        로드된 도메인에는 등록 / 삭제를 반영하고 로드되지 않은 도메인은 건너뛰는지 확인
+        """
+        registry = DomainIndexRegistry(snapshot_dir="")
+        cache = FakeCache()
+        replica = ChangeFeedReplica(feed, registry=registry, cache=cache)
+        registry.get(DOMAIN)
+        assert replica.poll_once() == 0  # 시작 위치 = 현재 head
+
+        user_id, doc = make_user(5)
+        users.docs[user_id] = doc
+        feed.append(UPSERT, user_id, DOMAIN)
+        del users.docs["2"]
+        feed.append(DELETE, "2", DOMAIN)
+        other_id, doc = make_user(6, OTHER_DOMAIN)
+        users.docs[other_id] = doc
+        feed.append(UPSERT, other_id, OTHER_DOMAIN)
+
+        assert replica.poll_once() == 3
+        assert sorted(registry.get(DOMAIN).ids) == ["1", "3", "4", "5"]
+        assert not registry.is_loaded(OTHER_DOMAIN)
+        assert set(cache.domains) == {DOMAIN, OTHER_DOMAIN}
+        assert cache.users == ["2"]
+
+        stats = replica.get_stats()
+        assert stats["applied_seq"] == 3
+        assert stats["lag_events"] == 0
+        assert stats["lag_seconds"] == 0.0
+
+    def test_catch_up_in_batches_and_lag(self, feed, users):
+        """
+        밀린 이벤트를 배치 단위로 따라잡고 그 사이 지연 이벤트 수를 보고하는지 확인
+        """
+        registry = DomainIndexRegistry(snapshot_dir="")
+        replica = ChangeFeedReplica(
+            feed, registry=registry, cache=FakeCache(), batch_size=2
+        )
+        registry.get(DOMAIN)
+        replica.poll_once()
+        for user_id in range(10, 15):
+            key, doc = make_user(user_id)
+            users.docs[key] = doc
+            feed.append(UPSERT, key, DOMAIN)
+
+        assert replica.poll_once() == 2
+        assert replica.get_stats()["lag_events"] == 3
+        while replica.poll_once():
+            pass
+        assert replica.get_stats()["lag_events"] == 0
+        assert len(registry.get(DOMAIN)) == 9
+
+    def test_resync_when_events_were_pruned(self, feed, users, monkeypatch):
+        """
+        필요한 이벤트가 정리되어 catch-up이 불가능하면 로드된 인덱스를 버리고 head부터 다시 시작하는지 확인
+        """
+        monkeypatch.setattr(change_feed_module, "_PRUNE_EVERY", 1)
+        registry = DomainIndexRegistry(snapshot_dir="")
+        cache = FakeCache()
+        replica = ChangeFeedReplica(feed, registry=registry, cache=cache)
+        registry.get(DOMAIN)
+        replica.poll_once()
+
+        feed.retention = 2
+        for user_id in range(20, 25):
+            key, doc = make_user(user_id)
+            users.docs[key] = doc
+            feed.append(UPSERT, key, DOMAIN)
+
+        assert replica.poll_once() == 0
+        assert not registry.is_loaded(DOMAIN)
+        assert replica.applied_seq == 5
+        assert replica.get_stats()["resyncs"] == 1
+        assert cache.cleared == 1
+        # 다시 로드하면 Chroma의 현재 상태를 그대로 읽음
+        assert len(registry.get(DOMAIN)) == 9
+
+    def test_worker_sync_without_prefork(self, tmp_path, monkeypatch):
+        """
+        uvicorn --workers N이면 피드 기록을 켜고 같은 파일을 읽는 복제기를 만들고,
+        단일 워커이거나 pre-fork 세대 카운터가 공유되면 만들지 않는지 확인
+        """
+        feed = ChangeFeed(path=str(tmp_path / "changes.db"), enabled=False)
+        monkeypatch.setattr(change_feed_module, "change_feed", feed)
+        monkeypatch.setattr(change_feed_module, "change_feed_replica", None)
+
+        assert change_feed_module.worker_sync_replica(workers=1) is None
+        assert not feed.enabled
+
+        shared = DomainGenerations(slots=64)
+        shared.share()
+        monkeypatch.setattr(worker_generations, "index_generations", shared)
+        assert change_feed_module.worker_sync_replica(workers=4) is None
+        monkeypatch.undo()
+
+        monkeypatch.setattr(change_feed_module, "change_feed", feed)
+        monkeypatch.setattr(change_feed_module, "change_feed_replica", None)
+        replica = change_feed_module.worker_sync_replica(workers=4)
+        assert feed.enabled
+        assert replica.source.path == feed.path
+        assert change_feed_module.worker_sync_replica(workers=4) is replica
+
+        # 다른 워커가 기록한 이벤트를 이 워커의 복제기가 읽음
+        feed.append(UPSERT, "5", DOMAIN)
+        assert replica.source.read(0)["events"][0]["userId"] == "5"
@@ -0,0 +1,167 @@
+"""
+Chroma 클라이언트 관리 테스트 모듈
+이 모듈은 클라이언트 재사용, 상태 확인 캐시, 회로 차단을 단위 테스트합니다.
+주요 테스트 대상:
+- TTL 안에서는 상태 확인(heartbeat) 없이 클라이언트를 재사용하는지
+- 컬렉션 접근마다 count()로 상태를 확인하지 않는지
+- 실제 연산이 연결 오류로 실패했을 때만 재연결하는지
+- 연속 실패 시 회로 차단과 지수 백오프
+"""
+
+import pytest
+import requests
+from core.vector_database import collections as collections_module
+from core.vector_database.client import ChromaClientManager, ChromaUnavailableError
+
+
+class FakeCollection:
+    """호출 횟수를 기록하고 지정한 횟수만큼 연결 오류를 내는 컬렉션"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def count(self):
+        self.calls.append("count")
+        return 0
+
+    def get(self, ids=None, **kwargs):
+        self.calls.append("get")
+        if self.client.broken:
+            raise requests.exceptions.ConnectionError("connection reset")
+        return {"ids": ids or []}
+
+    def upsert(self, **kwargs):
+        self.calls.append("upsert")
+        if self.client.broken:
+            raise requests.exceptions.ConnectionError("connection reset")
+
+
+class FakeClient:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.broken = False
+        self.heartbeats = 0
+        self.collections = {}
+
+    def heartbeat(self):
+        self.heartbeats += 1
+        if not self.alive:
+            raise requests.exceptions.ConnectionError("refused")
+        return 1
+
+    def get_or_create_collection(self, name):
+        return self.collections.setdefault(name, FakeCollection(self))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr("core.vector_database.client.time.monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    clients = []
+
+    def factory():
+        clients.append(FakeClient())
+        return clients[-1]
+
+    manager = ChromaClientManager(factory, liveness_ttl=30, threshold=2)
+    manager.clients = clients
+    monkeypatch.setattr(collections_module, "chroma_clients", manager)
+    monkeypatch.setattr(collections_module, "_collection_cache", {})
+    return manager
+
+
+class TestChromaClientManager:
+    """
+    Chroma 클라이언트 관리 테스트 클래스
+    """
+
+    def test_liveness_is_cached_for_ttl(self, manager, clock):
+        """
+        TTL 안에서는 heartbeat 없이 같은 클라이언트를 돌려주고 TTL이 지나면 한 번만 확인하는지 확인
+        """
+        first = manager.get_client()
+        for _ in range(10):
+            assert manager.get_client() is first
+        assert manager.get_stats()["probes"] == 1
+
+        clock.now += 31
+        assert manager.get_client() is first
+        assert manager.get_client() is first
+        stats = manager.get_stats()
+        assert (stats["probes"], stats["connects"]) == (2, 1)
+
+    def test_collection_access_does_not_probe(self, manager, clock):
+        """
+        컬렉션을 여러 번 가져와도 count()나 추가 heartbeat를 호출하지 않는지 확인
+        """
+        for _ in range(5):
+            collection = collections_module.get_user_collection()
+            collection.get(ids=["1"])
+
+        fake = manager.clients[0].collections["user_profiles"]
+        assert fake.calls == ["get"] * 5
+        assert manager.get_stats()["probes"] == 1
+
+    def test_reconnects_when_operation_fails(self, manager, clock):
+        """
+        읽기 연산이 연결 오류로 실패하면 새 클라이언트로 한 번 재시도하고, 쓰기는 그대로 예외를 내는지 확인
+        """
+        collection = collections_module.get_user_collection()
+        manager.clients[0].broken = True
+
+        assert collection.get(ids=["7"]) == {"ids": ["7"]}
+        assert len(manager.clients) == 2
+        assert collections_module.get_user_collection() is not collection
+
+        manager.clients[1].broken = True
+        with pytest.raises(requests.exceptions.ConnectionError):
+            collections_module.get_user_collection().upsert(ids=["7"])
+        stats = manager.get_stats()
+        assert (stats["operation_failures"], stats["connects"]) == (2, 2)
+
+    def test_breaker_opens_with_exponential_backoff(self, clock):
+        """
+        연속 실패가 임계치에 도달하면 대기 시간 동안 연결을 시도하지 않고, 다시 실패하면 대기 시간이 두 배가 되는지 확인
+        """
+        attempts = []
+
+        def factory():
+            attempts.append(clock.now)
+            return FakeClient(alive=False)
+
+        manager = ChromaClientManager(
+            factory, threshold=2, base_delay=1.0, max_delay=60.0
+        )
+        for _ in range(2):
+            with pytest.raises(ChromaUnavailableError):
+                manager.get_client()
+        assert manager.state == "OPEN"
+
+        with pytest.raises(ChromaUnavailableError):
+            manager.get_client()
+        assert len(attempts) == 2
+        assert manager.get_stats()["rejected"] == 1
+
+        clock.now += 1.1  # half-open → 재시도 실패 → 2초 차단
+        assert manager.state == "HALF_OPEN"
+        with pytest.raises(ChromaUnavailableError):
+            manager.get_client()
+        clock.now += 1.1
+        with pytest.raises(ChromaUnavailableError):
+            manager.get_client()
+        assert len(attempts) == 3
+        assert manager.get_stats()["breaker_opens"] == 2
@@ -0,0 +1,196 @@
+"""
+도메인 파티션 테스트 모듈
+이 모듈은 consistent hashing 기반 도메인 배치와 요청 라우팅을 단위 테스트합니다.
+주요 테스트 대상:
+- 노드 추가 시 일부 도메인만 이동하는지
+- 다른 노드 소유 도메인 요청의 redirect / proxy 처리
+- 전달받은 요청은 다시 전달하지 않는지
+- 사용자 → 도메인 조회 캐시
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from core.domain_partition import (
+    FORWARDED_HEADER,
+    OWNER_HEADER,
+    DomainPartition,
+    HashRing,
+    parse_nodes,
+)
+from starlette.requests import Request
+
+NODES = {"node-a": "http://node-a:8000", "node-b": "http://node-b:8000"}
+DOMAINS = [f"org{i}.com" for i in range(2000)]
+
+
+def make_request(
+    path="/api/v1/tuning", query=b"userId=1", method="GET", body=b"", headers=None
+):
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": raw_headers,
+    }
+    return Request(scope, receive)
+
+
+def foreign_domain(partition: DomainPartition) -> str:
+    return next(d for d in DOMAINS if not partition.owns(d))
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """받은 요청을 JSON으로 돌려주는 소유 노드 역할"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        reply = json.dumps(
+            {
+                "path": self.path,
+                "body": json.loads(body),
+                "forwardedBy": self.headers.get(FORWARDED_HEADER),
+            }
+        ).encode()
+        self.send_response(409)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def owner_server():
+    server = HTTPServer(("127.0.0.1", 0), EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestDomainPartition:
+    """
+    도메인 파티션 테스트 클래스
+    """
+
+    def test_adding_node_moves_only_some_domains(self):
+        """
+        노드가 추가되면 새 노드로 가는 도메인만 이동하고 배치가 고르게 나뉘는지 확인
+        """
+        before = HashRing(["node-a", "node-b"])
+        after = HashRing(["node-a", "node-b", "node-c"])
+        owners = {d: before.owner(d) for d in DOMAINS}
+
+        moved = [d for d in DOMAINS if after.owner(d) != owners[d]]
+        assert all(after.owner(d) == "node-c" for d in moved)
+        assert 0.2 < len(moved) / len(DOMAINS) < 0.45
+        share = sum(owners[d] == "node-a" for d in DOMAINS) / len(DOMAINS)
+        assert 0.4 < share < 0.6
+
+    def test_parse_nodes_and_validation(self):
+        """
+        노드 설정 파싱과 잘못된 설정 거부 확인
+        """
+        assert parse_nodes("a=http://x:1/, b=http://y:2") == {
+            "a": "http://x:1",
+            "b": "http://y:2",
+        }
+        with pytest.raises(ValueError):
+            parse_nodes("a-http://x:1")
+        with pytest.raises(ValueError):
+            DomainPartition(NODES, node_id="node-z")
+        assert not DomainPartition({}, node_id="").enabled
+
+    @pytest.mark.asyncio
+    async def test_redirects_foreign_domain(self):
+        """
+        다른 노드 소유 도메인은 307로 소유 노드 URL을 안내하고 자기 도메인은 로컬 처리하는지 확인
+        """
+        partition = DomainPartition(NODES, node_id="node-a", mode="redirect")
+        domain = foreign_domain(partition)
+        local = next(d for d in DOMAINS if partition.owns(d))
+
+        assert await partition.route(make_request(), local) is None
+        response = await partition.route(make_request(), domain)
+        assert response.status_code == 307
+        assert (
+            response.headers["location"] == "http://node-b:8000/api/v1/tuning?userId=1"
+        )
+        assert response.headers[OWNER_HEADER] == "node-b"
+
+        # 이미 전달된 요청은 다시 보내지 않음
+        forwarded = make_request(headers={FORWARDED_HEADER: "node-b"})
+        assert await partition.route(forwarded, domain) is None
+        stats = partition.get_stats()
+        assert (stats["local"], stats["redirected"], stats["misrouted"]) == (1, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_proxies_to_owner(self, owner_server):
+        """
+        proxy 방식에서 본문과 전달 표시를 소유 노드로 보내고 응답 상태/본문을 그대로 반환하는지 확인
+        """
+        nodes = {"node-a": "http://node-a:8000", "node-b": owner_server}
+        partition = DomainPartition(nodes, node_id="node-a", mode="proxy")
+        domain = foreign_domain(partition)
+        body = json.dumps({"userId": 7, "emailDomain": domain}).encode()
+
+        response = await partition.route(
+            make_request(
+                "/api/v1/users",
+                b"",
+                "POST",
+                body,
+                {"Content-Type": "application/json"},
+            ),
+            domain,
+        )
+        assert response.status_code == 409
+        reply = json.loads(response.body)
+        assert reply["path"] == "/api/v1/users"
+        assert reply["body"]["userId"] == 7
+        assert reply["forwardedBy"] == "node-a"
+        assert partition.get_stats()["proxied"] == 1
+
+    @pytest.mark.asyncio
+    async def test_user_domain_lookup_is_cached(self):
+        """
+        사용자 도메인은 한 번만 조회하고 삭제 시 캐시에서 제거되는지 확인
+        """
+        partition = DomainPartition(NODES, node_id="node-a")
+        domain = foreign_domain(partition)
+        calls = []
+
+        def lookup(user_id):
+            calls.append(user_id)
+            return domain
+
+        for _ in range(3):
+            response = await partition.route_user(make_request(), "1", lookup)
+            assert response.status_code == 307
+        assert calls == ["1"]
+
+        partition.forget_user("1")
+        await partition.route_user(make_request(), "1", lookup)
+        assert calls == ["1", "1"]
+
+        # 파티션 미사용 노드는 조회 자체를 하지 않음
+        single = DomainPartition({}, node_id="")
+        assert await single.route_user(make_request(), "2", lookup) is None
+        assert calls == ["1", "1"]
@@ -0,0 +1,198 @@
+"""
+도메인 상주 메모리 관리 테스트 모듈
+이 모듈은 바이트 예산 기반 도메인 인덱스 LRU 내보내기를 단위 테스트합니다.
+주요 테스트 대상:
+- 예산을 넘으면 가장 오래 쓰이지 않은 도메인을 내보내는지
+- 스냅샷을 쓰면 메모리 맵 인덱스로 전환되어 Chroma를 다시 읽지 않는지
+- 로드 / 적중 / 내보내기 통계
+- 파이썬 객체와 메모리 맵에 쓴 페이지를 포함한 힙 상주 바이트
+- 등록 반영과 내보내기가 겹쳐도 갱신이 사라지지 않는지
+"""
+
+import mmap
+import threading
+
+import numpy as np
+import pytest
+from core import domain_index as domain_index_module
+from core.domain_index import DomainIndexRegistry
+from core.vector_database.residency import ResidencyManager
+
+DOMAINS = ["a.com", "b.com", "c.com"]
+DIM = 16
+
+
+class FakeCollection:
+    """get만 지원하는 메모리 컬렉션 (벡터를 읽어 간 사용자 수 기록)"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.fetched = 0
+
+    def get(self, ids=None, where=None, include=None):
+        where = (where or {}).get("$and", [where or {}])
+        found = [
+            doc_id
+            for doc_id in (ids if ids is not None else list(self.docs))
+            if doc_id in self.docs
+            and all(
+                self.docs[doc_id][0].get(k) == v
+                for cond in where
+                for k, v in cond.items()
+                if not isinstance(v, dict)
+            )
+            and all(
+                self.docs[doc_id][0].get(k, float("-inf")) > v["$gt"]
+                for cond in where
+                for k, v in cond.items()
+                if isinstance(v, dict)
+            )
+        ]
+        include = ["metadatas", "embeddings"] if include is None else include
+        result = {"ids": found}
+        if "embeddings" in include:
+            self.fetched += len(found)
+            result["embeddings"] = [self.docs[d][1] for d in found]
+        if "metadatas" in include:
+            result["metadatas"] = [dict(self.docs[d][0]) for d in found]
+        return result
+
+
+def make_user(user_id: int, domain: str):
+    meta = {
+        "userId": str(user_id),
+        "emailDomain": domain,
+        "MBTI": "INTJ",
+        "field_embeddings": "{}",
+    }
+    embedding = np.random.default_rng(user_id).normal(size=DIM).tolist()
+    return str(user_id), (meta, embedding)
+
+
+@pytest.fixture
+def users(monkeypatch):
+    docs = dict(
+        make_user(d * 100 + i, domain)
+        for d, domain in enumerate(DOMAINS)
+        for i in range(20)
+    )
+    collection = FakeCollection(docs)
+    monkeypatch.setattr(domain_index_module, "get_user_collection", lambda: collection)
+    return collection
+
+
+def domain_bytes(users) -> int:
+    registry = DomainIndexRegistry(snapshot_dir="")
+    return registry.get(DOMAINS[0]).memory_bytes()
+
+
+class TestDomainResidency:
+    """
+    도메인 상주 메모리 관리 테스트 클래스
+    """
+
+    def test_evicts_least_recently_used_domain(self, users):
+        """
+        예산을 넘으면 가장 오래 쓰이지 않은 도메인을 해제하고 다시 요청하면 새로 로드하는지 확인
+        """
+        budget = int(domain_bytes(users) * 2.5)
+        registry = DomainIndexRegistry(snapshot_dir="", memory_budget=budget)
+        registry.get("a.com")
+        registry.get("b.com")
+        registry.get("a.com")  # a가 더 최근
+        registry.get("c.com")  # 예산 초과 → b 해제
+
+        assert registry.is_loaded("a.com")
+        assert not registry.is_loaded("b.com")
+        assert registry.is_loaded("c.com")
+
+        stats = registry.get_stats()["residency"]
+        assert (stats["loads"], stats["hits"], stats["evictions"]) == (3, 1, 1)
+        assert stats["mapped_evictions"] == 0
+        assert stats["resident_bytes"] <= budget
+
+        users.fetched = 0
+        assert len(registry.get("b.com")) == 20
+        assert users.fetched == 20
+
+    def test_eviction_falls_back_to_snapshot(self, users, tmp_path):
+        """
+        스냅샷을 쓰면 내보낸 도메인이 메모리 맵 인덱스로 바뀌고 같은 점수를 내며 Chroma를 다시 읽지 않는지 확인
+        """
+        budget = int(domain_bytes(users) * 1.5)
+        registry = DomainIndexRegistry(snapshot_dir=str(tmp_path), memory_budget=budget)
+        query = np.ones(DIM, np.float32)
+        before = registry.get("a.com").score(query)
+        registry.get("b.com")  # 예산 초과 → a를 스냅샷으로 저장하고 메모리 맵으로 전환
+
+        index = registry.get("a.com")
+        assert index.mapped
+        after = index.score(query)
+        assert after[0] == before[0]
+        np.testing.assert_allclose(after[1], before[1], rtol=1e-6)
+
+        stats = registry.get_stats()["residency"]
+        assert stats["mapped_evictions"] == 1
+        assert stats["hits"] == 1
+
+        # 메모리 맵 인덱스에도 등록이 바로 반영됨
+        user_id, (meta, embedding) = make_user(999, "a.com")
+        registry.upsert_user(user_id, embedding, meta)
+        assert "999" in registry.get("a.com").ids
+
+    def test_heap_bytes_include_python_and_dirty_pages(self, users, tmp_path):
+        """
+        메모리 바이트에 ID 목록 / 행 사전 / 시그니처가 포함되고,
+        메모리 맵 인덱스에 쓰면 복사된 페이지가 힙 상주 바이트로 집계되는지 확인
+        """
+        registry = DomainIndexRegistry(snapshot_dir=str(tmp_path))
+        index = registry.get("a.com")
+        columns = index._column_bytes()
+        assert index.memory_bytes() > columns
+        assert index.heap_bytes() == index.memory_bytes()
+
+        registry.save_snapshots()
+        restored = DomainIndexRegistry(snapshot_dir=str(tmp_path))
+        mapped = restored.get("a.com")
+        assert mapped.mapped and not mapped.dirty
+        clean = mapped.heap_bytes()
+        assert 0 < clean < mapped.memory_bytes() - columns // 2
+
+        user_id, (meta, embedding) = make_user(1, "a.com")
+        restored.upsert_user(user_id, embedding, meta)
+        assert mapped.mapped and mapped.dirty
+        assert mapped.heap_bytes() >= clean + 3 * mmap.PAGESIZE
+
+    def test_upsert_not_lost_to_concurrent_eviction(self, users, tmp_path):
+        """
+        조회 직후 다른 요청의 내보내기가 인덱스를 메모리 맵 복사본으로 바꾸어도 등록이 반영되는지 확인
+        """
+        budget = int(domain_bytes(users) * 1.5)
+        registry = DomainIndexRegistry(snapshot_dir=str(tmp_path), memory_budget=budget)
+        index = registry.get("a.com")
+        upsert = index.upsert
+        evictor = threading.Thread(target=registry.get, args=("b.com",))
+
+        def evict_then_upsert(*args):
+            # b 로드 → 예산 초과로 a 내보내기 (등록이 잠금 안이면 끝날 때까지 대기)
+            evictor.start()
+            evictor.join(0.2)
+            upsert(*args)
+
+        index.upsert = evict_then_upsert
+        user_id, (meta, embedding) = make_user(999, "a.com")
+        registry.upsert_user(user_id, embedding, meta)
+        evictor.join()
+
+        assert registry.get_stats()["residency"]["mapped_evictions"] == 1
+        assert "999" in registry.get("a.com").ids
+
+    def test_unlimited_budget_never_evicts(self):
+        """
+        예산이 0이면 내보낼 도메인을 고르지 않는지 확인
+        """
+        manager = ResidencyManager(0)
+        for domain in DOMAINS:
+            manager.touch(domain, loaded=True)
+        assert manager.select_victims({d: 10**9 for d in DOMAINS}) == []
+        assert manager.get_stats()["recent"] == list(reversed(DOMAINS))
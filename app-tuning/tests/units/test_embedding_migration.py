@@ -0,0 +1,202 @@
+"""
+임베딩 재생성 마이그레이션 테스트 모듈
+이 모듈은 모델 교체 후 임베딩 버전 전환을 단위 테스트합니다.
+주요 테스트 대상:
+- (도메인, 버전)별 인덱스 분리 (같은 버전끼리만 비교)
+- 배치 재임베딩 → 전체 전환 후 유사도 재계산(cut-over)
+- 진행 상태 저장 및 재실행 시 이어서 진행
+- 재임베딩을 구간(slice) 크기 묶음으로 나누어 묶음마다 휴식
+"""
+
+import numpy as np
+import pytest
+from core import domain_index as domain_index_module
+from core import embedding_migration as migration_module
+from core.domain_index import DomainIndexRegistry
+from core.embedding_migration import DONE, EmbeddingMigration
+from core.embedding_version import EMBEDDING_VERSION_KEY, embedding_version_of
+from core.vector_database import decode_similarities
+
+DOMAIN = "kakaotech.com"
+DIM = 16
+
+
+class FakeCollection:
+    """get / update / upsert만 지원하는 메모리 컬렉션"""
+
+    def __init__(self, docs=None):
+        self.docs = docs or {}
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        found = [
+            doc_id
+            for doc_id in (ids if ids is not None else list(self.docs))
+            if doc_id in self.docs
+            and all(self.docs[doc_id][0].get(k) == v for k, v in (where or {}).items())
+        ]
+        if limit is not None:
+            found = found[offset : offset + limit]
+        return {
+            "ids": found,
+            "metadatas": [dict(self.docs[d][0]) for d in found],
+            "embeddings": [self.docs[d][1] for d in found],
+        }
+
+    def update(self, ids, embeddings, metadatas):
+        for doc_id, embedding, metadata in zip(ids, embeddings, metadatas):
+            self.docs[doc_id] = (metadata, embedding)
+
+    upsert = update
+
+
+def fake_encoder(metas, fields):
+    """모델 대신 결정적인 벡터를 만드는 인코더"""
+    rng = np.random.default_rng(len(metas))
+    embeddings = rng.normal(size=(len(metas), DIM)).tolist()
+    return embeddings, [{} for _ in metas]
+
+
+def make_user(user_id: int, version: str = None):
+    meta = {
+        "userId": str(user_id),
+        "emailDomain": DOMAIN,
+        "religion": "무교",
+        "MBTI": "INTJ" if user_id % 2 else "ENFP",
+        "field_embeddings": "{}",
+    }
+    if version:
+        meta[EMBEDDING_VERSION_KEY] = version
+    embedding = np.random.default_rng(user_id).normal(size=DIM).tolist()
+    return str(user_id), (meta, embedding)
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    users = FakeCollection(dict(make_user(i) for i in range(1, 8)))
+    similarities = FakeCollection()
+    registry = DomainIndexRegistry()
+    monkeypatch.setattr(domain_index_module, "get_user_collection", lambda: users)
+    monkeypatch.setattr(migration_module, "get_user_collection", lambda: users)
+    monkeypatch.setattr(
+        migration_module, "get_similarity_collection", lambda: similarities
+    )
+    monkeypatch.setattr(migration_module, "domain_indexes", registry)
+    return users, similarities, registry
+
+
+class TestEmbeddingMigration:
+    """
+    임베딩 재생성 마이그레이션 테스트 클래스
+    """
+
+    def test_registry_separates_versions(self, stores):
+        """
+        버전이 다른 사용자는 서로 다른 인덱스에 들어가는지 확인
+        """
+        users, _, registry = stores
+        user_id, doc = make_user(9, "v2")
+        users.docs[user_id] = doc
+
+        assert registry.get(DOMAIN, "v2").ids == ["9"]
+        legacy = registry.get(DOMAIN, embedding_version_of({}))
+        assert len(legacy) == 7 and "9" not in legacy.ids
+
+        # 재임베딩으로 버전이 바뀌면 이전 버전 인덱스에서 빠짐
+        meta, embedding = users.docs["1"]
+        registry.upsert_user("1", embedding, {**meta, EMBEDDING_VERSION_KEY: "v2"})
+        assert sorted(registry.get(DOMAIN, "v2").ids) == ["1", "9"]
+        assert "1" not in legacy.ids
+
+    def test_migration_cuts_over_when_domain_complete(self, stores, tmp_path):
+        """
+        모든 사용자를 배치로 재임베딩한 뒤 도메인 유사도를 새 버전으로 다시 계산하는지 확인
+        """
+        users, similarities, registry = stores
+        migration = EmbeddingMigration(
+            target_version="v2",
+            batch_size=3,
+            cpu_budget=1.0,
+            state_path=str(tmp_path / "state.json"),
+            encoder=fake_encoder,
+        )
+
+        assert migration.run() == {DOMAIN: DONE}
+
+        assert all(
+            meta[EMBEDDING_VERSION_KEY] == "v2" for meta, _ in users.docs.values()
+        )
+        assert registry.versions(DOMAIN) == ["v2"]
+        assert len(similarities.docs) == 7
+        assert set(decode_similarities(similarities.docs["1"][0])) == {
+            "2",
+            "3",
+            "4",
+            "5",
+            "6",
+            "7",
+        }
+        state = migration.get_stats()["domains"][DOMAIN]
+        assert state["migrated"] == state["total"] == 7
+
+    def test_progress_resumes_from_saved_state(self, stores, tmp_path):
+        """
+        중단된 마이그레이션을 새 인스턴스가 저장된 상태에서 이어서 진행하는지 확인
+        """
+        users, _, _ = stores
+        state_path = str(tmp_path / "state.json")
+        first = EmbeddingMigration(
+            target_version="v2",
+            batch_size=3,
+            cpu_budget=1.0,
+            state_path=state_path,
+            encoder=fake_encoder,
+        )
+        original = first.migrate_batch
+
+        def migrate_then_stop(batch):
+            migrated = original(batch)
+            first._stop.set()
+            return migrated
+
+        first.migrate_batch = migrate_then_stop
+        assert first.run([DOMAIN]) == {DOMAIN: "MIGRATING"}
+
+        second = EmbeddingMigration(
+            target_version="v2",
+            batch_size=3,
+            cpu_budget=1.0,
+            state_path=state_path,
+            encoder=fake_encoder,
+        )
+        assert second.get_stats()["domains"][DOMAIN]["migrated"] == 3
+        assert second.run([DOMAIN]) == {DOMAIN: DONE}
+        assert second.get_stats()["domains"][DOMAIN]["migrated"] == 7
+        assert all(
+            meta[EMBEDDING_VERSION_KEY] == "v2" for meta, _ in users.docs.values()
+        )
+
+    def test_encode_split_into_slices(self, stores, tmp_path):
+        """
+        배치 전체를 한 번에 인코딩하지 않고 구간 안에 끝나는 묶음으로 나누어 묶음마다 휴식하는지 확인
+        """
+        sizes, pauses = [], []
+
+        def recording_encoder(metas, fields):
+            sizes.append(len(metas))
+            return fake_encoder(metas, fields)
+
+        migration = EmbeddingMigration(
+            target_version="v2",
+            batch_size=7,
+            cpu_budget=0.5,
+            slice_ms=0,
+            encode_chunk=2,
+            state_path=str(tmp_path / "state.json"),
+            encoder=recording_encoder,
+        )
+        migration._throttle = pauses.append
+
+        assert migration.migrate_batch([str(i) for i in range(1, 8)]) == 7
+        # 첫 묶음 이후에는 구간(0ms)에 맞춰 한 명씩
+        assert sizes == [2, 1, 1, 1, 1, 1]
+        assert len(pauses) == len(sizes)
@@ -0,0 +1,195 @@
+"""
+도메인 인덱스 스냅샷 테스트 모듈
+이 모듈은 상주 인덱스 스냅샷 저장 / 복원을 단위 테스트합니다.
+주요 테스트 대상:
+- 스냅샷 복원 결과가 전체 로드와 같은 점수를 내는지
+- 스냅샷 이후 등록 / 수정 / 삭제만 Chroma에서 읽어 반영하는지
+- 코덱이 다른 스냅샷은 무시하고 전체 로드하는지
+- 투영 버전이 다른 스냅샷은 무시하고 전체 로드하는지
+"""
+
+import numpy as np
+import pytest
+from core import domain_index as domain_index_module
+from core import matching_score_optimized
+from core.domain_index import DomainIndexRegistry
+from core.index_snapshot import UPDATED_AT_KEY, list_snapshots
+from core.projection import Projection
+
+DOMAIN = "kakaotech.com"
+DIM = 16
+
+
+def matches(meta: dict, where: dict) -> bool:
+    for key, cond in (where or {}).items():
+        if key == "$and":
+            if not all(matches(meta, c) for c in cond):
+                return False
+        elif isinstance(cond, dict):
+            if not meta.get(key, float("-inf")) > cond["$gt"]:
+                return False
+        elif meta.get(key) != cond:
+            return False
+    return True
+
+
+class FakeCollection:
+    """get만 지원하는 메모리 컬렉션 (벡터를 읽어 간 사용자 수 기록)"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.fetched = 0
+
+    def get(self, ids=None, where=None, include=None):
+        found = [
+            doc_id
+            for doc_id in (ids if ids is not None else list(self.docs))
+            if doc_id in self.docs and matches(self.docs[doc_id][0], where)
+        ]
+        include = ["metadatas", "embeddings"] if include is None else include
+        result = {"ids": found}
+        if "embeddings" in include:
+            self.fetched += len(found)
+            result["embeddings"] = [self.docs[d][1] for d in found]
+        if "metadatas" in include:
+            result["metadatas"] = [dict(self.docs[d][0]) for d in found]
+        return result
+
+
+def make_user(user_id: int, updated_at: float = None, mbti: str = "INTJ"):
+    meta = {
+        "userId": str(user_id),
+        "emailDomain": DOMAIN,
+        "MBTI": mbti,
+        "field_embeddings": "{}",
+    }
+    if updated_at is not None:
+        meta[UPDATED_AT_KEY] = updated_at
+    embedding = np.random.default_rng(user_id).normal(size=DIM).tolist()
+    return str(user_id), (meta, embedding)
+
+
+def scores(registry: DomainIndexRegistry):
+    index = registry.get(DOMAIN)
+    ids, cosine, signature_ids, signatures = index.score(np.ones(DIM, np.float32))
+    return {
+        uid: (round(float(c), 5), signatures[s][0])
+        for uid, c, s in zip(ids, cosine, signature_ids)
+    }
+
+
+@pytest.fixture
+def users(monkeypatch):
+    collection = FakeCollection(dict(make_user(i) for i in range(1, 41)))
+    monkeypatch.setattr(domain_index_module, "get_user_collection", lambda: collection)
+    return collection
+
+
+class TestIndexSnapshot:
+    """
+    도메인 인덱스 스냅샷 테스트 클래스
+    """
+
+    def test_restore_matches_full_load(self, users, tmp_path):
+        """
+        스냅샷으로 복원한 인덱스가 메모리 맵으로 열리고 전체 로드와 같은 결과를 내는지 확인
+        """
+        original = DomainIndexRegistry(snapshot_dir=str(tmp_path))
+        expected = scores(original)
+        assert original.save_snapshots() == 1
+        assert original.save_snapshots() == 0  # 변경이 없으면 다시 저장하지 않음
+
+        users.fetched = 0
+        restored = DomainIndexRegistry(snapshot_dir=str(tmp_path))
+        assert scores(restored) == expected
+        assert restored.get(DOMAIN).mapped
+        assert users.fetched == 0
+        assert restored.get_stats()["snapshots"]["restored"] == 1
+
+    def test_replays_only_changes_since_snapshot(self, users, tmp_path):
+        """
+        스냅샷 이후 등록 / 수정 / 삭제된 사용자만 읽어 반영하는지 확인
+        """
+        original = DomainIndexRegistry(snapshot_dir=str(tmp_path))
+        original.get(DOMAIN)
+        original.save_snapshots()
+        later = 4102444800.0  # 스냅샷 이후 시각
+
+        user_id, doc = make_user(41, updated_at=later)
+        users.docs[user_id] = doc  # 등록
+        user_id, doc = make_user(2, updated_at=later, mbti="ENFP")
+        users.docs[user_id] = doc  # 규칙 필드 수정
+        user_id, doc = make_user(42)
+        users.docs[user_id] = doc  # 갱신 시각 없이 추가된 사용자
+        del users.docs["3"]  # 삭제
+
+        users.fetched = 0
+        restored = DomainIndexRegistry(snapshot_dir=str(tmp_path))
+        restored_scores = scores(restored)
+        assert users.fetched == 3  # 변경된 3명의 벡터만 읽음
+        assert restored_scores == scores(DomainIndexRegistry(snapshot_dir=""))
+        stats = restored.get_stats()["snapshots"]
+        assert stats["replayed_users"] == 3
+        assert stats["removed_users"] == 1
+
+        # 복원 후 등록은 여유 행에 들어가고 다시 스냅샷 대상이 됨
+        user_id, (meta, embedding) = make_user(43)
+        restored.upsert_user(user_id, embedding, meta)
+        assert restored.get(DOMAIN).mapped
+        assert restored.save_snapshots() == 1
+        assert (
+            len(list_snapshots(str(tmp_path), DOMAIN, restored.get(DOMAIN).version))
+            == 2
+        )
+
+    def test_snapshot_with_other_codec_is_ignored(self, users, tmp_path):
+        """
+        다른 코덱으로 저장된 스냅샷은 쓰지 않고 Chroma에서 전체 로드하는지 확인
+        """
+        other = DomainIndexRegistry("float16", snapshot_dir=str(tmp_path))
+        other.get(DOMAIN)
+        assert other.save_snapshots() == 1
+
+        users.fetched = 0
+        registry = DomainIndexRegistry("float32", snapshot_dir=str(tmp_path))
+        assert len(registry.get(DOMAIN)) == 40
+        assert not registry.get(DOMAIN).mapped
+        assert users.fetched == 40
+
+    def test_snapshot_with_other_projection_is_ignored(
+        self, users, tmp_path, monkeypatch
+    ):
+        """
+        투영을 켜거나 바꾼 뒤에는 이전 매칭 벡터 공간의 스냅샷을 쓰지 않고 전체 로드하는지 확인
+        """
+        original = DomainIndexRegistry(snapshot_dir=str(tmp_path))
+        original.get(DOMAIN)
+        assert original.save_snapshots() == 1
+
+        def activate(version: str, dim: int):
+            components = np.random.default_rng(dim).normal(size=(dim, DIM))
+            projection = Projection(version, components, np.ones(dim), 40)
+            for module in (domain_index_module, matching_score_optimized):
+                monkeypatch.setattr(module, "get_active_projection", lambda: projection)
+
+        # 투영 사용 시작 → 16차원 스냅샷 무시
+        activate("pca-4-a", 4)
+        users.fetched = 0
+        registry = DomainIndexRegistry(snapshot_dir=str(tmp_path))
+        index = registry.get(DOMAIN)
+        assert not index.mapped and index.codec.dim == 4
+        assert users.fetched == 40
+        assert len(index.score(np.ones(4, np.float32))[0]) == 40
+        assert registry.get_stats()["snapshots"]["incompatible"] == 1
+        assert registry.save_snapshots() == 1
+
+        # 같은 차원으로 다시 학습한 투영 → 이전 투영 스냅샷 무시
+        activate("pca-4-b", 4)
+        users.fetched = 0
+        refit = DomainIndexRegistry(snapshot_dir=str(tmp_path))
+        assert not refit.get(DOMAIN).mapped
+        assert users.fetched == 40
+
+        # 같은 투영이면 복원
+        activate("pca-4-a", 4)
+        assert DomainIndexRegistry(snapshot_dir=str(tmp_path)).get(DOMAIN).mapped
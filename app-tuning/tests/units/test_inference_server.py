@@ -0,0 +1,132 @@
+"""
+추론 서버 테스트 모듈
+이 모듈은 별도 추론 서버와 원격 인코더 클라이언트를 단위 테스트합니다.
+주요 테스트 대상:
+- 공유 메모리로 돌려받은 임베딩 값의 정확성
+- 여러 클라이언트 요청의 배치 처리
+- 단일 텍스트 / 목록 입력의 반환 형태
+- 이벤트 루프 스레드를 막지 않는 encode_async
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from core.inference_client import InferenceServerError, RemoteEncoder
+from core.inference_server import InferenceServer
+
+DIM = 8
+AUTHKEY = b"test-inference"
+
+
+class FakeModel:
+    """텍스트 길이로 결정적인 벡터를 만드는 모델"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, show_progress_bar=False):
+        self.calls += 1
+        if "fail" in texts:
+            raise ValueError("encode failed")
+        return np.array([expected(text) for text in texts], dtype=np.float32)
+
+
+def expected(text: str) -> np.ndarray:
+    return np.arange(DIM, dtype=np.float32) + len(text)
+
+
+@pytest.fixture
+def server(tmp_path):
+    model = FakeModel()
+    server = InferenceServer(
+        str(tmp_path / "inference.sock"),
+        lambda: model,
+        max_batch=64,
+        batch_wait=0.05,
+        authkey=AUTHKEY,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    assert server.wait_ready(5)
+    yield server
+    server.shutdown()
+    thread.join(5)
+
+
+class TestInferenceServer:
+    """
+    추론 서버 테스트 클래스
+    """
+
+    def test_encode_returns_model_vectors(self, server):
+        """
+        공유 메모리로 받은 결과가 모델 출력과 같고 입력 형태에 맞는지 확인
+        """
+        encoder = RemoteEncoder(server.address, authkey=AUTHKEY)
+
+        assert encoder.get_sentence_embedding_dimension() == DIM
+        single = encoder.encode("음악")
+        assert single.shape == (DIM,)
+        np.testing.assert_array_equal(single, expected("음악"))
+
+        batch = encoder.encode(["a", "bbb"], show_progress_bar=False)
+        assert batch.shape == (2, DIM)
+        np.testing.assert_array_equal(batch[1], expected("bbb"))
+
+    def test_concurrent_requests_are_batched(self, server):
+        """
+        여러 스레드(워커)의 동시 요청이 더 적은 수의 encode 호출로 묶이는지 확인
+        """
+        encoder = RemoteEncoder(server.address, authkey=AUTHKEY)
+        texts = ["x" * i for i in range(1, 17)]
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(encoder.encode, texts))
+
+        for text, vector in zip(texts, results):
+            np.testing.assert_array_equal(vector, expected(text))
+        stats = server.get_stats()
+        assert stats["requests"] == 16
+        assert stats["batches"] < stats["requests"]
+
+    def test_encode_error_is_raised_to_client(self, server):
+        """
+        서버 측 인코딩 실패가 클라이언트 예외로 전달되고 연결은 계속 쓸 수 있는지 확인
+        """
+        encoder = RemoteEncoder(server.address, authkey=AUTHKEY)
+
+        with pytest.raises(InferenceServerError):
+            encoder.encode(["fail"])
+        np.testing.assert_array_equal(encoder.encode("ok"), expected("ok"))
+
+    @pytest.mark.asyncio
+    async def test_encode_async_keeps_event_loop_free(self, server):
+        """
+        encode_async는 스레드에서 요청하여 배치 대기 중에도 루프가 돌고,
+        루프 스레드에서 직접 호출한 encode는 집계되는지 확인
+        """
+        encoder = RemoteEncoder(server.address, authkey=AUTHKEY)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        vector = await encoder.encode_async("음악")
+        task.cancel()
+
+        np.testing.assert_array_equal(vector, expected("음악"))
+        assert ticks > 1
+        assert encoder.get_stats()["loop_thread_calls"] == 0
+
+        encoder.encode("blocking")
+        assert encoder.get_stats()["loop_thread_calls"] == 1
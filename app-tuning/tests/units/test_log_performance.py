@@ -0,0 +1,139 @@
+"""
+성능 로깅 데코레이터 테스트 모듈
+이 모듈은 log_performance 데코레이터의 계측 비용 절감을 단위 테스트합니다.
+주요 테스트 대상:
+- 요청 컨텍스트의 유저 ID 사용과 user_id 인자 대체
+- 작업별 측정 비율 (측정하지 않은 호출도 오류는 집계)
+- 메모리는 호출마다가 아니라 백그라운드 샘플러에서 읽는지
+- 계측 오버헤드가 실행 시간의 1% 미만인지
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+
+import pytest
+from utils import logger
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def records():
+    logger.reset_performance_metrics()
+    handler = ListHandler()
+    logger.logger.addHandler(handler)
+    yield handler.messages
+    logger.logger.removeHandler(handler)
+    logger.reset_performance_metrics()
+
+
+class TestLogPerformance:
+    """
+    성능 로깅 데코레이터 테스트 클래스
+    """
+
+    def test_user_id_from_context_then_argument(self, records):
+        """
+        컨텍스트에 유저 ID가 있으면 그 값을, 없으면 user_id 인자를 로그에 쓰는지 확인
+        """
+
+        @logger.log_performance("lookup")
+        def lookup(domain, user_id=None):
+            return {}
+
+        @logger.log_performance("lookup_async")
+        async def lookup_async(user_id):
+            return {}
+
+        def in_request():
+            logger.bind_user_id(42)
+            lookup("a.com", user_id="7")
+            asyncio.run(lookup_async("8"))
+
+        contextvars.copy_context().run(in_request)
+        lookup("a.com", user_id="7")
+        lookup("a.com")
+
+        assert [m.split("userId=")[1].rstrip("]") for m in records] == [
+            "42",
+            "42",
+            "7",
+            "unknown",
+        ]
+        assert logger.current_user_id.get() is None
+
+    def test_sample_rate_skips_measurement_but_counts_errors(self, records):
+        """
+        측정 비율이 0이면 시간 / 로그는 기록하지 않고 오류 횟수만 집계하는지 확인
+        """
+
+        @logger.log_performance("hot_path", sample_rate=0.0)
+        def hot_path(fail=False):
+            if fail:
+                raise KeyError("x")
+            return 1
+
+        for _ in range(10):
+            hot_path()
+        with pytest.raises(KeyError):
+            hot_path(fail=True)
+
+        summary = logger.get_performance_summary()
+        assert records == []
+        assert "hot_path" not in summary.get("api_response_times", {})
+        assert summary["errors"] == {"hot_path": {"KeyError": 1}}
+        assert logger.sample_rates["hot_path"] == 0.0
+
+    def test_memory_is_read_from_sampler(self, records, monkeypatch):
+        """
+        include_memory=True여도 호출마다 psutil을 읽지 않고 샘플러 값을 쓰는지 확인
+        """
+        reads = []
+        monkeypatch.setattr(
+            logger, "_get_memory_usage", lambda: reads.append(1) or 100.0
+        )
+        sampler = logger.MemorySampler(interval=60)
+        monkeypatch.setattr(logger, "memory_sampler", sampler)
+
+        @logger.log_performance("with_memory", include_memory=True)
+        def with_memory():
+            return 1
+
+        for _ in range(20):
+            with_memory()
+
+        assert len(reads) == 1  # 샘플러 시작 시 한 번
+        assert "memory_diff=0.00MB" in records[-1]
+        summary = logger.get_performance_summary()
+        assert summary["memory_usage_by_function"]["with_memory"]["latest"] == 100.0
+
+    def test_overhead_is_below_one_percent(self, records, monkeypatch):
+        """
+        요청 수준 작업에서 데코레이터 자체의 계측 오버헤드가 측정되고 실행 시간의 1% 미만인지 확인
+        (콘솔 / 파일 출력 비용은 환경에 따라 달라 제외)
+        """
+        monkeypatch.setattr(logger.logger, "handlers", [logging.NullHandler()])
+
+        @logger.log_performance("request_like", include_memory=True)
+        def request_like(user_id):
+            time.sleep(0.1)
+            return {"matchedUserCount": 1}
+
+        request_like("0")  # 샘플러 시작
+        logger.reset_performance_metrics()
+        for _ in range(5):
+            request_like("1")
+
+        summary = logger.get_performance_summary()
+        ratio = summary["api_response_times"]["request_like"]["overhead_ratio"]
+        assert 0 < ratio < 0.01
+        assert summary["instrumentation"]["overhead_seconds"] > 0
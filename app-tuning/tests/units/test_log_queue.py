@@ -0,0 +1,129 @@
+"""
+큐 기반 로그 출력 테스트 모듈
+이 모듈은 utils/log_queue의 비동기 출력과 JSON 형식을 단위 테스트합니다.
+주요 테스트 대상:
+- 느린 핸들러가 로그 호출을 지연시키지 않는지
+- 큐가 가득 차면 기다리지 않고 버린 수를 집계하는지
+- 중지 시 남은 레코드를 모두 출력하는지
+- JSON 형식과 요청 컨텍스트의 user_id
+"""
+
+import json
+import logging
+import threading
+import time
+
+import pytest
+from utils import logger
+from utils.log_queue import JsonFormatter, QueueLogging
+
+
+class SlowHandler(logging.Handler):
+    def __init__(self, delay: float = 0.0):
+        super().__init__()
+        self.delay = delay
+        self.messages = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def emit(self, record):
+        self.gate.wait()
+        time.sleep(self.delay)
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def target():
+    test_logger = logging.getLogger("test_log_queue")
+    test_logger.setLevel(logging.INFO)
+    test_logger.propagate = False
+    yield test_logger
+    test_logger.handlers.clear()
+
+
+class TestQueueLogging:
+    """
+    QueueLogging 단위 테스트
+    """
+
+    def test_slow_handler_does_not_block_caller(self, target):
+        """
+        핸들러가 느려도 logger.info는 큐에 넣고 바로 반환
+        """
+        handler = SlowHandler(delay=0.05)
+        queue_logging = QueueLogging(target, [handler], queue_size=100)
+
+        start = time.perf_counter()
+        for i in range(10):
+            target.info(f"message {i}")
+        elapsed = time.perf_counter() - start
+        queue_logging.stop()
+
+        assert elapsed < 0.05 * 10 / 2
+        assert handler.messages == [f"message {i}" for i in range(10)]
+
+    def test_full_queue_drops_and_counts(self, target):
+        """
+        출력이 막혀 큐가 가득 차면 기다리지 않고 버린 수를 집계
+        """
+        handler = SlowHandler()
+        handler.gate.clear()
+        queue_logging = QueueLogging(target, [handler], queue_size=5)
+
+        for i in range(20):
+            target.info(f"message {i}")
+        stats = queue_logging.get_stats()
+        handler.gate.set()
+        queue_logging.stop()
+
+        # 리스너가 꺼내 간 1개 + 큐 5개 외에는 버려짐
+        assert stats["dropped"] >= 20 - 6
+        assert stats["enqueued"] + stats["dropped"] == 20
+        assert len(handler.messages) == stats["enqueued"]
+
+    def test_stop_flushes_pending_records(self, target):
+        """
+        중지 시 큐에 남은 레코드를 모두 출력하고, 두 번 호출해도 안전
+        """
+        handler = SlowHandler(delay=0.001)
+        queue_logging = QueueLogging(target, [handler], queue_size=1000)
+
+        for i in range(200):
+            target.info(f"message {i}")
+        queue_logging.stop()
+        queue_logging.stop()
+
+        assert len(handler.messages) == 200
+        assert queue_logging.get_stats()["depth"] == 0
+
+
+class TestJsonFormatter:
+    """
+    JsonFormatter 단위 테스트
+    """
+
+    def test_json_line_with_user_id(self):
+        """
+        한 줄 JSON에 기본 필드와 성능 로거가 붙인 user_id가 포함되는지
+        """
+        captured = []
+
+        class Capture(logging.Handler):
+            def emit(self, record):
+                captured.append(JsonFormatter(["user_id"]).format(record))
+
+        handler = Capture()
+        logger.logger.addHandler(handler)
+        token = logger.bind_user_id(42)
+        try:
+            logger.logger.info('PERF: "quoted" 한글')
+        finally:
+            logger.reset_user_id(token)
+            logger.logger.removeHandler(handler)
+
+        assert "\n" not in captured[0]
+        entry = json.loads(captured[0])
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "tuning_performance"
+        assert entry["message"] == 'PERF: "quoted" 한글'
+        assert entry["user_id"] == "42"
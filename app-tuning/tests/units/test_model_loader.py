@@ -0,0 +1,184 @@
+"""
+모델 백그라운드 로드 테스트 모듈
+이 모듈은 SBERT 모델 지연 로드와 준비 상태 확인을 단위 테스트합니다.
+주요 테스트 대상:
+- 백그라운드 로드 상태 전환 (LOADING → READY / FAILED)
+- 로드 전 /api/v1/health/ready 와 임베딩 요청의 503 + Retry-After 응답
+- get_model()의 로드 대기
+- 로드 실패 후 백오프 재시도
+- 규칙 필드만 바뀐 프로필 수정은 모델 로드 중에도 처리
+"""
+
+import json
+import threading
+
+import pytest
+from api.controllers.user_controller import ensure_model_ready
+from api.endpoints.health_router import HealthRouter
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from models import sbert_loader
+from schemas.user_schema import EmbeddingUpdate
+from services import user_service
+from utils.error_handler import register_exception_handlers
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """모듈 상태를 초기화하고 느린 가짜 모델 생성 함수로 교체"""
+    release = threading.Event()
+    fake_model = object()
+
+    def create():
+        release.wait(5)
+        return fake_model
+
+    monkeypatch.setattr(sbert_loader, "model", None)
+    monkeypatch.setattr(sbert_loader, "_model_ready", threading.Event())
+    monkeypatch.setattr(sbert_loader, "_attempt_done", threading.Event())
+    monkeypatch.setattr(sbert_loader, "_model_thread", None)
+    monkeypatch.setattr(sbert_loader, "_model_error", None)
+    monkeypatch.setattr(sbert_loader, "_load_attempts", 0)
+    monkeypatch.setattr(sbert_loader, "_next_retry_at", None)
+    monkeypatch.setattr(sbert_loader, "_load_seconds", None)
+    monkeypatch.setattr(sbert_loader, "_create_model", create)
+    yield release, fake_model
+    release.set()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    register_exception_handlers(app)
+    app.include_router(HealthRouter().router)
+
+    @app.post("/embed")
+    async def embed():
+        ensure_model_ready()
+        return {"code": "OK"}
+
+    return TestClient(app)
+
+
+class TestModelLoader:
+    """
+    모델 백그라운드 로드 테스트 클래스
+    """
+
+    def test_requests_rejected_until_model_ready(self, loader, client):
+        """
+        로드 중에는 준비 확인과 임베딩 요청이 503 + Retry-After, 완료 후에는 200인지 확인
+        """
+        release, fake_model = loader
+        sbert_loader.start_model_loading()
+
+        assert client.get("/api/v1/health").status_code == 200
+        ready = client.get("/api/v1/health/ready")
+        assert ready.status_code == 503
+        assert ready.headers["Retry-After"] == str(
+            sbert_loader.MODEL_RETRY_AFTER_SECONDS
+        )
+        assert ready.json()["model"]["status"] == "LOADING"
+        rejected = client.post("/embed")
+        assert rejected.status_code == 503
+        assert rejected.json()["code"] == "EMBEDDING_MODEL_NOT_READY"
+        assert "Retry-After" in rejected.headers
+
+        release.set()
+        assert sbert_loader.get_model() is fake_model
+        assert client.get("/api/v1/health/ready").status_code == 200
+        assert client.post("/embed").json() == {"code": "OK"}
+
+    def test_get_model_waits_for_lazy_load(self, loader):
+        """
+        백그라운드 로드를 시작하지 않은 경우(스크립트 등) get_model()이 로드 후 반환하는지 확인
+        """
+        release, fake_model = loader
+        assert sbert_loader.get_model_status()["status"] == "NOT_STARTED"
+
+        release.set()
+        assert sbert_loader.get_model() is fake_model
+        assert sbert_loader.get_model_status()["status"] == "READY"
+
+    def test_failed_load_is_reported(self, loader, monkeypatch):
+        """
+        로드 실패가 FAILED 상태로 보고되고 get_model()이 예외를 던지는지 확인
+        """
+
+        def fail():
+            raise OSError("model files missing")
+
+        monkeypatch.setattr(sbert_loader, "_create_model", fail)
+
+        with pytest.raises(RuntimeError):
+            sbert_loader.get_model()
+        status = sbert_loader.get_model_status()
+        assert status["status"] == "FAILED"
+        assert "model files missing" in status["error"]
+        assert status["attempts"] == 1 and "retryInSeconds" in status
+
+    def test_failed_load_is_retried(self, loader, monkeypatch, client):
+        """
+        로드 실패(예: 추론 서버가 아직 뜨지 않음) 후 백오프 재시도로 READY가 되는지 확인
+        """
+        release, fake_model = loader
+        release.set()
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionRefusedError("inference server not running")
+            return fake_model
+
+        monkeypatch.setattr(sbert_loader, "_create_model", flaky)
+        monkeypatch.setattr(sbert_loader, "MODEL_LOAD_RETRY_BASE_DELAY", 0.01)
+        sbert_loader.start_model_loading()
+
+        assert sbert_loader._model_ready.wait(5)
+        assert len(attempts) == 3
+        assert sbert_loader.get_model() is fake_model
+        assert client.get("/api/v1/health/ready").status_code == 200
+
+    def test_rule_only_update_skips_readiness_check(self, loader, monkeypatch):
+        """
+        모델 로드 중에도 MBTI 수정은 처리되고, 재임베딩이 필요한 수정만 503인지 확인
+        """
+        stored = {
+            "userId": "1",
+            "emailDomain": "kakaotech.com",
+            "MBTI": "ESTP",
+            "hobbies": "게임",
+            "field_embeddings": json.dumps({}),
+        }
+
+        class Collection:
+            def get(self, ids, include):
+                return {"ids": ids, "metadatas": [dict(stored)], "embeddings": [[0.1]]}
+
+            def update(self, ids, embeddings, metadatas):
+                stored.update(metadatas[0])
+
+        class Feed:
+            def append(self, op, user_id, domain):
+                pass
+
+        monkeypatch.setattr(user_service, "get_user_collection", Collection)
+        monkeypatch.setattr(user_service, "change_feed", Feed())
+        monkeypatch.setattr(
+            user_service, "update_similarity_for_users", lambda *a, **k: {}
+        )
+        sbert_loader.start_model_loading()
+
+        result = user_service.update_user_profile(
+            "1", EmbeddingUpdate(MBTI="INFJ"), ensure_model_ready
+        )
+        assert result["changedFields"] == ["MBTI"]
+        assert stored["MBTI"] == "INFJ"
+
+        with pytest.raises(HTTPException) as rejected:
+            user_service.update_user_profile(
+                "1", EmbeddingUpdate(hobbies=["MUSIC"]), ensure_model_ready
+            )
+        assert rejected.value.status_code == 503
+        assert stored["hobbies"] == "게임"
@@ -0,0 +1,107 @@
+"""
+성능 지표 저장소 테스트 모듈
+이 모듈은 고정 메모리 히스토그램 기반 성능 지표를 단위 테스트합니다.
+주요 테스트 대상:
+- 로그 버킷 분위수의 상대 오차와 고정된 버킷 수
+- 최근 구간(sliding window)이 지나면 분위수에서 오래된 값이 빠지는지
+- /monitoring/performance-summary 응답 형태와 작업별 오류 카운트
+"""
+
+import numpy as np
+import pytest
+from utils import logger
+from utils.histogram import HISTOGRAM_GROWTH, LogHistogram, WindowedHistogram
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def metrics():
+    logger.reset_performance_metrics()
+    yield logger.performance_metrics
+    logger.reset_performance_metrics()
+
+
+class TestPerformanceMetrics:
+    """
+    성능 지표 저장소 테스트 클래스
+    """
+
+    def test_quantiles_are_accurate_with_fixed_buckets(self):
+        """
+        대량의 값을 기록해도 버킷 수가 고정되고 분위수가 버킷 폭 이내 오차인지 확인
+        """
+        values = np.random.default_rng(0).lognormal(mean=-3, sigma=1, size=100_000)
+        histogram = LogHistogram()
+        for value in values:
+            histogram.record(float(value))
+
+        assert histogram.count == len(values)
+        assert len(histogram.buckets) < 400
+        assert histogram.max == pytest.approx(values.max())
+        for q in (0.5, 0.95, 0.99):
+            exact = np.quantile(values, q)
+            assert abs(histogram.quantile(q) - exact) / exact < HISTOGRAM_GROWTH - 1
+
+    def test_window_drops_old_samples(self):
+        """
+        구간이 지나면 분위수는 최근 값만 반영하고 누적 개수 / 최대값은 유지되는지 확인
+        """
+        clock = FakeClock()
+        histogram = WindowedHistogram(window_seconds=60, slots=6, clock=clock)
+        for _ in range(100):
+            histogram.record(5.0)
+
+        clock.now = 30
+        for _ in range(10):
+            histogram.record(0.01)
+        assert histogram.summary()["p95"] == pytest.approx(5.0, rel=0.03)
+
+        clock.now = 75  # 처음 기록한 칸은 구간 밖
+        summary = histogram.summary()
+        assert summary["window_count"] == 10
+        assert summary["p95"] == pytest.approx(0.01, rel=0.03)
+        assert (summary["count"], summary["max"]) == (110, 5.0)
+
+    def test_summary_shape_and_error_counts(self, metrics):
+        """
+        요약 응답의 기존 키가 유지되고 동기 / 비동기 / DB 오류가 작업별로 집계되는지 확인
+        """
+
+        @logger.log_performance("score_users", include_memory=True)
+        def score_users(user_id, fail=False):
+            if fail:
+                raise ValueError("bad input")
+            return {"matchedUserCount": 3}
+
+        @logger.log_db_operation("get", "user_profiles")
+        def fetch(ids=None):
+            raise TimeoutError()
+
+        for _ in range(5):
+            score_users("1")
+        with pytest.raises(ValueError):
+            score_users("1", fail=True)
+        with pytest.raises(TimeoutError):
+            fetch(ids=["1"])
+        logger.log_embedding_generation(4, 384, 0.2)
+        logger.log_similarity_calculation("1", 10, 5, 0.1)
+
+        summary = logger.get_performance_summary()
+        api = summary["api_response_times"]["score_users"]
+        assert {"count", "avg", "min", "max", "p95"} <= set(api)
+        assert (api["count"], api["errors"]) == (5, 1)
+        assert summary["errors"] == {
+            "score_users": {"ValueError": 1},
+            "user_profiles_get": {"TimeoutError": 1},
+        }
+        assert summary["embedding_generation"]["avg_fields"] == 4
+        assert summary["similarity_calculation"]["avg_match_ratio"] == 0.5
+        assert summary["memory_usage"]["samples"] == 5
+        assert summary["memory_usage_by_function"]["score_users"]["count"] == 5
@@ -0,0 +1,224 @@
+"""
+pre-fork 다중 워커 테스트 모듈
+이 모듈은 fork된 워커 사이의 상태 동기화와 메모리 보고를 단위 테스트합니다.
+주요 테스트 대상:
+- 다른 프로세스의 도메인 변경을 저널의 사용자만 증분 반영
+- 저널이 밀려났거나 도메인 단위 변경이면 상주 인덱스 다시 로드
+- 자신이 변경한 도메인은 다시 로드하지 않음
+- 다른 프로세스의 무효화가 추천 캐시에 반영
+- 워커 번호 / 메모리 보고
+- 워커 종료 시 큐에 남은 로그 출력
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pytest
+from core import domain_index as domain_index_module
+from core import recommendation_cache as recommendation_cache_module
+from core.domain_index import DomainIndexRegistry
+from core.prefork import PreforkServer, is_primary_worker, read_process_memory
+from core.recommendation_cache import RecommendationCache
+from core.worker_generations import DomainGenerations
+from utils import logger
+from utils.log_queue import QueueLogging
+
+DOMAIN = "kakaotech.com"
+DIM = 16
+
+
+class FakeCollection:
+    """get만 지원하는 메모리 컬렉션"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = []
+
+    def get(self, ids=None, where=None, include=None):
+        self.calls.append({"ids": ids, "where": where})
+        found = [
+            doc_id
+            for doc_id, (meta, _) in self.docs.items()
+            if (ids is None or doc_id in ids)
+            and all(meta.get(k) == v for k, v in (where or {}).items())
+        ]
+        return {
+            "ids": found,
+            "metadatas": [dict(self.docs[d][0]) for d in found],
+            "embeddings": [self.docs[d][1] for d in found],
+        }
+
+
+def make_user(user_id: int):
+    meta = {
+        "userId": str(user_id),
+        "emailDomain": DOMAIN,
+        "MBTI": "INTJ",
+        "field_embeddings": "{}",
+    }
+    embedding = np.random.default_rng(user_id).normal(size=DIM).tolist()
+    return str(user_id), (meta, embedding)
+
+
+def run_in_child(target, *args):
+    """fork된 프로세스에서 target 실행 (pre-fork 워커 역할)"""
+    process = multiprocessing.get_context("fork").Process(target=target, args=args)
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    index_generations = DomainGenerations(slots=64, journal_size=8)
+    index_generations.share()
+    recommendation_generations = DomainGenerations(slots=64)
+    recommendation_generations.share()
+    monkeypatch.setattr(domain_index_module, "index_generations", index_generations)
+    monkeypatch.setattr(
+        recommendation_cache_module,
+        "recommendation_generations",
+        recommendation_generations,
+    )
+    return index_generations, recommendation_generations
+
+
+@pytest.fixture
+def users(monkeypatch):
+    collection = FakeCollection(dict(make_user(i) for i in range(1, 5)))
+    monkeypatch.setattr(domain_index_module, "get_user_collection", lambda: collection)
+    return collection
+
+
+class TestPrefork:
+    """
+    pre-fork 다중 워커 테스트 클래스
+    """
+
+    def test_sibling_change_applied_incrementally(self, generations, users):
+        """
+        다른 워커의 등록/삭제는 도메인을 다시 로드하지 않고 바뀐 사용자만 Chroma에서 읽어 반영하는지 확인
+        """
+        registry = DomainIndexRegistry()
+        index = registry.get(DOMAIN)
+        assert len(index) == 4
+
+        user_id, (meta, embedding) = make_user(5)
+        users.docs[user_id] = (meta, embedding)  # 공유 저장소(Chroma)에 반영된 상태
+        run_in_child(registry.upsert_user, user_id, embedding, meta)
+        del users.docs["2"]
+        run_in_child(registry.remove_user, "2", DOMAIN)
+        users.calls.clear()
+
+        assert registry.get(DOMAIN) is index
+        assert sorted(index.ids) == ["1", "3", "4", "5"]
+        assert users.calls == [{"ids": ["5", "2"], "where": None}]
+        assert registry.get_stats()["worker_sync"] == {"synced_users": 2, "reloads": 0}
+
+        # 이미 반영한 뒤에는 다시 읽지 않음
+        registry.get(DOMAIN)
+        assert len(users.calls) == 1
+
+    def test_overflowed_journal_reloads_domain_index(self, generations, users):
+        """
+        저널 크기보다 많이 밀렸거나 도메인 단위 변경이면 도메인 전체를 다시 로드하는지 확인
+        """
+        registry = DomainIndexRegistry()
+        index = registry.get(DOMAIN)
+
+        def register_many():
+            for i in range(5, 15):
+                user_id, (meta, embedding) = make_user(i)
+                registry.upsert_user(user_id, embedding, meta)
+
+        users.docs.update(make_user(i) for i in range(5, 15))
+        run_in_child(register_many)
+
+        reloaded = registry.get(DOMAIN)
+        assert reloaded is not index
+        assert len(reloaded) == 14
+        assert registry.get_stats()["worker_sync"]["reloads"] == 1
+
+        # 사용자 ID 없이 기록된 변경 (버전 해제 등)
+        run_in_child(generations[0].record, DOMAIN)
+        assert registry.get(DOMAIN) is not reloaded
+        assert registry.get_stats()["worker_sync"]["reloads"] == 2
+
+    def test_own_change_does_not_reload(self, generations, users):
+        """
+        자신이 반영한 변경은 세대만 맞추고 인덱스를 다시 로드하지 않는지 확인
+        """
+        registry = DomainIndexRegistry()
+        index = registry.get(DOMAIN)
+
+        user_id, (meta, embedding) = make_user(6)
+        registry.upsert_user(user_id, embedding, meta)
+
+        assert registry.get(DOMAIN) is index
+        assert "6" in index.ids
+
+    @pytest.mark.asyncio
+    async def test_sibling_invalidation_marks_cache_stale(self, generations):
+        """
+        다른 워커의 도메인 무효화가 이 워커의 추천 캐시를 stale로 만드는지 확인
+        """
+        cache = RecommendationCache(stale_wait=1.0)
+
+        async def first():
+            return [2, 3], DOMAIN
+
+        async def second():
+            return [4], DOMAIN
+
+        assert await cache.get_or_load("1", first) == [2, 3]
+        run_in_child(RecommendationCache().invalidate_domain, DOMAIN)
+
+        assert await cache.get_or_load("1", second) == [4]
+        assert cache.get_stats()["refreshes"] == 1
+
+    def test_worker_identity_and_memory(self, monkeypatch):
+        """
+        워커 번호에 따른 주 워커 판별과 프로세스 메모리 보고 확인
+        """
+        monkeypatch.delenv("TUNING_WORKER_INDEX", raising=False)
+        assert is_primary_worker()
+        monkeypatch.setenv("TUNING_WORKER_INDEX", "2")
+        assert not is_primary_worker()
+
+        memory = read_process_memory()
+        assert memory["rss"] > 0
+
+    def test_worker_exit_flushes_queued_logs(self, monkeypatch, tmp_path):
+        """
+        os._exit로 끝나는 워커도 큐에 남은 로그를 모두 출력한 뒤 종료하는지 확인
+        """
+
+        class SlowFileHandler(logging.FileHandler):
+            def emit(self, record):
+                time.sleep(0.001)
+                super().emit(record)
+
+        target = logging.getLogger("test_prefork_worker")
+        target.setLevel(logging.INFO)
+        target.propagate = False
+        path = tmp_path / "worker.log"
+        queue_logging = QueueLogging(target, [SlowFileHandler(path)])
+        monkeypatch.setattr(logger, "queue_logging", queue_logging)
+
+        def run_worker(config, sock, worker_index):
+            for i in range(100):
+                target.info(f"message {i}")
+
+        server = PreforkServer(workers=1)
+        monkeypatch.setattr(server, "_run_worker", run_worker)
+        server._spawn(None, None, 1)
+        for pid in server._children:
+            _, status = os.waitpid(pid, 0)
+            assert os.waitstatus_to_exitcode(status) == 0
+        queue_logging.stop()
+        target.handlers.clear()
+
+        assert path.read_text().splitlines() == [f"message {i}" for i in range(100)]
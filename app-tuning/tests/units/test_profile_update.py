@@ -0,0 +1,77 @@
+"""
+사용자 프로필 부분 수정 테스트 모듈
+이 모듈은 수정 요청과 저장된 메타데이터의 비교 및 반영 계획을 단위 테스트합니다.
+주요 테스트 대상:
+- 규칙 필드만 바뀐 경우 재임베딩 생략
+- 임베딩 필드 변경 시 해당 필드와 통합 텍스트만 재임베딩
+- 값이 같은 요청은 변경 없음 처리, 부분 수정 스키마 검증
+"""
+
+import json
+
+import pytest
+from core.profile_update import PROFILE_TEXT_FIELDS, plan_profile_update
+from pydantic import ValidationError
+from schemas.user_schema import EmbeddingUpdate
+
+STORED_META = {
+    "userId": "1",
+    "emailDomain": "kakaotech.com",
+    "gender": "남자",
+    "ageGroup": "20대",
+    "MBTI": "ESTP",
+    "religion": "무교",
+    "smoking": "비흡연",
+    "drinking": "가끔",
+    "personality": "친절한, 내향적인",
+    "currentInterests": "베이킹, 그림",
+    "hobbies": "게임",
+    "field_embeddings": json.dumps({field: [0.1] for field in PROFILE_TEXT_FIELDS}),
+}
+
+
+class TestProfileUpdate:
+    """
+    프로필 부분 수정 계획 테스트 클래스
+    """
+
+    def test_rule_only_change_skips_inference(self):
+        """
+        MBTI만 바뀐 경우 재임베딩 없이 매칭 스코어만 재계산하는지 확인
+        """
+        plan = plan_profile_update(STORED_META, {"MBTI": "INFJ"})
+
+        assert plan.changed_fields == ["MBTI"]
+        assert plan.reembed_fields == []
+        assert plan.reembed_profile is False
+        assert plan.rules_changed and plan.update_similarity
+        assert plan.metadata["MBTI"] == "INFJ"
+
+    def test_embedding_field_change_reembeds_only_that_field(self):
+        """
+        임베딩 필드 변경 시 해당 필드와 통합 텍스트만 재임베딩하고 같은 값은 무시하는지 확인
+        """
+        plan = plan_profile_update(
+            STORED_META,
+            {"religion": "NON_RELIGIOUS", "hobbies": ["GAMING", "MUSIC"]},
+        )
+
+        assert plan.changed_fields == ["hobbies"]
+        assert plan.reembed_fields == ["hobbies"]
+        assert plan.reembed_profile is True
+        assert plan.rules_changed is False
+        assert plan.metadata["hobbies"] == "게임, 음악"
+
+        unchanged = plan_profile_update(STORED_META, {"smoking": "NO_SMOKING"})
+        assert unchanged.changed_fields == [] and not unchanged.update_similarity
+
+    def test_update_schema_validation(self):
+        """
+        빈 요청, 빈 값, 변경 불가 필드(emailDomain)를 거절하는지 확인
+        """
+        assert EmbeddingUpdate(MBTI="INFJ").model_dump(exclude_unset=True) == {
+            "MBTI": "INFJ"
+        }
+        for payload in ({}, {"pets": []}, {"emailDomain": "other.com"}):
+            with pytest.raises(ValidationError):
+                EmbeddingUpdate(**payload)
@@ -0,0 +1,106 @@
+"""
+매칭 벡터 PCA 투영 테스트 모듈
+이 모듈은 결합 벡터 차원 축소 투영의 학습, 저장, 평가를 단위 테스트합니다.
+주요 테스트 대상:
+- 버전별 저장/로드
+- 저차원 구조를 가진 벡터에서 상위 K개 목록 보존 여부
+- 투영 적용 경로 (상주 인덱스 벡터에만 적용)
+"""
+
+import json
+
+import numpy as np
+import pytest
+from core import matching_score_optimized
+from core.projection import (
+    Projection,
+    evaluate_projection,
+    fit_projection,
+    load_projection,
+    save_projection,
+)
+
+
+def make_vectors(n: int = 400, dim: int = 768, rank: int = 32) -> np.ndarray:
+    """저차원 구조 + 작은 잡음을 가진 벡터 생성"""
+    rng = np.random.default_rng(0)
+    basis = rng.normal(size=(rank, dim))
+    vectors = rng.normal(size=(n, rank)) @ basis
+    return vectors + 0.01 * rng.normal(size=(n, dim))
+
+
+class TestProjection:
+    """
+    PCA 투영 테스트 클래스
+    """
+
+    def test_save_and_load_by_version(self, tmp_path):
+        """
+        저장한 투영을 버전 이름과 latest로 다시 로드할 수 있는지 확인
+        """
+        projection = fit_projection(make_vectors(), 64, version="pca-64-test")
+        save_projection(projection, str(tmp_path))
+
+        loaded = load_projection("pca-64-test", str(tmp_path))
+        latest = load_projection("latest", str(tmp_path))
+
+        assert loaded.version == latest.version == "pca-64-test"
+        assert loaded.output_dim == 64 and loaded.input_dim == 768
+        assert np.array_equal(loaded.components, projection.components)
+
+    def test_projection_preserves_top_k(self):
+        """
+        축소된 차원에서도 상위 K개 목록과 순위가 유지되는지 확인
+        """
+        vectors = make_vectors()
+        projection = fit_projection(vectors, 64)
+        report = evaluate_projection(vectors, projection, [list(range(400))], top_k=20)
+
+        assert report["recall_at_k"] >= 0.95
+        assert report["spearman_top_k"] >= 0.9
+        assert report["matrix_bytes_projected"] * 12 == report["matrix_bytes_full"]
+
+    def test_too_few_samples_rejected(self):
+        """
+        학습 샘플 수가 투영 차원 이하이면 거부되는지 확인
+        """
+        with pytest.raises(ValueError):
+            fit_projection(make_vectors(n=32), 64)
+
+    def test_projection_applies_to_index_vectors_only(self, monkeypatch):
+        """
+        투영은 상주 인덱스 벡터(matching_vector)에만 적용되고,
+        전체 차원 경로는 호출마다 후보 행렬을 투영하지 않는지 확인
+        """
+        calls = []
+
+        class CountingProjection(Projection):
+            def transform(self, vectors):
+                calls.append(np.asarray(vectors).shape)
+                return super().transform(vectors)
+
+        vectors = make_vectors(n=40)
+        projection = CountingProjection(
+            "pca-8-test", np.eye(8, 768, dtype=np.float32), np.ones(8), 40
+        )
+        monkeypatch.setattr(
+            matching_score_optimized, "get_active_projection", lambda: projection
+        )
+
+        meta = {"emailDomain": "kakaotech.com", "field_embeddings": json.dumps({})}
+        assert matching_score_optimized.matching_vector(vectors[0], meta).shape == (8,)
+        assert len(calls) == 1
+
+        all_users = {
+            "ids": [str(i) for i in range(40)],
+            "embeddings": list(vectors),
+            "metadatas": [dict(meta) for _ in range(40)],
+        }
+        _, components = matching_score_optimized.compute_matching_components(
+            "0", vectors[0], meta, all_users
+        )
+        assert len(calls) == 1
+
+        full = vectors[1:] @ vectors[0]
+        full /= np.linalg.norm(vectors[1:], axis=1) * np.linalg.norm(vectors[0])
+        assert np.allclose(components[:, 0], full, atol=1e-5)
@@ -0,0 +1,112 @@
+"""
+Prometheus 지표 노출 테스트 모듈
+이 모듈은 /metrics 텍스트 노출 형식 변환과 요청 지연 미들웨어를 단위 테스트합니다.
+주요 테스트 대상:
+- 로그 버킷 히스토그램 → 누적 le 버킷 / _sum / _count 변환
+- 라우트 템플릿 단위 요청 지연 기록 (매칭되지 않은 경로는 하나의 라벨로 묶음)
+- 요약 제공자 통계 게이지와 프로세스 지표 노출
+"""
+
+import re
+
+import pytest
+from api.endpoints.metrics_router import MetricsRouter
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from utils import logger
+from utils.histogram import LogHistogram
+from utils.prometheus import MetricsWriter, RequestMetricsMiddleware
+
+
+def samples(text: str, name: str):
+    """지표 이름의 (라벨 문자열, 값) 목록"""
+    pattern = re.compile(rf"^{name}(\{{.*\}})? (\S+)$", re.M)
+    return [(labels or "", float(value)) for labels, value in pattern.findall(text)]
+
+
+@pytest.fixture
+def client():
+    logger.reset_performance_metrics()
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware, record=logger.log_http_request)
+    app.include_router(MetricsRouter().router)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    yield TestClient(app)
+    logger.reset_performance_metrics()
+
+
+class TestPrometheusMetrics:
+    """
+    Prometheus 지표 노출 테스트 클래스
+    """
+
+    def test_histogram_buckets_are_cumulative(self):
+        """
+        le 버킷이 누적 개수이고 +Inf / _count / _sum이 정확한지 확인
+        """
+        histogram = LogHistogram()
+        values = [0.003] * 5 + [0.04] * 3 + [0.7, 50.0]
+        for value in values:
+            histogram.record(value)
+
+        writer = MetricsWriter(buckets=[0.005, 0.05, 1.0])
+        writer.histogram("op_seconds", "test", [({"operation": "x"}, histogram)])
+        text = writer.render()
+
+        assert "# TYPE op_seconds histogram" in text
+        buckets = [value for _, value in samples(text, "op_seconds_bucket")]
+        assert buckets == [5, 8, 9, 10]
+        assert samples(text, "op_seconds_count") == [('{operation="x"}', 10)]
+        assert samples(text, "op_seconds_sum")[0][1] == pytest.approx(sum(values))
+
+    def test_request_latency_by_route_template(self, client):
+        """
+        경로 변수는 라우트 템플릿으로, 매칭되지 않은 경로는 <unmatched>로 기록되는지 확인
+        """
+        for item_id in (1, 2, 3):
+            assert client.get(f"/items/{item_id}").status_code == 200
+        assert client.get("/items/abc").status_code == 422
+        assert client.get("/missing/path").status_code == 404
+
+        text = client.get("/metrics").text
+        counts = dict(samples(text, "tuning_http_request_duration_seconds_count"))
+        assert counts['{method="GET",route="/items/{item_id}",status="200"}'] == 3
+        assert counts['{method="GET",route="/items/{item_id}",status="422"}'] == 1
+        assert counts['{method="GET",route="<unmatched>",status="404"}'] == 1
+
+    def test_exposes_component_stats_and_process(self, client, monkeypatch):
+        """
+        요약 제공자의 숫자 / 불리언 / 중첩 값은 게이지로, 문자열은 제외하고 프로세스 메모리를 노출하는지 확인
+        """
+        monkeypatch.setitem(
+            logger.summary_providers,
+            "test_queue",
+            lambda: {
+                "depth": 7,
+                "running": True,
+                "state": "OPEN",
+                "cache": {"hit_ratio": 0.75},
+            },
+        )
+
+        @logger.log_performance("embed_fields_optimized")
+        def embed():
+            return {}
+
+        embed()
+        response = client.get("/metrics")
+        text = response.text
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert samples(text, "tuning_test_queue_depth") == [("", 7)]
+        assert samples(text, "tuning_test_queue_running") == [("", 1)]
+        assert samples(text, "tuning_test_queue_cache_hit_ratio") == [("", 0.75)]
+        assert "tuning_test_queue_state" not in text
+        assert samples(text, "tuning_operation_duration_seconds_count") == [
+            ('{operation="embed_fields_optimized"}', 1)
+        ]
+        assert samples(text, "process_resident_memory_bytes")[0][1] > 0
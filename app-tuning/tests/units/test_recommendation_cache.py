@@ -0,0 +1,178 @@
+"""
+추천 결과 캐시 테스트 모듈
+이 모듈은 get_matching_users 결과 캐시의 동작을 단위 테스트합니다.
+주요 테스트 대상:
+- 캐시 적중 및 single-flight 계산 공유
+- 도메인 단위 무효화와 stale-while-revalidate
+- 엔트리 수 / 메모리 한도에 따른 LRU 제거
+"""
+
+import asyncio
+
+import pytest
+from core.recommendation_cache import RecommendationCache
+
+
+def make_loader(result, domain="kakaotech.com", delay=0.0, calls=None):
+    """호출 횟수를 기록하는 테스트용 loader 생성"""
+
+    async def loader():
+        if calls is not None:
+            calls.append(1)
+        if delay:
+            await asyncio.sleep(delay)
+        return list(result), domain
+
+    return loader
+
+
+class TestRecommendationCache:
+    """
+    추천 결과 캐시 테스트 클래스
+    """
+
+    @pytest.mark.asyncio
+    async def test_hit_after_first_load(self):
+        """
+        첫 조회 이후에는 loader를 다시 호출하지 않는지 확인
+        """
+        cache = RecommendationCache()
+        calls = []
+
+        first = await cache.get_or_load("1", make_loader([2, 3], calls=calls))
+        second = await cache.get_or_load("1", make_loader([9], calls=calls))
+
+        assert first == [2, 3]
+        assert second == [2, 3]
+        assert len(calls) == 1
+        assert cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_are_coalesced(self):
+        """
+        동일 사용자에 대한 동시 요청은 한 번만 계산되는지 확인
+        """
+        cache = RecommendationCache()
+        calls = []
+        loader = make_loader([2, 3], delay=0.05, calls=calls)
+
+        results = await asyncio.gather(
+            *[cache.get_or_load("1", loader) for _ in range(5)]
+        )
+
+        assert all(result == [2, 3] for result in results)
+        assert len(calls) == 1
+        assert cache.get_stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_invalidated_entry_is_refreshed(self):
+        """
+        도메인 무효화 후 갱신이 빠르게 끝나면 새 결과를 반환하는지 확인
+        """
+        cache = RecommendationCache(stale_wait=1.0)
+        await cache.get_or_load("1", make_loader([2, 3]))
+
+        assert cache.invalidate_domain("kakaotech.com") == 1
+        result = await cache.get_or_load("1", make_loader([4, 5]))
+
+        assert result == [4, 5]
+
+    @pytest.mark.asyncio
+    async def test_other_domain_is_not_invalidated(self):
+        """
+        다른 도메인 무효화는 기존 엔트리에 영향을 주지 않는지 확인
+        """
+        cache = RecommendationCache()
+        await cache.get_or_load("1", make_loader([2, 3]))
+
+        assert cache.invalidate_domain("other.com") == 0
+        assert await cache.get_or_load("1", make_loader([4, 5])) == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_refresh_is_slow(self):
+        """
+        갱신이 느리면 기존(stale) 값을 반환하고, 갱신 완료 후 새 값을 반환하는지 확인
+        """
+        cache = RecommendationCache(stale_wait=0.01)
+        await cache.get_or_load("1", make_loader([2, 3]))
+        cache.invalidate_domain("kakaotech.com")
+
+        stale = await cache.get_or_load("1", make_loader([4, 5], delay=0.05))
+        assert stale == [2, 3]
+
+        await asyncio.sleep(0.1)
+        assert await cache.get_or_load("1", make_loader([9])) == [4, 5]
+        assert cache.get_stats()["stale_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_when_refresh_fails(self):
+        """
+        갱신 중 오류가 발생하면 기존 값을 반환하는지 확인
+        """
+        cache = RecommendationCache(stale_wait=1.0)
+        await cache.get_or_load("1", make_loader([2, 3]))
+        cache.invalidate_domain("kakaotech.com")
+
+        async def failing_loader():
+            raise RuntimeError("chroma timeout")
+
+        assert await cache.get_or_load("1", failing_loader) == [2, 3]
+        assert cache.get_stats()["refresh_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_miss_propagates_loader_error(self):
+        """
+        캐시 미스 상태에서 loader 오류는 호출자에게 그대로 전달되는지 확인
+        """
+        cache = RecommendationCache()
+
+        async def failing_loader():
+            raise RuntimeError("not found")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("1", failing_loader)
+        assert cache.get_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_entry_count(self):
+        """
+        최대 엔트리 수를 넘으면 가장 오래 사용되지 않은 엔트리가 제거되는지 확인
+        """
+        cache = RecommendationCache(max_entries=2)
+        await cache.get_or_load("1", make_loader([2]))
+        await cache.get_or_load("2", make_loader([1]))
+        await cache.get_or_load("1", make_loader([2]))  # "1"을 최근 사용으로 갱신
+        await cache.get_or_load("3", make_loader([1]))
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 1
+
+        calls = []
+        await cache.get_or_load("2", make_loader([1], calls=calls))
+        assert len(calls) == 1  # "2"는 제거되어 다시 계산
+
+    @pytest.mark.asyncio
+    async def test_eviction_by_memory_budget(self):
+        """
+        추정 메모리 한도를 넘으면 엔트리가 제거되는지 확인
+        """
+        cache = RecommendationCache(max_bytes=4096)
+        for user_id in range(10):
+            await cache.get_or_load(str(user_id), make_loader(list(range(50))))
+
+        stats = cache.get_stats()
+        assert stats["bytes"] <= 4096
+        assert stats["entries"] < 10
+
+    @pytest.mark.asyncio
+    async def test_invalidate_user_removes_entry(self):
+        """
+        삭제된 사용자의 엔트리는 즉시 제거되는지 확인
+        """
+        cache = RecommendationCache()
+        await cache.get_or_load("1", make_loader([2, 3]))
+
+        cache.invalidate_user("1")
+
+        assert cache.get_stats()["entries"] == 0
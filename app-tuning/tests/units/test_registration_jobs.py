@@ -0,0 +1,167 @@
+"""
+비동기 작업 큐 테스트 모듈
+이 모듈은 등록 작업에 사용하는 작업 큐와 상태 조회를 단위 테스트합니다.
+주요 테스트 대상:
+- 작업 상태 전이 및 단계별 소요 시간 기록
+- 실패 작업의 오류 정보
+- 같은 사용자 중복 등록 및 대기열 포화 거절
+- 워커 간 작업 상태 공유 저장소 (다른 워커에서 상태 조회 / 중복 거절)
+"""
+
+import asyncio
+import threading
+
+import pytest
+from core.job_queue import JobManager, JobStore
+from fastapi import HTTPException
+
+
+class FakeUser:
+    """userId만 필요한 등록 요청 대역"""
+
+    def __init__(self, user_id: int):
+        self.userId = user_id
+        self.emailDomain = "kakaotech.com"
+
+
+def process(user, timings):
+    """등록 파이프라인 대역 (userId 99는 실패)"""
+    if user.userId == 99:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "code": "EMBEDDING_REGISTER_SIMILARITY_UPDATE_FAILED",
+                "message": "x",
+            },
+        )
+    timings.update({"embed": 0.1, "store": 0.01, "score": 0.02, "fanout": 0.03})
+
+
+def make_manager(queue_size: int = 10, process=process, store=None) -> JobManager:
+    return JobManager(
+        name="registration",
+        process=process,
+        key_of=lambda user: str(user.userId),
+        workers=1,
+        queue_size=queue_size,
+        ttl=60,
+        codes={
+            "duplicate": "EMBEDDING_CONFLICT_DUPLICATE_ID",
+            "queue_full": "EMBEDDING_REGISTER_QUEUE_FULL",
+            "failed": "EMBEDDING_REGISTER_SERVER_ERROR",
+            "not_found": "REGISTRATION_JOB_NOT_FOUND",
+        },
+        store=store,
+    )
+
+
+async def wait_finished(manager, job_id):
+    for _ in range(100):
+        job = manager.get(job_id)
+        if job["status"] in ("SUCCEEDED", "FAILED"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+async def wait_stored(manager, job_id, status):
+    """다른 워커가 기록한 작업이 해당 상태가 될 때까지 대기"""
+    for _ in range(100):
+        try:
+            job = await manager.lookup(job_id)
+            if job["status"] == status:
+                return job
+        except HTTPException:
+            pass
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job did not reach {status}")
+
+
+class TestRegistrationJobs:
+    """
+    비동기 등록 작업 테스트 클래스
+    """
+
+    @pytest.mark.asyncio
+    async def test_job_succeeds_with_stage_timings(self):
+        """
+        작업이 QUEUED로 접수되고 완료 후 단계별 소요 시간이 기록되는지 확인
+        """
+        manager = make_manager()
+        accepted = manager.submit(FakeUser(1))
+        assert accepted["status"] == "QUEUED"
+
+        job = await wait_finished(manager, accepted["jobId"])
+        assert job["status"] == "SUCCEEDED"
+        assert set(job["stages"]) == {"embed", "store", "score", "fanout"}
+        assert job["totalSeconds"] >= 0
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_reports_error(self):
+        """
+        실패한 작업은 FAILED 상태와 오류 코드를 반환하는지 확인
+        """
+        manager = make_manager()
+        job = await wait_finished(manager, manager.submit(FakeUser(99))["jobId"])
+
+        assert job["status"] == "FAILED"
+        assert job["error"]["code"] == "EMBEDDING_REGISTER_SIMILARITY_UPDATE_FAILED"
+        assert manager.get_stats()["failed"] == 1
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_and_queue_full_rejected(self):
+        """
+        처리 중인 사용자 재등록은 409, 대기열 포화 시 503으로 거절되는지 확인
+        """
+        manager = make_manager(queue_size=1)
+        manager.submit(FakeUser(1))
+
+        with pytest.raises(HTTPException) as duplicate:
+            manager.submit(FakeUser(1))
+        assert duplicate.value.status_code == 409
+
+        with pytest.raises(HTTPException) as full:
+            manager.submit(FakeUser(2))
+        assert full.value.status_code == 503
+
+        with pytest.raises(HTTPException) as missing:
+            manager.get("unknown")
+        assert missing.value.status_code == 404
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_job_visible_from_other_worker(self, tmp_path):
+        """
+        한 워커가 접수한 작업을 같은 저장소를 쓰는 다른 워커에서 조회 / 중복 거절하는지 확인
+        """
+        release = threading.Event()
+
+        def slow_process(user, timings):
+            release.wait(5)
+            process(user, timings)
+
+        path = str(tmp_path / "jobs.db")
+        accepting = make_manager(process=slow_process, store=JobStore(path, ttl=60))
+        other = make_manager(store=JobStore(path, ttl=60))
+
+        job_id = accepting.submit(FakeUser(1))["jobId"]
+        job = await wait_stored(other, job_id, "RUNNING")
+        assert job["key"] == "1"
+
+        with pytest.raises(HTTPException) as duplicate:
+            await asyncio.to_thread(other.check_duplicate, FakeUser(1))
+        assert duplicate.value.status_code == 409
+
+        release.set()
+        await wait_finished(accepting, job_id)
+        await accepting.shutdown()
+
+        job = await wait_stored(other, job_id, "SUCCEEDED")
+        assert set(job["stages"]) == {"embed", "store", "score", "fanout"}
+        await asyncio.to_thread(other.check_duplicate, FakeUser(1))
+
+        with pytest.raises(HTTPException) as missing:
+            await other.lookup("unknown")
+        assert missing.value.status_code == 404
@@ -0,0 +1,98 @@
+"""
+규칙 점수 메모이제이션 테스트 모듈
+이 모듈은 시그니처 단위 규칙 점수 재사용을 단위 테스트합니다.
+주요 테스트 대상:
+- 시그니처 동일성 판정
+- 메모 사용 시 점수 구성요소가 쌍별 직접 계산 결과와 일치하는지 여부
+- LRU 크기 제한 및 적중률 통계
+"""
+
+import json
+import random
+
+import numpy as np
+from core.matching_score_optimized import (
+    compute_matching_components,
+    rule_signature,
+    rule_similarity_components,
+)
+from core.rule_score_memo import RuleScoreMemo, rule_score_memo
+
+
+def make_user(rng: random.Random, user_id: int) -> dict:
+    """제한된 범주 값으로 시그니처가 자주 겹치는 사용자 메타데이터 생성"""
+    return {
+        "userId": str(user_id),
+        "emailDomain": "kakaotech.com",
+        "religion": rng.choice(["무교", "기독교"]),
+        "smoking": rng.choice(["비흡연", "가끔"]),
+        "drinking": "가끔",
+        "MBTI": rng.choice(["INTJ", "ENFP"]),
+        "ageGroup": "AGE_20S",
+        "personality": rng.choice(["차분한, 성실한", "활발한"]),
+        "preferredPeople": rng.choice(["활발한", "차분한"]),
+        "field_embeddings": json.dumps({}),
+    }
+
+
+class TestRuleScoreMemo:
+    """
+    규칙 점수 메모이제이션 테스트 클래스
+    """
+
+    def test_signature_ignores_tag_order(self):
+        """
+        태그 순서만 다른 사용자는 같은 시그니처를 갖는지 확인
+        """
+        user1 = {"MBTI": "INTJ", "personality": ["A", "B"], "preferredPeople": []}
+        user2 = {"MBTI": "INTJ", "personality": ["B", "A"], "preferredPeople": None}
+
+        assert rule_signature(user1) == rule_signature(user2)
+        assert rule_signature(user1) != rule_signature({**user1, "MBTI": "ENFP"})
+
+    def test_memoized_components_match_direct_computation(self):
+        """
+        시그니처 묶음 계산 결과가 쌍별 직접 계산 결과와 일치하는지 확인
+        """
+        rng = random.Random(7)
+        users = [make_user(rng, i) for i in range(1, 60)]
+        all_users = {
+            "ids": [u["userId"] for u in users],
+            "embeddings": np.random.default_rng(7).normal(size=(59, 768)).tolist(),
+            "metadatas": users,
+        }
+
+        other_ids, components = compute_matching_components(
+            "1", all_users["embeddings"][0], users[0], all_users
+        )
+
+        by_id = {u["userId"]: u for u in users}
+        for row, other_id in enumerate(other_ids):
+            expected = rule_similarity_components(users[0], by_id[other_id])
+            assert components[row, 1:].tolist() == expected
+
+        stats = rule_score_memo.get_stats()
+        assert stats["broadcast_rows"] >= len(other_ids)
+
+    def test_lru_limit_and_hit_ratio(self):
+        """
+        최대 엔트리 수 제한과 적중률 통계 확인
+        """
+        memo = RuleScoreMemo(max_entries=2)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return [1.0, 0.5, 0.0, 0.25]
+
+        memo.get_or_compute("q", "a", compute, members=3)
+        memo.get_or_compute("q", "a", compute, members=3)
+        memo.get_or_compute("q", "b", compute)
+        memo.get_or_compute("q", "c", compute)
+
+        stats = memo.get_stats()
+        assert len(calls) == 3
+        assert stats["hits"] == 1
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 1
+        assert stats["hit_ratio"] == 0.25
@@ -0,0 +1,92 @@
+"""
+유사도 목록 압축 포맷 테스트 모듈
+이 모듈은 similarity_collection 메타데이터 인코딩/디코딩을 단위 테스트합니다.
+주요 테스트 대상:
+- 점수 내림차순 정렬 저장 및 상위 K개 슬라이스 조회
+- 기존 JSON 맵 호환 및 제자리 변환
+- 점수 양자화 오차
+"""
+
+import json
+
+import pytest
+from core.vector_database.similarity_codec import (
+    convert_metadata,
+    decode_similarities,
+    encode_similarities,
+    is_packed,
+    same_score,
+    top_similarities,
+)
+
+
+class TestSimilarityCodec:
+    """
+    유사도 압축 포맷 테스트 클래스
+    """
+
+    def test_encoded_list_is_sorted_by_score(self):
+        """
+        인코딩 결과가 점수 내림차순으로 저장되는지 확인
+        """
+        metadata = encode_similarities({"3": 0.2, "10": 0.9, "7": 0.5})
+
+        assert is_packed(metadata)
+        assert metadata["sim_count"] == 3
+        assert [uid for uid, _ in top_similarities(metadata, 10)] == ["10", "7", "3"]
+
+    def test_top_k_is_prefix_slice(self):
+        """
+        상위 K개 조회가 전체 정렬 결과의 앞부분과 일치하는지 확인
+        """
+        similarities = {str(i): (i % 97) / 100 for i in range(1, 1001)}
+        metadata = encode_similarities(similarities)
+
+        full = top_similarities(metadata, 1000)
+        for k in (0, 1, 2, 3, 5, 100):
+            assert top_similarities(metadata, k) == full[:k]
+
+    def test_roundtrip_within_quantization_error(self):
+        """
+        디코딩된 점수가 원래 점수와 양자화 오차 범위 내에서 일치하는지 확인
+        """
+        similarities = {"1": 0.812345, "2": -0.3, "3": 0.0, "4": 1.0}
+        decoded = decode_similarities(encode_similarities(similarities))
+
+        assert decoded.keys() == similarities.keys()
+        for uid, score in similarities.items():
+            assert abs(decoded[uid] - score) < 2e-5
+            assert same_score(decoded[uid], score)
+
+    def test_empty_similarities(self):
+        """
+        빈 유사도 맵 처리 확인
+        """
+        metadata = encode_similarities({})
+
+        assert decode_similarities(metadata) == {}
+        assert top_similarities(metadata, 10) == []
+
+    def test_legacy_json_is_readable(self):
+        """
+        기존 JSON 맵 포맷도 동일하게 조회되는지 확인
+        """
+        legacy = {"userId": "1", "similarities": json.dumps({"2": 0.3, "3": 0.8})}
+
+        assert decode_similarities(legacy) == {"2": 0.3, "3": 0.8}
+        assert top_similarities(legacy, 1) == [("3", 0.8)]
+
+    def test_convert_metadata_in_place(self):
+        """
+        기존 JSON 맵이 압축 포맷으로 변환되고 기존 필드가 비워지는지 확인
+        """
+        legacy = {"userId": "1", "similarities": json.dumps({"2": 0.3, "3": 0.8})}
+        converted = convert_metadata(legacy)
+
+        assert is_packed(converted)
+        assert converted["userId"] == "1"
+        assert converted["similarities"] == ""
+        top = top_similarities(converted, 2)
+        assert [uid for uid, _ in top] == ["3", "2"]
+        assert [score for _, score in top] == pytest.approx([0.8, 0.3], abs=2e-5)
+        assert convert_metadata(converted) is converted
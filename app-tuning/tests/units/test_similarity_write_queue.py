@@ -0,0 +1,155 @@
+"""
+유사도 쓰기 지연 큐 테스트 모듈
+이 모듈은 SQLite 저널 기반 유사도 쓰기 지연 반영을 단위 테스트합니다.
+주요 테스트 대상:
+- 문서 단위 작업 병합 및 일괄 반영
+- 재시작 후 저널 재반영(replay)
+- 삭제 사용자 관련 대기 작업 정리
+- 저장된 자기 문서의 역방향 항목 병합 (반영 스레드에서 수행)
+- 다른 워커의 삭제 정리가 진행 중인 반영 배치와 겹치지 않는지
+"""
+
+import threading
+import time
+
+import pytest
+from core import similarity_write_queue as queue_module
+from core.similarity_write_queue import SimilarityWriteQueue, build_similarity_metadata
+from core.vector_database import decode_similarities
+
+
+class FakeCollection:
+    """get / upsert만 지원하는 메모리 컬렉션"""
+
+    def __init__(self, docs=None):
+        self.docs = docs or {}
+        self.upsert_calls = 0
+
+    def get(self, ids, include):
+        found = [doc_id for doc_id in ids if doc_id in self.docs]
+        return {
+            "ids": found,
+            "metadatas": [self.docs[d][0] for d in found],
+            "embeddings": [self.docs[d][1] for d in found],
+        }
+
+    def upsert(self, ids, embeddings, metadatas):
+        self.upsert_calls += 1
+        for doc_id, embedding, metadata in zip(ids, embeddings, metadatas):
+            self.docs[doc_id] = (metadata, embedding)
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    similarity = FakeCollection()
+    profiles = FakeCollection({uid: ({}, [0.1] * 4) for uid in ("1", "2", "3")})
+    monkeypatch.setattr(queue_module, "get_similarity_collection", lambda: similarity)
+    monkeypatch.setattr(queue_module, "get_user_collection", lambda: profiles)
+    return similarity
+
+
+def make_queue(tmp_path) -> SimilarityWriteQueue:
+    return SimilarityWriteQueue(path=str(tmp_path / "journal.db"), enabled=True)
+
+
+class TestSimilarityWriteQueue:
+    """
+    유사도 쓰기 지연 큐 테스트 클래스
+    """
+
+    def test_flush_coalesces_documents(self, tmp_path, collections):
+        """
+        여러 등록의 작업이 문서당 한 번의 쓰기로 합쳐져 반영되는지 확인
+        """
+        queue = make_queue(tmp_path)
+        queue.enqueue("2", {"1": 0.5}, {"1": 0.5}, {}, "kakaotech.com")
+        queue.enqueue(
+            "3", {"1": 0.7, "2": 0.6}, {"1": 0.7, "2": 0.6}, {}, "kakaotech.com"
+        )
+
+        assert queue.get_stats()["depth"] == 5
+        assert queue.drain(timeout=5)
+
+        assert collections.upsert_calls == 1
+        assert decode_similarities(collections.docs["1"][0]) == pytest.approx(
+            {"2": 0.5, "3": 0.7}, abs=1e-4
+        )
+        assert decode_similarities(collections.docs["2"][0]) == pytest.approx(
+            {"1": 0.5, "3": 0.6}, abs=1e-4
+        )
+        stats = queue.get_stats()
+        assert stats["depth"] == 0
+        assert stats["operations_per_document"] == pytest.approx(5 / 3, abs=0.01)
+
+    def test_journal_replayed_after_restart(self, tmp_path, collections):
+        """
+        반영 전에 종료된 작업이 같은 저널로 다시 시작한 큐에서 반영되는지 확인
+        """
+        make_queue(tmp_path).enqueue("2", {"1": 0.5}, {"1": 0.5}, {}, None)
+
+        restarted = make_queue(tmp_path)
+        assert restarted.get_stats()["depth"] == 2
+        assert restarted.flush_once() == 2
+        assert set(collections.docs) == {"1", "2"}
+
+    def test_purge_deleted_user(self, tmp_path, collections):
+        """
+        삭제된 사용자 관련 대기 작업이 정리되어 다시 기록되지 않는지 확인
+        """
+        queue = make_queue(tmp_path)
+        queue.enqueue("3", {"1": 0.7, "2": 0.6}, {"1": 0.7, "2": 0.6}, {}, None)
+
+        assert queue.purge_user("2") == 1
+        queue.drain(timeout=5)
+
+        assert "2" not in collections.docs
+        assert decode_similarities(collections.docs["3"][0]) == pytest.approx(
+            {"1": 0.7}, abs=1e-4
+        )
+
+    def test_replace_keeps_stored_reverse_entries(self, tmp_path, collections):
+        """
+        자기 문서 교체 시 다른 등록이 먼저 저장한 역방향 항목을 유지하는지 확인
+        (요청 경로에서 Chroma를 조회하지 않고 반영 스레드의 문서 읽기로 병합)
+        """
+        collections.docs["2"] = (
+            build_similarity_metadata("2", {"1": 0.4, "3": 0.8}, {}, None),
+            [0.1] * 4,
+        )
+        queue = make_queue(tmp_path)
+        queue.enqueue("2", {"1": 0.5}, {"1": 0.5}, {}, None)
+        queue.drain(timeout=5)
+
+        assert decode_similarities(collections.docs["2"][0]) == pytest.approx(
+            {"1": 0.5, "3": 0.8}, abs=1e-4
+        )
+
+    def test_purge_waits_for_batch_in_other_worker(
+        self, tmp_path, collections, monkeypatch
+    ):
+        """
+        같은 저널을 쓰는 다른 워커의 삭제 정리가 이미 읽어 둔 배치의 반영이 끝난 뒤에 수행되는지 확인
+        (정리 후 역방향 쓰기가 다시 반영되어 삭제된 사용자가 되살아나지 않도록)
+        """
+        primary, other = make_queue(tmp_path), make_queue(tmp_path)
+        primary.enqueue("2", {"1": 0.5}, {"1": 0.5}, {}, None)
+
+        order = []
+        writing = threading.Event()
+        write = queue_module.write_similarity_documents
+
+        def slow_write(operations, domains):
+            writing.set()
+            time.sleep(0.3)
+            write(operations, domains)
+            order.append("write")
+
+        monkeypatch.setattr(queue_module, "write_similarity_documents", slow_write)
+        flusher = threading.Thread(target=primary.flush_once)
+        flusher.start()
+        assert writing.wait(5)
+        other.purge_user("2")
+        order.append("purge")
+        flusher.join()
+
+        assert order == ["write", "purge"]
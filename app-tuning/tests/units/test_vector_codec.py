@@ -0,0 +1,166 @@
+"""
+매칭 벡터 압축 코덱 및 도메인 인덱스 테스트 모듈
+이 모듈은 압축 코드 기반 점수 계산의 정확도를 float 경로와 비교하여 단위 테스트합니다.
+주요 테스트 대상:
+- float16 / int8 / pq 코덱의 압축률과 코사인 오차, 상위 K개 재현율
+- 도메인 인덱스 점수 구성요소와 기존 전체 조회 경로의 일치 여부
+- 인덱스 사용자 교체/삭제
+"""
+
+import json
+import random
+
+import numpy as np
+import pytest
+from core.domain_index import DomainIndex
+from core.matching_score_optimized import (
+    compute_matching_components,
+    compute_matching_components_indexed,
+)
+from core.vector_database.vector_codec import evaluate_codec, get_codec
+
+
+def make_vectors(n: int = 600, dim: int = 768) -> np.ndarray:
+    """군집 구조를 가진 매칭 벡터 생성"""
+    rng = np.random.default_rng(3)
+    centers = rng.normal(size=(12, dim))
+    return centers[rng.integers(0, 12, n)] + 0.5 * rng.normal(size=(n, dim))
+
+
+def make_users(n: int = 80):
+    """같은 도메인 사용자 메타데이터와 임베딩 생성"""
+    rng = random.Random(11)
+    embeddings = np.random.default_rng(11).normal(size=(n, 768)).tolist()
+    metas = [
+        {
+            "userId": str(i),
+            "emailDomain": "kakaotech.com",
+            "religion": rng.choice(["무교", "기독교"]),
+            "smoking": rng.choice(["비흡연", "가끔"]),
+            "drinking": "가끔",
+            "MBTI": rng.choice(["INTJ", "ENFP"]),
+            "ageGroup": "AGE_20S",
+            "personality": rng.choice(["차분한", "활발한"]),
+            "preferredPeople": rng.choice(["활발한", "차분한"]),
+            "field_embeddings": json.dumps({}),
+        }
+        for i in range(n)
+    ]
+    return [str(i) for i in range(n)], embeddings, metas
+
+
+class TestVectorCodec:
+    """
+    압축 코덱 정확도 테스트 클래스
+    """
+
+    @pytest.mark.parametrize(
+        "name, compression, max_error, recall",
+        [
+            ("float16", 2.0, 1e-3, 0.99),
+            ("int8", 3.9, 2e-2, 0.9),
+            ("pq", 16.0, 0.25, 0.5),
+        ],
+    )
+    def test_codec_accuracy(self, name, compression, max_error, recall):
+        """
+        코덱별 압축률, 코사인 최대 오차, 상위 K개 재현율 확인
+        """
+        vectors = make_vectors()
+        codec = get_codec(name, vectors.shape[1]).fit(vectors)
+        report = evaluate_codec(vectors, codec, queries=30, top_k=20)
+
+        assert report["compression"] >= compression
+        assert report["max_abs_error"] <= max_error
+        assert report["recall_at_k"] >= recall
+
+    def test_unknown_codec_rejected(self):
+        """
+        지원하지 않는 코덱 이름은 거부되는지 확인
+        """
+        with pytest.raises(ValueError):
+            get_codec("int4", 768)
+
+
+class TestDomainIndex:
+    """
+    도메인 인덱스 테스트 클래스
+    """
+
+    def test_indexed_components_match_full_scan(self):
+        """
+        float32 인덱스 경로의 구성요소가 전체 조회 경로와 일치하는지 확인
+        """
+        ids, embeddings, metas = make_users()
+        index = DomainIndex("kakaotech.com", "float32")
+        index.build(ids, embeddings, metas)
+        all_users = {"ids": ids, "embeddings": embeddings, "metadatas": metas}
+
+        expected_ids, expected = compute_matching_components(
+            "0", embeddings[0], metas[0], all_users
+        )
+        other_ids, components = compute_matching_components_indexed(
+            "0", embeddings[0], metas[0], index
+        )
+
+        order = [other_ids.index(uid) for uid in expected_ids]
+        assert np.allclose(components[order], expected, atol=1e-6)
+
+    def test_upsert_and_remove(self):
+        """
+        사용자 교체 시 행이 늘지 않고, 삭제 시 나머지 사용자가 유지되는지 확인
+        """
+        ids, embeddings, metas = make_users(10)
+        index = DomainIndex("kakaotech.com", "int8")
+        index.build(ids, embeddings, metas)
+
+        index.upsert("3", embeddings[4], metas[4])
+        assert len(index) == 10
+
+        assert index.remove("3")
+        assert not index.remove("3")
+        other_ids, cosine, _, _ = index.score(
+            np.asarray(index.codec.decode(index.codes[:1])[0]), exclude_id="0"
+        )
+        assert sorted(other_ids) == sorted(set(ids) - {"0", "3"})
+        assert len(cosine) == 8
+        # 열 바이트 기준 (memory_bytes는 ID 목록 등 파이썬 객체도 포함)
+        assert index._column_bytes() / len(index) < 768 * 4 / 3
+
+    def test_parallel_scoring_matches_inprocess(self, monkeypatch):
+        """
+        공유 메모리 병렬 계산 결과가 프로세스 내 계산과 일치하고,
+        기준 인원 미만 도메인은 프로세스 내에서 계산하는지 확인
+        """
+        from core import domain_index as domain_index_module
+        from core.parallel_scoring import ParallelScorer
+
+        scorer = ParallelScorer(workers=2, min_users=50, min_rows=20)
+        monkeypatch.setattr(domain_index_module, "parallel_scorer", scorer)
+
+        ids, embeddings, metas = make_users()
+        index = DomainIndex("kakaotech.com", "int8")
+        index.build(ids, embeddings, metas)
+        reference = DomainIndex("kakaotech.com", "int8")
+        monkeypatch.setattr(scorer, "workers", 0)
+        reference.build(ids, embeddings, metas)
+        monkeypatch.setattr(scorer, "workers", 2)
+
+        try:
+            query = index.codec.decode(index.codes[:1])[0]
+            parallel_ids, parallel_cosine, _, _ = index.score(query, "0")
+            expected_ids, expected_cosine, _, _ = reference.score(query, "0")
+
+            assert parallel_ids == expected_ids
+            assert np.allclose(parallel_cosine, expected_cosine, atol=1e-6)
+            assert scorer.get_stats()["partitions"] == 2
+
+            index.remove("1")
+            small = DomainIndex("kakaotech.com", "int8")
+            small.build(ids[:10], embeddings[:10], metas[:10])
+            small.score(query, "0")
+            assert scorer.get_stats()["inprocess_calls"] >= 1
+            small.close()
+        finally:
+            scorer.shutdown()
+            index.close()
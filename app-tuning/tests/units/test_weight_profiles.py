@@ -0,0 +1,141 @@
+"""
+점수 구성요소 저장 및 재가중치 테스트 모듈
+이 모듈은 쌍별 점수 구성요소 저장과 가중치 프로필 적용을 단위 테스트합니다.
+주요 테스트 대상:
+- 구성요소 블렌딩과 기존 규칙 기반 점수 계산의 일치 여부
+- 구성요소 압축 저장/복원
+- 읽기 시점 재가중치 상위 K개 조회
+"""
+
+import numpy as np
+import pytest
+from core.matching_score_optimized import (
+    EMBEDDING_WEIGHT,
+    RULE_WEIGHT,
+    SCORE_COMPONENTS,
+    blend_scores,
+    rule_based_similarity,
+    rule_similarity_components,
+)
+from core.vector_database.similarity_codec import (
+    decode_components,
+    encode_similarities,
+    top_similarities,
+)
+from core.weight_profiles import (
+    DEFAULT_PROFILE,
+    _build_profile,
+    needs_reblend,
+    profile_signature,
+    reblend_map,
+    reblend_top_similarities,
+)
+
+USER_A = {
+    "religion": "NON_RELIGIOUS",
+    "smoking": "NO_SMOKING",
+    "drinking": "SOMETIMES",
+    "MBTI": "INTJ",
+    "ageGroup": "AGE_20S",
+    "personality": ["CALM", "POLITE"],
+    "preferredPeople": ["ACTIVE", "WITTY"],
+}
+USER_B = {
+    "religion": "NON_RELIGIOUS",
+    "smoking": "SOMETIMES",
+    "drinking": "SOMETIMES",
+    "MBTI": "ENFP",
+    "ageGroup": "AGE_30S",
+    "personality": ["ACTIVE", "WITTY"],
+    "preferredPeople": ["CALM"],
+}
+
+
+def make_metadata(profile=DEFAULT_PROFILE):
+    """구성요소가 저장된 유사도 메타데이터 생성"""
+    components = {
+        "2": [0.9, 1.0, 0.0, 0.0, 0.0],
+        "3": [0.1, 0.0, 1.0, 1.0, 1.0],
+        "4": [0.5, 0.5, 0.5, 0.5, 0.5],
+    }
+    scores = blend_scores(np.array(list(components.values())), **profile)
+    similarities = dict(zip(components.keys(), scores.tolist()))
+    metadata = encode_similarities(similarities, components, SCORE_COMPONENTS)
+    metadata["sim_weight_profile"] = profile_signature(profile)
+    return metadata, components
+
+
+class TestWeightProfiles:
+    """
+    점수 구성요소 및 가중치 프로필 테스트 클래스
+    """
+
+    def test_blend_matches_rule_based_similarity(self):
+        """
+        기본 가중치 블렌딩 결과가 기존 점수 계산식과 일치하는지 확인
+        """
+        cosine = 0.4321
+        expected = EMBEDDING_WEIGHT * cosine + RULE_WEIGHT * rule_based_similarity(
+            USER_A, USER_B
+        )
+        components = np.array([[cosine] + rule_similarity_components(USER_A, USER_B)])
+
+        assert blend_scores(components)[0] == pytest.approx(expected, abs=1e-6)
+
+    def test_components_roundtrip(self):
+        """
+        구성요소가 점수 정렬 순서와 무관하게 userId별로 복원되는지 확인
+        """
+        metadata, components = make_metadata()
+        decoded = decode_components(metadata)
+
+        assert decoded.keys() == components.keys()
+        for uid, values in components.items():
+            assert decoded[uid] == pytest.approx(values, abs=2e-5)
+
+    def test_missing_components_are_skipped(self):
+        """
+        구성요소가 없는 쌍은 복원 결과에서 제외되는지 확인
+        """
+        metadata = encode_similarities(
+            {"2": 0.5, "3": 0.4}, {"2": [0.1] * 5}, SCORE_COMPONENTS
+        )
+
+        assert list(decode_components(metadata)) == ["2"]
+
+    def test_same_profile_needs_no_reblend(self):
+        """
+        저장 당시와 같은 프로필이면 재계산이 필요 없는지 확인
+        """
+        metadata, _ = make_metadata()
+
+        assert not needs_reblend(metadata, DEFAULT_PROFILE)
+
+    def test_read_time_reblend_changes_order(self):
+        """
+        규칙 가중치를 높인 프로필로 읽으면 순위가 재계산되는지 확인
+        """
+        metadata, _ = make_metadata()
+        profile = _build_profile({"embedding": 0.1, "rule": 0.9})
+
+        assert [uid for uid, _ in top_similarities(metadata, 3)] == ["2", "4", "3"]
+        assert needs_reblend(metadata, profile)
+
+        reblended = reblend_top_similarities(metadata, profile, 2)
+        assert [uid for uid, _ in reblended] == ["3", "4"]
+
+    def test_reblend_map_keeps_scores_without_components(self):
+        """
+        구성요소가 없는 쌍은 기존 점수를 유지하는지 확인
+        """
+        profile = _build_profile({"embedding": 0.0, "rule": 1.0})
+        result = reblend_map({"2": 0.7, "3": 0.2}, {"3": [0.0, 1, 1, 1, 1]}, profile)
+
+        assert result == {"2": 0.7, "3": 1.0}
+
+    def test_unknown_rule_component_rejected(self):
+        """
+        존재하지 않는 규칙 구성요소 가중치는 거부되는지 확인
+        """
+        with pytest.raises(ValueError):
+            _build_profile({"rule_components": {"height": 1.0}})
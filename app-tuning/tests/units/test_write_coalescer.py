@@ -0,0 +1,193 @@
+"""
+Chroma 쓰기 병합 테스트 모듈
+이 모듈은 문서 ID 단위 쓰기 병합 버퍼를 단위 테스트합니다.
+주요 테스트 대상:
+- 구간 내 여러 요청 작업의 문서별 병합 및 일괄 반영
+- 버퍼 포화 / 종료 시 강제 반영
+- 교체 작업과 역방향 설정 작업의 병합 규칙
+- 이전 배치에서 반영된 역방향 항목이 뒤늦은 자기 문서 교체로 지워지지 않는지
+- 동기 등록 경로가 병합 대기 중 이벤트 루프를 막지 않는지
+"""
+
+import asyncio
+import threading
+
+import pytest
+from core import similarity_write_queue as queue_module
+from core.similarity_write_queue import (
+    merge_operations,
+    similarity_operations,
+    write_similarity_documents,
+)
+from core.vector_database import WriteCoalescer, decode_similarities
+from services import user_service
+
+
+class RecordingWriter:
+    """반영 호출을 기록하는 writer"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, operations, domains):
+        self.calls.append((dict(operations), dict(domains)))
+
+
+class FakeCollection:
+    """get / upsert만 지원하는 메모리 컬렉션"""
+
+    def __init__(self, docs=None):
+        self.docs = docs or {}
+
+    def get(self, ids, include):
+        found = [doc_id for doc_id in ids if doc_id in self.docs]
+        return {
+            "ids": found,
+            "metadatas": [self.docs[d][0] for d in found],
+            "embeddings": [self.docs[d][1] for d in found],
+        }
+
+    def upsert(self, ids, embeddings, metadatas):
+        for doc_id, embedding, metadata in zip(ids, embeddings, metadatas):
+            self.docs[doc_id] = (metadata, embedding)
+
+
+class TestWriteCoalescer:
+    """
+    쓰기 병합 버퍼 테스트 클래스
+    """
+
+    def test_submissions_in_window_flush_once(self):
+        """
+        구간 안에 들어온 여러 요청의 작업이 한 번의 쓰기로 합쳐지는지 확인
+        """
+        writer = RecordingWriter()
+        coalescer = WriteCoalescer(
+            writer, window=60, max_documents=100, merge=merge_operations
+        )
+
+        registrations = {
+            "2": {"1": 0.5},
+            "3": {"1": 0.7, "2": 0.6},
+            "4": {"1": 0.2},
+        }
+
+        futures = []
+        for user_id, scores in registrations.items():
+            operations = similarity_operations(user_id, dict(scores), scores, {})
+            futures.append(
+                coalescer.submit(operations, {d: "a.com" for d in operations})
+            )
+        assert writer.calls == [] and not any(f.done() for f in futures)
+
+        assert coalescer.flush() == 4
+        assert len(writer.calls) == 1
+        operations, domains = writer.calls[0]
+        assert set(operations) == {"1", "2", "3", "4"}
+        assert [subject for _, subject, _ in operations["1"]] == ["2", "3", "4"]
+        assert [f.result(timeout=1) for f in futures] == [4, 4, 4]
+        stats = coalescer.get_stats()
+        assert stats["written_documents"] == 4
+        assert stats["operations_per_document"] == 1.75
+        coalescer.shutdown()
+
+    def test_forced_flush_when_full_and_on_shutdown(self):
+        """
+        대기 문서 수 상한 도달 시 즉시, 종료 시 남은 작업이 반영되는지 확인
+        """
+        writer = RecordingWriter()
+        coalescer = WriteCoalescer(writer, window=60, max_documents=2)
+
+        coalescer.submit({"1": ["a"]}, {"1": None})
+        assert writer.calls == []
+        full = coalescer.submit({"2": ["b"]}, {"2": None})
+        assert full.done() and len(writer.calls) == 1
+        assert coalescer.get_stats()["forced_flushes"] == 1
+
+        pending = coalescer.submit({"3": ["c"]}, {"3": None})
+        coalescer.shutdown()
+        assert pending.result(timeout=1) == 1
+        assert writer.calls[-1][0] == {"3": ["c"]}
+        assert not coalescer.enabled
+
+    def test_merge_keeps_earlier_reverse_sets(self):
+        """
+        늦게 들어온 자기 문서 교체가 교체 맵에 없는 앞선 역방향 설정을 지우지 않는지 확인
+        """
+        pending = [
+            ("set", "5", {"score": 0.4, "components": None}),
+            ("set", "2", {"score": 0.1, "components": None}),
+        ]
+        incoming = [
+            ("replace", None, {"similarities": {"2": 0.3}, "components": {}}),
+            ("set", "6", {"score": 0.9, "components": None}),
+        ]
+
+        merged = merge_operations(pending, incoming)
+
+        assert [op for op, _, _ in merged] == ["replace", "set", "set"]
+        assert [subject for _, subject, _ in merged[1:]] == ["5", "6"]
+
+    def test_replace_keeps_reverse_entries_from_earlier_batch(self, monkeypatch):
+        """
+        앞 배치에서 반영된 역방향 항목이 다음 배치의 자기 문서 교체로 지워지지 않는지 확인
+        (3의 등록이 먼저 반영된 뒤, 3을 모르고 계산된 2의 등록이 반영되는 경우)
+        """
+        similarity = FakeCollection()
+        profiles = FakeCollection({uid: ({}, [0.1] * 4) for uid in ("1", "2", "3")})
+        monkeypatch.setattr(
+            queue_module, "get_similarity_collection", lambda: similarity
+        )
+        monkeypatch.setattr(queue_module, "get_user_collection", lambda: profiles)
+        coalescer = WriteCoalescer(
+            write_similarity_documents,
+            window=60,
+            max_documents=100,
+            merge=merge_operations,
+        )
+
+        for user_id, scores in (("3", {"1": 0.7, "2": 0.6}), ("2", {"1": 0.5})):
+            operations = similarity_operations(user_id, dict(scores), scores, {})
+            future = coalescer.submit(operations, {d: None for d in operations})
+            coalescer.flush()
+            future.result(timeout=1)
+        coalescer.shutdown()
+
+        assert decode_similarities(similarity.docs["2"][0]) == pytest.approx(
+            {"1": 0.5, "3": 0.6}, abs=1e-4
+        )
+        assert decode_similarities(similarity.docs["1"][0]) == pytest.approx(
+            {"2": 0.5, "3": 0.7}, abs=1e-4
+        )
+
+    @pytest.mark.asyncio
+    async def test_register_user_does_not_block_event_loop(self, monkeypatch):
+        """
+        register_user가 반영 대기(process_registration) 중에도 다른 코루틴이 실행되는지 확인
+        """
+        writer = RecordingWriter()
+        coalescer = WriteCoalescer(writer, window=60, max_documents=100)
+        loop_ran = threading.Event()
+
+        def process_registration(user):
+            # 같은 구간의 다른 요청이 들어올 때까지 기다리는 병합 대기를 흉내냄
+            coalescer.submit({user: ["set"]}, {user: None}).result(timeout=5)
+
+        async def other_request():
+            # 등록 작업이 버퍼에서 대기하는 동안 루프가 계속 돌아야 이 코루틴이 진행됨
+            while not coalescer.get_stats()["pending_documents"]:
+                await asyncio.sleep(0.01)
+            loop_ran.set()
+            coalescer.flush()
+
+        monkeypatch.setattr(user_service, "validate_registration", lambda user: None)
+        monkeypatch.setattr(user_service, "process_registration", process_registration)
+
+        await asyncio.wait_for(
+            asyncio.gather(user_service.register_user("7"), other_request()),
+            timeout=10,
+        )
+
+        assert loop_ran.is_set()
+        assert writer.calls == [({"7": ["set"]}, {"7": None})]
+        coalescer.shutdown()
@@ -25,7 +25,12 @@ def register_exception_handlers(app: FastAPI) -> None:
         """HTTP 예외 핸들러"""
         # HTTP 예외에 detail이 Dict 형태로 들어있으면 그대로 사용
         if isinstance(exc.detail, dict) and "code" in exc.detail:
-            return JSONResponse(status_code=exc.status_code, content=exc.detail)
+            # Retry-After 등 예외에 지정된 헤더 유지
+            return JSONResponse(
+                status_code=exc.status_code,
+                content=exc.detail,
+                headers=getattr(exc, "headers", None),
+            )
 
         if isinstance(exc.detail, list):
             return JSONResponse(
@@ -0,0 +1,167 @@
+# 고정 메모리 히스토그램 유틸리티 (성능 지표 저장용)
+"""
+성능 지표를 값마다 리스트에 쌓지 않고 로그 버킷 히스토그램에 누적
+
+- LogHistogram: 값 v를 floor(log(v / HISTOGRAM_MIN_VALUE) / log(HISTOGRAM_GROWTH))번 버킷에 기록
+  (상대 오차 약 (HISTOGRAM_GROWTH - 1) / 2, 버킷 수는 HISTOGRAM_MAX_BUCKETS로 고정)
+- WindowedHistogram: 누적 히스토그램 + 최근 PERF_WINDOW_SECONDS초를 PERF_WINDOW_SLOTS개 칸으로 나눈
+  링 버퍼 (오래된 칸은 다음 기록 때 비워 재사용하므로 메모리가 늘지 않음)
+- 분위수 / 요약은 비어 있지 않은 버킷만 순회하므로 O(버킷 수)
+- 잠금은 하지 않으므로 여러 스레드에서 기록할 때는 호출하는 쪽에서 잠금
+"""
+
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+# 버킷 폭 (인접 버킷 경계의 비율)
+HISTOGRAM_GROWTH = float(os.getenv("HISTOGRAM_GROWTH", "1.04"))
+# 이 값 이하는 모두 0번 버킷 (초 단위 기준 0.1ms)
+HISTOGRAM_MIN_VALUE = float(os.getenv("HISTOGRAM_MIN_VALUE", "0.0001"))
+# 버킷 수 상한 (기본값이면 0.1ms ~ 약 2.6e13까지 구분)
+HISTOGRAM_MAX_BUCKETS = int(os.getenv("HISTOGRAM_MAX_BUCKETS", "1000"))
+
+# 분위수를 계산할 최근 구간 길이 (초) / 구간을 나눌 칸 수
+PERF_WINDOW_SECONDS = float(os.getenv("PERF_WINDOW_SECONDS", "300"))
+PERF_WINDOW_SLOTS = int(os.getenv("PERF_WINDOW_SLOTS", "10"))
+
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+
+
+class LogHistogram:
+    """
+    로그 버킷 히스토그램 (개수 / 합계 / 최소 / 최대 / 마지막 값은 정확히 유지)
+    """
+
+    __slots__ = ("buckets", "count", "total", "min", "max", "last")
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.clear()
+
+    def clear(self) -> None:
+        self.buckets.clear()
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.last: Optional[float] = None
+
+    @staticmethod
+    def _index(value: float) -> int:
+        if value <= HISTOGRAM_MIN_VALUE:
+            return 0
+        index = int(math.log(value / HISTOGRAM_MIN_VALUE) / _LOG_GROWTH) + 1
+        return min(index, HISTOGRAM_MAX_BUCKETS - 1)
+
+    @staticmethod
+    def bucket_value(index: int) -> float:
+        # 버킷 [min·g^(i-1), min·g^i)의 기하 중앙값
+        if index == 0:
+            return HISTOGRAM_MIN_VALUE
+        return HISTOGRAM_MIN_VALUE * math.exp((index - 0.5) * _LOG_GROWTH)
+
+    def record(self, value: float) -> None:
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+        self.last = value
+
+    def merge(self, other: "LogHistogram") -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if other.count:
+            self.count += other.count
+            self.total += other.total
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+            self.last = other.last
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 분위수 근사값 (최소 / 최대 범위로 제한, 비어 있으면 None)"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(self.bucket_value(index), self.min), self.max)
+        return self.max
+
+
+class WindowedHistogram:
+    """
+    누적 히스토그램과 최근 구간(sliding window) 히스토그램
+
+    Args:
+        window_seconds: 분위수를 계산할 최근 구간 길이 (초)
+        slots: 구간을 나눌 칸 수 (칸 하나 길이만큼씩 구간이 밀려남)
+        clock: 시간 함수 (테스트용)
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = PERF_WINDOW_SECONDS,
+        slots: int = PERF_WINDOW_SLOTS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window_seconds = window_seconds
+        self.lifetime = LogHistogram()
+        self._clock = clock
+        self._slot_seconds = window_seconds / max(1, slots)
+        self._slots = [LogHistogram() for _ in range(max(1, slots))]
+        # 칸별로 기록 중인 시간 구간 번호 (다르면 오래된 칸)
+        self._epochs = [-1] * len(self._slots)
+
+    def _epoch(self) -> int:
+        return int(self._clock() // self._slot_seconds)
+
+    def record(self, value: float) -> None:
+        self.lifetime.record(value)
+        epoch = self._epoch()
+        i = epoch % len(self._slots)
+        if self._epochs[i] != epoch:
+            self._slots[i].clear()
+            self._epochs[i] = epoch
+        self._slots[i].record(value)
+
+    def window(self) -> LogHistogram:
+        """최근 구간에 기록된 값만 합친 히스토그램"""
+        epoch = self._epoch()
+        merged = LogHistogram()
+        for slot_epoch, slot in zip(self._epochs, self._slots):
+            if epoch - len(self._slots) < slot_epoch <= epoch:
+                merged.merge(slot)
+        return merged
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        누적 개수 / 평균 / 최소 / 최대와 최근 구간 p50 / p95 / p99
+        (최근 구간에 기록이 없으면 누적 히스토그램의 분위수)
+        """
+        recent = self.window()
+        source = recent if recent.count else self.lifetime
+        return {
+            "count": self.lifetime.count,
+            "avg": self.lifetime.mean,
+            "min": self.lifetime.min,
+            "max": self.lifetime.max,
+            "p50": _round(source.quantile(0.50)),
+            "p95": _round(source.quantile(0.95)),
+            "p99": _round(source.quantile(0.99)),
+            "window_seconds": self.window_seconds,
+            "window_count": recent.count,
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
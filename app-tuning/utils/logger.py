@@ -1,24 +1,30 @@
 # 로깅 유틸리티(애플리케이션 로그 관리)
 
 import asyncio
+import contextvars
 import functools
 import logging
 import os
+import random
+import threading
 import time
 from datetime import datetime
 from inspect import signature
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import psutil
+from utils.histogram import LogHistogram, WindowedHistogram
+from utils.log_queue import LOG_ASYNC, LOG_FORMAT, QueueLogging, make_formatter
+from utils.prometheus import MetricsWriter
 
 # 로거 설정
 logger = logging.getLogger("tuning_performance")
-formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+# LOG_FORMAT=json이면 한 줄 JSON (요청 컨텍스트의 user_id 포함)
+formatter = make_formatter("%(asctime)s [%(levelname)s] %(message)s", ["user_id"])
 
 # 콘솔 핸들러
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
 
 # 파일 핸들러 (logs 디렉토리에 성능 로그 저장)
 os.makedirs("logs", exist_ok=True)
@@ -26,214 +32,318 @@ file_handler = logging.FileHandler(
     f"logs/performance_{datetime.now().strftime('%Y%m%d')}.log"
 )
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+
+# 요청 처리 경로에서 파일 / 콘솔 쓰기를 하지 않도록 큐에 넣고 별도 스레드에서 출력 (utils/log_queue)
+queue_logging: Optional[QueueLogging] = None
+if LOG_ASYNC:
+    queue_logging = QueueLogging(logger, [console_handler, file_handler])
+else:
+    logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
 
 logger.setLevel(logging.INFO)
 logger.propagate = False  # 부모 로거로 메시지 전파 중단
 
-# 성능 지표 컬렉션 (간단한 인메모리 저장소)
-performance_metrics = {
-    "api_response_times": {},
-    "embedding_generation_times": [],
-    "similarity_calculation_times": [],
-    "db_operation_times": {},
-    "error_counts": {},
-    "memory_usage_samples": [],
-    "memory_usage_by_function": {},
-}
 
+class _UserIdFilter(logging.Filter):
+    # 레코드를 만든 요청 스레드에서 유저 ID를 붙여 둠 (출력 스레드에서는 컨텍스트를 알 수 없음)
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.user_id = current_user_id.get()
+        return True
 
-def log_performance(operation_name: Optional[str] = None, include_memory: bool = False):
-    """
-    성능 측정 및 로깅 데코레이터
 
-    Args:
-        operation_name: 로깅할 작업 이름 (기본값: 함수명)
-        include_memory: 메모리 사용량도 함께 로깅할지 여부
-    """
+logger.addFilter(_UserIdFilter())
 
-    def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        async def async_wrapper(*args, **kwargs) -> Any:
-            # 작업 이름 결정
-            op_name = operation_name or func.__name__
 
-            # 유저 ID 추출 시도
-            bound_args = signature(func).bind(*args, **kwargs)
-            bound_args.apply_defaults()
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    # "embed_fields_optimized=0.1,compute_matching_score=0.5" 형식
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
 
-            user_id = (
-                kwargs.get("user_id")
-                or kwargs.get("userId")
-                or (args[0] if args and isinstance(args[0], (str, int)) else None)
-            )
 
-            # 객체나 딕셔너리 내부 속성에서 추출
-            if not user_id:
-                for arg in bound_args.arguments.values():
-                    if isinstance(arg, dict):
-                        user_id = arg.get("user_id") or arg.get("userId")
-                    elif hasattr(arg, "user_id"):
-                        user_id = getattr(arg, "user_id")
-                    elif hasattr(arg, "userId"):
-                        user_id = getattr(arg, "userId")
-                    if user_id:
-                        break
+# 측정할 호출 비율 기본값 (1.0이면 모든 호출 측정)
+PERF_SAMPLE_RATE = float(os.getenv("PERF_SAMPLE_RATE", "1.0"))
+# 작업별 측정 비율 (예: "embed_fields_optimized=0.1,compute_matching_score=0.5")
+PERF_SAMPLE_RATES = _parse_sample_rates(os.getenv("PERF_SAMPLE_RATES", ""))
+# 메모리 샘플러 주기 (초, 0이면 호출마다 직접 측정)
+PERF_MEMORY_SAMPLE_INTERVAL = float(os.getenv("PERF_MEMORY_SAMPLE_INTERVAL", "1.0"))
 
-            user_id = str(user_id) if user_id is not None else "unknown"
+# 현재 요청(작업)의 유저 ID (컨트롤러 / 작업 워커가 bind_user_id로 설정)
+current_user_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_user_id", default=None
+)
 
-            # 초기 메모리 사용량
-            if include_memory:
-                initial_memory = _get_memory_usage()
 
-            # 시작 시간 기록
-            start_time = time.time()
+def _new_metrics() -> Dict[str, Any]:
+    # 값마다 리스트에 쌓지 않고 고정 메모리 히스토그램 / 누적 합계만 유지 (utils/histogram)
+    return {
+        # (method, route, status) → WindowedHistogram (RequestMetricsMiddleware가 기록)
+        "http_request_times": {},
+        # 작업 이름 → WindowedHistogram
+        "api_response_times": {},
+        "embedding_generation_times": WindowedHistogram(),
+        "embedding_totals": {"field_count": 0, "vector_size": 0},
+        "similarity_calculation_times": WindowedHistogram(),
+        "similarity_totals": {"match_ratio": 0.0},
+        # 컬렉션_작업 → WindowedHistogram
+        "db_operation_times": {},
+        # 작업 이름 → 오류 유형 → 횟수
+        "error_counts": {},
+        "memory_usage_samples": LogHistogram(),
+        # 작업 이름 → LogHistogram
+        "memory_usage_by_function": {},
+        # 작업 이름 → [계측 오버헤드 합계, 측정한 실행 시간 합계] (초)
+        "instrumentation_overhead": {},
+    }
+
+
+# 성능 지표 컬렉션 (고정 메모리 인메모리 저장소)
+performance_metrics = _new_metrics()
+# 여러 요청 스레드가 동시에 기록하므로 지표 갱신 / 요약 생성 시 잠금
+_metrics_lock = threading.Lock()
+# 작업 이름 → 측정 비율 (데코레이션 시 결정)
+sample_rates: Dict[str, float] = {}
+
+
+class MemorySampler:
+    """
+    백그라운드 스레드가 주기적으로 프로세스 메모리(RSS)를 읽어 두고,
+    데코레이터는 호출마다 psutil을 부르지 않고 마지막 값만 사용
+
+    - 처음 사용될 때 시작하며, fork된 워커에서는 새 프로세스 기준으로 다시 시작
+    - interval이 0 이하면 호출마다 직접 측정
+    """
 
+    def __init__(self, interval: float = PERF_MEMORY_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self._value = 0.0
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def current_mb(self) -> float:
+        if self.interval <= 0:
+            return _get_memory_usage()
+        if self._pid != os.getpid():
+            self._start()
+        return self._value
+
+    def _start(self) -> None:
+        with self._lock:
+            pid = os.getpid()
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._value = _get_memory_usage()
+            threading.Thread(
+                target=self._run, args=(pid,), name="memory-sampler", daemon=True
+            ).start()
+
+    def _run(self, pid: int) -> None:
+        process = psutil.Process(pid)
+        # fork된 자식에서는 _pid가 바뀌므로 부모에서 시작한 루프와 섞이지 않음
+        while self._pid == pid:
+            time.sleep(self.interval)
             try:
-                # 함수 실행
-                result = await func(*args, **kwargs)
+                self._value = process.memory_info().rss / (1024 * 1024)
+                self.samples += 1
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "samples": self.samples,
+            "current_mb": round(self._value, 2),
+        }
 
-                # 경과 시간 계산
-                elapsed = round(time.time() - start_time, 3)
 
-                # 결과 정보 추출
-                result_info = _extract_result_info(result)
+# 모듈 레벨 싱글톤 인스턴스
+memory_sampler = MemorySampler()
 
-                # 메모리 사용량 변화 계산
-                memory_info = ""
-                if include_memory:
-                    final_memory = _get_memory_usage()
-                    memory_diff = final_memory - initial_memory
-                    memory_info = f", memory_diff={memory_diff:.2f}MB"
+# 외부 모듈(캐시 등)의 통계를 성능 요약에 포함시키기 위한 제공자 목록
+summary_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
 
-                    if op_name not in performance_metrics["memory_usage_by_function"]:
-                        performance_metrics["memory_usage_by_function"][op_name] = []
-                    performance_metrics["memory_usage_by_function"][op_name].append(
-                        final_memory
-                    )
 
-                # 성능 정보 로깅
-                logger.info(
-                    f"PERF: {op_name} completed in {elapsed}s [userId={user_id}{result_info}{memory_info}]"
-                )
+def log_performance(
+    operation_name: Optional[str] = None,
+    include_memory: bool = False,
+    sample_rate: Optional[float] = None,
+):
+    """
+    성능 측정 및 로깅 데코레이터
 
-                # 메트릭 저장
-                _store_metric(op_name, elapsed, result)
+    Args:
+        operation_name: 로깅할 작업 이름 (기본값: 함수명)
+        include_memory: 메모리 사용량도 함께 로깅할지 여부 (백그라운드 샘플러 값 사용)
+        sample_rate: 측정할 호출 비율 (기본값: PERF_SAMPLE_RATE, PERF_SAMPLE_RATES가 우선)
+    """
 
-                return result
+    def decorator(func: Callable) -> Callable:
+        # 작업 이름 / 측정 비율 / 유저 ID 인자 위치는 데코레이션 시 한 번만 결정
+        op_name = operation_name or func.__name__
+        rate = _resolve_sample_rate(op_name, sample_rate)
+        user_arg = _find_user_arg(func)
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs) -> Any:
+            # 측정하지 않는 호출은 오류 횟수만 기록
+            if rate < 1.0 and random.random() >= rate:
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    _record_error(op_name, type(e).__name__)
+                    raise
+
+            entered = time.perf_counter()
+            initial_memory = memory_sampler.current_mb() if include_memory else None
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
             except Exception as e:
-                # 오류 발생 시간 계산
-                elapsed = round(time.time() - start_time, 3)
+                _log_failure(op_name, start, user_arg, args, kwargs, e)
+                raise
+            _log_success(
+                op_name, entered, start, user_arg, args, kwargs, result, initial_memory
+            )
+            return result
 
-                # 오류 정보 로깅
-                error_type = type(e).__name__
-                logger.error(
-                    f"PERF-ERROR: {op_name} failed after {elapsed}s [userId={user_id}, error_type={error_type}]"
-                )
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs) -> Any:
+            # 측정하지 않는 호출은 오류 횟수만 기록
+            if rate < 1.0 and random.random() >= rate:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    _record_error(op_name, type(e).__name__)
+                    raise
+
+            entered = time.perf_counter()
+            initial_memory = memory_sampler.current_mb() if include_memory else None
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                _log_failure(op_name, start, user_arg, args, kwargs, e)
+                raise
+            _log_success(
+                op_name, entered, start, user_arg, args, kwargs, result, initial_memory
+            )
+            return result
 
-                # 오류 카운트 증가
-                if op_name not in performance_metrics["error_counts"]:
-                    performance_metrics["error_counts"][op_name] = {}
+        # 동기/비동기 함수에 맞는 래퍼 반환
+        if asyncio.iscoroutinefunction(func):
+            return async_wrapper
+        else:
+            return sync_wrapper
 
-                if error_type not in performance_metrics["error_counts"][op_name]:
-                    performance_metrics["error_counts"][op_name][error_type] = 0
+    return decorator
 
-                performance_metrics["error_counts"][op_name][error_type] += 1
 
-                raise
+def _log_success(
+    op_name: str,
+    entered: float,
+    start: float,
+    user_arg: Optional[Tuple[str, int]],
+    args: tuple,
+    kwargs: dict,
+    result: Any,
+    initial_memory: Optional[float],
+) -> None:
+    """
+    성공한 호출의 로그 / 지표 기록 (측정 자체에 쓴 시간을 계측 오버헤드로 함께 기록)
+    """
+    finished = time.perf_counter()
+    elapsed = finished - start
 
-        @functools.wraps(func)
-        def sync_wrapper(*args, **kwargs) -> Any:
-            # 작업 이름 결정
-            op_name = operation_name or func.__name__
-
-            bound_args = signature(func).bind(*args, **kwargs)
-            bound_args.apply_defaults()
-            # 유저 ID 추출 시도
-            user_id = (
-                kwargs.get("user_id")
-                or kwargs.get("userId")
-                or (args[0] if args and isinstance(args[0], (str, int)) else None)
-            )
+    # 결과 정보 추출
+    result_info = _extract_result_info(result)
 
-            # 객체 속성 탐색
-            if not user_id:
-                for arg in bound_args.arguments.values():
-                    if isinstance(arg, dict) and ("user_id" in arg or "userId" in arg):
-                        user_id = arg.get("user_id") or arg.get("userId")
-                        break
-                    if hasattr(arg, "user_id"):
-                        user_id = getattr(arg, "user_id")
-                        break
-                    if hasattr(arg, "userId"):
-                        user_id = getattr(arg, "userId")
-                        break
-
-            user_id = str(user_id) if user_id is not None else "unknown"
-
-            # 초기 메모리 사용량
-            if include_memory:
-                initial_memory = _get_memory_usage()
+    # 메모리 사용량 변화 계산 (샘플러 주기 단위의 근사값)
+    memory_info = ""
+    if initial_memory is not None:
+        final_memory = memory_sampler.current_mb()
+        memory_info = f", memory_diff={final_memory - initial_memory:.2f}MB"
+        _record_memory(op_name, final_memory)
 
-            # 시작 시간 기록
-            start_time = time.time()
+    # 성능 정보 로깅
+    user_id = _resolve_user_id(user_arg, args, kwargs)
+    logger.info(
+        f"PERF: {op_name} completed in {elapsed:.3f}s [userId={user_id}{result_info}{memory_info}]"
+    )
 
-            try:
-                # 함수 실행
-                result = func(*args, **kwargs)
+    # 메트릭 저장
+    overhead = (start - entered) + (time.perf_counter() - finished)
+    _store_metric(op_name, elapsed, result, overhead=overhead)
 
-                # 경과 시간 계산
-                elapsed = round(time.time() - start_time, 3)
 
-                # 결과 정보 추출
-                result_info = _extract_result_info(result)
-
-                # 메모리 사용량 변화 계산
-                memory_info = ""
-                if include_memory:
-                    final_memory = _get_memory_usage()
-                    memory_diff = final_memory - initial_memory
-                    memory_info = f", memory_diff={memory_diff:.2f}MB"
-                    performance_metrics["memory_usage_samples"].append(final_memory)
-
-                    if op_name not in performance_metrics["memory_usage_by_function"]:
-                        performance_metrics["memory_usage_by_function"][op_name] = []
-                    performance_metrics["memory_usage_by_function"][op_name].append(
-                        final_memory
-                    )
-                # 성능 정보 로깅
-                logger.info(
-                    f"PERF: {op_name} completed in {elapsed}s [userId={user_id}{result_info}{memory_info}]"
-                )
+def _log_failure(
+    op_name: str,
+    start: float,
+    user_arg: Optional[Tuple[str, int]],
+    args: tuple,
+    kwargs: dict,
+    error: Exception,
+) -> None:
+    """
+    실패한 호출의 오류 로그 / 작업별 오류 횟수 기록
+    """
+    elapsed = time.perf_counter() - start
+    error_type = type(error).__name__
+    user_id = _resolve_user_id(user_arg, args, kwargs)
+    logger.error(
+        f"PERF-ERROR: {op_name} failed after {elapsed:.3f}s [userId={user_id}, error_type={error_type}]"
+    )
+    _record_error(op_name, error_type)
 
-                # 메트릭 저장
-                _store_metric(op_name, elapsed, result)
 
-                return result
-            except Exception as e:
-                # 오류 발생 시간 계산
-                elapsed = round(time.time() - start_time, 3)
+def bind_user_id(user_id: Any) -> contextvars.Token:
+    """
+    현재 요청(작업) 컨텍스트의 유저 ID 설정 (이후 log_performance 로그에 사용)
 
-                # 오류 정보 로깅
-                error_type = type(e).__name__
-                logger.error(
-                    f"PERF-ERROR: {op_name} failed after {elapsed}s [userId={user_id}, error_type={error_type}]"
-                )
+    Returns:
+        reset_user_id에 넘길 토큰
+    """
+    return current_user_id.set(str(user_id) if user_id is not None else None)
 
-                # 오류 카운트 증가
-                if error_type not in performance_metrics["error_counts"]:
-                    performance_metrics["error_counts"][error_type] = 0
-                performance_metrics["error_counts"][error_type] += 1
 
-                raise
+def reset_user_id(token: contextvars.Token) -> None:
+    """bind_user_id 이전 값으로 복원"""
+    current_user_id.reset(token)
 
-        # 동기/비동기 함수에 맞는 래퍼 반환
-        if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        else:
-            return sync_wrapper
 
-    return decorator
+def _find_user_arg(func: Callable) -> Optional[Tuple[str, int]]:
+    # 컨텍스트에 유저 ID가 없을 때 쓸 user_id / userId 인자의 (이름, 위치) (시그니처는 한 번만 분석)
+    try:
+        parameters = list(signature(func).parameters)
+    except (TypeError, ValueError):
+        return None
+    for index, name in enumerate(parameters):
+        if name in ("user_id", "userId"):
+            return name, index
+    return None
+
+
+def _resolve_user_id(
+    user_arg: Optional[Tuple[str, int]], args: tuple, kwargs: dict
+) -> str:
+    user_id = current_user_id.get()
+    if user_id is None and user_arg is not None:
+        name, index = user_arg
+        user_id = kwargs.get(name, args[index] if index < len(args) else None)
+    return str(user_id) if user_id is not None else "unknown"
+
+
+def _resolve_sample_rate(op_name: str, sample_rate: Optional[float]) -> float:
+    rate = PERF_SAMPLE_RATES.get(
+        op_name, PERF_SAMPLE_RATE if sample_rate is None else sample_rate
+    )
+    rate = min(max(rate, 0.0), 1.0)
+    sample_rates[op_name] = rate
+    return rate
 
 
 def log_db_operation(operation_type: str, collection_name: str) -> Callable:
@@ -269,9 +379,7 @@ def log_db_operation(operation_type: str, collection_name: str) -> Callable:
                 logger.info(f"DB-PERF: {op_key} completed in {elapsed}s{data_info}")
 
                 # 메트릭 저장
-                if op_key not in performance_metrics["db_operation_times"]:
-                    performance_metrics["db_operation_times"][op_key] = []
-                performance_metrics["db_operation_times"][op_key].append(elapsed)
+                _store_metric(op_key, elapsed, kind="db_operation_times")
 
                 return result
             except Exception as e:
@@ -285,9 +393,7 @@ def log_db_operation(operation_type: str, collection_name: str) -> Callable:
                 )
 
                 # 오류 카운트 증가
-                if error_type not in performance_metrics["error_counts"]:
-                    performance_metrics["error_counts"][error_type] = 0
-                performance_metrics["error_counts"][error_type] += 1
+                _record_error(op_key, error_type)
 
                 raise
 
@@ -310,9 +416,11 @@ def log_embedding_generation(
     logger.info(
         f"EMBEDDING: Generated {field_count} fields in {elapsed:.3f}s, vector_size={vector_size}"
     )
-    performance_metrics["embedding_generation_times"].append(
-        {"field_count": field_count, "vector_size": vector_size, "time": elapsed}
-    )
+    with _metrics_lock:
+        performance_metrics["embedding_generation_times"].record(elapsed)
+        totals = performance_metrics["embedding_totals"]
+        totals["field_count"] += field_count
+        totals["vector_size"] += vector_size
 
 
 def log_similarity_calculation(
@@ -333,15 +441,11 @@ def log_similarity_calculation(
         f"[userId={user_id}, avg_time_per_user={avg_time_per_user:.5f}s]"
     )
 
-    performance_metrics["similarity_calculation_times"].append(
-        {
-            "user_id": user_id,
-            "total_users": total_users,
-            "match_count": match_count,
-            "time": elapsed,
-            "avg_time_per_user": avg_time_per_user,
-        }
-    )
+    with _metrics_lock:
+        performance_metrics["similarity_calculation_times"].record(elapsed)
+        performance_metrics["similarity_totals"]["match_ratio"] += (
+            match_count / total_users if total_users > 0 else 0
+        )
 
 
 def log_memory_usage(operation: str = "general") -> None:
@@ -353,141 +457,269 @@ def log_memory_usage(operation: str = "general") -> None:
     """
     memory_mb = _get_memory_usage()
     logger.info(f"MEMORY: {operation} - Current usage: {memory_mb:.2f}MB")
-    performance_metrics["memory_usage_samples"].append(memory_mb)
+    with _metrics_lock:
+        performance_metrics["memory_usage_samples"].record(memory_mb)
+
+
+def log_http_request(method: str, route: str, status: int, elapsed: float) -> None:
+    """
+    HTTP 요청 지연 기록 (로그 없이 히스토그램에만 기록, /metrics에서 노출)
+
+    Args:
+        route: 라우트 템플릿 (예: /api/v1/users/{user_id})
+    """
+    _store_metric((method, route, status), elapsed, kind="http_request_times")
+
+
+def record_db_operation(op_key: str, elapsed: float) -> None:
+    """
+    저장소 연산 시간 기록 (로그 없이 db_operations 히스토그램에만 기록)
+
+    Args:
+        op_key: 컬렉션_작업 (예: user_profiles_query)
+    """
+    _store_metric(op_key, elapsed, kind="db_operation_times")
+
+
+def get_prometheus_metrics() -> str:
+    """
+    성능 지표 / 요약 제공자 통계 / 프로세스 지표를 Prometheus 텍스트 노출 형식으로 반환
+    """
+    writer = MetricsWriter()
+    with _metrics_lock:
+        writer.histogram(
+            "tuning_http_request_duration_seconds",
+            "HTTP request latency by route template.",
+            [
+                ({"method": method, "route": route, "status": status}, h.lifetime)
+                for (method, route, status), h in performance_metrics[
+                    "http_request_times"
+                ].items()
+            ],
+        )
+        writer.histogram(
+            "tuning_operation_duration_seconds",
+            "log_performance operation latency (encode, scoring, similarity fan-out).",
+            [
+                ({"operation": op_name}, h.lifetime)
+                for op_name, h in performance_metrics["api_response_times"].items()
+            ],
+        )
+        writer.histogram(
+            "tuning_db_operation_duration_seconds",
+            "Chroma collection operation latency.",
+            [
+                ({"operation": op_key}, h.lifetime)
+                for op_key, h in performance_metrics["db_operation_times"].items()
+            ],
+        )
+        writer.histogram(
+            "tuning_embedding_generation_duration_seconds",
+            "Embedding generation latency.",
+            [({}, performance_metrics["embedding_generation_times"].lifetime)],
+        )
+        writer.histogram(
+            "tuning_similarity_calculation_duration_seconds",
+            "Similarity calculation latency.",
+            [({}, performance_metrics["similarity_calculation_times"].lifetime)],
+        )
+        writer.counter(
+            "tuning_operation_errors_total",
+            "Failed operations by error type.",
+            [
+                ({"operation": op_name, "error_type": error_type}, count)
+                for op_name, counts in performance_metrics["error_counts"].items()
+                for error_type, count in counts.items()
+            ],
+        )
+        writer.counter(
+            "tuning_instrumentation_overhead_seconds_total",
+            "Time spent by log_performance measuring operations.",
+            [
+                ({"operation": op_name}, overhead)
+                for op_name, (overhead, _) in performance_metrics[
+                    "instrumentation_overhead"
+                ].items()
+            ],
+        )
+
+    # 요약 제공자 통계 (큐 깊이, 캐시 적중률 등)
+    for name, provider in list(summary_providers.items()):
+        try:
+            writer.stats("tuning", name, provider())
+        except Exception as e:
+            logger.warning(f"SUMMARY-PROVIDER-ERROR: {name} [error={e}]")
+
+    writer.process()
+    return writer.render()
 
 
 def get_performance_summary() -> Dict[str, Any]:
     """
     누적된 성능 지표 요약 정보 반환
+    (개수 / 평균 / 최소 / 최대는 누적값, p50 / p95 / p99는 최근 구간 기준)
+    """
+    with _metrics_lock:
+        summary = _summarize_metrics()
+
+    # 등록된 외부 통계 제공자 요약
+    for name, provider in summary_providers.items():
+        try:
+            summary[name] = provider()
+        except Exception as e:
+            logger.warning(f"SUMMARY-PROVIDER-ERROR: {name} [error={e}]")
+    return summary
+
+
+def register_summary_provider(
+    name: str, provider: Callable[[], Dict[str, Any]]
+) -> None:
+    """
+    성능 요약(get_performance_summary)에 포함될 통계 제공자 등록
+
+    Args:
+        name: 요약 응답에 사용될 키 이름
+        provider: 통계 딕셔너리를 반환하는 함수
+    """
+    summary_providers[name] = provider
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """
+    로그 출력 큐 상태 (대기 레코드 수, 버린 레코드 수)
+    """
+    if queue_logging is None:
+        return {"async": False, "format": LOG_FORMAT}
+    return queue_logging.get_stats()
+
+
+register_summary_provider("logging", get_logging_stats)
+
+
+def stop_logging() -> None:
+    """
+    큐에 남은 로그를 모두 출력하고 리스너 중지
+    (atexit를 거치지 않고 os._exit로 끝나는 pre-fork 워커가 종료 직전에 호출)
+    """
+    if queue_logging is not None:
+        queue_logging.stop()
+
+
+def reset_performance_metrics() -> None:
     """
-    import statistics
+    성능 지표 초기화
+    """
+    with _metrics_lock:
+        performance_metrics.clear()
+        performance_metrics.update(_new_metrics())
 
-    summary = {}
+
+def _summarize_metrics() -> Dict[str, Any]:
+    """
+    히스토그램 / 누적 합계로 요약 생성 (비어 있지 않은 버킷만 순회, 호출하는 쪽에서 잠금)
+    """
+    summary: Dict[str, Any] = {}
 
     # API 응답 시간 요약
     if performance_metrics["api_response_times"]:
-        summary["api_response_times"] = {}
-        for op_name, times in performance_metrics["api_response_times"].items():
-            if times:
-                summary["api_response_times"][op_name] = {
-                    "count": len(times),
-                    "avg": statistics.mean(times),
-                    "min": min(times),
-                    "max": max(times),
-                    "p95": (
-                        sorted(times)[int(len(times) * 0.95)]
-                        if len(times) > 20
-                        else max(times)
-                    ),
-                }
+        summary["api_response_times"] = {
+            op_name: {
+                **histogram.summary(),
+                "errors": sum(
+                    performance_metrics["error_counts"].get(op_name, {}).values()
+                ),
+                # count는 측정한 호출 수 (sample_rate < 1이면 일부 호출만 측정)
+                "sample_rate": sample_rates.get(op_name, 1.0),
+                "overhead_ratio": _overhead_ratio(
+                    *performance_metrics["instrumentation_overhead"].get(
+                        op_name, (0.0, 0.0)
+                    )
+                ),
+            }
+            for op_name, histogram in performance_metrics["api_response_times"].items()
+        }
 
     # 임베딩 생성 시간 요약
-    if performance_metrics["embedding_generation_times"]:
-        times = [
-            item["time"] for item in performance_metrics["embedding_generation_times"]
-        ]
+    embedding = performance_metrics["embedding_generation_times"]
+    if embedding.lifetime.count:
+        count = embedding.lifetime.count
+        totals = performance_metrics["embedding_totals"]
         summary["embedding_generation"] = {
-            "count": len(times),
-            "avg_time": statistics.mean(times) if times else 0,
-            "avg_fields": (
-                statistics.mean(
-                    [
-                        item["field_count"]
-                        for item in performance_metrics["embedding_generation_times"]
-                    ]
-                )
-                if times
-                else 0
-            ),
-            "avg_vector_size": (
-                statistics.mean(
-                    [
-                        item["vector_size"]
-                        for item in performance_metrics["embedding_generation_times"]
-                    ]
-                )
-                if times
-                else 0
-            ),
+            "count": count,
+            "avg_time": embedding.lifetime.mean,
+            "avg_fields": totals["field_count"] / count,
+            "avg_vector_size": totals["vector_size"] / count,
+            **_percentiles(embedding),
         }
 
     # 유사도 계산 시간 요약
-    if performance_metrics["similarity_calculation_times"]:
-        times = [
-            item["time"] for item in performance_metrics["similarity_calculation_times"]
-        ]
+    similarity = performance_metrics["similarity_calculation_times"]
+    if similarity.lifetime.count:
+        count = similarity.lifetime.count
         summary["similarity_calculation"] = {
-            "count": len(times),
-            "avg_time": statistics.mean(times) if times else 0,
-            "avg_match_ratio": (
-                statistics.mean(
-                    [
-                        (
-                            item["match_count"] / item["total_users"]
-                            if item["total_users"] > 0
-                            else 0
-                        )
-                        for item in performance_metrics["similarity_calculation_times"]
-                    ]
-                )
-                if times
-                else 0
-            ),
+            "count": count,
+            "avg_time": similarity.lifetime.mean,
+            "avg_match_ratio": performance_metrics["similarity_totals"]["match_ratio"]
+            / count,
+            **_percentiles(similarity),
         }
 
     # DB 작업 시간 요약
     if performance_metrics["db_operation_times"]:
-        summary["db_operations"] = {}
-        for op_key, times in performance_metrics["db_operation_times"].items():
-            if times:
-                summary["db_operations"][op_key] = {
-                    "count": len(times),
-                    "avg": statistics.mean(times),
-                    "min": min(times),
-                    "max": max(times),
-                }
-
-    # 오류 카운트 요약
+        summary["db_operations"] = {
+            op_key: histogram.summary()
+            for op_key, histogram in performance_metrics["db_operation_times"].items()
+        }
+
+    # 오류 카운트 요약 (작업 이름 → 오류 유형 → 횟수)
     if performance_metrics["error_counts"]:
-        summary["errors"] = performance_metrics["error_counts"]
+        summary["errors"] = {
+            op_name: dict(counts)
+            for op_name, counts in performance_metrics["error_counts"].items()
+        }
 
     # 메모리 사용량 요약
-    if performance_metrics["memory_usage_samples"]:
+    samples = performance_metrics["memory_usage_samples"]
+    if samples.count:
         summary["memory_usage"] = {
-            "samples": len(performance_metrics["memory_usage_samples"]),
-            "avg": statistics.mean(performance_metrics["memory_usage_samples"]),
-            "max": max(performance_metrics["memory_usage_samples"]),
-            "current": (
-                performance_metrics["memory_usage_samples"][-1]
-                if performance_metrics["memory_usage_samples"]
-                else 0
-            ),
+            "samples": samples.count,
+            "avg": samples.mean,
+            "max": samples.max,
+            "current": samples.last,
         }
+
     # 함수별 메모리 사용량 요약
-    if "memory_usage_by_function" in performance_metrics:
-        summary["memory_usage_by_function"] = {}
+    summary["memory_usage_by_function"] = {
+        func_name: {
+            "count": samples.count,
+            "avg": samples.mean,
+            "max": samples.max,
+            "latest": samples.last,
+        }
         for func_name, samples in performance_metrics[
             "memory_usage_by_function"
-        ].items():
-            if samples:
-                summary["memory_usage_by_function"][func_name] = {
-                    "count": len(samples),
-                    "avg": statistics.mean(samples),
-                    "max": max(samples),
-                    "latest": samples[-1],
-                }
+        ].items()
+    }
+
+    # 계측 오버헤드 (데코레이터가 측정에 쓴 시간 / 측정한 실행 시간)
+    overhead = performance_metrics["instrumentation_overhead"].values()
+    summary["instrumentation"] = {
+        "overhead_seconds": round(sum(o for o, _ in overhead), 6),
+        "overhead_ratio": _overhead_ratio(
+            sum(o for o, _ in overhead), sum(e for _, e in overhead)
+        ),
+        "memory_sampler": memory_sampler.get_stats(),
+    }
     return summary
 
 
-def reset_performance_metrics() -> None:
-    """
-    성능 지표 초기화
-    """
-    for key in performance_metrics:
-        if isinstance(performance_metrics[key], dict):
-            performance_metrics[key] = {}
-        else:
-            performance_metrics[key] = []
+def _overhead_ratio(overhead: float, elapsed: float) -> Optional[float]:
+    return round(overhead / elapsed, 6) if elapsed > 0 else None
+
+
+def _percentiles(histogram: WindowedHistogram) -> Dict[str, Any]:
+    summary = histogram.summary()
+    return {key: summary[key] for key in ("p50", "p95", "p99", "window_count")}
 
 
 def _get_memory_usage() -> float:
@@ -518,13 +750,56 @@ def _extract_result_info(result: Any) -> str:
     return info
 
 
-def _store_metric(op_name: str, elapsed: float, result: Any = None) -> None:
+def _store_metric(
+    op_name: str,
+    elapsed: float,
+    result: Any = None,
+    kind: str = "api_response_times",
+    overhead: Optional[float] = None,
+) -> None:
     """
-    성능 지표 저장
+    성능 지표 저장 (작업별 히스토그램에 경과 시간 기록)
+
+    Args:
+        overhead: 이 호출을 측정하는 데 쓴 시간 (초, 데코레이터가 전달)
     """
-    # API 응답 시간 저장
-    if op_name not in performance_metrics["api_response_times"]:
-        performance_metrics["api_response_times"][op_name] = []
-    performance_metrics["api_response_times"][op_name].append(elapsed)
+    with _metrics_lock:
+        histograms = performance_metrics[kind]
+        histogram = histograms.get(op_name)
+        if histogram is None:
+            histogram = histograms[op_name] = WindowedHistogram()
+        histogram.record(elapsed)
+        if overhead is not None:
+            totals = performance_metrics["instrumentation_overhead"].setdefault(
+                op_name, [0.0, 0.0]
+            )
+            totals[0] += overhead
+            totals[1] += elapsed
 
     # 추가 메트릭 (예: 임베딩 또는 유사도 계산 관련)은 전용 함수를 통해 저장
+
+
+def _record_error(op_name: str, error_type: str) -> None:
+    """
+    작업별 오류 유형 횟수 증가
+    """
+    with _metrics_lock:
+        counts = performance_metrics["error_counts"].setdefault(op_name, {})
+        counts[error_type] = counts.get(error_type, 0) + 1
+
+
+def _record_memory(op_name: str, memory_mb: float, process_sample: bool = True) -> None:
+    """
+    작업 종료 시점 메모리 사용량 기록
+
+    Args:
+        process_sample: 프로세스 전체 메모리 샘플(memory_usage)에도 포함할지 여부
+    """
+    with _metrics_lock:
+        if process_sample:
+            performance_metrics["memory_usage_samples"].record(memory_mb)
+        histograms = performance_metrics["memory_usage_by_function"]
+        histogram = histograms.get(op_name)
+        if histogram is None:
+            histogram = histograms[op_name] = LogHistogram()
+        histogram.record(memory_mb)
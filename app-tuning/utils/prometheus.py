@@ -0,0 +1,221 @@
+# Prometheus 텍스트 노출 형식 유틸리티 (/metrics)
+"""
+이미 수집 중인 성능 지표(utils/logger 히스토그램, 요약 제공자 통계)를
+Prometheus 텍스트 노출 형식(text/plain; version=0.0.4)으로 변환
+
+- 히스토그램: 로그 버킷 히스토그램(utils/histogram)을 PROMETHEUS_BUCKETS 경계의 누적 le 버킷으로 변환
+  (개수 / 합계는 정확, 버킷 경계는 로그 버킷 폭 이내 근사) → histogram_quantile로 p99 계산 가능
+- 요청 지연: RequestMetricsMiddleware가 라우트 템플릿(/api/v1/users/{user_id}) 단위로 기록
+- 구성 요소 통계: 요약 제공자(register_summary_provider)의 숫자 값을 게이지로 노출
+  (예: registration_jobs.queued → tuning_registration_jobs_queued)
+- 변환은 스크레이프 시에만 수행되므로 요청 처리 경로에는 히스토그램 기록 비용만 추가됨
+- pre-fork 다중 워커 모드에서는 응답한 워커의 지표만 포함
+"""
+
+import math
+import os
+import re
+import time
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+from utils.histogram import LogHistogram
+
+# 히스토그램 le 버킷 경계 (초)
+PROMETHEUS_BUCKETS = sorted(
+    float(b)
+    for b in os.getenv(
+        "PROMETHEUS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30"
+    ).split(",")
+)
+# 노출 형식 Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# 라우트에 매칭되지 않은 요청의 route 라벨 (경로를 그대로 쓰면 라벨 종류가 무한히 늘어남)
+UNMATCHED_ROUTE = "<unmatched>"
+
+Labels = Dict[str, Any]
+
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def metric_name(*parts: str) -> str:
+    """이름 조각을 Prometheus 지표 이름으로 변환 (허용되지 않는 문자는 _)"""
+    return _INVALID_NAME.sub("_", "_".join(p for p in parts if p)).lower()
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsWriter:
+    """
+    Prometheus 텍스트 노출 형식 작성기
+
+    Args:
+        buckets: 히스토그램 le 버킷 경계 (오름차순)
+    """
+
+    def __init__(self, buckets: List[float] = PROMETHEUS_BUCKETS):
+        self.buckets = buckets
+        self._lines: List[str] = []
+
+    def _header(self, name: str, help_text: str, kind: str) -> None:
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {kind}")
+
+    def _sample(self, name: str, labels: Labels, value: float) -> None:
+        self._lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def gauge(
+        self, name: str, help_text: str, samples: Iterable[Tuple[Labels, float]]
+    ) -> None:
+        samples = list(samples)
+        if samples:
+            self._header(name, help_text, "gauge")
+            for labels, value in samples:
+                self._sample(name, labels, value)
+
+    def counter(
+        self, name: str, help_text: str, samples: Iterable[Tuple[Labels, float]]
+    ) -> None:
+        samples = list(samples)
+        if samples:
+            self._header(name, help_text, "counter")
+            for labels, value in samples:
+                self._sample(name, labels, value)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        series: Iterable[Tuple[Labels, LogHistogram]],
+    ) -> None:
+        """
+        로그 버킷 히스토그램을 누적 le 버킷 / _sum / _count로 변환 (비어 있지 않은 버킷만 순회)
+        """
+        series = [(labels, h) for labels, h in series if h.count]
+        if not series:
+            return
+        self._header(name, help_text, "histogram")
+        for labels, histogram in series:
+            counts = [0] * len(self.buckets)
+            for index, count in histogram.buckets.items():
+                # 버킷 대표값이 들어가는 첫 le 경계 (모든 경계보다 크면 +Inf에만 포함)
+                position = bisect_left(self.buckets, LogHistogram.bucket_value(index))
+                if position < len(counts):
+                    counts[position] += count
+            for bound, cumulative in zip(self.buckets, accumulate(counts)):
+                self._sample(f"{name}_bucket", {**labels, "le": bound}, cumulative)
+            self._sample(f"{name}_bucket", {**labels, "le": "+Inf"}, histogram.count)
+            self._sample(f"{name}_sum", labels, histogram.total)
+            self._sample(f"{name}_count", labels, histogram.count)
+
+    def stats(self, prefix: str, component: str, stats: Dict[str, Any]) -> None:
+        """
+        통계 딕셔너리의 숫자 / 불리언 값을 게이지로 기록 (한 단계 중첩 딕셔너리까지, 문자열 / 목록 제외)
+        """
+        for key, value in stats.items():
+            if isinstance(value, dict):
+                self.stats(prefix, metric_name(component, key), value)
+            elif isinstance(value, (bool, int, float)) and not (
+                isinstance(value, float) and math.isnan(value)
+            ):
+                name = metric_name(prefix, component, key)
+                self.gauge(name, f"{component}.{key}", [({}, value)])
+
+    def process(self) -> None:
+        """프로세스 메모리 / CPU / 파일 디스크립터 (Prometheus 표준 process_* 이름)"""
+        try:
+            process = psutil.Process(os.getpid())
+            with process.oneshot():
+                memory = process.memory_info()
+                cpu = process.cpu_times()
+                created = process.create_time()
+                threads = process.num_threads()
+                fds = process.num_fds() if hasattr(process, "num_fds") else None
+        except Exception:
+            return
+        self.gauge(
+            "process_resident_memory_bytes",
+            "Resident memory size in bytes.",
+            [({}, memory.rss)],
+        )
+        self.gauge(
+            "process_virtual_memory_bytes",
+            "Virtual memory size in bytes.",
+            [({}, memory.vms)],
+        )
+        self.counter(
+            "process_cpu_seconds_total",
+            "Total user and system CPU time spent in seconds.",
+            [({}, cpu.user + cpu.system)],
+        )
+        self.gauge(
+            "process_start_time_seconds",
+            "Start time of the process since unix epoch in seconds.",
+            [({}, created)],
+        )
+        self.gauge("process_threads", "Number of OS threads.", [({}, threads)])
+        if fds is not None:
+            self.gauge(
+                "process_open_fds", "Number of open file descriptors.", [({}, fds)]
+            )
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+class RequestMetricsMiddleware:
+    """
+    요청 지연 기록 ASGI 미들웨어 (BaseHTTPMiddleware보다 가벼운 순수 ASGI 구현)
+    응답 시작까지가 아니라 응답 본문 전송 완료까지의 시간을 라우트 템플릿 단위로 기록
+
+    Args:
+        app: 하위 ASGI 앱
+        record: (method, route, status, elapsed) 기록 함수
+    """
+
+    def __init__(self, app, record: Callable[[str, str, int, float], None]):
+        self.app = app
+        self.record = record
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status: Optional[int] = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.record(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status or 500,
+                time.perf_counter() - start,
+            )